@@ -0,0 +1,212 @@
+"""
+Curva forward de minério de ferro em arrays NumPy contíguos.
+
+`ForwardCurve` guarda um snapshot da curva (um preço por contrato, o mais
+recente) como arrays ordenados por vencimento. Interpolação, roll yield e
+spreads de calendário são operações vetorizadas sobre esses arrays, baratas
+o bastante para rodar a cada tick do sinal.
+
+Uso:
+    from jobs.clients.supabase_client import get_supabase_client
+
+    curve = get_supabase_client().get_forward_curve()
+    curve.interpolate(90)          # Preço no tenor de 90 dias
+    curve.roll_yield()             # Roll yield anualizado entre contratos
+    curve.spread("DERIV_IO_SWAP_2026_01", "DERIV_IO_SWAP_2026_03")
+"""
+
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+from jobs.config.contracts import IRON_ORE_CONTRACTS
+
+
+def variable_key_maturity(variable_keys: np.ndarray) -> np.ndarray:
+    """
+    Vencimento aproximado (último dia do mês) a partir de DERIV_IO_SWAP_YYYY_MM.
+
+    Returns:
+        Array datetime64[D] (NaT para chaves fora do formato).
+    """
+    months = pd.Series(variable_keys, dtype=object).str.extract(r"(\d{4})_(\d{2})$")
+    month_start = pd.to_datetime(months[0] + "-" + months[1], format="%Y-%m", errors="coerce")
+    return (month_start + pd.offsets.MonthEnd(0)).to_numpy(dtype="datetime64[D]")
+
+
+class ForwardCurve:
+    """Snapshot da curva forward: contratos ordenados por vencimento."""
+
+    __slots__ = ("variable_keys", "symbols", "maturities", "prices", "timestamps", "as_of", "_index")
+
+    def __init__(
+        self,
+        variable_keys: np.ndarray,
+        symbols: np.ndarray,
+        maturities: np.ndarray,
+        prices: np.ndarray,
+        timestamps: np.ndarray,
+    ) -> None:
+        """
+        Cria a curva a partir de arrays já alinhados (ver `from_rows`).
+
+        Args:
+            variable_keys: Identificador de cada contrato
+            symbols: RIC de cada contrato
+            maturities: Vencimentos (datetime64[D])
+            prices: Preços (float64)
+            timestamps: Timestamp (UTC, sem fuso) do preço de cada contrato
+        """
+        order = np.argsort(maturities, kind="stable")
+        self.variable_keys = np.asarray(variable_keys, dtype=object)[order]
+        self.symbols = np.asarray(symbols, dtype=object)[order]
+        self.maturities = np.ascontiguousarray(np.asarray(maturities, dtype="datetime64[D]")[order])
+        self.prices = np.ascontiguousarray(np.asarray(prices, dtype=np.float64)[order])
+        self.timestamps = np.ascontiguousarray(np.asarray(timestamps, dtype="datetime64[ns]")[order])
+        self.as_of = self.timestamps.max() if len(self.timestamps) else np.datetime64("NaT", "ns")
+        self._index = {key: i for i, key in enumerate(self.variable_keys)}
+
+    @classmethod
+    def from_rows(cls, rows: list[dict[str, Any]]) -> "ForwardCurve":
+        """
+        Monta a curva a partir de linhas de prices_iron_ore.
+
+        Mantém a linha mais recente de cada `variable_key`; contratos sem
+        `expiry_date` usam o vencimento do calendário de contratos (EXPIR_DATE
+        já visto ou último dia do mês) e, fora dele, o último dia do mês da chave.
+
+        Args:
+            rows: Dicts com timestamp, variable_key, price e (opcional)
+                  expiry_date e symbol
+
+        Returns:
+            ForwardCurve (vazia se não houver linhas válidas).
+        """
+        df = pd.DataFrame(rows, columns=["timestamp", "variable_key", "symbol", "expiry_date", "price"])
+        df = df.dropna(subset=["timestamp", "variable_key", "price"])
+        if df.empty:
+            return cls.empty()
+
+        df["timestamp"] = pd.to_datetime(df["timestamp"], utc=True, format="ISO8601")
+        df = df.sort_values("timestamp", kind="stable").drop_duplicates("variable_key", keep="last")
+
+        keys = df["variable_key"].to_numpy(dtype=object)
+        maturities = pd.to_datetime(df["expiry_date"], errors="coerce").to_numpy(dtype="datetime64[D]")
+        missing = np.isnat(maturities)
+        if missing.any():
+            maturities[missing] = IRON_ORE_CONTRACTS.maturities(keys[missing])
+            missing = np.isnat(maturities)
+        if missing.any():
+            maturities[missing] = variable_key_maturity(keys[missing])
+
+        return cls(
+            variable_keys=keys,
+            symbols=df["symbol"].to_numpy(dtype=object),
+            maturities=maturities,
+            prices=df["price"].to_numpy(dtype=np.float64),
+            timestamps=df["timestamp"].dt.tz_localize(None).to_numpy(),
+        )
+
+    @classmethod
+    def empty(cls) -> "ForwardCurve":
+        """Curva sem contratos."""
+        return cls(
+            np.array([], dtype=object),
+            np.array([], dtype=object),
+            np.array([], dtype="datetime64[D]"),
+            np.array([], dtype=np.float64),
+            np.array([], dtype="datetime64[ns]"),
+        )
+
+    def __len__(self) -> int:
+        return len(self.prices)
+
+    def __repr__(self) -> str:
+        return f"ForwardCurve({len(self)} contratos, as_of={self.as_of})"
+
+    def days_to_maturity(self, as_of: np.datetime64 | None = None) -> np.ndarray:
+        """
+        Dias até o vencimento de cada contrato.
+
+        Args:
+            as_of: Data de referência. Padrão: timestamp mais recente da curva
+        """
+        ref = (self.as_of if as_of is None else np.datetime64(as_of)).astype("datetime64[D]")
+        return (self.maturities - ref).astype(np.float64)
+
+    def interpolate(self, tenor_days: float | np.ndarray, as_of: np.datetime64 | None = None) -> float | np.ndarray:
+        """
+        Preço interpolado linearmente em tenor(es) constante(s).
+
+        Fora do intervalo de vencimentos retorna o preço do contrato extremo.
+
+        Args:
+            tenor_days: Dias a partir de `as_of` (escalar ou array)
+            as_of: Data de referência. Padrão: timestamp mais recente da curva
+
+        Returns:
+            Preço(s) interpolado(s) (NaN se a curva estiver vazia).
+        """
+        if not len(self):
+            return np.full(np.shape(tenor_days), np.nan) if np.ndim(tenor_days) else float("nan")
+        result = np.interp(tenor_days, self.days_to_maturity(as_of), self.prices)
+        return float(result) if np.ndim(result) == 0 else result
+
+    def roll_yield(self, annualize: bool = True) -> np.ndarray:
+        """
+        Roll yield entre contratos consecutivos: (F_i / F_{i+1}) - 1.
+
+        Positivo em backwardation (contrato próximo acima do seguinte).
+
+        Args:
+            annualize: Se True, escala por 365 / dias entre os vencimentos
+
+        Returns:
+            Array com len(curve) - 1 valores.
+        """
+        near, far = self.prices[:-1], self.prices[1:]
+        roll = near / far - 1.0
+        if annualize:
+            gap = np.diff(self.maturities).astype(np.float64)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                roll = np.where(gap > 0, roll * 365.0 / gap, np.nan)
+        return roll
+
+    def calendar_spreads(self, lag: int = 1) -> np.ndarray:
+        """
+        Spreads de calendário F_{i+lag} - F_i entre contratos.
+
+        Args:
+            lag: Distância (em contratos) entre as pernas
+
+        Returns:
+            Array com len(curve) - lag valores.
+        """
+        if lag < 1 or lag >= len(self):
+            return np.array([], dtype=np.float64)
+        return self.prices[lag:] - self.prices[:-lag]
+
+    def spread(self, near: str, far: str) -> float:
+        """
+        Spread F_far - F_near entre dois contratos pelo `variable_key`.
+
+        Returns:
+            Spread ou NaN se algum contrato não estiver na curva.
+        """
+        i, j = self._index.get(near), self._index.get(far)
+        if i is None or j is None:
+            return float("nan")
+        return float(self.prices[j] - self.prices[i])
+
+    def to_frame(self) -> pd.DataFrame:
+        """Curva como DataFrame indexado por variable_key."""
+        return pd.DataFrame(
+            {
+                "symbol": self.symbols,
+                "expiry_date": self.maturities,
+                "price": self.prices,
+                "timestamp": self.timestamps,
+            },
+            index=pd.Index(self.variable_keys, name="variable_key"),
+        )
@@ -0,0 +1,211 @@
+"""
+Sessão LSEG de longa duração compartilhada pelos fetchers.
+
+Abrir a sessão do LSEG Workspace é a parte mais lenta de cada coleta.
+`LsegSessionManager` mantém uma única sessão aberta entre coletas:
+
+- acquire/release: empréstimo da sessão (contagem de usuários ativos)
+- health check: verifica o estado da sessão antes de emprestá-la
+- reconexão automática: reabre a sessão se ela caiu
+- expiração por ociosidade: fecha a sessão após `idle_timeout` sem uso
+
+O módulo `lseg.data` pode ser injetado no construtor, o que permite testar
+o gerenciador contra um stub local.
+
+Uso:
+    from jobs.clients.lseg_session import get_lseg_session
+
+    session = get_lseg_session()
+    with session.lease():
+        ld.get_data(...)
+"""
+
+import atexit
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from types import ModuleType
+
+from loguru import logger
+
+from jobs.config.settings import (
+    LSEG_CONFIG_PATH,
+    LSEG_SESSION_HEALTH_INTERVAL,
+    LSEG_SESSION_IDLE_TIMEOUT,
+    LSEG_SESSION_OPEN_RETRIES,
+)
+
+# Importa LSEG
+try:
+    import lseg.data as ld
+except ImportError:
+    logger.error("lseg-data não instalado. Execute: pip install lseg-data")
+    ld = None
+
+
+class LsegSessionManager:
+    """Gerenciador de uma sessão LSEG compartilhada e reutilizada."""
+
+    def __init__(
+        self,
+        ld_module: ModuleType | None = None,
+        config_path: Path = LSEG_CONFIG_PATH,
+        idle_timeout: float = LSEG_SESSION_IDLE_TIMEOUT,
+        health_check_interval: float = LSEG_SESSION_HEALTH_INTERVAL,
+        open_retries: int = LSEG_SESSION_OPEN_RETRIES,
+    ) -> None:
+        """
+        Inicializa o gerenciador (a sessão só é aberta no primeiro acquire).
+
+        Args:
+            ld_module: Módulo `lseg.data` (ou stub). Padrão: o instalado
+            config_path: Arquivo de configuração da sessão
+            idle_timeout: Segundos sem uso até fechar a sessão
+            health_check_interval: Segundos entre verificações de estado
+            open_retries: Novas tentativas ao abrir a sessão
+        """
+        self.ld = ld_module if ld_module is not None else ld
+        self.config_path = config_path
+        self.idle_timeout = idle_timeout
+        self.health_check_interval = health_check_interval
+        self.open_retries = open_retries
+
+        self.is_open = False
+        self.opened_count = 0  # Handshakes realizados (métrica)
+        self._users = 0
+        self._last_check = 0.0
+        self._lock = threading.RLock()
+        self._idle_timer: threading.Timer | None = None
+
+    def _open(self) -> bool:
+        """Abre a sessão, com novas tentativas e backoff exponencial."""
+        if self.ld is None:
+            logger.error("lseg-data não está instalado")
+            return False
+        if not self.config_path.exists():
+            logger.error(f"Arquivo de configuração não encontrado: {self.config_path}")
+            return False
+
+        for attempt in range(self.open_retries + 1):
+            try:
+                start = time.perf_counter()
+                logger.info(f"Abrindo sessão LSEG com config: {self.config_path.name}")
+                self.ld.open_session(config_name=str(self.config_path))
+                self.is_open = True
+                self.opened_count += 1
+                self._last_check = time.monotonic()
+                logger.info(f"Sessão LSEG aberta em {time.perf_counter() - start:.2f}s")
+                return True
+            except Exception as e:
+                logger.error(f"Erro ao abrir sessão LSEG (tentativa {attempt + 1}): {e}")
+                if attempt < self.open_retries:
+                    time.sleep(2**attempt)
+        return False
+
+    def _close(self) -> None:
+        """Fecha a sessão (erros são apenas registrados)."""
+        if not self.is_open:
+            return
+        try:
+            self.ld.close_session()
+            logger.info("Sessão LSEG fechada")
+        except Exception as e:
+            logger.warning(f"Erro ao fechar sessão LSEG: {e}")
+        finally:
+            self.is_open = False
+
+    def is_healthy(self) -> bool:
+        """
+        Verifica se a sessão padrão do LSEG está aberta.
+
+        Returns:
+            True se o estado da sessão é 'Opened'.
+        """
+        try:
+            state = self.ld.session.get_default().open_state
+        except Exception as e:
+            logger.warning(f"Falha no health check da sessão LSEG: {e}")
+            return False
+        return getattr(state, "name", str(state)) == "Opened"
+
+    def acquire(self) -> bool:
+        """
+        Empresta a sessão, abrindo ou reconectando se necessário.
+
+        Toda chamada bem-sucedida deve ser seguida de `release()`.
+
+        Returns:
+            True se a sessão está disponível.
+        """
+        with self._lock:
+            if self._idle_timer is not None:
+                self._idle_timer.cancel()
+                self._idle_timer = None
+
+            now = time.monotonic()
+            if self.is_open and now - self._last_check >= self.health_check_interval:
+                self._last_check = now
+                if not self.is_healthy():
+                    logger.warning("Sessão LSEG inativa, reconectando...")
+                    self._close()
+
+            if not self.is_open and not self._open():
+                return False
+
+            self._users += 1
+            return True
+
+    def release(self) -> None:
+        """Devolve a sessão; sem usuários, agenda o fechamento por ociosidade."""
+        with self._lock:
+            self._users = max(self._users - 1, 0)
+            if self._users == 0 and self.is_open and self.idle_timeout > 0:
+                self._idle_timer = threading.Timer(self.idle_timeout, self._expire)
+                self._idle_timer.daemon = True
+                self._idle_timer.start()
+
+    def _expire(self) -> None:
+        """Fecha a sessão se continuar ociosa (executado pelo timer)."""
+        with self._lock:
+            if self._users == 0:
+                logger.info(f"Sessão LSEG ociosa por {self.idle_timeout:.0f}s")
+                self._close()
+            self._idle_timer = None
+
+    @contextmanager
+    def lease(self) -> Iterator[bool]:
+        """
+        Context manager para `acquire`/`release`.
+
+        Yields:
+            True se a sessão está disponível.
+        """
+        acquired = self.acquire()
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                self.release()
+
+    def close(self) -> None:
+        """Fecha a sessão imediatamente (ex: ao encerrar o processo)."""
+        with self._lock:
+            if self._idle_timer is not None:
+                self._idle_timer.cancel()
+                self._idle_timer = None
+            self._close()
+
+
+# Singleton para uso em todo o projeto
+_session: LsegSessionManager | None = None
+
+
+def get_lseg_session() -> LsegSessionManager:
+    """Retorna instância singleton do gerenciador de sessão LSEG."""
+    global _session
+    if _session is None:
+        _session = LsegSessionManager()
+        atexit.register(_session.close)
+    return _session
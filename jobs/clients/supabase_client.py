@@ -5,19 +5,30 @@ Fornece métodos para inserir e consultar dados de preços,
 sinais de trading e logs do sistema.
 """
 
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from typing import Any
 
 from loguru import logger
 from supabase import Client, create_client
 
+from jobs.clients.forward_curve import ForwardCurve
 from jobs.config.settings import (
+    FORWARD_CURVE_CACHE_TTL,
+    FORWARD_CURVE_MAX_ROWS,
     SUPABASE_KEY,
     SUPABASE_URL,
     TABLE_AUXILIARY_DATA,
+    TABLE_IRON_ORE_BARS,
     TABLE_IRON_ORE_PRICES,
     TABLE_SYSTEM_LOGS,
     TABLE_VALE3_PRICES,
+    UPSERT_BATCH_SIZE,
+    UPSERT_MAX_RETRIES,
+    UPSERT_MAX_WORKERS,
+    UPSERT_RETRY_BACKOFF,
 )
 
 
@@ -30,9 +41,127 @@ class SupabaseClient:
             raise ValueError("SUPABASE_URL e SUPABASE_KEY devem estar configurados")
 
         self.client: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
+        self.batch_size = UPSERT_BATCH_SIZE
+        self.max_workers = UPSERT_MAX_WORKERS
+        self.max_retries = UPSERT_MAX_RETRIES
+        self.retry_backoff = UPSERT_RETRY_BACKOFF
+        # Relatório por lote do último upsert de cada tabela (ver `_upsert_batched`);
+        # o cliente é compartilhado entre threads (collect_all --concurrent)
+        self.upsert_reports: dict[str, list[dict[str, Any]]] = {}
+        self._reports_lock = threading.Lock()
+        # Cache da curva forward por fonte: (monotonic ao carregar, curva)
+        self._curve_cache: dict[str, tuple[float, ForwardCurve]] = {}
         logger.info("Conexão Supabase inicializada")
 
-    def insert_iron_ore_prices(self, records: list[dict[str, Any]]) -> int:
+    def _upsert_chunk(
+        self, table: str, chunk: list[dict[str, Any]], on_conflict: str, index: int
+    ) -> dict[str, Any]:
+        """
+        Envia um lote, repetindo com backoff exponencial em caso de falha.
+
+        Returns:
+            Dict do relatório do lote: chunk, rows, inserted, attempts,
+            seconds, rows_per_sec e error (None se OK).
+        """
+        start = time.perf_counter()
+        error: Exception | None = None
+
+        for attempt in range(1, self.max_retries + 2):
+            try:
+                result = self.client.table(table).upsert(chunk, on_conflict=on_conflict).execute()
+                error = None
+                break
+            except Exception as e:
+                error = e
+                if attempt <= self.max_retries:
+                    delay = self.retry_backoff * 2 ** (attempt - 1)
+                    logger.warning(
+                        f"{table} lote {index}: falha na tentativa {attempt} ({e}), "
+                        f"nova tentativa em {delay:.1f}s"
+                    )
+                    time.sleep(delay)
+
+        seconds = time.perf_counter() - start
+        inserted = 0 if error else len(result.data or [])
+        report = {
+            "chunk": index,
+            "rows": len(chunk),
+            "inserted": inserted,
+            "attempts": attempt,
+            "seconds": seconds,
+            "rows_per_sec": inserted / seconds if seconds > 0 else 0.0,
+            "error": str(error) if error else None,
+        }
+        logger.debug(
+            f"{table} lote {index}: {inserted}/{len(chunk)} registros em {seconds:.2f}s "
+            f"({report['rows_per_sec']:.0f} reg/s, {attempt} tentativa(s))"
+        )
+        return report
+
+    def _upsert_batched(
+        self,
+        table: str,
+        records: list[dict[str, Any]],
+        on_conflict: str,
+        batch_size: int | None = None,
+    ) -> int:
+        """
+        Upsert em lotes, com concorrência limitada e retry por lote.
+
+        Cada lote de `batch_size` registros é enviado por até `max_workers`
+        threads. Só os lotes que falham são repetidos (backoff exponencial a
+        partir de `retry_backoff`). Lotes que esgotam as tentativas não
+        impedem os demais; ao final é levantado RuntimeError com o total
+        perdido. O relatório por lote fica em `upsert_reports[table]`.
+
+        Args:
+            table: Tabela de destino
+            records: Registros já no formato do banco
+            on_conflict: Colunas da chave de upsert
+            batch_size: Registros por lote (default: self.batch_size)
+
+        Returns:
+            Número de registros inseridos.
+
+        Raises:
+            RuntimeError: Se algum lote falhar após todas as tentativas.
+        """
+        size = batch_size or self.batch_size
+        chunks = [records[i : i + size] for i in range(0, len(records), size)]
+        start = time.perf_counter()
+
+        if len(chunks) == 1:
+            reports = [self._upsert_chunk(table, chunks[0], on_conflict, 0)]
+        else:
+            with ThreadPoolExecutor(max_workers=max(1, self.max_workers)) as executor:
+                reports = list(executor.map(
+                    lambda item: self._upsert_chunk(table, item[1], on_conflict, item[0]),
+                    enumerate(chunks),
+                ))
+        with self._reports_lock:
+            self.upsert_reports[table] = reports
+
+        elapsed = time.perf_counter() - start
+        count = sum(r["inserted"] for r in reports)
+        failed = [r for r in reports if r["error"]]
+        logger.info(
+            f"Inseridos {count} registros em {table} "
+            f"({len(chunks)} lote(s), {elapsed:.2f}s, {count / elapsed if elapsed > 0 else 0:.0f} reg/s)"
+        )
+
+        if failed:
+            lost = sum(r["rows"] for r in failed)
+            for r in failed:
+                logger.error(f"{table} lote {r['chunk']}: {r['rows']} registros perdidos ({r['error']})")
+            raise RuntimeError(
+                f"{len(failed)} de {len(chunks)} lote(s) falharam em {table}: "
+                f"{lost} registros não inseridos"
+            )
+        return count
+
+    def insert_iron_ore_prices(
+        self, records: list[dict[str, Any]], batch_size: int | None = None
+    ) -> int:
         """
         Insere preços de minério de ferro.
 
@@ -47,9 +176,13 @@ class SupabaseClient:
                 - price_type: str ("intraday", "settlement", "historical")
                 - volume: int (opcional)
                 - open, high, low, close: float (opcional)
+            batch_size: Registros por lote (default: UPSERT_BATCH_SIZE)
 
         Returns:
             Número de registros inseridos.
+
+        Raises:
+            RuntimeError: Se algum lote falhar após todas as tentativas.
         """
         if not records:
             return 0
@@ -86,19 +219,37 @@ class SupabaseClient:
 
             db_records.append(db_record)
 
+        # Usa variable_key para upsert (identifica contrato pelo vencimento)
         try:
-            # Usa variable_key para upsert (identifica contrato pelo vencimento)
-            result = self.client.table(TABLE_IRON_ORE_PRICES).upsert(
-                db_records, on_conflict="timestamp,source,variable_key"
-            ).execute()
-            count = len(result.data) if result.data else 0
-            logger.info(f"Inseridos {count} registros em {TABLE_IRON_ORE_PRICES}")
-            return count
+            return self._upsert_batched(
+                TABLE_IRON_ORE_PRICES, db_records, "timestamp,source,variable_key", batch_size=batch_size
+            )
+        finally:
+            self.invalidate_forward_curve()
+
+    def upsert_iron_ore_bars(self, bars: list[dict[str, Any]]) -> int:
+        """
+        Mescla barras OHLC em prices_iron_ore_bars (RPC merge_iron_ore_bars).
+
+        Args:
+            bars: Barras de `BarAggregator.update`
+
+        Returns:
+            Número de barras gravadas (0 em caso de erro).
+        """
+        if not bars:
+            return 0
+
+        try:
+            result = self.client.rpc("merge_iron_ore_bars", {"bars": bars}).execute()
+            return int(result.data or 0)
         except Exception as e:
-            logger.error(f"Erro ao inserir iron_ore_prices: {e}")
-            raise
+            logger.error(f"Erro ao gravar barras em {TABLE_IRON_ORE_BARS}: {e}")
+            return 0
 
-    def insert_vale3_prices(self, records: list[dict[str, Any]]) -> int:
+    def insert_vale3_prices(
+        self, records: list[dict[str, Any]], batch_size: int | None = None
+    ) -> int:
         """
         Insere preços de VALE3.
 
@@ -110,9 +261,13 @@ class SupabaseClient:
                 - low: float
                 - close: float
                 - volume: int
+            batch_size: Registros por lote (default: UPSERT_BATCH_SIZE)
 
         Returns:
             Número de registros inseridos.
+
+        Raises:
+            RuntimeError: Se algum lote falhar após todas as tentativas.
         """
         if not records:
             return 0
@@ -132,18 +287,13 @@ class SupabaseClient:
             }
             db_records.append(db_record)
 
-        try:
-            result = self.client.table(TABLE_VALE3_PRICES).upsert(
-                db_records, on_conflict="timestamp,source,symbol"
-            ).execute()
-            count = len(result.data) if result.data else 0
-            logger.info(f"Inseridos {count} registros em {TABLE_VALE3_PRICES}")
-            return count
-        except Exception as e:
-            logger.error(f"Erro ao inserir vale3_prices: {e}")
-            raise
+        return self._upsert_batched(
+            TABLE_VALE3_PRICES, db_records, "timestamp,source,symbol", batch_size=batch_size
+        )
 
-    def insert_auxiliary_data(self, records: list[dict[str, Any]]) -> int:
+    def insert_auxiliary_data(
+        self, records: list[dict[str, Any]], batch_size: int | None = None
+    ) -> int:
         """
         Insere dados auxiliares (USD/BRL, VIX).
 
@@ -160,9 +310,13 @@ class SupabaseClient:
                 OU
                 - usd_brl: float (direto)
                 - vix: float (direto)
+            batch_size: Registros por lote (default: UPSERT_BATCH_SIZE)
 
         Returns:
             Número de registros inseridos.
+
+        Raises:
+            RuntimeError: Se algum lote falhar após todas as tentativas.
         """
         if not records:
             return 0
@@ -191,16 +345,9 @@ class SupabaseClient:
 
         db_records = list(by_timestamp.values())
 
-        try:
-            result = self.client.table(TABLE_AUXILIARY_DATA).upsert(
-                db_records, on_conflict="timestamp"
-            ).execute()
-            count = len(result.data) if result.data else 0
-            logger.info(f"Inseridos {count} registros em {TABLE_AUXILIARY_DATA}")
-            return count
-        except Exception as e:
-            logger.error(f"Erro ao inserir auxiliary_data: {e}")
-            raise
+        return self._upsert_batched(
+            TABLE_AUXILIARY_DATA, db_records, "timestamp", batch_size=batch_size
+        )
 
     def log_system_event(
         self,
@@ -261,10 +408,29 @@ class SupabaseClient:
             logger.error(f"Erro ao buscar latest iron_ore_price: {e}")
             return None
 
+    def _latest_curve_rows(self, source: str, columns: str = "*") -> list[dict[str, Any]]:
+        """
+        Linhas mais recentes de contratos da curva (ordem decrescente de timestamp).
+
+        Lê só as últimas FORWARD_CURVE_MAX_ROWS linhas em vez da tabela inteira.
+        """
+        result = (
+            self.client.table(TABLE_IRON_ORE_PRICES)
+            .select(columns)
+            .eq("source", source)
+            .not_.is_("variable_key", "null")
+            .order("timestamp", desc=True)
+            .limit(FORWARD_CURVE_MAX_ROWS)
+            .execute()
+        )
+        return result.data or []
+
     def get_iron_ore_forward_curve(self, source: str = "sgx") -> list[dict[str, Any]]:
         """
         Obtém a curva forward completa de minério de ferro (12 meses).
 
+        Para cálculos sobre a curva, prefira `get_forward_curve`.
+
         Args:
             source: Fonte dos dados ("sgx" ou "dce")
 
@@ -272,29 +438,52 @@ class SupabaseClient:
             Lista de dicts ordenados por expiry_date.
         """
         try:
-            result = (
-                self.client.table(TABLE_IRON_ORE_PRICES)
-                .select("*")
-                .eq("source", source)
-                .not_.is_("variable_key", "null")
-                .order("expiry_date", desc=False)
-                .execute()
-            )
-
-            # Agrupa por variable_key e pega o mais recente de cada
+            # Linhas em ordem decrescente: a primeira de cada contrato é a mais recente
             latest_by_key: dict[str, dict[str, Any]] = {}
-            for row in result.data or []:
-                key = row.get("variable_key")
-                if key and (key not in latest_by_key or
-                           row.get("timestamp", "") > latest_by_key[key].get("timestamp", "")):
-                    latest_by_key[key] = row
+            for row in self._latest_curve_rows(source):
+                latest_by_key.setdefault(row["variable_key"], row)
 
             # Retorna ordenado por expiry_date
-            return sorted(latest_by_key.values(), key=lambda x: x.get("expiry_date", ""))
+            return sorted(latest_by_key.values(), key=lambda x: x.get("expiry_date") or "")
         except Exception as e:
             logger.error(f"Erro ao buscar forward curve: {e}")
             return []
 
+    def get_forward_curve(
+        self, source: str = "sgx", max_age: float = FORWARD_CURVE_CACHE_TTL
+    ) -> ForwardCurve:
+        """
+        Obtém a curva forward como `ForwardCurve` (arrays NumPy), com cache.
+
+        A curva fica em cache no processo até `max_age` segundos ou até a
+        próxima inserção de preços de minério (`insert_iron_ore_prices`).
+
+        Args:
+            source: Fonte dos dados ("sgx" ou "dce")
+            max_age: Idade máxima (s) da curva em cache
+
+        Returns:
+            ForwardCurve (vazia se não houver dados). Em caso de erro,
+            retorna a última curva em cache, se houver.
+        """
+        cached = self._curve_cache.get(source)
+        if cached is not None and time.monotonic() - cached[0] < max_age:
+            return cached[1]
+
+        try:
+            rows = self._latest_curve_rows(source, "timestamp,symbol,variable_key,expiry_date,price")
+        except Exception as e:
+            logger.error(f"Erro ao buscar forward curve: {e}")
+            return cached[1] if cached is not None else ForwardCurve.empty()
+
+        curve = ForwardCurve.from_rows(rows)
+        self._curve_cache[source] = (time.monotonic(), curve)
+        return curve
+
+    def invalidate_forward_curve(self) -> None:
+        """Descarta as curvas forward em cache (chamado após novas inserções)."""
+        self._curve_cache.clear()
+
     def get_latest_vale3_price(self) -> dict[str, Any] | None:
         """
         Obtém o preço mais recente de VALE3.
@@ -338,11 +527,14 @@ class SupabaseClient:
 
 # Singleton para uso em todo o projeto
 _client: SupabaseClient | None = None
+_client_lock = threading.Lock()
 
 
 def get_supabase_client() -> SupabaseClient:
-    """Retorna instância singleton do cliente Supabase."""
+    """Retorna instância singleton do cliente Supabase (segura entre threads)."""
     global _client
     if _client is None:
-        _client = SupabaseClient()
+        with _client_lock:
+            if _client is None:
+                _client = SupabaseClient()
     return _client
@@ -0,0 +1,183 @@
+"""
+Calendário dos contratos SGX de minério de ferro (62% Fe CFR China).
+
+Os RICs são gerados dinamicamente: SZZF + código do mês + último dígito do
+ano. `IronOreContractCalendar` pré-calcula a tabela RIC ↔ variable_key ↔
+vencimento; `IRON_ORE_CONTRACTS` é a instância compartilhada usada pela
+ingestão (jobs/config/settings.py mantém os wrappers `generate_iron_ore_rics`
+e `ric_to_variable_key`).
+
+Uso:
+    from jobs.config.contracts import IRON_ORE_CONTRACTS
+
+    IRON_ORE_CONTRACTS.rics(12)
+    IRON_ORE_CONTRACTS.variable_key("SZZFV6")  # DERIV_IO_SWAP_2026_10
+"""
+
+import calendar
+from collections.abc import Callable
+from datetime import date, datetime
+
+import numpy as np
+import pandas as pd
+
+# Código RIC de cada mês do contrato
+MONTH_CODES = {
+    1: "F", 2: "G", 3: "H", 4: "J", 5: "K", 6: "M",
+    7: "N", 8: "Q", 9: "U", 10: "V", 11: "X", 12: "Z",
+}
+
+
+class IronOreContractCalendar:
+    """
+    Tabela pré-calculada dos contratos SGX de minério (RIC ↔ vencimento).
+
+    Os RICs têm só o último dígito do ano (SZZF + mês + dígito), então o
+    mesmo RIC aponta para anos diferentes conforme a data atual. A tabela
+    cobre os 120 RICs possíveis (12 meses x 10 dígitos) e é recalculada
+    automaticamente quando o mês corrente muda, mantendo a janela forward
+    de `rics()` atualizada em processos de longa duração.
+
+    Cada contrato guarda também o vencimento: o EXPIR_DATE informado pela
+    LSEG (`record_expiries`) quando já foi visto, senão o último dia do mês
+    do contrato. Vencimentos registrados sobrevivem à virada do mês.
+    """
+
+    def __init__(self, today: Callable[[], date] = date.today) -> None:
+        """
+        Inicializa o calendário.
+
+        Args:
+            today: Função que retorna a data atual (injetável para testes).
+        """
+        self._today = today
+        self._month: tuple[int, int] | None = None
+        self._key_by_ric: dict[str, str] = {}
+        self._ric_by_key: dict[str, str] = {}
+        self._month_end_by_key: dict[str, date] = {}
+        # Vencimentos informados pela LSEG, por variable_key
+        self._observed_expiry: dict[str, date] = {}
+
+    def _refresh(self) -> None:
+        """Recalcula a tabela se o mês corrente mudou."""
+        today = self._today()
+        if self._month == (today.year, today.month):
+            return
+
+        current_decade = (today.year // 10) * 10
+        key_by_ric = {}
+        month_end_by_key = {}
+        for year_digit in range(10):
+            # Ano completo: década atual, ou a próxima se ficaria muito no passado
+            year = current_decade + year_digit
+            if year < today.year - 1:
+                year += 10
+            for month, month_code in MONTH_CODES.items():
+                key = f"DERIV_IO_SWAP_{year}_{month:02d}"
+                key_by_ric[f"SZZF{month_code}{year_digit}"] = key
+                month_end_by_key[key] = date(year, month, calendar.monthrange(year, month)[1])
+
+        self._key_by_ric = key_by_ric
+        self._month_end_by_key = month_end_by_key
+        self._ric_by_key = {key: ric for ric, key in key_by_ric.items()}
+        self._month = (today.year, today.month)
+
+    def rics(self, num_months: int = 3) -> list[str]:
+        """RICs dos próximos N meses a partir do mês corrente."""
+        self._refresh()
+        year, month = self._month
+        rics = []
+        for i in range(num_months):
+            target_year, target_month = divmod(year * 12 + month - 1 + i, 12)
+            rics.append(f"SZZF{MONTH_CODES[target_month + 1]}{target_year % 10}")
+        return rics
+
+    def variable_key(self, ric: str) -> str | None:
+        """variable_key de um RIC (SZZFXY...) em O(1), ou None se inválido."""
+        if not ric or len(ric) < 6 or not ric.startswith("SZZF"):
+            return None
+        self._refresh()
+        return self._key_by_ric.get(ric[:6])
+
+    def ric(self, variable_key: str) -> str | None:
+        """RIC correspondente a um variable_key, ou None se fora da tabela."""
+        self._refresh()
+        return self._ric_by_key.get(variable_key)
+
+    def map_variable_keys(self, rics: pd.Series) -> pd.Series:
+        """Versão vetorizada de `variable_key` para uma coluna de RICs."""
+        self._refresh()
+        keys = rics.astype(str).str[:6].map(self._key_by_ric).astype(object)
+        return keys.where(keys.notna(), None)
+
+    def _key_expiry(self, variable_key: str | None, fallback: bool) -> date | None:
+        """Vencimento de um contrato da tabela (ver `expiry`)."""
+        if variable_key is None:
+            return None
+        observed = self._observed_expiry.get(variable_key)
+        if observed is not None or not fallback:
+            return observed
+        return self._month_end_by_key.get(variable_key)
+
+    def expiry(self, ric: str, fallback: bool = True) -> date | None:
+        """
+        Vencimento do contrato de um RIC.
+
+        Args:
+            ric: RIC no formato SZZFXY
+            fallback: Se True, usa o último dia do mês quando a LSEG ainda
+                      não informou o EXPIR_DATE do contrato
+
+        Returns:
+            Data de vencimento, ou None se o RIC é inválido (ou sem
+            vencimento registrado, com fallback=False).
+        """
+        return self._key_expiry(self.variable_key(ric), fallback)
+
+    def record_expiries(self, expiry_dates: pd.Series) -> None:
+        """
+        Registra vencimentos informados pela LSEG (EXPIR_DATE normalizado).
+
+        Args:
+            expiry_dates: Datas 'YYYY-MM-DD' (None/NaN ignorados); o contrato
+                          é identificado pelo ano/mês do próprio vencimento
+        """
+        for value in expiry_dates.dropna().unique():
+            try:
+                expiry = datetime.strptime(str(value), "%Y-%m-%d").date()
+            except ValueError:
+                continue
+            self._observed_expiry[f"DERIV_IO_SWAP_{expiry.year}_{expiry.month:02d}"] = expiry
+
+    def map_expiries(self, rics: pd.Series, fallback: bool = True) -> pd.Series:
+        """
+        Versão vetorizada de `expiry` para uma coluna de RICs.
+
+        Returns:
+            Série de strings 'YYYY-MM-DD' (None onde não há vencimento).
+        """
+        keys = self.map_variable_keys(rics)
+        expiry = {
+            key: day.isoformat()
+            for key in keys.dropna().unique()
+            if (day := self._key_expiry(key, fallback)) is not None
+        }
+        dates = keys.map(expiry).astype(object)
+        return dates.where(dates.notna(), None)
+
+    def maturities(self, variable_keys: np.ndarray) -> np.ndarray:
+        """
+        Vencimentos (datetime64[D]) de um array de variable_keys.
+
+        Returns:
+            Array datetime64[D]; NaT para chaves fora da tabela.
+        """
+        self._refresh()
+        return np.array(
+            [self._key_expiry(key, fallback=True) or np.datetime64("NaT") for key in variable_keys],
+            dtype="datetime64[D]",
+        )
+
+
+# Calendário compartilhado (recalculado na virada do mês)
+IRON_ORE_CONTRACTS = IronOreContractCalendar()
@@ -5,10 +5,14 @@ Carrega variáveis de ambiente do arquivo .env.
 """
 
 import os
+from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
 
 from dotenv import load_dotenv
 
+from jobs.config.contracts import IRON_ORE_CONTRACTS, MONTH_CODES  # noqa: F401
+
 # Carrega .env do diretório raiz do projeto
 PROJECT_ROOT = Path(__file__).parent.parent.parent
 load_dotenv(PROJECT_ROOT / ".env")
@@ -27,6 +31,12 @@ LSEG_PASSWORD = os.getenv("LSEG_PASSWORD", "")
 SUPABASE_URL = os.getenv("SUPABASE_URL", "")
 SUPABASE_KEY = os.getenv("SUPABASE_KEY", "")
 
+# Upserts em lote (backfills longos)
+UPSERT_BATCH_SIZE = int(os.getenv("UPSERT_BATCH_SIZE", "500"))  # Registros por requisição
+UPSERT_MAX_WORKERS = int(os.getenv("UPSERT_MAX_WORKERS", "4"))  # Lotes simultâneos
+UPSERT_MAX_RETRIES = int(os.getenv("UPSERT_MAX_RETRIES", "3"))  # Novas tentativas por lote
+UPSERT_RETRY_BACKOFF = float(os.getenv("UPSERT_RETRY_BACKOFF", "1.0"))  # Espera inicial (s)
+
 # =============================================================================
 # Telegram (para alertas)
 # =============================================================================
@@ -39,35 +49,32 @@ TELEGRAM_CHAT_ID = os.getenv("TELEGRAM_CHAT_ID", "")
 
 # Minério de ferro SGX - 62% Fe CFR China
 # RICs são gerados dinamicamente: SZZF + código do mês + último dígito do ano
-# Mapeamento de meses para código RIC
-MONTH_CODES = {
-    1: "F", 2: "G", 3: "H", 4: "J", 5: "K", 6: "M",
-    7: "N", 8: "Q", 9: "U", 10: "V", 11: "X", 12: "Z",
-}
+# (MONTH_CODES e a tabela de contratos em jobs/config/contracts.py)
+
 
 def generate_iron_ore_rics(num_months: int = 3) -> list[str]:
     """Gera RICs para os próximos N meses de contratos futuros de minério."""
-    from datetime import date
-    from dateutil.relativedelta import relativedelta
-
-    rics = []
-    today = date.today()
-    for i in range(num_months):
-        target_date = today + relativedelta(months=i)
-        year_code = str(target_date.year)[-1]
-        month_code = MONTH_CODES[target_date.month]
-        ric = f"SZZF{month_code}{year_code}"
-        rics.append(ric)
-    return rics
+    return IRON_ORE_CONTRACTS.rics(num_months)
+
+# Contratos por chamada de ld.get_history no histórico da curva forward
+CURVE_HISTORY_GROUP_SIZE = int(os.getenv("CURVE_HISTORY_GROUP_SIZE", "6"))
+
+# Snapshot da curva forward (SupabaseClient.get_forward_curve)
+FORWARD_CURVE_MAX_ROWS = int(os.getenv("FORWARD_CURVE_MAX_ROWS", "1000"))  # Linhas mais recentes lidas
+FORWARD_CURVE_CACHE_TTL = float(os.getenv("FORWARD_CURVE_CACHE_TTL", "60"))  # s (ingestão invalida antes)
 
 # RICs padrão (12 meses forward para curva completa)
+# Processos longos devem chamar generate_iron_ore_rics(12) a cada coleta
 IRON_ORE_RICS = generate_iron_ore_rics(12)
 
 
+@lru_cache(maxsize=4096)
 def expiry_date_to_variable_key(expiry_date: str | None) -> str | None:
     """
     Converte data de vencimento para variable_key no formato DERIV_IO_SWAP_YYYY_MM.
 
+    Resultados são memorizados (poucos vencimentos distintos por coleta).
+
     Args:
         expiry_date: Data de vencimento no formato YYYY-MM-DD ou similar
 
@@ -78,8 +85,6 @@ def expiry_date_to_variable_key(expiry_date: str | None) -> str | None:
         return None
 
     try:
-        from datetime import datetime
-
         # Tenta parsear diferentes formatos
         if isinstance(expiry_date, str):
             # Remove possível timezone
@@ -97,42 +102,15 @@ def ric_to_variable_key(ric: str) -> str | None:
     """
     Converte RIC para variable_key baseado no código do mês e ano.
 
+    Consulta a tabela pré-calculada de IRON_ORE_CONTRACTS.
+
     Args:
         ric: RIC no formato SZZFXY (X=mês, Y=ano)
 
     Returns:
         Variable key no formato DERIV_IO_SWAP_YYYY_MM ou None se inválido
     """
-    if not ric or len(ric) < 6 or not ric.startswith("SZZF"):
-        return None
-
-    try:
-        from datetime import date
-
-        # Extrai código do mês e ano do RIC
-        month_code = ric[4]
-        year_digit = ric[5]
-
-        # Inverte o dicionário de meses
-        code_to_month = {v: k for k, v in MONTH_CODES.items()}
-
-        if month_code not in code_to_month:
-            return None
-
-        month = code_to_month[month_code]
-
-        # Calcula o ano completo (assume próxima década se necessário)
-        current_year = date.today().year
-        current_decade = (current_year // 10) * 10
-        year = current_decade + int(year_digit)
-
-        # Se o ano calculado for muito no passado, ajusta para próxima década
-        if year < current_year - 1:
-            year += 10
-
-        return f"DERIV_IO_SWAP_{year}_{month:02d}"
-    except (ValueError, IndexError):
-        return None
+    return IRON_ORE_CONTRACTS.variable_key(ric)
 
 # VALE3 na B3
 VALE3_RIC = "VALE3.SA"
@@ -145,6 +123,7 @@ VIX_RIC = ".VIX"
 # Tabelas Supabase (conforme 001_initial_schema.sql)
 # =============================================================================
 TABLE_IRON_ORE_PRICES = "prices_iron_ore"
+TABLE_IRON_ORE_BARS = "prices_iron_ore_bars"  # 004_iron_ore_bars.sql
 TABLE_VALE3_PRICES = "prices_vale3"
 TABLE_AUXILIARY_DATA = "auxiliary_data"
 TABLE_SIGNALS = "signals"
@@ -154,6 +133,9 @@ TABLE_DAILY_METRICS = "daily_metrics"
 TABLE_SYSTEM_LOGS = "system_logs"
 TABLE_KILL_SWITCH_EVENTS = "kill_switch_events"
 
+# Barras OHLC agregadas dos snapshots (timeframe -> frequência pandas)
+BAR_TIMEFRAMES = {"5m": "5min", "1h": "1h", "1d": "1D"}
+
 # =============================================================================
 # Caminhos
 # =============================================================================
@@ -163,6 +145,28 @@ LOGS_DIR.mkdir(exist_ok=True)
 # Config LSEG
 LSEG_CONFIG_PATH = PROJECT_ROOT / "jobs" / "lseg-data.config.json"
 
+# Sessão LSEG compartilhada (jobs/clients/lseg_session.py)
+LSEG_SESSION_IDLE_TIMEOUT = float(os.getenv("LSEG_SESSION_IDLE_TIMEOUT", "900"))  # s sem uso
+LSEG_SESSION_HEALTH_INTERVAL = float(os.getenv("LSEG_SESSION_HEALTH_INTERVAL", "60"))  # s
+LSEG_SESSION_OPEN_RETRIES = int(os.getenv("LSEG_SESSION_OPEN_RETRIES", "2"))
+
+# =============================================================================
+# Backfill histórico em blocos (jobs/ingestion/backfill_historical.py)
+# =============================================================================
+BACKFILL_CHUNK_MONTHS = int(os.getenv("BACKFILL_CHUNK_MONTHS", "6"))  # Meses por bloco
+BACKFILL_MAX_WORKERS = int(os.getenv("BACKFILL_MAX_WORKERS", "4"))  # Blocos simultâneos
+BACKFILL_STATE_DIR = PROJECT_ROOT / "jobs" / "state"  # Checkpoints (criado sob demanda)
+
+# =============================================================================
+# Coleta concorrente (collect_all --concurrent)
+# =============================================================================
+# Tempo máximo (s) de busca + persistência por fonte
+COLLECT_TIMEOUTS = {
+    "iron_ore": float(os.getenv("COLLECT_TIMEOUT_IRON_ORE", "90")),
+    "vale3": float(os.getenv("COLLECT_TIMEOUT_VALE3", "45")),
+    "auxiliary": float(os.getenv("COLLECT_TIMEOUT_AUXILIARY", "45")),
+}
+
 
 def validate_config() -> dict[str, bool]:
     """Valida se as configurações essenciais estão presentes."""
@@ -11,14 +11,19 @@ Usa Yahoo Finance para dados históricos de longo prazo:
 Os dados do LSEG são usados para dados recentes/realtime.
 Yahoo Finance é usado para backfill histórico (gratuito, 7+ anos).
 
+O período é dividido em blocos de datas buscados em paralelo, com
+checkpoint em jobs/state/ (uma execução interrompida retoma dos blocos
+pendentes). Ver jobs/ingestion/chunked_backfill.py.
+
 Uso:
     python -m jobs.ingestion.backfill_historical --years 5
     python -m jobs.ingestion.backfill_historical --years 7 --type all
+    python -m jobs.ingestion.backfill_historical --years 5 --workers 8 --chunk-months 3
+    python -m jobs.ingestion.backfill_historical --years 5 --restart
 """
 
 import argparse
 import sys
-from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Any
 
@@ -29,7 +34,11 @@ from loguru import logger
 # Adiciona diretório raiz ao path
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
+from jobs.clients.lseg_session import get_lseg_session
 from jobs.clients.supabase_client import get_supabase_client
+from jobs.config.settings import BACKFILL_CHUNK_MONTHS, BACKFILL_MAX_WORKERS
+from jobs.ingestion.chunked_backfill import backfill_period, run_chunked_backfill
+from jobs.ingestion.lseg_records import field, frame_to_records, utc_isoformat
 
 
 # Mapeamento de tickers Yahoo Finance
@@ -50,21 +59,22 @@ def download_yahoo_data(
     """
     Baixa dados históricos do Yahoo Finance.
 
+    Usa `yf.Ticker.history` (seguro para chamadas em threads paralelas,
+    ao contrário de `yf.download`, que compartilha estado global).
+
     Args:
         ticker: Ticker do Yahoo Finance
         start_date: Data início (YYYY-MM-DD)
         end_date: Data fim (YYYY-MM-DD)
 
     Returns:
-        DataFrame com dados OHLCV
+        DataFrame com dados OHLCV (índice de datas sem fuso)
     """
     logger.info(f"Baixando {ticker}: {start_date} a {end_date}")
 
-    data = yf.download(
-        ticker,
+    data = yf.Ticker(ticker).history(
         start=start_date,
         end=end_date,
-        progress=False,
         auto_adjust=True,  # Ajusta para splits/dividendos
     )
 
@@ -72,208 +82,202 @@ def download_yahoo_data(
         logger.warning(f"Sem dados para {ticker}")
         return pd.DataFrame()
 
-    # Flatten multi-index columns if present
-    if isinstance(data.columns, pd.MultiIndex):
-        data.columns = data.columns.get_level_values(0)
+    # Datas do pregão local, sem fuso (mesmo formato de yf.download)
+    if isinstance(data.index, pd.DatetimeIndex) and data.index.tz is not None:
+        data.index = data.index.tz_localize(None)
 
     logger.info(f"{ticker}: {len(data)} registros baixados")
     return data
 
 
-def backfill_iron_ore(years: int = 5) -> int:
+def fetch_iron_ore_chunk(start_date: str, end_date: str) -> list[dict[str, Any]]:
+    """
+    Registros de SZZFc2 (SGX front month contínuo) via LSEG em um período.
+
+    Requer a sessão LSEG aberta (ver `backfill_iron_ore`).
+    """
+    response = get_lseg_session().ld.get_history(
+        universe="SZZFc2",  # SGX front month contínuo
+        interval="daily",
+        start=start_date,
+        end=end_date,
+    )
+
+    if response is None or response.empty:
+        logger.warning(f"Sem dados do LSEG para {start_date} a {end_date}")
+        return []
+
+    # Usa SETTLE como preço (campo principal para futuros)
+    price = field(response, "SETTLE")
+    valid = price.notna()
+    frame = pd.DataFrame({
+        "timestamp": utc_isoformat(response.index[valid]),
+        "source": "sgx",
+        "symbol": "SZZFc2",
+        "price": price[valid].astype(float).to_numpy(),
+        "variable_key": "SGX_IO_62_FE_FRONT",
+        "price_type": "settlement",
+        "close": price[valid].astype(float).to_numpy(),
+    })
+    return frame_to_records(frame)
+
+
+def fetch_vale3_chunk(start_date: str, end_date: str) -> list[dict[str, Any]]:
+    """Registros diários de VALE3 do Yahoo Finance em um período."""
+    data = download_yahoo_data(YAHOO_TICKERS["vale3"], start_date, end_date)
+    if data.empty:
+        return []
+
+    volume = field(data, "Volume")
+    frame = pd.DataFrame({
+        "timestamp": utc_isoformat(data.index),
+        "source": "yahoo",
+        "symbol": "VALE3",
+        "close": field(data, "Close").to_numpy(),
+        "open": field(data, "Open").to_numpy(),
+        "high": field(data, "High").to_numpy(),
+        "low": field(data, "Low").to_numpy(),
+        "volume": volume.where(volume > 0).to_numpy(),
+    })
+    return frame_to_records(frame, int_columns=("volume",))
+
+
+def fetch_auxiliary_chunk(start_date: str, end_date: str) -> list[dict[str, Any]]:
+    """Registros de USD/BRL, VIX e IBOV (fechamento) do Yahoo Finance em um período."""
+    data_frames = {}
+    for name in ["usd_brl", "vix", "ibov"]:
+        data = download_yahoo_data(YAHOO_TICKERS[name], start_date, end_date)
+        if not data.empty:
+            data_frames[name] = data["Close"]
+
+    if not data_frames:
+        return []
+
+    # Combina em um DataFrame; só mantém datas com pelo menos um valor
+    combined = pd.DataFrame(data_frames).dropna(how="all").astype(float)
+    combined.insert(0, "timestamp", utc_isoformat(combined.index))
+    return frame_to_records(combined.reset_index(drop=True))
+
+
+def backfill_iron_ore(
+    years: int = 5,
+    chunk_months: int = BACKFILL_CHUNK_MONTHS,
+    max_workers: int = BACKFILL_MAX_WORKERS,
+    resume: bool = True,
+) -> int:
     """
     Backfill de preços de minério de ferro via LSEG (SGX).
 
-    Usa SZZFc1 (contrato contínuo front month da SGX Cingapura).
+    Usa SZZFc2 (contrato contínuo front month da SGX Cingapura). O período é
+    buscado em blocos paralelos, com checkpoint (ver `run_chunked_backfill`).
 
     Args:
         years: Número de anos para buscar
+        chunk_months: Meses por bloco
+        max_workers: Blocos buscados simultaneamente
+        resume: Se False, ignora o checkpoint e refaz todos os blocos
 
     Returns:
         Número de registros inseridos
     """
     logger.info(f"Iniciando backfill de minério de ferro SGX ({years} anos)")
 
-    # Importa LSEG
-    try:
-        import lseg.data as ld
-        from jobs.config.settings import LSEG_CONFIG_PATH
-    except ImportError:
-        logger.error("lseg-data não instalado")
-        return 0
-
-    end_date = datetime.now().strftime("%Y-%m-%d")
-    start_date = (datetime.now() - timedelta(days=years * 365)).strftime("%Y-%m-%d")
-
-    records = []
-
-    try:
-        # Abre sessão LSEG
-        ld.open_session(config_name=str(LSEG_CONFIG_PATH))
-        logger.info("Sessão LSEG aberta")
-
-        # Busca histórico do contrato contínuo SGX
-        response = ld.get_history(
-            universe="SZZFc2",  # SGX front month contínuo
-            interval="daily",
-            start=start_date,
-            end=end_date,
-        )
+    start_date, end_date = backfill_period(years)
+    client = get_supabase_client()
 
-        if response is None or response.empty:
-            logger.warning("Sem dados retornados do LSEG")
+    # Uma sessão LSEG compartilhada por todos os blocos
+    with get_lseg_session().lease() as session_open:
+        if not session_open:
+            logger.error("Sessão LSEG indisponível")
             return 0
 
-        logger.info(f"Baixados {len(response)} registros do LSEG")
-
-        for timestamp, row in response.iterrows():
-            ts = pd.Timestamp(timestamp)
-            if ts.tzinfo is None:
-                ts = ts.tz_localize("UTC")
-
-            # Usa SETTLE como preço (campo principal para futuros)
-            price = row.get("SETTLE")
-            if pd.isna(price):
-                continue
-
-            record = {
-                "timestamp": ts.isoformat(),
-                "source": "sgx",
-                "symbol": "SZZFc2",
-                "price": float(price),
-                "variable_key": "SGX_IO_62_FE_FRONT",
-                "price_type": "settlement",
-                "close": float(price),
-            }
-
-            records.append(record)
-
-    except Exception as e:
-        logger.error(f"Erro ao buscar dados LSEG: {e}")
-    finally:
-        try:
-            ld.close_session()
-            logger.info("Sessão LSEG fechada")
-        except Exception:
-            pass
-
-    if records:
-        client = get_supabase_client()
-        count = client.insert_iron_ore_prices(records)
-        logger.info(f"Minério de ferro SGX: {count} registros inseridos")
-        return count
-
-    return 0
-
-
-def backfill_vale3(years: int = 5) -> int:
+        count = run_chunked_backfill(
+            "iron_ore",
+            start_date,
+            end_date,
+            fetch_chunk=fetch_iron_ore_chunk,
+            persist=client.insert_iron_ore_prices,
+            chunk_months=chunk_months,
+            max_workers=max_workers,
+            resume=resume,
+        )
+
+    logger.info(f"Minério de ferro SGX: {count} registros inseridos")
+    return count
+
+
+def backfill_vale3(
+    years: int = 5,
+    chunk_months: int = BACKFILL_CHUNK_MONTHS,
+    max_workers: int = BACKFILL_MAX_WORKERS,
+    resume: bool = True,
+) -> int:
     """
-    Backfill de preços de VALE3.
+    Backfill de preços de VALE3 em blocos paralelos, com checkpoint.
 
     Args:
         years: Número de anos para buscar
+        chunk_months: Meses por bloco
+        max_workers: Blocos buscados simultaneamente
+        resume: Se False, ignora o checkpoint e refaz todos os blocos
 
     Returns:
         Número de registros inseridos
     """
     logger.info(f"Iniciando backfill de VALE3 ({years} anos)")
 
-    end_date = datetime.now().strftime("%Y-%m-%d")
-    start_date = (datetime.now() - timedelta(days=years * 365)).strftime("%Y-%m-%d")
+    start_date, end_date = backfill_period(years)
+    client = get_supabase_client()
+    count = run_chunked_backfill(
+        "vale3",
+        start_date,
+        end_date,
+        fetch_chunk=fetch_vale3_chunk,
+        persist=client.insert_vale3_prices,
+        chunk_months=chunk_months,
+        max_workers=max_workers,
+        resume=resume,
+    )
 
-    data = download_yahoo_data(YAHOO_TICKERS["vale3"], start_date, end_date)
+    logger.info(f"VALE3: {count} registros inseridos")
+    return count
 
-    if data.empty:
-        return 0
-
-    records = []
-    for timestamp, row in data.iterrows():
-        ts = pd.Timestamp(timestamp)
-        if ts.tzinfo is None:
-            ts = ts.tz_localize("UTC")
-
-        record = {
-            "timestamp": ts.isoformat(),
-            "source": "yahoo",
-            "symbol": "VALE3",
-            "close": float(row["Close"]),
-        }
-
-        if not pd.isna(row.get("Open")):
-            record["open"] = float(row["Open"])
-        if not pd.isna(row.get("High")):
-            record["high"] = float(row["High"])
-        if not pd.isna(row.get("Low")):
-            record["low"] = float(row["Low"])
-        if not pd.isna(row.get("Volume")) and row["Volume"] > 0:
-            record["volume"] = int(row["Volume"])
-
-        records.append(record)
-
-    if records:
-        client = get_supabase_client()
-        count = client.insert_vale3_prices(records)
-        logger.info(f"VALE3: {count} registros inseridos")
-        return count
-
-    return 0
-
-
-def backfill_auxiliary(years: int = 5) -> int:
+
+def backfill_auxiliary(
+    years: int = 5,
+    chunk_months: int = BACKFILL_CHUNK_MONTHS,
+    max_workers: int = BACKFILL_MAX_WORKERS,
+    resume: bool = True,
+) -> int:
     """
-    Backfill de dados auxiliares (USD/BRL, VIX, IBOV).
+    Backfill de dados auxiliares (USD/BRL, VIX, IBOV) em blocos paralelos.
 
     Args:
         years: Número de anos para buscar
+        chunk_months: Meses por bloco
+        max_workers: Blocos buscados simultaneamente
+        resume: Se False, ignora o checkpoint e refaz todos os blocos
 
     Returns:
         Número de registros inseridos
     """
     logger.info(f"Iniciando backfill de dados auxiliares ({years} anos)")
 
-    end_date = datetime.now().strftime("%Y-%m-%d")
-    start_date = (datetime.now() - timedelta(days=years * 365)).strftime("%Y-%m-%d")
-
-    # Baixa todos os dados
-    data_frames = {}
-    for name in ["usd_brl", "vix", "ibov"]:
-        ticker = YAHOO_TICKERS[name]
-        data = download_yahoo_data(ticker, start_date, end_date)
-        if not data.empty:
-            data_frames[name] = data["Close"]
-
-    if not data_frames:
-        return 0
-
-    # Combina em um DataFrame
-    combined = pd.DataFrame(data_frames)
-
-    records = []
-    for timestamp, row in combined.iterrows():
-        ts = pd.Timestamp(timestamp)
-        if ts.tzinfo is None:
-            ts = ts.tz_localize("UTC")
-
-        record = {"timestamp": ts.isoformat()}
-
-        if not pd.isna(row.get("usd_brl")):
-            record["usd_brl"] = float(row["usd_brl"])
-        if not pd.isna(row.get("vix")):
-            record["vix"] = float(row["vix"])
-        if not pd.isna(row.get("ibov")):
-            record["ibov"] = float(row["ibov"])
-
-        # Só adiciona se tiver pelo menos um valor
-        if len(record) > 1:
-            records.append(record)
-
-    if records:
-        client = get_supabase_client()
-        count = client.insert_auxiliary_data(records)
-        logger.info(f"Dados auxiliares: {count} registros inseridos")
-        return count
+    start_date, end_date = backfill_period(years)
+    client = get_supabase_client()
+    count = run_chunked_backfill(
+        "auxiliary",
+        start_date,
+        end_date,
+        fetch_chunk=fetch_auxiliary_chunk,
+        persist=client.insert_auxiliary_data,
+        chunk_months=chunk_months,
+        max_workers=max_workers,
+        resume=resume,
+    )
 
-    return 0
+    logger.info(f"Dados auxiliares: {count} registros inseridos")
+    return count
 
 
 def normalize_dataframe(
@@ -332,8 +336,7 @@ def create_aligned_dataset(years: int = 5) -> pd.DataFrame:
     """
     logger.info(f"Criando dataset alinhado ({years} anos)")
 
-    end_date = datetime.now().strftime("%Y-%m-%d")
-    start_date = (datetime.now() - timedelta(days=years * 365)).strftime("%Y-%m-%d")
+    start_date, end_date = backfill_period(years)
 
     # Baixa todos os dados
     iron = download_yahoo_data(YAHOO_TICKERS["iron_ore"], start_date, end_date)
@@ -386,6 +389,24 @@ def main() -> None:
         help="Apenas analisa dados sem inserir no banco",
     )
 
+    parser.add_argument(
+        "--chunk-months",
+        type=int,
+        default=BACKFILL_CHUNK_MONTHS,
+        help=f"Meses por bloco (default: {BACKFILL_CHUNK_MONTHS})",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=BACKFILL_MAX_WORKERS,
+        help=f"Blocos buscados em paralelo (default: {BACKFILL_MAX_WORKERS})",
+    )
+    parser.add_argument(
+        "--restart",
+        action="store_true",
+        help="Ignora checkpoints e refaz todos os blocos",
+    )
+
     args = parser.parse_args()
 
     if args.analyze:
@@ -406,16 +427,21 @@ def main() -> None:
 
     logger.info(f"Iniciando backfill: {args.years} anos, tipo={args.type}")
 
+    options = {
+        "chunk_months": args.chunk_months,
+        "max_workers": args.workers,
+        "resume": not args.restart,
+    }
     total_records = 0
 
     if args.type in ("all", "iron-ore"):
-        total_records += backfill_iron_ore(args.years)
+        total_records += backfill_iron_ore(args.years, **options)
 
     if args.type in ("all", "vale3"):
-        total_records += backfill_vale3(args.years)
+        total_records += backfill_vale3(args.years, **options)
 
     if args.type in ("all", "auxiliary"):
-        total_records += backfill_auxiliary(args.years)
+        total_records += backfill_auxiliary(args.years, **options)
 
     logger.info(f"Backfill finalizado: {total_records} registros totais")
 
@@ -0,0 +1,183 @@
+"""
+Agregação streaming dos snapshots de minério em barras OHLC.
+
+Cada coleta realtime gera um snapshot por contrato. `BarAggregator` mantém,
+por (timeframe, source, variable_key), a barra corrente de cada timeframe
+(5m, 1h, 1d) e a atualiza conforme os snapshots chegam. Para o banco vão
+só as barras parciais dos registros novos (deltas), gravadas em
+prices_iron_ore_bars via RPC `merge_iron_ore_bars`
+(sql/004_iron_ore_bars.sql), que as mescla com o que já está lá. Assim
+um processo novo (ex: cron a cada 5 min) não sobrescreve a barra gravada
+por execuções anteriores, e a contagem de ticks soma corretamente quando
+vários processos escrevem na mesma barra. Enviar a barra acumulada em
+memória contaria de novo ticks já gravados (ou perderia os gravados por
+outro processo, já que o RPC não soma parciais sobrepostas).
+
+Registros 'historical' (um por dia) só alimentam as barras diárias.
+
+Uso:
+    from jobs.ingestion.bar_aggregator import get_bar_aggregator
+
+    bars = get_bar_aggregator().update(records)
+    supabase.upsert_iron_ore_bars(bars)
+"""
+
+from typing import Any
+
+import pandas as pd
+
+from jobs.config.settings import BAR_TIMEFRAMES
+from jobs.ingestion.lseg_records import field, utc_index, utc_isoformat
+
+# Colunas de cada barra (mesma ordem do RPC merge_iron_ore_bars)
+BAR_COLUMNS = [
+    "timeframe", "timestamp", "source", "variable_key", "symbol",
+    "open", "high", "low", "close", "ticks", "first_tick", "last_tick",
+]
+
+
+def bars_from_records(
+    records: list[dict[str, Any]], timeframes: dict[str, str] = BAR_TIMEFRAMES
+) -> pd.DataFrame:
+    """
+    Agrega registros de prices_iron_ore em barras parciais.
+
+    Args:
+        records: Registros no formato de `insert_iron_ore_prices`
+        timeframes: Timeframe -> frequência pandas (default: BAR_TIMEFRAMES)
+
+    Returns:
+        DataFrame com as colunas de BAR_COLUMNS (timestamps UTC), uma linha
+        por (timeframe, início da barra, source, variable_key).
+    """
+    df = pd.DataFrame(records)
+    if df.empty or "variable_key" not in df or "price" not in df:
+        return pd.DataFrame(columns=BAR_COLUMNS)
+
+    df = df[df["variable_key"].notna() & df["price"].notna()]
+    if df.empty:
+        return pd.DataFrame(columns=BAR_COLUMNS)
+
+    price = df["price"].astype(float)
+    ticks = pd.DataFrame({
+        "tick": utc_index(df["timestamp"]),
+        "source": field(df, "source").fillna("sgx").to_numpy(),
+        "variable_key": df["variable_key"].to_numpy(),
+        "symbol": field(df, "symbol").to_numpy(),
+        # Registros diários trazem OHLC; snapshots só o preço
+        "open": field(df, "open").astype(float).fillna(price).to_numpy(),
+        "high": field(df, "high").astype(float).fillna(price).to_numpy(),
+        "low": field(df, "low").astype(float).fillna(price).to_numpy(),
+        "close": price.to_numpy(),
+        "intraday": (field(df, "price_type") != "historical").to_numpy(),
+    }).sort_values("tick", kind="stable")
+
+    frames = []
+    for timeframe, freq in timeframes.items():
+        subset = ticks if freq == "1D" else ticks[ticks["intraday"]]
+        if subset.empty:
+            continue
+        grouped = subset.assign(timestamp=subset["tick"].dt.floor(freq)).groupby(
+            ["timestamp", "source", "variable_key"], sort=True
+        )
+        bars = grouped.agg(
+            symbol=("symbol", "last"),
+            open=("open", "first"),
+            high=("high", "max"),
+            low=("low", "min"),
+            close=("close", "last"),
+            ticks=("close", "size"),
+            first_tick=("tick", "min"),
+            last_tick=("tick", "max"),
+        ).reset_index()
+        bars.insert(0, "timeframe", timeframe)
+        frames.append(bars)
+
+    if not frames:
+        return pd.DataFrame(columns=BAR_COLUMNS)
+    return pd.concat(frames, ignore_index=True)[BAR_COLUMNS]
+
+
+def merge_bar(current: dict[str, Any], partial: dict[str, Any]) -> dict[str, Any]:
+    """
+    Mescla uma barra parcial na barra corrente do mesmo período.
+
+    Mesmas regras do RPC merge_iron_ore_bars: parciais posteriores à barra
+    somam ticks; parciais sobrepostas (reenvio) não alteram a contagem.
+    """
+    merged = dict(current)
+    if partial["first_tick"] < current["first_tick"]:
+        merged["open"] = partial["open"]
+    if partial["last_tick"] >= current["last_tick"]:
+        merged["close"] = partial["close"]
+        merged["symbol"] = partial["symbol"] or current["symbol"]
+    merged["high"] = max(current["high"], partial["high"])
+    merged["low"] = min(current["low"], partial["low"])
+    if partial["first_tick"] > current["last_tick"]:
+        merged["ticks"] = current["ticks"] + partial["ticks"]
+    else:
+        merged["ticks"] = max(current["ticks"], partial["ticks"])
+    merged["first_tick"] = min(current["first_tick"], partial["first_tick"])
+    merged["last_tick"] = max(current["last_tick"], partial["last_tick"])
+    return merged
+
+
+class BarAggregator:
+    """Barras OHLC correntes por (timeframe, source, variable_key)."""
+
+    def __init__(self, timeframes: dict[str, str] = BAR_TIMEFRAMES) -> None:
+        """
+        Args:
+            timeframes: Timeframe -> frequência pandas (default: BAR_TIMEFRAMES)
+        """
+        self.timeframes = timeframes
+        # Apenas a barra mais recente de cada série fica em memória
+        self.bars: dict[tuple[str, str, str], dict[str, Any]] = {}
+
+    def update(self, records: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        """
+        Aplica novos registros e retorna as barras parciais deles.
+
+        A barra corrente em memória é atualizada, mas o retorno contém só
+        os registros recebidos nesta chamada (deltas), que o RPC mescla no
+        banco. Registros de períodos anteriores à barra corrente (ex:
+        histórico) geram barras parciais sem alterar o estado.
+
+        Args:
+            records: Registros no formato de `insert_iron_ore_prices`
+
+        Returns:
+            Barras parciais prontas para `SupabaseClient.upsert_iron_ore_bars`
+            (timestamps em ISO 8601).
+        """
+        partials = bars_from_records(records, self.timeframes)
+        touched = []
+        for partial in partials.to_dict("records"):
+            key = (partial["timeframe"], partial["source"], partial["variable_key"])
+            current = self.bars.get(key)
+            if current is None or partial["timestamp"] > current["timestamp"]:
+                self.bars[key] = partial
+            elif partial["timestamp"] == current["timestamp"]:
+                self.bars[key] = merge_bar(current, partial)
+            touched.append(partial)
+
+        if not touched:
+            return []
+
+        out = pd.DataFrame(touched, columns=BAR_COLUMNS)
+        for column in ("timestamp", "first_tick", "last_tick"):
+            out[column] = utc_isoformat(out[column])
+        out["ticks"] = out["ticks"].astype(int)
+        return out.astype(object).where(out.notna(), None).to_dict("records")
+
+
+# Singleton para uso em todo o projeto
+_aggregator: BarAggregator | None = None
+
+
+def get_bar_aggregator() -> BarAggregator:
+    """Retorna instância singleton do agregador de barras."""
+    global _aggregator
+    if _aggregator is None:
+        _aggregator = BarAggregator()
+    return _aggregator
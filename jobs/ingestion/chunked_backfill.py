@@ -0,0 +1,260 @@
+"""
+Backfill em blocos de datas, paralelo e retomável.
+
+Um backfill longo é dividido em blocos de `chunk_months` meses, alinhados
+ao calendário (ex: jan-jun, jul-dez), de modo que os mesmos blocos sejam
+gerados em execuções em dias diferentes. Cada bloco é buscado e persistido
+em uma thread; ao terminar, é registrado em um arquivo de checkpoint:
+
+    jobs/state/backfill_<nome>.json
+
+O checkpoint é chaveado pelo início de calendário do bloco e guarda o
+intervalo já coberto. Uma execução interrompida (ou com blocos que
+falharam) retoma a partir dos blocos pendentes; numa execução em dia
+posterior, o primeiro bloco (recortado pelo início do período) continua
+concluído e o último busca só os dias que faltam. Como a persistência é
+upsert, reprocessar um bloco é seguro.
+
+Uso:
+    from jobs.ingestion.chunked_backfill import run_chunked_backfill
+
+    total = run_chunked_backfill(
+        "vale3", "2020-01-01", "2025-01-01",
+        fetch_chunk=lambda start, end: [...],
+        persist=client.insert_vale3_prices,
+    )
+"""
+
+import json
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any
+
+from loguru import logger
+
+from jobs.config.settings import (
+    BACKFILL_CHUNK_MONTHS,
+    BACKFILL_MAX_WORKERS,
+    BACKFILL_STATE_DIR,
+)
+
+
+def _chunk_month_index(day: date, chunk_months: int) -> int:
+    """Índice (ano * 12 + mês - 1) do mês de início do bloco de calendário de `day`."""
+    return (day.year * 12 + day.month - 1) // chunk_months * chunk_months
+
+
+def backfill_period(years: int, today: date | None = None) -> tuple[str, str]:
+    """
+    Período (início, fim exclusivo) dos últimos `years` anos até hoje.
+
+    O início é o primeiro dia do mês de `years` anos atrás, estável ao longo
+    do mês, para que o checkpoint reconheça os blocos de execuções em dias
+    diferentes.
+
+    Args:
+        years: Anos de histórico
+        today: Data de referência (default: hoje)
+
+    Returns:
+        Tuple (início, fim) em YYYY-MM-DD.
+    """
+    today = today or datetime.now().date()
+    return date(today.year - years, today.month, 1).isoformat(), today.isoformat()
+
+
+def date_chunks(
+    start_date: str, end_date: str, chunk_months: int = BACKFILL_CHUNK_MONTHS
+) -> list[tuple[str, str]]:
+    """
+    Divide [start_date, end_date) em blocos alinhados ao calendário.
+
+    Os limites internos caem no primeiro dia de meses múltiplos de
+    `chunk_months` (contados a partir de janeiro); o primeiro e o último
+    bloco são recortados pelo intervalo pedido.
+
+    Args:
+        start_date: Data início (YYYY-MM-DD)
+        end_date: Data fim, exclusiva (YYYY-MM-DD)
+        chunk_months: Meses por bloco
+
+    Returns:
+        Lista de (início, fim) em YYYY-MM-DD, em ordem cronológica.
+    """
+    if chunk_months < 1:
+        raise ValueError(f"chunk_months deve ser >= 1: {chunk_months}")
+
+    start = datetime.strptime(start_date, "%Y-%m-%d").date()
+    end = datetime.strptime(end_date, "%Y-%m-%d").date()
+
+    chunks = []
+    month_index = _chunk_month_index(start, chunk_months)
+    chunk_start = start
+    while chunk_start < end:
+        month_index += chunk_months
+        year, month = divmod(month_index, 12)
+        chunk_end = min(date(year, month + 1, 1), end)
+        chunks.append((chunk_start.isoformat(), chunk_end.isoformat()))
+        chunk_start = chunk_end
+    return chunks
+
+
+class BackfillCheckpoint:
+    """
+    Registro (em JSON) do intervalo já concluído de cada bloco de um backfill.
+
+    Cada entrada é chaveada pelo início de calendário do bloco (independe
+    do recorte pelo período pedido) e guarda {"start", "end", "records"}.
+    """
+
+    def __init__(self, path: Path, chunk_months: int = BACKFILL_CHUNK_MONTHS) -> None:
+        """
+        Carrega o checkpoint (vazio se o arquivo não existe ou é inválido).
+
+        Args:
+            path: Arquivo JSON do checkpoint
+            chunk_months: Meses por bloco (define as chaves de calendário)
+        """
+        self.path = path
+        self.chunk_months = chunk_months
+        self._lock = threading.Lock()
+        self.completed: dict[str, dict[str, Any]] = {}
+
+        if path.exists():
+            try:
+                completed = json.loads(path.read_text())["completed"]
+                for key, entry in completed.items():
+                    if not isinstance(entry, dict):
+                        # Formato antigo: "início:fim" -> registros
+                        start, end = key.split(":")
+                        entry = {"start": start, "end": end, "records": entry}
+                    self.completed[self.key((entry["start"], entry["end"]))] = entry
+            except (ValueError, KeyError, TypeError, AttributeError) as e:
+                logger.warning(f"Checkpoint inválido em {path.name}, ignorando: {e}")
+                self.completed = {}
+
+    def key(self, chunk: tuple[str, str]) -> str:
+        """Chave do bloco no checkpoint: início do bloco de calendário."""
+        start = datetime.strptime(chunk[0], "%Y-%m-%d").date()
+        year, month = divmod(_chunk_month_index(start, self.chunk_months), 12)
+        return date(year, month + 1, 1).isoformat()
+
+    def pending(self, chunk: tuple[str, str]) -> tuple[str, str] | None:
+        """
+        Parte do bloco ainda não concluída.
+
+        Returns:
+            O bloco inteiro, só o final ainda não coberto (ex: último bloco
+            em um dia posterior) ou None se o bloco já foi concluído.
+        """
+        entry = self.completed.get(self.key(chunk))
+        if entry is None or entry["start"] > chunk[0] or entry["end"] <= chunk[0]:
+            return chunk
+        if entry["end"] >= chunk[1]:
+            return None
+        return entry["end"], chunk[1]
+
+    def is_done(self, chunk: tuple[str, str]) -> bool:
+        """Se o bloco já foi concluído."""
+        return self.pending(chunk) is None
+
+    def mark_done(self, chunk: tuple[str, str], count: int) -> None:
+        """Marca o intervalo como concluído e grava o arquivo (escrita atômica)."""
+        with self._lock:
+            key = self.key(chunk)
+            entry = self.completed.get(key)
+            if entry is not None and entry["start"] <= chunk[1] and chunk[0] <= entry["end"]:
+                # Estende o intervalo contíguo já registrado
+                entry = {
+                    "start": min(entry["start"], chunk[0]),
+                    "end": max(entry["end"], chunk[1]),
+                    "records": entry["records"] + count,
+                }
+            else:
+                entry = {"start": chunk[0], "end": chunk[1], "records": count}
+            self.completed[key] = entry
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_suffix(".tmp")
+            tmp_path.write_text(json.dumps({"completed": self.completed}, indent=2, sort_keys=True))
+            tmp_path.replace(self.path)
+
+    def reset(self) -> None:
+        """Descarta o progresso registrado."""
+        with self._lock:
+            self.completed = {}
+            self.path.unlink(missing_ok=True)
+
+
+def run_chunked_backfill(
+    name: str,
+    start_date: str,
+    end_date: str,
+    fetch_chunk: Callable[[str, str], list[dict[str, Any]]],
+    persist: Callable[[list[dict[str, Any]]], int],
+    chunk_months: int = BACKFILL_CHUNK_MONTHS,
+    max_workers: int = BACKFILL_MAX_WORKERS,
+    state_dir: Path = BACKFILL_STATE_DIR,
+    resume: bool = True,
+) -> int:
+    """
+    Executa um backfill em blocos paralelos com checkpoint.
+
+    Falhas em um bloco são registradas e não interrompem os demais; o
+    bloco continua pendente e é refeito na próxima execução.
+
+    Args:
+        name: Nome do backfill (define o arquivo de checkpoint)
+        start_date: Data início (YYYY-MM-DD)
+        end_date: Data fim, exclusiva (YYYY-MM-DD)
+        fetch_chunk: Busca os registros de um bloco (início, fim)
+        persist: Persiste os registros e retorna quantos foram inseridos
+        chunk_months: Meses por bloco
+        max_workers: Blocos processados simultaneamente
+        state_dir: Diretório dos checkpoints
+        resume: Se False, descarta o checkpoint e refaz todos os blocos
+
+    Returns:
+        Número de registros inseridos nesta execução.
+    """
+    checkpoint = BackfillCheckpoint(state_dir / f"backfill_{name}.json", chunk_months)
+    if not resume:
+        checkpoint.reset()
+
+    chunks = date_chunks(start_date, end_date, chunk_months)
+    pending = [part for chunk in chunks if (part := checkpoint.pending(chunk)) is not None]
+    if len(pending) < len(chunks):
+        logger.info(f"{name}: retomando, {len(chunks) - len(pending)}/{len(chunks)} blocos já concluídos")
+    if not pending:
+        return 0
+
+    def process(chunk: tuple[str, str]) -> int:
+        records = fetch_chunk(*chunk)
+        count = persist(records) if records else 0
+        checkpoint.mark_done(chunk, count)
+        logger.info(f"{name}: bloco {chunk[0]} a {chunk[1]} concluído ({count} registros)")
+        return count
+
+    start = time.perf_counter()
+    total = 0
+    failed = 0
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(pending)))) as executor:
+        futures = {executor.submit(process, chunk): chunk for chunk in pending}
+        for future in as_completed(futures):
+            chunk = futures[future]
+            try:
+                total += future.result()
+            except Exception as e:
+                failed += 1
+                logger.error(f"{name}: erro no bloco {chunk[0]} a {chunk[1]}: {e}")
+
+    logger.info(
+        f"{name}: {total} registros em {len(pending) - failed}/{len(pending)} blocos "
+        f"({time.perf_counter() - start:.1f}s)"
+    )
+    if failed:
+        logger.warning(f"{name}: {failed} bloco(s) pendente(s), execute novamente para retomar")
+    return total
@@ -21,8 +21,10 @@ from loguru import logger
 # Adiciona diretório raiz ao path
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
+from jobs.clients.lseg_session import LsegSessionManager, get_lseg_session
 from jobs.clients.supabase_client import get_supabase_client
-from jobs.config.settings import LSEG_CONFIG_PATH, USDBRL_RIC, VIX_RIC
+from jobs.config.settings import USDBRL_RIC, VIX_RIC
+from jobs.ingestion.lseg_records import field, frame_to_records, utc_isoformat
 
 # Importa LSEG
 try:
@@ -35,48 +37,33 @@ except ImportError:
 class AuxiliaryFetcher:
     """Fetcher de dados auxiliares via LSEG."""
 
-    def __init__(self) -> None:
-        """Inicializa o fetcher."""
+    def __init__(self, session: LsegSessionManager | None = None) -> None:
+        """
+        Inicializa o fetcher.
+
+        Args:
+            session: Gerenciador da sessão LSEG. Padrão: sessão compartilhada
+                     do processo (`get_lseg_session()`).
+        """
         self.supabase = get_supabase_client()
+        self.session = session or get_lseg_session()
         self.session_open = False
 
     def _open_session(self) -> bool:
         """
-        Abre sessão com LSEG Workspace usando arquivo de configuração.
+        Obtém a sessão LSEG compartilhada (abre apenas se necessário).
 
         Returns:
-            True se sessão aberta com sucesso.
+            True se sessão disponível.
         """
-        if ld is None:
-            logger.error("lseg-data não está instalado")
-            return False
-
-        try:
-            config_path = LSEG_CONFIG_PATH
-            if not config_path.exists():
-                logger.error(f"Arquivo de configuração não encontrado: {config_path}")
-                return False
-
-            logger.info(f"Abrindo sessão LSEG com config: {config_path.name}")
-            ld.open_session(config_name=str(config_path))
-            self.session_open = True
-            logger.info("Sessão LSEG aberta com sucesso")
-            return True
-
-        except Exception as e:
-            logger.error(f"Erro ao abrir sessão LSEG: {e}")
-            return False
+        self.session_open = self.session.acquire()
+        return self.session_open
 
     def _close_session(self) -> None:
-        """Fecha sessão com LSEG."""
+        """Devolve a sessão LSEG (ela é fechada só por ociosidade)."""
         if self.session_open:
-            try:
-                ld.close_session()
-                logger.info("Sessão LSEG fechada")
-            except Exception as e:
-                logger.warning(f"Erro ao fechar sessão LSEG: {e}")
-            finally:
-                self.session_open = False
+            self.session.release()
+            self.session_open = False
 
     def fetch_realtime(self) -> list[dict[str, Any]]:
         """
@@ -105,38 +92,26 @@ class AuxiliaryFetcher:
 
             now_utc = datetime.now(timezone.utc)
 
-            for _, row in response.iterrows():
-                ric = row.get("Instrument", "")
-                # Usa TRDPRC_1, ou média de BID/ASK como fallback
-                last_value = row.get("TRDPRC_1")
-                if pd.isna(last_value):
-                    bid = row.get("BID")
-                    ask = row.get("ASK")
-                    if not pd.isna(bid) and not pd.isna(ask):
-                        last_value = (float(bid) + float(ask)) / 2
-                    elif not pd.isna(bid):
-                        last_value = bid
-
-                if pd.isna(last_value):
-                    logger.warning(f"Valor inválido para {ric}")
-                    continue
-
-                # Mapeia RIC para nome do indicador
-                if ric == USDBRL_RIC:
-                    indicator = "usd_brl"
-                elif ric == VIX_RIC:
-                    indicator = "vix"
-                else:
-                    logger.warning(f"RIC desconhecido: {ric}")
-                    continue
-
-                record = {
-                    "timestamp": now_utc.isoformat(),
-                    "indicator": indicator,
-                    "value": float(last_value),
-                }
-                records.append(record)
-                logger.debug(f"Coletado: {indicator} = {last_value}")
+            # Usa TRDPRC_1, ou média de BID/ASK (ou BID) como fallback
+            bid = field(response, "BID")
+            mid = (bid + field(response, "ASK")).div(2).fillna(bid)
+            value = field(response, "TRDPRC_1").fillna(mid)
+
+            # Mapeia RIC para nome do indicador
+            rics_col = response["Instrument"]
+            indicator = rics_col.map({USDBRL_RIC: "usd_brl", VIX_RIC: "vix"})
+            for ric in rics_col[value.isna()]:
+                logger.warning(f"Valor inválido para {ric}")
+            for ric in rics_col[value.notna() & indicator.isna()]:
+                logger.warning(f"RIC desconhecido: {ric}")
+
+            frame = pd.DataFrame({
+                "timestamp": now_utc.isoformat(),
+                "indicator": indicator,
+                "value": value,
+            })
+            records = frame_to_records(frame[value.notna() & indicator.notna()])
+            logger.debug(f"Coletado: {dict(zip(frame['indicator'], frame['value']))}")
 
             logger.info(f"Coletados {len(records)} indicadores auxiliares")
 
@@ -201,7 +176,6 @@ class AuxiliaryFetcher:
                     logger.warning(f"Sem dados históricos para {indicator}")
                     continue
 
-                count = 0
                 # Detecta a coluna de preço disponível
                 # FX usa MID_PRICE, índices usam CLOSE ou TRDPRC_1
                 price_cols = ["MID_PRICE", "CLOSE", "TRDPRC_1", "MID_CLOSE", "BID", "BID_CLOSE", "ASK_CLOSE"]
@@ -224,23 +198,15 @@ class AuxiliaryFetcher:
 
                 logger.info(f"Usando coluna '{available_col}' para {indicator}")
 
-                for timestamp, row in response.iterrows():
-                    value = row.get(available_col)
-                    if pd.isna(value):
-                        continue
-
-                    if isinstance(timestamp, pd.Timestamp):
-                        ts_utc = timestamp.tz_localize("UTC") if timestamp.tzinfo is None else timestamp.tz_convert("UTC")
-                    else:
-                        ts_utc = pd.Timestamp(timestamp, tz="UTC")
-
-                    record = {
-                        "timestamp": ts_utc.isoformat(),
-                        "indicator": indicator,
-                        "value": float(value),
-                    }
-                    records.append(record)
-                    count += 1
+                values = pd.to_numeric(response[available_col], errors="coerce")
+                frame = pd.DataFrame({
+                    "timestamp": utc_isoformat(response.index),
+                    "indicator": indicator,
+                    "value": values.to_numpy(dtype=float),
+                })
+                indicator_records = frame_to_records(frame[values.notna().to_numpy()])
+                records.extend(indicator_records)
+                count = len(indicator_records)
 
                 logger.info(f"Coletados {count} registros para {indicator}")
 
@@ -15,18 +15,27 @@ from datetime import datetime, timedelta, timezone
 from pathlib import Path
 from typing import Any
 
+import numpy as np
 import pandas as pd
 from loguru import logger
 
 # Adiciona diretório raiz ao path
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
+from jobs.clients.lseg_session import LsegSessionManager, get_lseg_session
 from jobs.clients.supabase_client import get_supabase_client
-from jobs.config.settings import (
-    IRON_ORE_RICS,
-    LSEG_CONFIG_PATH,
-    expiry_date_to_variable_key,
-    ric_to_variable_key,
+from jobs.config.contracts import IRON_ORE_CONTRACTS
+from jobs.config.settings import CURVE_HISTORY_GROUP_SIZE, generate_iron_ore_rics
+from jobs.ingestion.bar_aggregator import BarAggregator, get_bar_aggregator
+from jobs.ingestion.lseg_records import (
+    field,
+    frame_to_records,
+    history_by_instrument,
+    normalize_expiry_dates,
+    ohlcv_frame,
+    resolve_variable_keys,
+    utc_index,
+    utc_isoformat,
 )
 
 # Importa LSEG
@@ -40,60 +49,52 @@ except ImportError:
 class IronOreFetcher:
     """Fetcher de preços de minério de ferro via LSEG."""
 
-    def __init__(self) -> None:
-        """Inicializa o fetcher."""
+    def __init__(
+        self,
+        session: LsegSessionManager | None = None,
+        bars: BarAggregator | None = None,
+    ) -> None:
+        """
+        Inicializa o fetcher.
+
+        Args:
+            session: Gerenciador da sessão LSEG. Padrão: sessão compartilhada
+                     do processo (`get_lseg_session()`).
+            bars: Agregador de barras OHLC. Padrão: agregador compartilhado
+                  do processo (`get_bar_aggregator()`).
+        """
         self.supabase = get_supabase_client()
+        self.session = session or get_lseg_session()
+        self.bars = bars or get_bar_aggregator()
         self.session_open = False
 
     def _open_session(self) -> bool:
         """
-        Abre sessão com LSEG Workspace usando arquivo de configuração.
+        Obtém a sessão LSEG compartilhada (abre apenas se necessário).
 
         Returns:
-            True se sessão aberta com sucesso.
+            True se sessão disponível.
         """
-        if ld is None:
-            logger.error("lseg-data não está instalado")
-            return False
-
-        try:
-            config_path = LSEG_CONFIG_PATH
-            if not config_path.exists():
-                logger.error(f"Arquivo de configuração não encontrado: {config_path}")
-                return False
-
-            logger.info(f"Abrindo sessão LSEG com config: {config_path.name}")
-            ld.open_session(config_name=str(config_path))
-            self.session_open = True
-            logger.info("Sessão LSEG aberta com sucesso")
-            return True
-
-        except Exception as e:
-            logger.error(f"Erro ao abrir sessão LSEG: {e}")
-            return False
+        self.session_open = self.session.acquire()
+        return self.session_open
 
     def _close_session(self) -> None:
-        """Fecha sessão com LSEG."""
+        """Devolve a sessão LSEG (ela é fechada só por ociosidade)."""
         if self.session_open:
-            try:
-                ld.close_session()
-                logger.info("Sessão LSEG fechada")
-            except Exception as e:
-                logger.warning(f"Erro ao fechar sessão LSEG: {e}")
-            finally:
-                self.session_open = False
+            self.session.release()
+            self.session_open = False
 
     def fetch_realtime(self, rics: list[str] | None = None) -> list[dict[str, Any]]:
         """
         Busca snapshot de preços em tempo real.
 
         Args:
-            rics: Lista de RICs a buscar. Padrão: IRON_ORE_RICS (12 meses)
+            rics: Lista de RICs a buscar. Padrão: próximos 12 meses (recalculado a cada chamada)
 
         Returns:
             Lista de dicts com dados de preços.
         """
-        rics = rics or IRON_ORE_RICS
+        rics = rics or generate_iron_ore_rics(12)
         records = []
 
         try:
@@ -120,50 +121,30 @@ class IronOreFetcher:
 
             now_utc = datetime.now(timezone.utc)
 
-            for _, row in response.iterrows():
-                ric = row.get("Instrument", "")
-                # Usa TRDPRC_1 como preço principal, SETTLE como fallback
-                last_price = row.get("TRDPRC_1")
-                if pd.isna(last_price):
-                    last_price = row.get("SETTLE")
-
-                if pd.isna(last_price):
-                    logger.warning(f"Preço inválido para {ric}")
-                    continue
-
-                # Extrai e formata expiry_date
-                expiry_raw = row.get("EXPIR_DATE")
-                expiry_date = None
-                if not pd.isna(expiry_raw):
-                    if isinstance(expiry_raw, pd.Timestamp):
-                        expiry_date = expiry_raw.strftime("%Y-%m-%d")
-                    elif isinstance(expiry_raw, str):
-                        expiry_date = expiry_raw.split("T")[0]
-                    else:
-                        expiry_date = str(expiry_raw)
-
-                # Calcula variable_key (prefere expiry_date, fallback para RIC)
-                variable_key = expiry_date_to_variable_key(expiry_date)
-                if not variable_key:
-                    variable_key = ric_to_variable_key(ric)
-
-                record = {
-                    "timestamp": now_utc.isoformat(),
-                    "source": "sgx",
-                    "symbol": ric,
-                    "price": float(last_price),
-                    "variable_key": variable_key,
-                    "expiry_date": expiry_date,
-                    "price_type": "intraday",
-                }
-
+            # Usa TRDPRC_1 como preço principal, SETTLE como fallback
+            settle = field(response, "SETTLE")
+            price = field(response, "TRDPRC_1").fillna(settle)
+            rics_col = response["Instrument"].astype(str)
+            for ric in rics_col[price.isna()]:
+                logger.warning(f"Preço inválido para {ric}")
+
+            # Calcula variable_key (prefere expiry_date, fallback para RIC)
+            expiry_date = normalize_expiry_dates(field(response, "EXPIR_DATE"))
+            IRON_ORE_CONTRACTS.record_expiries(expiry_date)
+            known = IRON_ORE_CONTRACTS.map_expiries(rics_col, fallback=False)
+            expiry_date = expiry_date.where(expiry_date.notna(), known)
+            frame = pd.DataFrame({
+                "timestamp": now_utc.isoformat(),
+                "source": "sgx",
+                "symbol": rics_col,
+                "price": price,
+                "variable_key": resolve_variable_keys(expiry_date, rics_col),
+                "expiry_date": expiry_date,
                 # Settlement como close
-                if not pd.isna(row.get("SETTLE")):
-                    record["close"] = float(row.get("SETTLE"))
-                    record["price_type"] = "settlement"
-
-                records.append(record)
-                logger.debug(f"Coletado: {ric} ({variable_key}) = {last_price}")
+                "price_type": np.where(settle.notna(), "settlement", "intraday"),
+                "close": settle,
+            })
+            records = frame_to_records(frame[price.notna()])
 
             logger.info(f"Coletados {len(records)} preços de minério (12 meses forward)")
 
@@ -179,27 +160,34 @@ class IronOreFetcher:
 
         return records
 
-    def fetch_historical(
+    def fetch_curve_history(
         self,
         rics: list[str] | None = None,
         start_date: str | None = None,
         end_date: str | None = None,
         interval: str = "daily",
-    ) -> list[dict[str, Any]]:
+        group_size: int = CURVE_HISTORY_GROUP_SIZE,
+    ) -> pd.DataFrame:
         """
-        Busca dados históricos de preços.
+        Busca o histórico da curva forward com poucas chamadas ao LSEG.
+
+        Os contratos são pedidos em grupos de `group_size` RICs por
+        `ld.get_history`, e os vencimentos em uma única `ld.get_data`.
+        Um ano de curva com 12 contratos leva 3 chamadas (no padrão).
 
         Args:
-            rics: Lista de RICs. Padrão: IRON_ORE_RICS (12 meses)
+            rics: Lista de RICs. Padrão: próximos 12 meses (recalculado a cada chamada)
             start_date: Data início (YYYY-MM-DD). Padrão: 30 dias atrás
             end_date: Data fim (YYYY-MM-DD). Padrão: hoje
             interval: Intervalo (1H, 1D, etc.)
+            group_size: Contratos por chamada de histórico
 
         Returns:
-            Lista de dicts com dados históricos.
+            DataFrame indexado por (timestamp UTC, variable_key) com colunas
+            symbol, expiry_date, price, open, high, low e volume. Vazio se
+            não houver dados.
         """
-        rics = rics or IRON_ORE_RICS
-        records = []
+        rics = rics or generate_iron_ore_rics(12)
 
         # Define datas padrão
         if not end_date:
@@ -208,85 +196,42 @@ class IronOreFetcher:
             start_dt = datetime.now() - timedelta(days=30)
             start_date = start_dt.strftime("%Y-%m-%d")
 
+        frames = []
         try:
             if not self._open_session():
-                return records
+                return pd.DataFrame()
 
-            # Primeiro busca expiry_date de cada RIC
-            expiry_dates = {}
+            # Vencimento dos contratos ainda sem EXPIR_DATE no calendário, em uma chamada
+            unknown = [ric for ric in rics if IRON_ORE_CONTRACTS.expiry(ric, fallback=False) is None]
             try:
-                expiry_response = ld.get_data(rics, fields=["EXPIR_DATE"])
-                if expiry_response is not None and not expiry_response.empty:
-                    for _, row in expiry_response.iterrows():
-                        ric = row.get("Instrument", "")
-                        expiry_raw = row.get("EXPIR_DATE")
-                        if not pd.isna(expiry_raw):
-                            if isinstance(expiry_raw, pd.Timestamp):
-                                expiry_dates[ric] = expiry_raw.strftime("%Y-%m-%d")
-                            elif isinstance(expiry_raw, str):
-                                expiry_dates[ric] = expiry_raw.split("T")[0]
-                            else:
-                                expiry_dates[ric] = str(expiry_raw)
+                if unknown:
+                    expiry_response = ld.get_data(unknown, fields=["EXPIR_DATE"])
+                    if expiry_response is not None and not expiry_response.empty:
+                        IRON_ORE_CONTRACTS.record_expiries(
+                            normalize_expiry_dates(field(expiry_response, "EXPIR_DATE"))
+                        )
             except Exception as e:
                 logger.warning(f"Não foi possível buscar expiry_dates: {e}")
 
-            for ric in rics:
-                logger.info(f"Buscando histórico {ric}: {start_date} a {end_date}")
-
-                # Busca histórico
-                response = ld.get_history(
-                    universe=ric,
-                    fields=["TRDPRC_1", "HIGH_1", "LOW_1", "OPEN_PRC", "ACVOL_UNS"],
-                    interval=interval,
-                    start=start_date,
-                    end=end_date,
-                )
+            for i in range(0, len(rics), max(group_size, 1)):
+                group = rics[i:i + max(group_size, 1)]
+                logger.info(f"Buscando histórico {group}: {start_date} a {end_date}")
+                try:
+                    response = ld.get_history(
+                        universe=group,
+                        fields=["TRDPRC_1", "HIGH_1", "LOW_1", "OPEN_PRC", "ACVOL_UNS"],
+                        interval=interval,
+                        start=start_date,
+                        end=end_date,
+                    )
+                except Exception as e:
+                    logger.error(f"Erro ao buscar histórico de {group}: {e}")
+                    continue
 
                 if response is None or response.empty:
-                    logger.warning(f"Sem dados históricos para {ric}")
+                    logger.warning(f"Sem dados históricos para {group}")
                     continue
-
-                # Determina variable_key e expiry_date para este RIC
-                expiry_date = expiry_dates.get(ric)
-                variable_key = expiry_date_to_variable_key(expiry_date)
-                if not variable_key:
-                    variable_key = ric_to_variable_key(ric)
-
-                count = 0
-                for timestamp, row in response.iterrows():
-                    price = row.get("TRDPRC_1")
-                    if pd.isna(price):
-                        continue
-
-                    # Converte timestamp para UTC
-                    if isinstance(timestamp, pd.Timestamp):
-                        ts_utc = timestamp.tz_localize("UTC") if timestamp.tzinfo is None else timestamp.tz_convert("UTC")
-                    else:
-                        ts_utc = pd.Timestamp(timestamp, tz="UTC")
-
-                    record = {
-                        "timestamp": ts_utc.isoformat(),
-                        "source": "sgx",
-                        "symbol": ric,
-                        "price": float(price),
-                        "variable_key": variable_key,
-                        "expiry_date": expiry_date,
-                        "price_type": "historical",
-                    }
-
-                    if not pd.isna(row.get("HIGH_1")):
-                        record["high"] = float(row.get("HIGH_1"))
-                    if not pd.isna(row.get("LOW_1")):
-                        record["low"] = float(row.get("LOW_1"))
-                    if not pd.isna(row.get("OPEN_PRC")):
-                        record["open"] = float(row.get("OPEN_PRC"))
-                    if not pd.isna(row.get("ACVOL_UNS")):
-                        record["volume"] = int(row.get("ACVOL_UNS"))
-
-                    records.append(record)
-                    count += 1
-
-                logger.info(f"Coletados {count} registros históricos para {ric} ({variable_key})")
+                frames.append(history_by_instrument(response, group))
 
         except Exception as e:
             logger.error(f"Erro ao buscar dados históricos: {e}")
@@ -298,18 +243,103 @@ class IronOreFetcher:
         finally:
             self._close_session()
 
-        return records
+        if not frames:
+            return pd.DataFrame()
+
+        history = pd.concat(frames, ignore_index=True)
+        history = history[field(history, "TRDPRC_1").notna()].reset_index(drop=True)
+        rics_col = history["ric"].astype(str)
+        expiry_date = IRON_ORE_CONTRACTS.map_expiries(rics_col, fallback=False)
+
+        curve = pd.DataFrame({
+            "timestamp": utc_index(history["timestamp"]),
+            # Prefere expiry_date, fallback para RIC
+            "variable_key": resolve_variable_keys(expiry_date, rics_col),
+            "symbol": rics_col,
+            "expiry_date": expiry_date,
+            "price": field(history, "TRDPRC_1"),
+        }).join(ohlcv_frame(history))
+        curve = curve.set_index(["timestamp", "variable_key"]).sort_index()
+
+        logger.info(
+            f"Curva forward: {len(curve)} registros de {curve['symbol'].nunique()} contratos "
+            f"({-(-len(rics) // max(group_size, 1))} chamadas de histórico)"
+        )
+        return curve
+
+    @staticmethod
+    def curve_to_records(curve: pd.DataFrame) -> list[dict[str, Any]]:
+        """
+        Converte o histórico da curva (ver `fetch_curve_history`) em registros.
+
+        Returns:
+            Lista de dicts no formato de `insert_iron_ore_prices`.
+        """
+        if curve.empty:
+            return []
+
+        flat = curve.reset_index()
+        frame = pd.DataFrame({
+            "timestamp": utc_isoformat(flat["timestamp"]),
+            "source": "sgx",
+            "symbol": flat["symbol"].to_numpy(),
+            "price": flat["price"].to_numpy(),
+            "variable_key": flat["variable_key"].to_numpy(),
+            "expiry_date": flat["expiry_date"].to_numpy(),
+            "price_type": "historical",
+        })
+        frame = frame.join(flat[["open", "high", "low", "volume"]])
+        return frame_to_records(frame, int_columns=("volume",))
+
+    def fetch_historical(
+        self,
+        rics: list[str] | None = None,
+        start_date: str | None = None,
+        end_date: str | None = None,
+        interval: str = "daily",
+    ) -> list[dict[str, Any]]:
+        """
+        Busca dados históricos de preços (curva forward em lote).
+
+        Args:
+            rics: Lista de RICs. Padrão: próximos 12 meses (recalculado a cada chamada)
+            start_date: Data início (YYYY-MM-DD). Padrão: 30 dias atrás
+            end_date: Data fim (YYYY-MM-DD). Padrão: hoje
+            interval: Intervalo (1H, 1D, etc.)
+
+        Returns:
+            Lista de dicts com dados históricos.
+        """
+        curve = self.fetch_curve_history(rics, start_date, end_date, interval)
+        return self.curve_to_records(curve)
+
+    def persist_bars(self, records: list[dict[str, Any]]) -> int:
+        """
+        Atualiza as barras OHLC (5m/1h/1d) com os registros e as grava.
+
+        Falhas são apenas registradas: as barras nunca bloqueiam a ingestão.
+
+        Returns:
+            Número de barras gravadas.
+        """
+        try:
+            return self.supabase.upsert_iron_ore_bars(self.bars.update(records))
+        except Exception as e:
+            logger.error(f"Erro ao agregar barras de minério: {e}")
+            return 0
 
     def fetch_and_persist_realtime(self) -> int:
         """
-        Busca dados realtime e persiste no Supabase.
+        Busca dados realtime, persiste no Supabase e atualiza as barras.
 
         Returns:
             Número de registros inseridos.
         """
         records = self.fetch_realtime()
         if records:
-            return self.supabase.insert_iron_ore_prices(records)
+            count = self.supabase.insert_iron_ore_prices(records)
+            self.persist_bars(records)
+            return count
         return 0
 
     def fetch_and_persist_historical(
@@ -318,7 +348,7 @@ class IronOreFetcher:
         end_date: str | None = None,
     ) -> int:
         """
-        Busca dados históricos e persiste no Supabase.
+        Busca o histórico da curva forward e persiste em uma escrita em lote.
 
         Args:
             start_date: Data início (YYYY-MM-DD)
@@ -329,7 +359,9 @@ class IronOreFetcher:
         """
         records = self.fetch_historical(start_date=start_date, end_date=end_date)
         if records:
-            return self.supabase.insert_iron_ore_prices(records)
+            count = self.supabase.insert_iron_ore_prices(records)
+            self.persist_bars(records)
+            return count
         return 0
 
 
@@ -17,8 +17,10 @@ from loguru import logger
 # Adiciona diretório raiz ao path
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
+from jobs.clients.lseg_session import LsegSessionManager, get_lseg_session
 from jobs.clients.supabase_client import get_supabase_client
-from jobs.config.settings import LSEG_CONFIG_PATH, VALE3_RIC
+from jobs.config.settings import VALE3_RIC
+from jobs.ingestion.lseg_records import field, frame_to_records, ohlcv_frame, utc_isoformat
 
 # Importa LSEG
 try:
@@ -31,49 +33,34 @@ except ImportError:
 class Vale3Fetcher:
     """Fetcher de preços de VALE3 via LSEG."""
 
-    def __init__(self) -> None:
-        """Inicializa o fetcher."""
+    def __init__(self, session: LsegSessionManager | None = None) -> None:
+        """
+        Inicializa o fetcher.
+
+        Args:
+            session: Gerenciador da sessão LSEG. Padrão: sessão compartilhada
+                     do processo (`get_lseg_session()`).
+        """
         self.supabase = get_supabase_client()
         self.ric = VALE3_RIC
+        self.session = session or get_lseg_session()
         self.session_open = False
 
     def _open_session(self) -> bool:
         """
-        Abre sessão com LSEG Workspace usando arquivo de configuração.
+        Obtém a sessão LSEG compartilhada (abre apenas se necessário).
 
         Returns:
-            True se sessão aberta com sucesso.
+            True se sessão disponível.
         """
-        if ld is None:
-            logger.error("lseg-data não está instalado")
-            return False
-
-        try:
-            config_path = LSEG_CONFIG_PATH
-            if not config_path.exists():
-                logger.error(f"Arquivo de configuração não encontrado: {config_path}")
-                return False
-
-            logger.info(f"Abrindo sessão LSEG com config: {config_path.name}")
-            ld.open_session(config_name=str(config_path))
-            self.session_open = True
-            logger.info("Sessão LSEG aberta com sucesso")
-            return True
-
-        except Exception as e:
-            logger.error(f"Erro ao abrir sessão LSEG: {e}")
-            return False
+        self.session_open = self.session.acquire()
+        return self.session_open
 
     def _close_session(self) -> None:
-        """Fecha sessão com LSEG."""
+        """Devolve a sessão LSEG (ela é fechada só por ociosidade)."""
         if self.session_open:
-            try:
-                ld.close_session()
-                logger.info("Sessão LSEG fechada")
-            except Exception as e:
-                logger.warning(f"Erro ao fechar sessão LSEG: {e}")
-            finally:
-                self.session_open = False
+            self.session.release()
+            self.session_open = False
 
     def fetch_realtime(self) -> list[dict[str, Any]]:
         """
@@ -109,29 +96,15 @@ class Vale3Fetcher:
 
             now_utc = datetime.now(timezone.utc)
 
-            for _, row in response.iterrows():
-                last_price = row.get("TRDPRC_1")
-
-                if pd.isna(last_price):
-                    logger.warning(f"Preço inválido para {self.ric}")
-                    continue
+            last_price = field(response, "TRDPRC_1")
+            if last_price.isna().any():
+                logger.warning(f"Preço inválido para {self.ric}")
 
-                record = {
-                    "timestamp": now_utc.isoformat(),
-                    "close": float(last_price),
-                }
-
-                if not pd.isna(row.get("OPEN_PRC")):
-                    record["open"] = float(row.get("OPEN_PRC"))
-                if not pd.isna(row.get("HIGH_1")):
-                    record["high"] = float(row.get("HIGH_1"))
-                if not pd.isna(row.get("LOW_1")):
-                    record["low"] = float(row.get("LOW_1"))
-                if not pd.isna(row.get("ACVOL_UNS")):
-                    record["volume"] = int(row.get("ACVOL_UNS"))
-
-                records.append(record)
-                logger.info(f"Coletado: VALE3 = {last_price}")
+            frame = pd.DataFrame({"timestamp": now_utc.isoformat(), "close": last_price})
+            frame = frame.join(ohlcv_frame(response))
+            records = frame_to_records(frame[last_price.notna()], int_columns=("volume",))
+            for record in records:
+                logger.info(f"Coletado: VALE3 = {record['close']}")
 
         except Exception as e:
             logger.error(f"Erro ao buscar dados realtime VALE3: {e}")
@@ -188,31 +161,13 @@ class Vale3Fetcher:
                 logger.warning(f"Sem dados históricos para {self.ric}")
                 return records
 
-            for timestamp, row in response.iterrows():
-                price = row.get("TRDPRC_1")
-                if pd.isna(price):
-                    continue
-
-                if isinstance(timestamp, pd.Timestamp):
-                    ts_utc = timestamp.tz_localize("UTC") if timestamp.tzinfo is None else timestamp.tz_convert("UTC")
-                else:
-                    ts_utc = pd.Timestamp(timestamp, tz="UTC")
-
-                record = {
-                    "timestamp": ts_utc.isoformat(),
-                    "close": float(price),
-                }
-
-                if not pd.isna(row.get("OPEN_PRC")):
-                    record["open"] = float(row.get("OPEN_PRC"))
-                if not pd.isna(row.get("HIGH_1")):
-                    record["high"] = float(row.get("HIGH_1"))
-                if not pd.isna(row.get("LOW_1")):
-                    record["low"] = float(row.get("LOW_1"))
-                if not pd.isna(row.get("ACVOL_UNS")):
-                    record["volume"] = int(row.get("ACVOL_UNS"))
-
-                records.append(record)
+            price = field(response, "TRDPRC_1")
+            frame = pd.DataFrame(
+                {"timestamp": utc_isoformat(response.index), "close": price.to_numpy()},
+                index=response.index,
+            )
+            frame = frame.join(ohlcv_frame(response))
+            records = frame_to_records(frame[price.notna()], int_columns=("volume",))
 
             logger.info(f"Coletados {len(records)} registros históricos VALE3")
 
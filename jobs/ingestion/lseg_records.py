@@ -0,0 +1,145 @@
+"""
+Conversão vetorizada de respostas LSEG em registros para o Supabase.
+
+As respostas de `ld.get_data` / `ld.get_history` são DataFrames; em vez de
+percorrer linha a linha com `iterrows`, cada fetcher monta as colunas do
+registro de uma vez (fallback de preço, normalização de vencimento,
+`variable_key`) e converte o resultado com `frame_to_records`.
+"""
+
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+from jobs.config.contracts import IRON_ORE_CONTRACTS
+
+# Campos OHLCV do LSEG -> colunas do registro
+OHLCV_FIELDS = {
+    "OPEN_PRC": "open",
+    "HIGH_1": "high",
+    "LOW_1": "low",
+    "ACVOL_UNS": "volume",
+}
+
+
+def field(df: pd.DataFrame, name: str) -> pd.Series:
+    """Coluna da resposta LSEG ou série de NaN se o campo não veio."""
+    if name in df.columns:
+        return df[name]
+    return pd.Series(np.nan, index=df.index, dtype=float)
+
+
+def utc_index(values: Any) -> pd.DatetimeIndex:
+    """Converte timestamps (índice ou coluna) para DatetimeIndex em UTC (sem fuso = UTC)."""
+    index = pd.DatetimeIndex(pd.to_datetime(values))
+    return index.tz_localize("UTC") if index.tz is None else index.tz_convert("UTC")
+
+
+def utc_isoformat(values: Any) -> pd.Index:
+    """
+    Converte timestamps (índice ou coluna) para strings ISO 8601 em UTC.
+
+    Timestamps sem fuso são tratados como UTC.
+    """
+    return utc_index(values).strftime("%Y-%m-%dT%H:%M:%S+00:00")
+
+
+def normalize_expiry_dates(values: pd.Series) -> pd.Series:
+    """
+    Normaliza datas de vencimento para 'YYYY-MM-DD' (None se ausente).
+
+    Aceita Timestamps, datas ou strings ISO com hora/fuso.
+    """
+    if pd.api.types.is_datetime64_any_dtype(values):
+        dates = values.dt.strftime("%Y-%m-%d")
+    else:
+        dates = values.astype("string").str.split("T").str[0].str.split(" ").str[0]
+    return dates.astype(object).where(values.notna(), None)
+
+
+def expiry_to_variable_keys(expiry: pd.Series) -> pd.Series:
+    """Versão vetorizada de `expiry_date_to_variable_key`."""
+    parsed = pd.to_datetime(expiry, format="%Y-%m-%d", errors="coerce")
+    keys = (
+        "DERIV_IO_SWAP_"
+        + parsed.dt.year.astype("Int64").astype("string")
+        + "_"
+        + parsed.dt.month.astype("Int64").astype("string").str.zfill(2)
+    )
+    return keys.astype(object).where(parsed.notna(), None)
+
+
+def resolve_variable_keys(expiry: pd.Series, rics: pd.Series) -> pd.Series:
+    """
+    `variable_key` de cada linha: pelo vencimento, com fallback pelo RIC.
+
+    O fallback consulta a tabela pré-calculada de contratos.
+    """
+    keys = expiry_to_variable_keys(expiry)
+    missing = keys.isna()
+    if missing.any():
+        keys[missing] = IRON_ORE_CONTRACTS.map_variable_keys(rics[missing])
+    return keys
+
+
+def frame_to_records(frame: pd.DataFrame, int_columns: tuple[str, ...] = ()) -> list[dict[str, Any]]:
+    """
+    Converte um DataFrame de registros em lista de dicts com tipos nativos.
+
+    Campos nulos são omitidos do registro (mesmo formato dos registros
+    montados campo a campo).
+
+    Args:
+        frame: Uma coluna por campo do registro
+        int_columns: Colunas convertidas para int (ex: volume)
+
+    Returns:
+        Lista de dicts pronta para o SupabaseClient.
+    """
+    if frame.empty:
+        return []
+
+    frame = frame.copy()
+    for col in int_columns:
+        if col in frame.columns:
+            frame[col] = np.trunc(pd.to_numeric(frame[col], errors="coerce")).astype("Int64")
+
+    nulls = frame.isna()
+    records = frame.astype(object).where(~nulls, None).to_dict("records")
+    if not nulls.to_numpy().any():
+        return records
+    return [{k: v for k, v in record.items() if v is not None} for record in records]
+
+
+def ohlcv_frame(response: pd.DataFrame) -> pd.DataFrame:
+    """Colunas open/high/low/volume a partir dos campos OHLCV do LSEG."""
+    return pd.DataFrame(
+        {target: field(response, name) for name, target in OHLCV_FIELDS.items()},
+        index=response.index,
+    )
+
+
+def history_by_instrument(response: pd.DataFrame, universe: list[str]) -> pd.DataFrame:
+    """
+    Empilha a resposta de `ld.get_history` com vários instrumentos.
+
+    Com mais de um instrumento, o LSEG devolve colunas (instrumento, campo);
+    com um só, apenas os campos. Em ambos os casos o resultado tem uma
+    linha por (instrumento, data) e uma coluna por campo.
+
+    Args:
+        response: Resposta de `ld.get_history` (vários campos)
+        universe: RICs pedidos na chamada
+
+    Returns:
+        DataFrame com colunas `ric`, `timestamp` e os campos pedidos.
+    """
+    if isinstance(response.columns, pd.MultiIndex):
+        instruments = response.columns.get_level_values(0).unique()
+        stacked = pd.concat({ric: response[ric] for ric in instruments}, names=["ric"])
+    else:
+        stacked = pd.concat({universe[0]: response}, names=["ric"])
+    stacked.columns.name = None
+    stacked.index = stacked.index.set_names(["ric", "timestamp"])
+    return stacked.reset_index()
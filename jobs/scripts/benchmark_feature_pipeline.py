@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Benchmark de memória do pipeline encadeado de add_*_features.
+
+Gera barras sintéticas de 5 minutos (minério + VALE3 + colunas auxiliares)
+e roda a cadeia retorno -> volatilidade -> Z-Score -> lags em três modos:
+
+    copy     comportamento padrão: cada etapa copia o DataFrame
+    inplace  inplace=True: colunas acrescentadas ao próprio DataFrame
+    frame    FeatureFrame: colunas escritas num bloco pré-alocado
+
+Cada modo roda num processo separado para que o pico de RSS
+(getrusage ru_maxrss) não seja contaminado pelos outros. Mostra o RSS com os
+dados carregados, o pico durante o pipeline e o tempo.
+
+Uso:
+    python jobs/scripts/benchmark_feature_pipeline.py
+    python jobs/scripts/benchmark_feature_pipeline.py --years 5 --extra-cols 40
+"""
+
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+# Adiciona diretório raiz ao path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+import numpy as np
+import pandas as pd
+
+MODES = ["copy", "inplace", "frame"]
+
+# Barras de 5 minutos por dia de pregão SGX (00:00-12:00 UTC)
+BARS_PER_DAY = 144
+
+
+def _rss_mb() -> float:
+    """RSS atual do processo (MB), via /proc; pico se /proc indisponível."""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * resource.getpagesize() / 1024 / 1024
+    except OSError:
+        return _peak_rss_mb()
+
+
+def _peak_rss_mb() -> float:
+    """Pico de RSS do processo (MB)."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reporta KB, macOS bytes
+    return peak / 1024 / 1024 if sys.platform == "darwin" else peak / 1024
+
+
+def make_dataset(years: int, extra_cols: int, seed: int = 42) -> pd.DataFrame:
+    """Barras sintéticas de 5 minutos com high/low e colunas auxiliares."""
+    rng = np.random.default_rng(seed)
+    n = years * 252 * BARS_PER_DAY
+    index = pd.date_range("2020-01-01", periods=n, freq="5min", tz="UTC")
+
+    iron = 100 * np.exp(np.cumsum(rng.normal(0, 0.001, n)))
+    vale = 60 * np.exp(np.cumsum(rng.normal(0, 0.001, n)))
+    data = {
+        "iron_ore_price": iron,
+        "iron_high": iron * (1 + rng.uniform(0, 0.002, n)),
+        "iron_low": iron * (1 - rng.uniform(0, 0.002, n)),
+        "vale3_close": vale,
+    }
+    for i in range(extra_cols):
+        data[f"aux_{i}"] = rng.normal(size=n)
+    return pd.DataFrame(data, index=index)
+
+
+def run_pipeline(df: pd.DataFrame, mode: str) -> int:
+    """Roda a cadeia de features no modo pedido. Retorna o nº de colunas novas."""
+    from src.features import (
+        FeatureFrame,
+        add_lagged_features,
+        add_return_features,
+        add_volatility_features,
+        add_zscore_features,
+    )
+
+    inplace = mode == "inplace"
+    target = FeatureFrame(df) if mode == "frame" else df
+    base_cols = len(df.columns)
+
+    target = add_return_features(target, "iron_ore_price", prefix="iron_", inplace=inplace)
+    target = add_return_features(
+        target, "vale3_close", periods=[1], prefix="vale_",
+        include_momentum=False, include_cumulative=False, inplace=inplace,
+    )
+    target = add_volatility_features(
+        target, close_col="iron_ore_price", high_col="iron_high", low_col="iron_low",
+        prefix="iron_", windows=[5, 10, 20, 60], inplace=inplace,
+    )
+    target = add_zscore_features(target, "iron_return_1d", windows=[10, 20, 60], inplace=inplace)
+    target = add_lagged_features(
+        target, "iron_return_1d", "vale_return_1d", lags=[1, 2, 3], inplace=inplace,
+    )
+
+    if mode == "frame":
+        return len(target.to_frame().columns)
+    return len(target.columns) - base_cols
+
+
+def run_mode(mode: str, years: int, extra_cols: int) -> dict:
+    """Executa um modo no processo atual e mede RSS/tempo."""
+    from loguru import logger
+    logger.remove()
+
+    df = make_dataset(years, extra_cols)
+    baseline = _rss_mb()
+    start = time.perf_counter()
+    features = run_pipeline(df, mode)
+    elapsed = time.perf_counter() - start
+
+    return {
+        "mode": mode,
+        "rows": len(df),
+        "features": features,
+        "baseline_mb": baseline,
+        "peak_mb": _peak_rss_mb(),
+        "seconds": elapsed,
+    }
+
+
+def run_benchmark(years: int, extra_cols: int) -> dict[str, dict]:
+    """Roda cada modo num subprocesso e imprime a comparação."""
+    results = {}
+    for mode in MODES:
+        output = subprocess.run(
+            [sys.executable, __file__, "--child", mode,
+             "--years", str(years), "--extra-cols", str(extra_cols)],
+            check=True, capture_output=True, text=True,
+        ).stdout
+        results[mode] = json.loads(output.strip().splitlines()[-1])
+
+    first = results[MODES[0]]
+    print(f"\n{first['rows']:,} barras, {extra_cols + 4} colunas base, {first['features']} features")
+    print(f"{'modo':<10} {'RSS dados (MB)':>15} {'pico (MB)':>11} {'pipeline (MB)':>14} {'tempo (s)':>10}")
+    for mode, r in results.items():
+        pipeline = r["peak_mb"] - r["baseline_mb"]
+        print(f"{mode:<10} {r['baseline_mb']:>15.0f} {r['peak_mb']:>11.0f} {pipeline:>14.0f} {r['seconds']:>10.2f}")
+
+    return results
+
+
+def main() -> None:
+    """Ponto de entrada principal."""
+    parser = argparse.ArgumentParser(
+        description="Pico de RSS do pipeline add_*_features: cópia vs inplace vs FeatureFrame"
+    )
+    parser.add_argument(
+        "--years",
+        type=int,
+        default=3,
+        help="Anos de barras de 5 minutos",
+    )
+    parser.add_argument(
+        "--extra-cols",
+        type=int,
+        default=20,
+        help="Colunas auxiliares no DataFrame base (largura do dataset)",
+    )
+    parser.add_argument("--child", choices=MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_mode(args.child, args.years, args.extra_cols)))
+        return
+
+    run_benchmark(args.years, args.extra_cols)
+
+
+if __name__ == "__main__":
+    main()
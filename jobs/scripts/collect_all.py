@@ -10,11 +10,15 @@ Coleta todos os dados necessários para a estratégia:
 
 Uso:
     python collect_all.py --mode realtime
+    python collect_all.py --mode realtime --concurrent
+    python collect_all.py --mode realtime --concurrent --interval 5
     python collect_all.py --mode historical --start-date 2024-01-01
 """
 
 import argparse
 import sys
+import threading
+import time
 from datetime import datetime
 from pathlib import Path
 
@@ -23,6 +27,8 @@ sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
 from loguru import logger
 
+from jobs.clients.lseg_session import get_lseg_session
+from jobs.config.settings import COLLECT_TIMEOUTS
 from jobs.ingestion.fetch_auxiliary import AuxiliaryFetcher
 from jobs.ingestion.fetch_iron_ore import IronOreFetcher
 from jobs.ingestion.fetch_vale3 import Vale3Fetcher
@@ -72,6 +78,99 @@ def collect_realtime() -> dict[str, int]:
     return results
 
 
+def collect_realtime_concurrent(
+    timeouts: dict[str, float] | None = None,
+) -> dict[str, int]:
+    """
+    Coleta dados em tempo real das três fontes em paralelo.
+
+    Usa a sessão LSEG compartilhada do processo (`get_lseg_session()`) e
+    executa cada busca + persistência em uma thread. Cada fonte tem seu próprio limite
+    de tempo; uma fonte lenta é registrada com 0 registros sem atrasar as
+    demais. As threads são daemon, então uma chamada travada não impede o
+    processo de terminar.
+
+    Args:
+        timeouts: Segundos por fonte (default: COLLECT_TIMEOUTS)
+
+    Returns:
+        Dict com contagem de registros por fonte.
+    """
+    timeouts = {**COLLECT_TIMEOUTS, **(timeouts or {})}
+    fetchers = {
+        "iron_ore": IronOreFetcher,
+        "vale3": Vale3Fetcher,
+        "auxiliary": AuxiliaryFetcher,
+    }
+
+    logger.info("Iniciando coleta realtime concorrente...")
+
+    session = get_lseg_session()
+    if not session.acquire():
+        logger.error("Sessão LSEG indisponível")
+        return dict.fromkeys(fetchers, 0)
+
+    counts: dict[str, int] = {}
+
+    def run(name: str) -> None:
+        try:
+            counts[name] = fetchers[name](session=session).fetch_and_persist_realtime()
+        except Exception as e:
+            logger.error(f"Erro ao coletar {name}: {e}")
+            counts[name] = 0
+
+    start = time.monotonic()
+    threads = {
+        name: threading.Thread(target=run, args=(name,), name=f"collect-{name}", daemon=True)
+        for name in fetchers
+    }
+    for thread in threads.values():
+        thread.start()
+
+    results = {}
+    try:
+        for name, thread in threads.items():
+            remaining = timeouts[name] - (time.monotonic() - start)
+            thread.join(max(remaining, 0))
+            if thread.is_alive():
+                logger.error(f"Timeout ao coletar {name} ({timeouts[name]:.0f}s)")
+                results[name] = 0
+            else:
+                results[name] = counts[name]
+                logger.info(f"{name}: {results[name]} registros")
+    finally:
+        session.release()
+
+    total = sum(results.values())
+    logger.info(
+        f"Coleta realtime concluída: {total} registros total "
+        f"em {time.monotonic() - start:.1f}s"
+    )
+
+    return results
+
+
+def run_realtime_loop(interval_minutes: float, concurrent: bool = True) -> None:
+    """
+    Executa a coleta realtime a cada `interval_minutes` no mesmo processo.
+
+    A sessão LSEG permanece aberta entre os ciclos (até expirar por
+    ociosidade), eliminando o handshake de cada coleta.
+
+    Args:
+        interval_minutes: Intervalo entre o início de ciclos consecutivos
+        concurrent: Se True, usa `collect_realtime_concurrent`
+    """
+    collect = collect_realtime_concurrent if concurrent else collect_realtime
+    interval = interval_minutes * 60
+
+    logger.info(f"Coleta contínua a cada {interval_minutes:g} min")
+    while True:
+        start = time.monotonic()
+        collect()
+        time.sleep(max(interval - (time.monotonic() - start), 0))
+
+
 def collect_historical(start_date: str, end_date: str | None = None) -> dict[str, int]:
     """
     Coleta dados históricos de todas as fontes.
@@ -151,10 +250,25 @@ def main() -> None:
         "--end-date",
         help="Data fim para histórico (YYYY-MM-DD)",
     )
+    parser.add_argument(
+        "--concurrent",
+        action="store_true",
+        help="Coleta realtime das fontes em paralelo com sessão LSEG única",
+    )
+    parser.add_argument(
+        "--interval",
+        type=float,
+        help="Repete a coleta realtime a cada N minutos, mantendo a sessão LSEG",
+    )
     args = parser.parse_args()
 
     if args.mode == "realtime":
-        collect_realtime()
+        if args.interval:
+            run_realtime_loop(args.interval, concurrent=args.concurrent)
+        elif args.concurrent:
+            collect_realtime_concurrent()
+        else:
+            collect_realtime()
     elif args.mode in ("historical", "backfill"):
         if not args.start_date:
             logger.error("--start-date é obrigatório para modo histórico")
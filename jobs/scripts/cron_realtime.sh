@@ -37,7 +37,7 @@ echo "Início: $(date '+%Y-%m-%d %H:%M:%S')" >> "$LOG_FILE"
 
 # Executa coleta
 cd "$PROJECT_ROOT"
-python -m jobs.scripts.collect_all --mode realtime >> "$LOG_FILE" 2>&1
+python -m jobs.scripts.collect_all --mode realtime --concurrent >> "$LOG_FILE" 2>&1
 
 echo "Fim: $(date '+%Y-%m-%d %H:%M:%S')" >> "$LOG_FILE"
 echo "" >> "$LOG_FILE"
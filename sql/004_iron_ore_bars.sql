@@ -0,0 +1,130 @@
+-- ===========================================
+-- QUANTFUND - Barras OHLC agregadas de minério de ferro
+-- ===========================================
+-- Cada snapshot realtime (a cada 5 min) continua gravado em prices_iron_ore;
+-- o BarAggregator (jobs/ingestion/bar_aggregator.py) mantém em paralelo
+-- barras de 5m, 1h e 1d por contrato (variable_key) nesta tabela, de modo
+-- que os consumidores leiam barras prontas em vez de reagrupar ticks.
+
+-- -------------------------------------------
+-- Tabela: prices_iron_ore_bars
+-- -------------------------------------------
+CREATE TABLE IF NOT EXISTS prices_iron_ore_bars (
+    id BIGSERIAL PRIMARY KEY,
+    timeframe VARCHAR(3) NOT NULL,      -- '5m', '1h', '1d'
+    timestamp TIMESTAMPTZ NOT NULL,     -- Início da barra (UTC)
+    source VARCHAR(50) NOT NULL,
+    variable_key VARCHAR(50) NOT NULL,
+    symbol VARCHAR(50),
+    open DECIMAL(10, 2) NOT NULL,
+    high DECIMAL(10, 2) NOT NULL,
+    low DECIMAL(10, 2) NOT NULL,
+    close DECIMAL(10, 2) NOT NULL,
+    ticks INTEGER NOT NULL DEFAULT 1,   -- Snapshots agregados
+    first_tick TIMESTAMPTZ NOT NULL,    -- Timestamp do primeiro tick (define o open)
+    last_tick TIMESTAMPTZ NOT NULL,     -- Timestamp do último tick (define o close)
+    updated_at TIMESTAMPTZ DEFAULT NOW(),
+
+    UNIQUE(timeframe, source, variable_key, timestamp)
+);
+
+-- Leitura de uma série (timeframe + contrato) por tempo
+CREATE INDEX IF NOT EXISTS idx_iron_ore_bars_series
+ON prices_iron_ore_bars(timeframe, variable_key, timestamp DESC);
+
+-- Leitura de todos os contratos de um timeframe (paginação por timestamp, id)
+CREATE INDEX IF NOT EXISTS idx_iron_ore_bars_timeframe
+ON prices_iron_ore_bars(timeframe, source, timestamp, id);
+
+COMMENT ON TABLE prices_iron_ore_bars IS 'Barras OHLC (5m, 1h, 1d) de minério por contrato';
+
+-- -------------------------------------------
+-- Função: merge_iron_ore_bars (RPC)
+-- -------------------------------------------
+-- Mescla barras parciais (JSON) nas existentes: open do tick mais antigo,
+-- close do mais recente, high/low extremos. Reenviar a mesma barra não
+-- altera o resultado, então vários processos podem gravar sem coordenação.
+CREATE OR REPLACE FUNCTION merge_iron_ore_bars(bars JSONB)
+RETURNS INTEGER
+LANGUAGE sql
+AS $$
+    WITH incoming AS (
+        SELECT *
+        FROM jsonb_to_recordset(bars) AS b(
+            timeframe TEXT,
+            timestamp TIMESTAMPTZ,
+            source TEXT,
+            variable_key TEXT,
+            symbol TEXT,
+            open NUMERIC,
+            high NUMERIC,
+            low NUMERIC,
+            close NUMERIC,
+            ticks INTEGER,
+            first_tick TIMESTAMPTZ,
+            last_tick TIMESTAMPTZ
+        )
+    ),
+    merged AS (
+        INSERT INTO prices_iron_ore_bars AS cur (
+            timeframe, timestamp, source, variable_key, symbol,
+            open, high, low, close, ticks, first_tick, last_tick
+        )
+        SELECT
+            timeframe, timestamp, source, variable_key, symbol,
+            open, high, low, close, ticks, first_tick, last_tick
+        FROM incoming
+        ON CONFLICT (timeframe, source, variable_key, timestamp) DO UPDATE SET
+            open = CASE WHEN EXCLUDED.first_tick < cur.first_tick THEN EXCLUDED.open ELSE cur.open END,
+            high = GREATEST(cur.high, EXCLUDED.high),
+            low = LEAST(cur.low, EXCLUDED.low),
+            close = CASE WHEN EXCLUDED.last_tick >= cur.last_tick THEN EXCLUDED.close ELSE cur.close END,
+            -- Parciais são deltas (BarAggregator envia só os ticks novos): somam
+            -- quando posteriores à barra; reenvio da mesma parcial não duplica
+            ticks = CASE
+                WHEN EXCLUDED.first_tick > cur.last_tick THEN cur.ticks + EXCLUDED.ticks
+                ELSE GREATEST(cur.ticks, EXCLUDED.ticks)
+            END,
+            first_tick = LEAST(cur.first_tick, EXCLUDED.first_tick),
+            last_tick = GREATEST(cur.last_tick, EXCLUDED.last_tick),
+            symbol = CASE
+                WHEN EXCLUDED.last_tick >= cur.last_tick THEN COALESCE(EXCLUDED.symbol, cur.symbol)
+                ELSE cur.symbol
+            END,
+            updated_at = NOW()
+        RETURNING 1
+    )
+    SELECT COUNT(*)::INTEGER FROM merged;
+$$;
+
+-- -------------------------------------------
+-- Carga inicial a partir dos ticks existentes
+-- -------------------------------------------
+-- Registros 'historical' (um por dia) só entram nas barras diárias.
+INSERT INTO prices_iron_ore_bars (
+    timeframe, timestamp, source, variable_key, symbol,
+    open, high, low, close, ticks, first_tick, last_tick
+)
+SELECT
+    tf.timeframe,
+    date_bin(tf.width, p.timestamp, TIMESTAMPTZ '2000-01-01 00:00:00+00') AS bucket,
+    p.source,
+    p.variable_key,
+    (ARRAY_AGG(p.symbol ORDER BY p.timestamp DESC))[1],
+    (ARRAY_AGG(COALESCE(p.open, p.price) ORDER BY p.timestamp))[1],
+    MAX(COALESCE(p.high, p.price)),
+    MIN(COALESCE(p.low, p.price)),
+    (ARRAY_AGG(p.price ORDER BY p.timestamp DESC))[1],
+    COUNT(*),
+    MIN(p.timestamp),
+    MAX(p.timestamp)
+FROM prices_iron_ore p
+CROSS JOIN (VALUES
+    ('5m', INTERVAL '5 minutes'),
+    ('1h', INTERVAL '1 hour'),
+    ('1d', INTERVAL '1 day')
+) AS tf(timeframe, width)
+WHERE p.variable_key IS NOT NULL
+  AND (tf.timeframe = '1d' OR p.price_type IS DISTINCT FROM 'historical')
+GROUP BY tf.timeframe, bucket, p.source, p.variable_key
+ON CONFLICT (timeframe, source, variable_key, timestamp) DO NOTHING;
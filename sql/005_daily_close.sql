@@ -0,0 +1,147 @@
+-- ===========================================
+-- QUANTFUND - Fechamentos diários no servidor
+-- ===========================================
+-- Correlação, retornos diários e análise semanal só precisam do último
+-- preço de cada dia. Em vez de baixar todos os ticks e agrupar no cliente,
+-- a tabela daily_close guarda um fechamento por (instrumento, dia UTC),
+-- mantida incrementalmente por refresh_daily_close() via pg_cron.
+--
+-- Instrumentos:
+--   VALE3                    - prices_vale3.close
+--   IRON_ORE_FRONT           - minério front month (menor vencimento com
+--                              negociação no dia)
+--   DERIV_IO_SWAP_YYYY_MM    - cada contrato de minério (variable_key)
+--
+-- É uma "materialized view" incremental: PostgreSQL só sabe recalcular
+-- uma MATERIALIZED VIEW inteira, então a tabela é atualizada por upsert
+-- apenas nos últimos dias.
+
+-- -------------------------------------------
+-- Tabela: daily_close
+-- -------------------------------------------
+CREATE TABLE IF NOT EXISTS daily_close (
+    instrument VARCHAR(50) NOT NULL,
+    day DATE NOT NULL,                  -- Dia (UTC)
+    close DECIMAL(10, 2) NOT NULL,      -- Último preço do dia
+    last_timestamp TIMESTAMPTZ NOT NULL,
+    ticks INTEGER NOT NULL,             -- Registros no dia
+    updated_at TIMESTAMPTZ DEFAULT NOW(),
+
+    PRIMARY KEY (instrument, day)
+);
+
+-- Leitura de vários instrumentos por período (get_daily_closes)
+CREATE INDEX IF NOT EXISTS idx_daily_close_day ON daily_close(day, instrument);
+
+COMMENT ON TABLE daily_close IS 'Fechamento diário (UTC) por instrumento, mantido por refresh_daily_close';
+
+-- -------------------------------------------
+-- Função: refresh_daily_close
+-- -------------------------------------------
+-- Recalcula os fechamentos a partir de p_days dias atrás (NULL = todo o
+-- histórico). Retorna o número de linhas gravadas.
+CREATE OR REPLACE FUNCTION refresh_daily_close(p_days INTEGER DEFAULT 3)
+RETURNS INTEGER
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    since TIMESTAMPTZ;
+    affected INTEGER;
+BEGIN
+    since := CASE
+        WHEN p_days IS NULL THEN '-infinity'::TIMESTAMPTZ
+        ELSE date_trunc('day', NOW() AT TIME ZONE 'UTC') AT TIME ZONE 'UTC' - make_interval(days => p_days)
+    END;
+
+    INSERT INTO daily_close (instrument, day, close, last_timestamp, ticks)
+    -- VALE3: último close do dia
+    SELECT
+        'VALE3',
+        (timestamp AT TIME ZONE 'UTC')::DATE AS day,
+        (ARRAY_AGG(close ORDER BY timestamp DESC, id DESC))[1],
+        MAX(timestamp),
+        COUNT(*)
+    FROM prices_vale3
+    WHERE timestamp >= since
+    GROUP BY day
+
+    UNION ALL
+
+    -- Minério: último preço de cada contrato no dia
+    SELECT
+        variable_key,
+        (timestamp AT TIME ZONE 'UTC')::DATE AS day,
+        (ARRAY_AGG(price ORDER BY timestamp DESC, id DESC))[1],
+        MAX(timestamp),
+        COUNT(*)
+    FROM prices_iron_ore
+    WHERE timestamp >= since AND variable_key LIKE 'DERIV_IO_SWAP_%'
+    GROUP BY variable_key, day
+
+    UNION ALL
+
+    -- Minério front month: contrato de menor vencimento negociado no dia
+    SELECT 'IRON_ORE_FRONT', day, close, last_timestamp, ticks
+    FROM (
+        SELECT DISTINCT ON (day) day, close, last_timestamp, ticks
+        FROM (
+            SELECT
+                variable_key,
+                (timestamp AT TIME ZONE 'UTC')::DATE AS day,
+                (ARRAY_AGG(price ORDER BY timestamp DESC, id DESC))[1] AS close,
+                MAX(timestamp) AS last_timestamp,
+                COUNT(*) AS ticks
+            FROM prices_iron_ore
+            WHERE timestamp >= since AND variable_key LIKE 'DERIV_IO_SWAP_%'
+            GROUP BY variable_key, day
+        ) AS contracts
+        ORDER BY day, variable_key
+    ) AS front
+
+    ON CONFLICT (instrument, day) DO UPDATE SET
+        close = EXCLUDED.close,
+        last_timestamp = EXCLUDED.last_timestamp,
+        ticks = EXCLUDED.ticks,
+        updated_at = NOW();
+
+    GET DIAGNOSTICS affected = ROW_COUNT;
+    RETURN affected;
+END;
+$$;
+
+COMMENT ON FUNCTION refresh_daily_close IS 'Atualiza daily_close a partir de p_days dias atrás (NULL = tudo)';
+
+-- -------------------------------------------
+-- Função: get_daily_closes (RPC)
+-- -------------------------------------------
+-- Fechamentos de vários instrumentos em [p_since, p_until), formato longo.
+CREATE OR REPLACE FUNCTION get_daily_closes(
+    p_instruments TEXT[],
+    p_since DATE,
+    p_until DATE DEFAULT NULL
+)
+RETURNS TABLE (day DATE, instrument VARCHAR, close DECIMAL)
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT d.day, d.instrument, d.close
+    FROM daily_close d
+    WHERE d.instrument = ANY(p_instruments)
+      AND d.day >= p_since
+      AND (p_until IS NULL OR d.day < p_until)
+    ORDER BY d.day, d.instrument;
+$$;
+
+-- -------------------------------------------
+-- Carga inicial e agendamento (pg_cron, ver 002_pg_cron_setup.sql)
+-- -------------------------------------------
+SELECT refresh_daily_close(NULL);
+
+-- Atualiza os últimos 3 dias a cada 5 minutos (cobre correções tardias)
+SELECT cron.schedule(
+    'refresh-daily-close',
+    '*/5 * * * *',
+    $$
+    SELECT refresh_daily_close(3);
+    $$
+);
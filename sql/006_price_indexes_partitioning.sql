@@ -0,0 +1,210 @@
+-- ===========================================
+-- QUANTFUND - Índices compostos e particionamento mensal dos preços
+-- ===========================================
+-- prices_iron_ore e prices_vale3 passam a ser particionadas por mês
+-- (RANGE em timestamp). As consultas por período (SignalGenerator, curva
+-- forward, daily_close) só tocam as partições do intervalo, e os índices de
+-- cada partição ficam pequenos o bastante para caber em memória.
+--
+-- Os índices seguem as consultas reais do projeto:
+--   src/db/client.py
+--     read_timeseries / iter_timeseries_pages  timestamp >= since
+--                                              ORDER BY timestamp, id
+--     get_iron_ore_prices(source=...)          source = ? ORDER BY timestamp DESC, id DESC
+--   jobs/clients/supabase_client.py
+--     insert_iron_ore_prices                   ON CONFLICT (timestamp, source, variable_key)
+--     insert_vale3_prices                      ON CONFLICT (timestamp, source, symbol)
+--     get_latest_iron_ore_price                source = ? AND variable_key = ?
+--                                              ORDER BY timestamp DESC LIMIT 1
+--     _latest_curve_rows                       source = ? AND variable_key IS NOT NULL
+--                                              ORDER BY timestamp DESC LIMIT n
+--
+-- Tabelas particionadas exigem a chave de partição em toda PRIMARY KEY ou
+-- UNIQUE, então a PK vira (id, timestamp); as chaves de upsert já incluem
+-- timestamp e não mudam.
+--
+-- Requer PostgreSQL 12+. Benchmark antes/depois:
+--   python jobs/scripts/benchmark_price_queries.py
+
+BEGIN;
+
+-- -------------------------------------------
+-- Função: create_monthly_partitions
+-- -------------------------------------------
+-- Cria as partições mensais (UTC) de p_table entre p_from e p_until.
+-- Linhas que já caíram na partição default naquele mês são movidas para a
+-- partição nova. Retorna o número de partições criadas.
+CREATE OR REPLACE FUNCTION create_monthly_partitions(
+    p_table TEXT,
+    p_from DATE,
+    p_until DATE
+)
+RETURNS INTEGER
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    month_start DATE := date_trunc('month', p_from)::DATE;
+    partition_name TEXT;
+    lower_bound TIMESTAMPTZ;
+    upper_bound TIMESTAMPTZ;
+    created INTEGER := 0;
+BEGIN
+    WHILE month_start < p_until LOOP
+        partition_name := p_table || '_' || to_char(month_start, 'YYYY_MM');
+        lower_bound := month_start::TIMESTAMP AT TIME ZONE 'UTC';
+        upper_bound := (month_start + INTERVAL '1 month')::TIMESTAMP AT TIME ZONE 'UTC';
+
+        IF to_regclass(partition_name) IS NULL THEN
+            EXECUTE format('CREATE TABLE %I (LIKE %I INCLUDING DEFAULTS)', partition_name, p_table);
+
+            IF to_regclass(p_table || '_default') IS NOT NULL THEN
+                EXECUTE format(
+                    'WITH moved AS (DELETE FROM %I WHERE timestamp >= %L AND timestamp < %L RETURNING *) '
+                    'INSERT INTO %I SELECT * FROM moved',
+                    p_table || '_default', lower_bound, upper_bound, partition_name
+                );
+            END IF;
+
+            -- ATTACH cria nas partições os índices definidos na tabela pai
+            EXECUTE format(
+                'ALTER TABLE %I ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)',
+                p_table, partition_name, lower_bound, upper_bound
+            );
+            created := created + 1;
+        END IF;
+
+        month_start := (month_start + INTERVAL '1 month')::DATE;
+    END LOOP;
+
+    RETURN created;
+END;
+$$;
+
+COMMENT ON FUNCTION create_monthly_partitions IS 'Cria partições mensais (UTC) de uma tabela de preços';
+
+-- -------------------------------------------
+-- Função: ensure_price_partitions
+-- -------------------------------------------
+-- Garante partições do mês corrente até p_months_ahead meses à frente.
+CREATE OR REPLACE FUNCTION ensure_price_partitions(p_months_ahead INTEGER DEFAULT 3)
+RETURNS INTEGER
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    this_month DATE := date_trunc('month', NOW() AT TIME ZONE 'UTC')::DATE;
+    until_month DATE := (this_month + make_interval(months => p_months_ahead + 1))::DATE;
+BEGIN
+    RETURN create_monthly_partitions('prices_iron_ore', this_month, until_month)
+         + create_monthly_partitions('prices_vale3', this_month, until_month);
+END;
+$$;
+
+-- -------------------------------------------
+-- Tabela: prices_iron_ore (particionada)
+-- -------------------------------------------
+ALTER TABLE prices_iron_ore RENAME TO prices_iron_ore_legacy;
+
+CREATE TABLE prices_iron_ore (
+    LIKE prices_iron_ore_legacy INCLUDING DEFAULTS INCLUDING COMMENTS
+) PARTITION BY RANGE (timestamp);
+
+-- Backfills anteriores à primeira partição caem na default
+CREATE TABLE prices_iron_ore_default PARTITION OF prices_iron_ore DEFAULT;
+
+SELECT create_monthly_partitions(
+    'prices_iron_ore',
+    COALESCE((SELECT (MIN(timestamp) AT TIME ZONE 'UTC')::DATE FROM prices_iron_ore_legacy), CURRENT_DATE),
+    (CURRENT_DATE + INTERVAL '4 months')::DATE
+);
+
+INSERT INTO prices_iron_ore SELECT * FROM prices_iron_ore_legacy;
+
+ALTER SEQUENCE prices_iron_ore_id_seq OWNED BY prices_iron_ore.id;
+DROP TABLE prices_iron_ore_legacy;
+
+ALTER TABLE prices_iron_ore ADD PRIMARY KEY (id, timestamp);
+
+-- Chave de upsert de insert_iron_ore_prices
+ALTER TABLE prices_iron_ore
+ADD CONSTRAINT prices_iron_ore_timestamp_source_variable_key_key
+UNIQUE (timestamp, source, variable_key);
+
+-- Paginação por (timestamp, id); INCLUDE cobre o SELECT do SignalGenerator
+CREATE INDEX idx_iron_ore_timestamp
+ON prices_iron_ore(timestamp, id) INCLUDE (price, symbol);
+
+-- get_iron_ore_prices(source=...) e último preço do front month
+CREATE INDEX idx_iron_ore_source
+ON prices_iron_ore(source, timestamp, id);
+
+-- Último preço de um contrato (get_latest_iron_ore_price)
+CREATE INDEX idx_iron_ore_variable_key
+ON prices_iron_ore(source, variable_key, timestamp DESC);
+
+-- Curva forward: index-only scan das linhas mais recentes de contratos
+CREATE INDEX idx_iron_ore_curve
+ON prices_iron_ore(source, timestamp DESC)
+INCLUDE (variable_key, symbol, expiry_date, price)
+WHERE variable_key IS NOT NULL;
+
+-- idx_iron_ore_expiry_date (003) não é recriado: nenhuma consulta filtra
+-- por expiry_date, e o índice só encarecia os inserts.
+
+COMMENT ON TABLE prices_iron_ore IS 'Preços históricos de minério de ferro (SGX, DCE), particionada por mês';
+
+-- -------------------------------------------
+-- Tabela: prices_vale3 (particionada)
+-- -------------------------------------------
+ALTER TABLE prices_vale3 RENAME TO prices_vale3_legacy;
+
+CREATE TABLE prices_vale3 (
+    LIKE prices_vale3_legacy INCLUDING DEFAULTS INCLUDING COMMENTS
+) PARTITION BY RANGE (timestamp);
+
+CREATE TABLE prices_vale3_default PARTITION OF prices_vale3 DEFAULT;
+
+SELECT create_monthly_partitions(
+    'prices_vale3',
+    COALESCE((SELECT (MIN(timestamp) AT TIME ZONE 'UTC')::DATE FROM prices_vale3_legacy), CURRENT_DATE),
+    (CURRENT_DATE + INTERVAL '4 months')::DATE
+);
+
+INSERT INTO prices_vale3 SELECT * FROM prices_vale3_legacy;
+
+ALTER SEQUENCE prices_vale3_id_seq OWNED BY prices_vale3.id;
+DROP TABLE prices_vale3_legacy;
+
+ALTER TABLE prices_vale3 ADD PRIMARY KEY (id, timestamp);
+
+-- Chave de upsert de insert_vale3_prices
+ALTER TABLE prices_vale3
+ADD CONSTRAINT prices_vale3_timestamp_source_symbol_key
+UNIQUE (timestamp, source, symbol);
+
+-- Paginação por (timestamp, id); INCLUDE cobre o SELECT do SignalGenerator
+CREATE INDEX idx_vale3_timestamp
+ON prices_vale3(timestamp, id) INCLUDE (close);
+
+COMMENT ON TABLE prices_vale3 IS 'Preços históricos de VALE3 via MT5, particionada por mês';
+
+COMMIT;
+
+ANALYZE prices_iron_ore;
+ANALYZE prices_vale3;
+
+-- -------------------------------------------
+-- Agendamento (pg_cron, ver 002_pg_cron_setup.sql)
+-- -------------------------------------------
+-- Cria as partições dos próximos meses diariamente; sem pg_cron (ex:
+-- PostgreSQL local) rode SELECT ensure_price_partitions() manualmente.
+DO $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'pg_cron') THEN
+        PERFORM cron.schedule(
+            'ensure-price-partitions',
+            '0 0 * * *',
+            'SELECT ensure_price_partitions(3)'
+        );
+    END IF;
+END;
+$$;
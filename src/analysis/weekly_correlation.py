@@ -3,14 +3,34 @@ Análise semanal de correlação Minério x VALE3.
 Executa via GitHub Actions aos domingos.
 """
 
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 
 import numpy as np
 import pandas as pd
 from loguru import logger
 from scipy import stats
 
-from src.db.client import get_supabase
+from src.config import DAILY_CLOSE_IRON_ORE, DAILY_CLOSE_VALE3
+from src.db.client import get_daily_closes, get_supabase
+from src.features.alignment import calculate_cross_correlation
+
+
+def fetch_daily_closes(days: int) -> pd.DataFrame:
+    """
+    Busca os fechamentos diários de minério e VALE3 dos últimos `days` dias.
+
+    Os fechamentos são calculados no banco (tabela daily_close), então só
+    uma linha por dia é transferida, em vez de todos os ticks.
+
+    Args:
+        days: Número de dias para buscar.
+
+    Returns:
+        DataFrame indexado por dia com colunas 'iron' (front month) e 'vale'.
+    """
+    since = (datetime.now(timezone.utc) - timedelta(days=days)).date()
+    closes = get_daily_closes([DAILY_CLOSE_IRON_ORE, DAILY_CLOSE_VALE3], since)
+    return closes.rename(columns={DAILY_CLOSE_IRON_ORE: "iron", DAILY_CLOSE_VALE3: "vale"})
 
 
 def calculate_correlation(days: int = 60) -> dict:
@@ -23,51 +43,23 @@ def calculate_correlation(days: int = 60) -> dict:
     Returns:
         Dicionário com métricas de correlação.
     """
-    client = get_supabase()
-    since = datetime.now() - timedelta(days=days)
-
-    # Buscar preços de minério
-    iron_result = client.table("prices_iron_ore").select(
-        "timestamp, close, price"
-    ).gte(
-        "timestamp", since.isoformat()
-    ).order("timestamp").execute()
-
-    # Buscar preços de VALE3
-    vale_result = client.table("prices_vale3").select(
-        "timestamp, close"
-    ).gte(
-        "timestamp", since.isoformat()
-    ).order("timestamp").execute()
-
-    iron_data = iron_result.data or []
-    vale_data = vale_result.data or []
-
-    if len(iron_data) < 10 or len(vale_data) < 10:
+    # Fechamentos diários de minério e VALE3
+    closes = fetch_daily_closes(days)
+    iron_count = int(closes["iron"].count())
+    vale_count = int(closes["vale"].count())
+
+    if iron_count < 10 or vale_count < 10:
         logger.warning("Dados insuficientes para calcular correlação")
         return {
             "correlation": None,
             "p_value": None,
-            "iron_count": len(iron_data),
-            "vale_count": len(vale_data),
+            "iron_count": iron_count,
+            "vale_count": vale_count,
             "error": "Dados insuficientes",
         }
 
-    # Converter para DataFrames
-    iron_df = pd.DataFrame(iron_data)
-    iron_df["timestamp"] = pd.to_datetime(iron_df["timestamp"])
-    iron_df["price"] = iron_df["close"].fillna(iron_df["price"])
-    iron_df = iron_df.set_index("timestamp")["price"].resample("D").last().dropna()
-
-    vale_df = pd.DataFrame(vale_data)
-    vale_df["timestamp"] = pd.to_datetime(vale_df["timestamp"])
-    vale_df = vale_df.set_index("timestamp")["close"].resample("D").last().dropna()
-
     # Alinhar séries
-    combined = pd.DataFrame({
-        "iron": iron_df,
-        "vale": vale_df,
-    }).dropna()
+    combined = closes.dropna()
 
     if len(combined) < 10:
         return {
@@ -113,63 +105,25 @@ def calculate_lead_lag(max_lag: int = 5) -> dict:
     Returns:
         Dicionário com análise de lead-lag.
     """
-    client = get_supabase()
-    since = datetime.now() - timedelta(days=90)
-
-    # Buscar dados
-    iron_result = client.table("prices_iron_ore").select(
-        "timestamp, close, price"
-    ).gte("timestamp", since.isoformat()).order("timestamp").execute()
+    # Buscar fechamentos diários
+    closes = fetch_daily_closes(90)
+    iron_series = closes["iron"].dropna()
+    vale_series = closes["vale"].dropna()
 
-    vale_result = client.table("prices_vale3").select(
-        "timestamp, close"
-    ).gte("timestamp", since.isoformat()).order("timestamp").execute()
-
-    iron_data = iron_result.data or []
-    vale_data = vale_result.data or []
-
-    if len(iron_data) < 20 or len(vale_data) < 20:
+    if len(iron_series) < 20 or len(vale_series) < 20:
         return {"error": "Dados insuficientes"}
 
-    # Preparar séries
-    iron_df = pd.DataFrame(iron_data)
-    iron_df["timestamp"] = pd.to_datetime(iron_df["timestamp"])
-    iron_df["price"] = iron_df["close"].fillna(iron_df["price"])
-    iron_series = iron_df.set_index("timestamp")["price"].resample("D").last().dropna()
+    # Retornos nos pregões comuns, em ordem cronológica: o lag k compara o
+    # minério de k pregões atrás com VALE3 de hoje
+    returns = pd.concat(
+        [iron_series.pct_change(), vale_series.pct_change()], axis=1, join="inner"
+    ).dropna()
 
-    vale_df = pd.DataFrame(vale_data)
-    vale_df["timestamp"] = pd.to_datetime(vale_df["timestamp"])
-    vale_series = vale_df.set_index("timestamp")["close"].resample("D").last().dropna()
-
-    # Calcular retornos
-    iron_returns = iron_series.pct_change().dropna()
-    vale_returns = vale_series.pct_change().dropna()
-
-    # Cross-correlation para diferentes lags
-    correlations = {}
-    for lag in range(-max_lag, max_lag + 1):
-        if lag < 0:
-            # VALE3 lidera (improvável)
-            aligned_iron = iron_returns.iloc[-lag:]
-            aligned_vale = vale_returns.iloc[:lag]
-        elif lag > 0:
-            # Minério lidera (esperado)
-            aligned_iron = iron_returns.iloc[:-lag]
-            aligned_vale = vale_returns.iloc[lag:]
-        else:
-            aligned_iron = iron_returns
-            aligned_vale = vale_returns
-
-        # Alinhar por data
-        common_dates = aligned_iron.index.intersection(aligned_vale.index)
-        if len(common_dates) < 10:
-            continue
-
-        corr, _ = stats.pearsonr(
-            aligned_iron.loc[common_dates],
-            aligned_vale.loc[common_dates]
-        )
-        correlations[lag] = float(corr)
+    # Cross-correlation de todos os lags de uma vez (FFT)
+    cross = calculate_cross_correlation(returns.iloc[:, 0], returns.iloc[:, 1], max_lag)
+    cross = cross[(cross["n_obs"] >= 10) & cross["correlation"].notna()]
+    correlations = {int(lag): float(corr) for lag, corr in zip(cross["lag"], cross["correlation"])}
+    significant_lags = [int(lag) for lag in cross.loc[cross["significant"], "lag"]]
 
     # Encontrar lag ótimo
     if correlations:
@@ -183,6 +137,7 @@ def calculate_lead_lag(max_lag: int = 5) -> dict:
         "correlations_by_lag": correlations,
         "optimal_lag_days": optimal_lag,
         "optimal_correlation": optimal_corr,
+        "significant_lags": significant_lags,
         "interpretation": (
             f"Minério lidera VALE3 em {optimal_lag} dia(s)"
             if optimal_lag > 0
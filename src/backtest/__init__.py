@@ -0,0 +1,33 @@
+"""
+Backtest da estratégia Minério → VALE3.
+
+Módulos:
+    - engine: Backtest vetorizado orientado a eventos com stops por ATR
+    - sweep: Varredura paralela de parâmetros com dataset em memória compartilhada
+    - walk_forward: Validação walk-forward com folds paralelos e cache em disco
+"""
+
+from src.backtest.engine import (
+    calculate_backtest_metrics,
+    generate_backtest_signals,
+    run_backtest,
+)
+from src.backtest.sweep import expand_grid, run_parameter_sweep
+from src.backtest.walk_forward import (
+    build_walk_forward_features,
+    generate_walk_forward_folds,
+    run_walk_forward,
+    summarize_walk_forward,
+)
+
+__all__ = [
+    "calculate_backtest_metrics",
+    "generate_backtest_signals",
+    "run_backtest",
+    "expand_grid",
+    "run_parameter_sweep",
+    "build_walk_forward_features",
+    "generate_walk_forward_folds",
+    "run_walk_forward",
+    "summarize_walk_forward",
+]
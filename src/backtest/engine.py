@@ -0,0 +1,383 @@
+"""
+Backtest vetorizado orientado a eventos da estratégia Minério → VALE3.
+
+Consome o DataFrame de `create_analysis_dataset` (src/features/alignment.py),
+aplica as regras de sinal e simula entradas e saídas em VALE3 com stop de
+`STOP_MULTIPLIER` x ATR(`ATR_PERIOD`), take profit e time stop.
+
+O loop percorre apenas os eventos de entrada; a saída de cada operação é
+encontrada por busca vetorizada nas barras seguintes. Posição, preços de
+entrada e P&L ficam em arrays NumPy pré-alocados, o que permite rodar
+5 anos diários ou vários anos de barras de 5 minutos em milissegundos.
+
+Convenções:
+- O sinal da barra t usa apenas informação disponível antes da abertura
+  de VALE3 em t (minério da janela crítica 12:00-13:00 UTC).
+- A entrada ocorre na abertura da barra t + entry_lag.
+- Stop e alvo são verificados com máxima/mínima de cada barra; se ambos
+  forem atingidos na mesma barra, assume-se o stop (conservador).
+- Gaps através do stop/alvo são executados no preço de abertura.
+
+Uso:
+    from src.backtest import run_backtest
+
+    dataset = create_analysis_dataset(iron_df, vale_df, aux_df)
+    result = run_backtest(dataset)
+    result["metrics"]["sharpe_ratio"]
+"""
+
+from typing import Any
+
+import numpy as np
+import pandas as pd
+from loguru import logger
+
+from src.config import (
+    ATR_PERIOD,
+    CAPITAL,
+    CORRELATION_THRESHOLD,
+    MAX_POSITION_PCT,
+    RISK_PER_TRADE,
+    ROLLING_WINDOW,
+    SIGNAL_THRESHOLD_STD,
+    STOP_MULTIPLIER,
+    USD_BRL_CHANGE_THRESHOLD,
+    VIX_THRESHOLD,
+)
+from src.strategy.rules import apply_signal_rules, calculate_usd_brl_change
+
+# Códigos de motivo de saída (array int8 → rótulo)
+EXIT_STOP = 1
+EXIT_TARGET = 2
+EXIT_TIME = 3
+EXIT_END = 4
+EXIT_REASONS = {
+    EXIT_STOP: "STOP_LOSS",
+    EXIT_TARGET: "TAKE_PROFIT",
+    EXIT_TIME: "TIME_STOP",
+    EXIT_END: "END_OF_DATA",
+}
+
+
+def generate_backtest_signals(
+    df: pd.DataFrame,
+    window: int = ROLLING_WINDOW,
+    threshold: float = SIGNAL_THRESHOLD_STD,
+    correlation_threshold: float = CORRELATION_THRESHOLD,
+    vix_threshold: float = VIX_THRESHOLD,
+    usd_brl_threshold: float = USD_BRL_CHANGE_THRESHOLD,
+    iron_col: str = "iron_ore_price",
+    vale_col: str = "vale3_close",
+) -> np.ndarray:
+    """
+    Aplica as regras da estratégia (`apply_signal_rules`) ao dataset alinhado.
+
+    A escala é o std dos `window` retornos anteriores e a correlação é a
+    rolling até t-1. A variação de USD/BRL vem da coluna 'usd_brl_change'
+    ou, sem ela, de `calculate_usd_brl_change` sobre 'usd_brl'.
+
+    O filtro de direção intradiária não se aplica a barras diárias.
+
+    Args:
+        df: DataFrame de `create_analysis_dataset`
+        window: Janela para volatilidade e correlação
+        threshold: Múltiplo de desvio padrão para sinal
+        correlation_threshold: Correlação mínima minério x VALE3
+        vix_threshold: VIX máximo (ignorado se não houver coluna 'vix')
+        usd_brl_threshold: Variação máxima de USD/BRL (ignorado sem 'usd_brl')
+        iron_col: Coluna de preço do minério
+        vale_col: Coluna de fechamento de VALE3
+
+    Returns:
+        Array int8 com 1 (LONG), -1 (SHORT) ou 0
+    """
+    iron_return = df[iron_col].pct_change()
+    vale_return = df[vale_col].pct_change()
+
+    # Volatilidade dos retornos anteriores (exclui o retorno atual)
+    prev_std = iron_return.rolling(window=window).std().shift(1).to_numpy()
+
+    # Correlação conhecida antes da abertura de VALE3
+    correlation = iron_return.rolling(window=window).corr(vale_return).shift(1).to_numpy()
+
+    usd_brl_change = None
+    if "usd_brl_change" in df.columns:
+        usd_brl_change = df["usd_brl_change"].to_numpy(dtype=float)
+    elif "usd_brl" in df.columns:
+        usd_brl_change = calculate_usd_brl_change(df["usd_brl"]).to_numpy()
+
+    return apply_signal_rules(
+        iron_return.to_numpy(),
+        prev_std,
+        correlation,
+        vix=df["vix"].to_numpy(dtype=float) if "vix" in df.columns else None,
+        usd_brl_change=usd_brl_change,
+        threshold=threshold,
+        correlation_threshold=correlation_threshold,
+        vix_threshold=vix_threshold,
+        usd_brl_threshold=usd_brl_threshold,
+    )
+
+
+def _true_range(high: np.ndarray, low: np.ndarray, close: np.ndarray) -> np.ndarray:
+    """True Range em arrays (primeira barra usa apenas high - low)."""
+    prev_close = np.empty_like(close)
+    prev_close[0] = np.nan
+    prev_close[1:] = close[:-1]
+    ranges = np.vstack([high - low, np.abs(high - prev_close), np.abs(low - prev_close)])
+    return np.nanmax(ranges, axis=0)
+
+
+def _rolling_mean(values: np.ndarray, window: int) -> np.ndarray:
+    """Média móvel simples por soma acumulada (NaN até a janela completar)."""
+    result = np.full(len(values), np.nan)
+    if len(values) < window:
+        return result
+    cumsum = np.cumsum(np.insert(values, 0, 0.0))
+    result[window - 1 :] = (cumsum[window:] - cumsum[:-window]) / window
+    return result
+
+
+def run_backtest(
+    df: pd.DataFrame,
+    signals: np.ndarray | pd.Series | None = None,
+    atr_period: int = ATR_PERIOD,
+    stop_multiplier: float = STOP_MULTIPLIER,
+    take_profit_rr: float | None = 2.0,
+    max_holding: int = 5,
+    entry_lag: int = 0,
+    cost_bps: float = 25.0,
+    capital: float = CAPITAL,
+    risk_per_trade: float = RISK_PER_TRADE,
+    max_position_pct: float = MAX_POSITION_PCT,
+    periods_per_year: int = 252,
+    vale_col: str = "vale3_close",
+    **signal_kwargs: Any,
+) -> dict[str, Any]:
+    """
+    Executa backtest da estratégia sobre o dataset alinhado.
+
+    Args:
+        df: DataFrame de `create_analysis_dataset` (diário ou intradiário)
+        signals: Sinais pré-calculados (1, -1, 0). Se None, usa
+                 `generate_backtest_signals(df, **signal_kwargs)`
+        atr_period: Período do ATR para o stop (em barras)
+        stop_multiplier: Stop = entrada -/+ stop_multiplier x ATR
+        take_profit_rr: Alvo em múltiplos do risco (None desativa)
+        max_holding: Time stop em barras
+        entry_lag: Barras entre o sinal e a entrada (0 = abertura da barra do sinal)
+        cost_bps: Custo round-trip em basis points (default: 25 = 0.25%)
+        capital: Capital inicial
+        risk_per_trade: Fração do capital arriscada até o stop
+        max_position_pct: Fração máxima do capital por posição
+        periods_per_year: Barras por ano para anualizar o Sharpe
+        vale_col: Coluna de fechamento de VALE3
+
+    Returns:
+        Dict com:
+        - trades: DataFrame com uma linha por operação
+        - equity: Série do patrimônio marcado a mercado
+        - position: Série int8 com a direção da posição em cada barra
+        - metrics: Dict com métricas agregadas
+    """
+    n = len(df)
+    close = df[vale_col].to_numpy(dtype=float)
+
+    # Sem OHLC, usa fechamento anterior como abertura e o corpo da barra
+    # como máxima/mínima
+    if "vale3_open" in df.columns:
+        open_ = df["vale3_open"].to_numpy(dtype=float)
+    else:
+        open_ = np.empty(n)
+        open_[1:] = close[:-1]
+        if n:
+            open_[0] = close[0]
+    open_ = np.where(np.isnan(open_), close, open_)
+    nan_bar = np.full(n, np.nan)
+    high = df["vale3_high"].to_numpy(dtype=float) if "vale3_high" in df.columns else nan_bar
+    low = df["vale3_low"].to_numpy(dtype=float) if "vale3_low" in df.columns else nan_bar
+    high = np.where(np.isnan(high), np.maximum(open_, close), high)
+    low = np.where(np.isnan(low), np.minimum(open_, close), low)
+
+    if signals is None:
+        signals = generate_backtest_signals(df, vale_col=vale_col, **signal_kwargs)
+    signals = np.asarray(signals, dtype=np.int8)
+
+    # ATR conhecido na abertura de cada barra (até a barra anterior)
+    atr = np.full(n, np.nan)
+    if n > 1:
+        atr[1:] = _rolling_mean(_true_range(high, low, close), atr_period)[:-1]
+
+    # Estado das operações em arrays pré-alocados
+    max_trades = int(np.count_nonzero(signals))
+    t_side = np.zeros(max_trades, dtype=np.int8)
+    t_entry_idx = np.zeros(max_trades, dtype=np.int64)
+    t_exit_idx = np.zeros(max_trades, dtype=np.int64)
+    t_entry_px = np.zeros(max_trades)
+    t_exit_px = np.zeros(max_trades)
+    t_stop = np.zeros(max_trades)
+    t_shares = np.zeros(max_trades)
+    t_pnl = np.zeros(max_trades)
+    t_reason = np.zeros(max_trades, dtype=np.int8)
+
+    position = np.zeros(n, dtype=np.int8)
+    unrealized = np.zeros(n)
+    realized = np.zeros(n)
+
+    cost = cost_bps / 10_000
+    equity_now = capital
+    n_trades = 0
+    next_free = 0  # Primeira barra disponível para nova entrada
+
+    event_bars = np.flatnonzero(signals)
+    entry_bars = event_bars + entry_lag
+
+    for signal_bar, entry in zip(event_bars, entry_bars):
+        if entry < next_free or entry >= n:
+            continue
+
+        side = int(signals[signal_bar])
+        entry_px = open_[entry]
+        risk = stop_multiplier * atr[entry]
+        if not np.isfinite(risk) or risk <= 0 or not np.isfinite(entry_px) or entry_px <= 0:
+            continue
+
+        stop = entry_px - side * risk
+        target = entry_px + side * take_profit_rr * risk if take_profit_rr else np.nan
+
+        shares = min(equity_now * risk_per_trade / risk, equity_now * max_position_pct / entry_px)
+        if shares <= 0:
+            continue
+
+        # Busca vetorizada da saída nas barras [entry, entry + max_holding)
+        end = min(entry + max_holding, n)
+        seg_open, seg_high, seg_low = open_[entry:end], high[entry:end], low[entry:end]
+        if side > 0:
+            stop_hit = seg_low <= stop
+            target_hit = seg_high >= target
+        else:
+            stop_hit = seg_high >= stop
+            target_hit = seg_low <= target
+
+        first_stop = int(np.argmax(stop_hit)) if stop_hit.any() else end - entry
+        first_target = int(np.argmax(target_hit)) if target_hit.any() else end - entry
+
+        if first_stop < end - entry and first_stop <= first_target:
+            exit_idx = entry + first_stop
+            gap_px = seg_open[first_stop]
+            exit_px = min(gap_px, stop) if side > 0 else max(gap_px, stop)
+            reason = EXIT_STOP
+        elif first_target < end - entry:
+            exit_idx = entry + first_target
+            gap_px = seg_open[first_target]
+            exit_px = max(gap_px, target) if side > 0 else min(gap_px, target)
+            reason = EXIT_TARGET
+        else:
+            exit_idx = end - 1
+            exit_px = close[exit_idx]
+            reason = EXIT_TIME if entry + max_holding <= n else EXIT_END
+
+        pnl = shares * side * (exit_px - entry_px) - cost * shares * entry_px
+
+        # Marcação a mercado enquanto a posição está aberta
+        position[entry : exit_idx + 1] = side
+        unrealized[entry:exit_idx] = shares * side * (close[entry:exit_idx] - entry_px)
+        realized[exit_idx] += pnl
+
+        t_side[n_trades] = side
+        t_entry_idx[n_trades] = entry
+        t_exit_idx[n_trades] = exit_idx
+        t_entry_px[n_trades] = entry_px
+        t_exit_px[n_trades] = exit_px
+        t_stop[n_trades] = stop
+        t_shares[n_trades] = shares
+        t_pnl[n_trades] = pnl
+        t_reason[n_trades] = reason
+        n_trades += 1
+
+        equity_now += pnl
+        next_free = exit_idx + 1
+
+    equity_values = capital + np.cumsum(realized) + unrealized
+    index = df.index
+    equity = pd.Series(equity_values, index=index, name="equity")
+
+    sl = slice(0, n_trades)
+    trades = pd.DataFrame({
+        "entry_time": index[t_entry_idx[sl]],
+        "exit_time": index[t_exit_idx[sl]],
+        "side": np.where(t_side[sl] > 0, "LONG", "SHORT"),
+        "entry_price": t_entry_px[sl],
+        "exit_price": t_exit_px[sl],
+        "stop_loss": t_stop[sl],
+        "quantity": t_shares[sl],
+        "pnl": t_pnl[sl],
+        "return_pct": t_pnl[sl] / (t_shares[sl] * t_entry_px[sl]) * 100,
+        "bars_held": t_exit_idx[sl] - t_entry_idx[sl] + 1,
+        "exit_reason": [EXIT_REASONS[r] for r in t_reason[sl]],
+    })
+
+    metrics = calculate_backtest_metrics(equity_values, t_pnl[sl], capital, periods_per_year)
+    metrics["signals"] = int(np.count_nonzero(signals))
+
+    logger.debug(
+        f"Backtest: {len(index)} barras, {n_trades} operações, "
+        f"retorno {metrics['total_return_pct']:.2f}%"
+    )
+
+    return {
+        "trades": trades,
+        "equity": equity,
+        "position": pd.Series(position, index=index, name="position"),
+        "metrics": metrics,
+    }
+
+
+def calculate_backtest_metrics(
+    equity: np.ndarray,
+    trade_pnl: np.ndarray,
+    capital: float = CAPITAL,
+    periods_per_year: int = 252,
+) -> dict[str, float]:
+    """
+    Calcula métricas agregadas de um backtest.
+
+    Args:
+        equity: Curva de patrimônio por barra
+        trade_pnl: P&L de cada operação
+        capital: Capital inicial
+        periods_per_year: Barras por ano para anualização
+
+    Returns:
+        Dict com retorno total, Sharpe, drawdown máximo e estatísticas de trades
+    """
+    if len(equity) == 0:
+        return {
+            "total_return_pct": 0.0,
+            "sharpe_ratio": 0.0,
+            "max_drawdown_pct": 0.0,
+            "trades": 0,
+            "win_rate": 0.0,
+            "profit_factor": 0.0,
+        }
+
+    curve = np.insert(equity, 0, capital)
+    bar_returns = np.diff(curve) / curve[:-1]
+    std = bar_returns.std() if len(bar_returns) > 1 else 0.0
+    sharpe = bar_returns.mean() / std * np.sqrt(periods_per_year) if std > 0 else 0.0
+
+    peak = np.maximum.accumulate(curve)
+    max_drawdown = float(((peak - curve) / peak).max())
+
+    wins = trade_pnl[trade_pnl > 0]
+    losses = trade_pnl[trade_pnl < 0]
+    gross_loss = -losses.sum()
+
+    return {
+        "total_return_pct": float((equity[-1] / capital - 1) * 100),
+        "sharpe_ratio": float(sharpe),
+        "max_drawdown_pct": max_drawdown * 100,
+        "trades": int(len(trade_pnl)),
+        "win_rate": float(len(wins) / len(trade_pnl)) if len(trade_pnl) else 0.0,
+        "profit_factor": float(wins.sum() / gross_loss) if gross_loss > 0 else 0.0,
+    }
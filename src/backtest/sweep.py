@@ -0,0 +1,157 @@
+"""
+Varredura paralela de parâmetros da estratégia.
+
+Expande uma grade de parâmetros (ex: SIGNAL_THRESHOLD_STD, ROLLING_WINDOW,
+CORRELATION_THRESHOLD) e executa um backtest por ponto em um
+ProcessPoolExecutor. O dataset alinhado é copiado uma única vez para um
+bloco de memória compartilhada; cada worker apenas se anexa a ele, sem
+serializar o DataFrame por tarefa. Os resultados vão para um único
+arquivo Parquet.
+
+Uso:
+    from src.backtest.sweep import run_parameter_sweep
+
+    results = run_parameter_sweep(
+        dataset,
+        grid={
+            "threshold": [1.0, 1.5, 2.0],
+            "window": [10, 20, 40],
+            "correlation_threshold": [0.0, 0.2, 0.4],
+        },
+        output_path=DATA_DIR / "sweep.parquet",
+    )
+"""
+
+import inspect
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import pandas as pd
+from loguru import logger
+
+from src.backtest.engine import generate_backtest_signals, run_backtest
+
+# Parâmetros aceitos por generate_backtest_signals; os demais vão para run_backtest
+SIGNAL_PARAMS = frozenset(inspect.signature(generate_backtest_signals).parameters) - {"df"}
+
+# Estado de cada worker (anexado no initializer)
+_worker_shm: shared_memory.SharedMemory | None = None
+_worker_df: pd.DataFrame | None = None
+
+
+def expand_grid(grid: dict[str, list[Any]]) -> list[dict[str, Any]]:
+    """
+    Expande uma grade de parâmetros no produto cartesiano.
+
+    Args:
+        grid: Dict nome → lista de valores
+
+    Returns:
+        Lista de dicts, um por combinação
+    """
+    names = list(grid)
+    return [dict(zip(names, values)) for values in itertools.product(*grid.values())]
+
+
+def _init_worker(shm_name: str, shape: tuple[int, int], columns: list[str]) -> None:
+    """Anexa o worker ao dataset em memória compartilhada (sem cópia)."""
+    global _worker_shm, _worker_df
+    _worker_shm = shared_memory.SharedMemory(name=shm_name)
+    data = np.ndarray(shape, dtype=np.float64, buffer=_worker_shm.buf)
+    _worker_df = pd.DataFrame(data, columns=columns, copy=False)
+
+
+def _evaluate_point(
+    params: dict[str, Any], backtest_kwargs: dict[str, Any]
+) -> dict[str, Any]:
+    """Executa o backtest de um ponto da grade no worker."""
+    signal_kwargs = {k: v for k, v in params.items() if k in SIGNAL_PARAMS}
+    run_kwargs = {**backtest_kwargs, **{k: v for k, v in params.items() if k not in SIGNAL_PARAMS}}
+
+    signals = generate_backtest_signals(_worker_df, **signal_kwargs)
+    result = run_backtest(_worker_df, signals=signals, **run_kwargs)
+    return {**params, **result["metrics"]}
+
+
+def _evaluate_chunk(
+    chunk: list[dict[str, Any]], backtest_kwargs: dict[str, Any]
+) -> list[dict[str, Any]]:
+    return [_evaluate_point(params, backtest_kwargs) for params in chunk]
+
+
+def run_parameter_sweep(
+    dataset: pd.DataFrame,
+    grid: dict[str, list[Any]],
+    output_path: Path | None = None,
+    max_workers: int | None = None,
+    chunk_size: int | None = None,
+    **backtest_kwargs: Any,
+) -> pd.DataFrame:
+    """
+    Executa backtests para todas as combinações da grade em paralelo.
+
+    Args:
+        dataset: DataFrame de `create_analysis_dataset`
+        grid: Dict nome → valores. Nomes de `generate_backtest_signals`
+              (threshold, window, correlation_threshold, ...) definem os
+              sinais; os demais são repassados a `run_backtest`
+              (stop_multiplier, max_holding, ...)
+        output_path: Arquivo Parquet de saída (opcional)
+        max_workers: Número de processos (default: os.cpu_count())
+        chunk_size: Pontos por tarefa (default: distribui ~4 tarefas por worker)
+        **backtest_kwargs: Parâmetros fixos de `run_backtest`
+
+    Returns:
+        DataFrame com uma linha por ponto da grade (parâmetros + métricas)
+    """
+    points = expand_grid(grid)
+    if not points:
+        return pd.DataFrame()
+
+    max_workers = max_workers or os.cpu_count() or 1
+    if chunk_size is None:
+        chunk_size = max(1, len(points) // (max_workers * 4))
+    chunks = [points[i : i + chunk_size] for i in range(0, len(points), chunk_size)]
+
+    # Apenas colunas numéricas usadas pelo backtest vão para a memória compartilhada
+    numeric = dataset.select_dtypes(include="number").astype(np.float64)
+    data = np.ascontiguousarray(numeric.to_numpy())
+    columns = list(numeric.columns)
+
+    logger.info(
+        f"Sweep: {len(points)} pontos em {len(chunks)} tarefas, "
+        f"{max_workers} workers, dataset {data.shape[0]}x{data.shape[1]}"
+    )
+
+    shm = shared_memory.SharedMemory(create=True, size=max(data.nbytes, 1))
+    try:
+        np.ndarray(data.shape, dtype=np.float64, buffer=shm.buf)[:] = data
+
+        rows: list[dict[str, Any]] = []
+        with ProcessPoolExecutor(
+            max_workers=max_workers,
+            initializer=_init_worker,
+            initargs=(shm.name, data.shape, columns),
+        ) as executor:
+            futures = [
+                executor.submit(_evaluate_chunk, chunk, backtest_kwargs) for chunk in chunks
+            ]
+            for future in futures:
+                rows.extend(future.result())
+    finally:
+        shm.close()
+        shm.unlink()
+
+    results = pd.DataFrame(rows)
+
+    if output_path is not None:
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        results.to_parquet(output_path, index=False)
+        logger.info(f"Resultados do sweep salvos em {output_path}")
+
+    return results
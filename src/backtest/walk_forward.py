@@ -0,0 +1,458 @@
+"""
+Validação walk-forward da estratégia Minério → VALE3.
+
+Implementa o procedimento de docs/GUIA_VALIDACAO_ESTATISTICA.md: para cada
+fold, escolhe os parâmetros no período de treino (ex: 18 meses) e avalia a
+escolha no período de teste seguinte (ex: 3 meses), avançando a janela.
+
+As features (via `FeatureGraph`) são calculadas uma única vez sobre todo o
+histórico. Como todas olham apenas para trás, fatiar o resultado por fold não
+introduz look-ahead. Os folds rodam em paralelo e cada resultado fica em cache em
+disco, chaveado pelo hash das colunas usadas no fold, pelos parâmetros e
+pelas versões das regras (`RULES_VERSION`) e das features
+(`FEATURES_VERSION`); rodar de novo com a janela deslocada reaproveita os
+folds que não mudaram.
+
+Uso:
+    from src.backtest.walk_forward import run_walk_forward, summarize_walk_forward
+
+    dataset = create_analysis_dataset(iron_df, vale_df, aux_df)
+    folds = run_walk_forward(
+        dataset,
+        grid={"threshold": [1.0, 1.5, 2.0], "window": [10, 20]},
+    )
+    summarize_walk_forward(folds)["approved"]
+"""
+
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import pandas as pd
+from loguru import logger
+
+from src.backtest.engine import calculate_backtest_metrics, run_backtest
+from src.backtest.sweep import expand_grid
+from src.config import (
+    ATR_PERIOD,
+    CAPITAL,
+    CORRELATION_THRESHOLD,
+    ROLLING_WINDOW,
+    SIGNAL_THRESHOLD_STD,
+    USD_BRL_CHANGE_THRESHOLD,
+    VIX_THRESHOLD,
+    WALK_FORWARD_CACHE_DIR,
+)
+from src.features import FeatureGraph
+from src.strategy.rules import RULES_VERSION, apply_signal_rules, calculate_usd_brl_change
+
+# Modos de sinal suportados
+SIGNAL_MODES = ("volatility", "zscore")
+
+# Colunas de data no resultado de cada fold
+FOLD_DATE_COLUMNS = ["train_start", "train_end", "test_start", "test_end"]
+
+# Versão das features/avaliação dos folds (incrementar ao mudar o cálculo;
+# invalida o cache de folds)
+FEATURES_VERSION = "1"
+
+# Colunas do dataset lidas além das de preço (features e backtest)
+_INPUT_COLUMNS = ("vix", "usd_brl", "usd_brl_change", "vale3_open", "vale3_high", "vale3_low")
+
+
+def build_walk_forward_features(
+    dataset: pd.DataFrame,
+    windows: list[int],
+    iron_col: str = "iron_ore_price",
+    vale_col: str = "vale3_close",
+) -> pd.DataFrame:
+    """
+    Calcula as features de todos os folds de uma vez sobre o histórico completo.
+
+    Colunas adicionadas (todas usam apenas dados até a própria barra):
+    - iron_return_1d, vale_return_1d: retornos diários (%)
+    - iron_volatility_{w}d: desvio padrão rolling dos retornos do minério
+    - iron_return_1d_zscore_{w}: Z-Score rolling do retorno do minério
+    - iron_vale_corr_{w}: correlação rolling conhecida antes da barra (t-1)
+    - usd_brl_change: variação absoluta de USD/BRL (se houver coluna 'usd_brl')
+
+    Args:
+        dataset: DataFrame de `create_analysis_dataset`
+        windows: Janelas de volatilidade/correlação usadas na grade
+        iron_col: Coluna de preço do minério
+        vale_col: Coluna de fechamento de VALE3
+
+    Returns:
+        DataFrame com as colunas originais mais as features
+    """
+    windows = sorted(set(windows))
+
+    # Retorno diário calculado uma vez e reaproveitado por volatilidade e Z-Score
+    graph = FeatureGraph(dataset, prices={"iron_": iron_col, "vale_": vale_col})
+    features = graph.build([
+        "iron_return_1d",
+        "vale_return_1d",
+        *(f"iron_volatility_{window}d" for window in windows),
+        *(f"iron_return_1d_zscore_{window}" for window in windows),
+    ])
+
+    for window in windows:
+        features[f"iron_vale_corr_{window}"] = (
+            features["iron_return_1d"].rolling(window=window).corr(features["vale_return_1d"]).shift(1)
+        )
+
+    if "usd_brl" in dataset.columns:
+        features["usd_brl_change"] = calculate_usd_brl_change(dataset["usd_brl"]).abs()
+
+    df = pd.concat([dataset, features], axis=1)
+
+    logger.debug(f"Features de walk-forward calculadas para janelas {windows}")
+    return df
+
+
+def generate_walk_forward_folds(
+    index: pd.DatetimeIndex,
+    train_months: int = 18,
+    test_months: int = 3,
+    step_months: int = 3,
+) -> list[dict[str, pd.Timestamp]]:
+    """
+    Gera as janelas de treino/teste do walk-forward.
+
+    Os inícios de fold seguem uma grade fixa de calendário (meses múltiplos
+    de `step_months`), de modo que deslocar o período analisado preserva os
+    folds em comum (e seus caches).
+
+    Args:
+        index: Índice temporal do dataset
+        train_months: Meses de treino por fold (default: 18)
+        test_months: Meses de teste por fold (default: 3)
+        step_months: Avanço entre folds (default: 3)
+
+    Returns:
+        Lista de dicts com train_start, train_end, test_start e test_end
+        (intervalos fechados à esquerda: [start, end))
+    """
+    if len(index) == 0:
+        return []
+
+    # Primeiro início de mês múltiplo de step_months (grade fixa no calendário)
+    start = index.min()
+    month = start.year * 12 + start.month - 1
+    if start > pd.Timestamp(year=start.year, month=start.month, day=1, tz=start.tz):
+        month += 1
+    month = -(-month // step_months) * step_months
+    first = pd.Timestamp(year=month // 12, month=month % 12 + 1, day=1, tz=start.tz)
+    last = index.max()
+
+    folds = []
+    train_start = first
+    while True:
+        test_start = train_start + pd.DateOffset(months=train_months)
+        test_end = test_start + pd.DateOffset(months=test_months)
+        if test_end > last + pd.Timedelta(days=1):
+            break
+        folds.append({
+            "train_start": train_start,
+            "train_end": test_start,
+            "test_start": test_start,
+            "test_end": test_end,
+        })
+        train_start += pd.DateOffset(months=step_months)
+
+    return folds
+
+
+def _feature_signals(
+    df: pd.DataFrame,
+    window: int,
+    threshold: float,
+    correlation_threshold: float,
+    signal_mode: str,
+    vix_threshold: float,
+    usd_brl_threshold: float,
+) -> np.ndarray:
+    """Aplica as regras da estratégia (`apply_signal_rules`) às features pré-calculadas."""
+    if signal_mode == "volatility":
+        # Mesma regra de generate_backtest_signals: retorno vs std anterior
+        stat = df["iron_return_1d"].to_numpy()
+        scale = df[f"iron_volatility_{window}d"].shift(1).to_numpy()
+    else:
+        # Z-Score já normalizado: escala unitária onde ele existe
+        stat = df[f"iron_return_1d_zscore_{window}"].to_numpy()
+        scale = np.where(np.isfinite(stat), 1.0, np.nan)
+
+    return apply_signal_rules(
+        stat,
+        scale,
+        df[f"iron_vale_corr_{window}"].to_numpy(),
+        vix=df["vix"].to_numpy(dtype=float) if "vix" in df.columns else None,
+        usd_brl_change=df["usd_brl_change"].to_numpy() if "usd_brl_change" in df.columns else None,
+        threshold=threshold,
+        correlation_threshold=correlation_threshold,
+        vix_threshold=vix_threshold,
+        usd_brl_threshold=usd_brl_threshold,
+    )
+
+
+def _segment_metrics(
+    frame: pd.DataFrame,
+    signals: np.ndarray,
+    start: pd.Timestamp,
+    backtest_kwargs: dict[str, Any],
+) -> dict[str, float]:
+    """
+    Backtest de um segmento do fold com aquecimento do ATR.
+
+    As barras anteriores a `start` servem apenas para o ATR; sinais nelas
+    são zerados e as métricas consideram somente o segmento.
+    """
+    seg = int(frame.index.searchsorted(start))
+    signals = signals.copy()
+    signals[:seg] = 0
+
+    result = run_backtest(frame, signals=signals, **backtest_kwargs)
+    trades = result["trades"]
+    pnl = trades.loc[trades["entry_time"] >= start, "pnl"].to_numpy()
+
+    metrics = calculate_backtest_metrics(
+        result["equity"].to_numpy()[seg:],
+        pnl,
+        capital=backtest_kwargs.get("capital", CAPITAL),
+        periods_per_year=backtest_kwargs.get("periods_per_year", 252),
+    )
+    metrics["signals"] = int(np.count_nonzero(signals))
+    return metrics
+
+
+def _evaluate_fold(
+    frame: pd.DataFrame,
+    fold: dict[str, pd.Timestamp],
+    points: list[dict[str, Any]],
+    options: dict[str, Any],
+) -> dict[str, Any]:
+    """Otimiza no treino e avalia no teste (executado no worker)."""
+    backtest_kwargs = options["backtest_kwargs"]
+    objective = options["objective"]
+    warmup = options["warmup"]
+
+    train_pos = int(frame.index.searchsorted(fold["train_start"]))
+    test_pos = int(frame.index.searchsorted(fold["test_start"]))
+    train = frame.iloc[: test_pos]
+    test = frame.iloc[max(test_pos - warmup, train_pos) :]
+
+    best_params: dict[str, Any] | None = None
+    best_train: dict[str, float] | None = None
+    for params in points:
+        signals = _feature_signals(
+            train,
+            signal_mode=options["signal_mode"],
+            vix_threshold=options["vix_threshold"],
+            usd_brl_threshold=options["usd_brl_threshold"],
+            **params,
+        )
+        metrics = _segment_metrics(train, signals, fold["train_start"], backtest_kwargs)
+        if best_train is None or metrics[objective] > best_train[objective]:
+            best_params, best_train = params, metrics
+
+    signals = _feature_signals(
+        test,
+        signal_mode=options["signal_mode"],
+        vix_threshold=options["vix_threshold"],
+        usd_brl_threshold=options["usd_brl_threshold"],
+        **best_params,
+    )
+    test_metrics = _segment_metrics(test, signals, fold["test_start"], backtest_kwargs)
+
+    row: dict[str, Any] = {key: fold[key].isoformat() for key in FOLD_DATE_COLUMNS}
+    row.update(best_params)
+    row[f"train_{objective}"] = best_train[objective]
+    row.update({f"test_{name}": value for name, value in test_metrics.items()})
+    return row
+
+
+def _fold_cache_key(frame: pd.DataFrame, fold: dict[str, pd.Timestamp], params: dict[str, Any]) -> str:
+    """Hash das colunas usadas no fold (com lookback) + parâmetros que afetam o resultado."""
+    digest = hashlib.sha256()
+    digest.update(pd.util.hash_pandas_object(frame, index=True).to_numpy().tobytes())
+    digest.update(json.dumps(
+        {"fold": {k: v.isoformat() for k, v in fold.items()}, **params},
+        sort_keys=True,
+        default=str,
+    ).encode())
+    return digest.hexdigest()[:32]
+
+
+def run_walk_forward(
+    dataset: pd.DataFrame,
+    grid: dict[str, list[Any]] | None = None,
+    train_months: int = 18,
+    test_months: int = 3,
+    step_months: int = 3,
+    objective: str = "sharpe_ratio",
+    signal_mode: str = "volatility",
+    vix_threshold: float = VIX_THRESHOLD,
+    usd_brl_threshold: float = USD_BRL_CHANGE_THRESHOLD,
+    iron_col: str = "iron_ore_price",
+    vale_col: str = "vale3_close",
+    cache_dir: Path | None = WALK_FORWARD_CACHE_DIR,
+    max_workers: int | None = None,
+    **backtest_kwargs: Any,
+) -> pd.DataFrame:
+    """
+    Executa a validação walk-forward.
+
+    Em cada fold, o ponto da grade com melhor `objective` no treino é
+    aplicado ao período de teste seguinte.
+
+    Args:
+        dataset: DataFrame de `create_analysis_dataset` (índice de datas)
+        grid: Dict com listas de window, threshold e correlation_threshold
+              (ausentes usam os valores de src/config.py)
+        train_months: Meses de treino por fold
+        test_months: Meses de teste por fold
+        step_months: Avanço entre folds
+        objective: Métrica de `calculate_backtest_metrics` a maximizar no treino
+        signal_mode: 'volatility' (retorno > threshold x std anterior, regra
+                     da estratégia) ou 'zscore' (|Z-Score| > threshold)
+        vix_threshold: VIX máximo para operar
+        usd_brl_threshold: Variação máxima de USD/BRL para operar
+        iron_col: Coluna de preço do minério
+        vale_col: Coluna de fechamento de VALE3
+        cache_dir: Diretório de cache dos folds (None desativa)
+        max_workers: Processos para os folds (default: os.cpu_count())
+        **backtest_kwargs: Parâmetros fixos de `run_backtest`
+
+    Returns:
+        DataFrame com uma linha por fold: datas, parâmetros escolhidos,
+        objetivo no treino, métricas de teste (prefixo 'test_') e 'cached'
+    """
+    if signal_mode not in SIGNAL_MODES:
+        raise ValueError(f"Modo de sinal inválido: {signal_mode}. Use {SIGNAL_MODES}")
+
+    grid = {
+        "window": [ROLLING_WINDOW],
+        "threshold": [SIGNAL_THRESHOLD_STD],
+        "correlation_threshold": [CORRELATION_THRESHOLD],
+        **(grid or {}),
+    }
+    points = expand_grid(grid)
+    backtest_kwargs = {"vale_col": vale_col, **backtest_kwargs}
+
+    # Features uma única vez sobre todo o histórico
+    features = build_walk_forward_features(dataset, grid["window"], iron_col, vale_col)
+    folds = generate_walk_forward_folds(features.index, train_months, test_months, step_months)
+    if not folds:
+        logger.warning("Histórico insuficiente para um fold de walk-forward")
+        return pd.DataFrame()
+
+    options = {
+        "objective": objective,
+        "signal_mode": signal_mode,
+        "vix_threshold": vix_threshold,
+        "usd_brl_threshold": usd_brl_threshold,
+        "backtest_kwargs": backtest_kwargs,
+        "warmup": backtest_kwargs.get("atr_period", ATR_PERIOD) + 1,
+    }
+    cache_params = {
+        "grid": grid,
+        "iron_col": iron_col,
+        "vale_col": vale_col,
+        "version": {"rules": RULES_VERSION, "features": FEATURES_VERSION},
+        **options,
+    }
+    columns = list(dict.fromkeys(
+        [iron_col, vale_col, *(col for col in _INPUT_COLUMNS if col in dataset.columns)]
+    ))
+
+    # Barras anteriores ao fold que influenciam suas features
+    lookback = max(grid["window"]) + 2
+
+    rows: dict[int, dict[str, Any]] = {}
+    pending: dict[int, tuple[pd.DataFrame, str | None]] = {}
+
+    for i, fold in enumerate(folds):
+        start, end = features.index.searchsorted([fold["train_start"], fold["test_end"]])
+        frame = features.iloc[start:end]
+
+        # Chave pelos dados brutos das colunas usadas (não pelas features,
+        # cujo arredondamento varia com o início do histórico)
+        key = None
+        if cache_dir is not None:
+            key = _fold_cache_key(
+                dataset[columns].iloc[max(start - lookback, 0) : end], fold, cache_params
+            )
+        cache_file = cache_dir / f"{key}.json" if key else None
+
+        if cache_file is not None and cache_file.exists():
+            rows[i] = {**json.loads(cache_file.read_text()), "cached": True}
+        else:
+            pending[i] = (frame, key)
+
+    logger.info(
+        f"Walk-forward: {len(folds)} folds ({len(folds) - len(pending)} em cache), "
+        f"{len(points)} pontos por fold"
+    )
+
+    if pending:
+        with ProcessPoolExecutor(max_workers=max_workers or os.cpu_count() or 1) as executor:
+            futures = {
+                i: executor.submit(_evaluate_fold, frame, folds[i], points, options)
+                for i, (frame, _) in pending.items()
+            }
+            for i, future in futures.items():
+                row = future.result()
+                key = pending[i][1]
+                if key is not None:
+                    cache_dir.mkdir(parents=True, exist_ok=True)
+                    (cache_dir / f"{key}.json").write_text(json.dumps(row))
+                rows[i] = {**row, "cached": False}
+
+    results = pd.DataFrame([rows[i] for i in range(len(folds))])
+    for col in FOLD_DATE_COLUMNS:
+        results[col] = pd.to_datetime(results[col])
+    results.insert(0, "fold", range(len(folds)))
+    return results
+
+
+def summarize_walk_forward(
+    results: pd.DataFrame,
+    min_sharpe: float = 1.0,
+    min_positive_pct: float = 70.0,
+    min_folds: int = 8,
+) -> dict[str, Any]:
+    """
+    Aplica os critérios de aprovação do guia de validação.
+
+    Args:
+        results: DataFrame de `run_walk_forward`
+        min_sharpe: Sharpe médio mínimo nos testes (default: 1.0)
+        min_positive_pct: % mínima de folds com Sharpe positivo (default: 70)
+        min_folds: Número mínimo de folds (default: 8)
+
+    Returns:
+        Dict com folds, sharpe médio, % positivos, retorno total e 'approved'
+    """
+    if results.empty:
+        return {"folds": 0, "mean_sharpe": 0.0, "positive_pct": 0.0,
+                "total_return_pct": 0.0, "approved": False}
+
+    sharpe = results["test_sharpe_ratio"]
+    growth = (1 + results["test_total_return_pct"] / 100).prod()
+
+    summary = {
+        "folds": int(len(results)),
+        "mean_sharpe": float(sharpe.mean()),
+        "positive_pct": float((sharpe > 0).mean() * 100),
+        "total_return_pct": float((growth - 1) * 100),
+    }
+    summary["approved"] = bool(
+        summary["folds"] >= min_folds
+        and summary["mean_sharpe"] > min_sharpe
+        and summary["positive_pct"] >= min_positive_pct
+    )
+    return summary
@@ -18,6 +18,9 @@ ROOT_DIR = Path(__file__).parent.parent
 SRC_DIR = ROOT_DIR / "src"
 DATA_DIR = ROOT_DIR / "data"
 LOGS_DIR = ROOT_DIR / "logs"
+SIGNAL_STATE_PATH = DATA_DIR / "signal_state.json"  # Checkpoint do estado rolling
+WALK_FORWARD_CACHE_DIR = DATA_DIR / "walk_forward"  # Resultados de folds em cache
+PRICE_CACHE_DIR = DATA_DIR / "parquet"  # Espelho local das tabelas de preços
 
 # Criar diretórios se não existirem
 DATA_DIR.mkdir(exist_ok=True)
@@ -29,6 +32,7 @@ LOGS_DIR.mkdir(exist_ok=True)
 SUPABASE_URL = os.getenv("SUPABASE_URL", "")
 SUPABASE_ANON_KEY = os.getenv("SUPABASE_ANON_KEY", "")
 SUPABASE_SERVICE_KEY = os.getenv("SUPABASE_SERVICE_KEY", "")
+SUPABASE_MAX_ROWS = int(os.getenv("SUPABASE_MAX_ROWS", "1000"))  # max-rows do PostgREST
 
 # -------------------------------------------
 # MetaTrader 5
@@ -83,6 +87,8 @@ CRITICAL_WINDOW_END = "13:00"  # UTC - B3 abre
 SIGNAL_THRESHOLD_STD = 1.5  # Desvios padrão para sinal
 ROLLING_WINDOW = 20  # Dias para cálculo de volatilidade
 CORRELATION_THRESHOLD = 0.2  # Mínimo para continuar operando
+VIX_THRESHOLD = 25.0  # NO-TRADE acima deste VIX
+USD_BRL_CHANGE_THRESHOLD = 0.005  # Variação máxima USD/BRL (0.5%)
 ATR_PERIOD = 14  # Período do ATR
 STOP_MULTIPLIER = 2.0  # Stop = 2x ATR
 
@@ -96,6 +102,10 @@ IRON_ORE_SYMBOLS = {
 
 VALE_SYMBOL = "VALE3"
 
+# Instrumentos da tabela daily_close (sql/005_daily_close.sql)
+DAILY_CLOSE_IRON_ORE = "IRON_ORE_FRONT"  # Minério front month
+DAILY_CLOSE_VALE3 = "VALE3"
+
 # -------------------------------------------
 # Validation
 # -------------------------------------------
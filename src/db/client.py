@@ -3,13 +3,22 @@ Cliente Supabase para o sistema QuantFund.
 Gerencia conexão e operações com o banco de dados.
 """
 
-from datetime import datetime
+import asyncio
+from collections.abc import Callable, Iterator
+from datetime import date, datetime, timedelta, timezone
 from typing import Any
 
+import numpy as np
+import pandas as pd
 from loguru import logger
 from supabase import Client, create_client
 
-from src.config import SUPABASE_ANON_KEY, SUPABASE_SERVICE_KEY, SUPABASE_URL
+from src.config import (
+    SUPABASE_ANON_KEY,
+    SUPABASE_MAX_ROWS,
+    SUPABASE_SERVICE_KEY,
+    SUPABASE_URL,
+)
 
 
 class SupabaseClient:
@@ -117,26 +126,69 @@ def get_iron_ore_prices(
         since: Buscar desde esta data (opcional)
 
     Returns:
-        Lista de registros de preços.
+        Lista de registros de preços (mais recentes primeiro).
     """
-    client = get_supabase()
-    query = client.table("prices_iron_ore").select("*")
-
-    if source:
-        query = query.eq("source", source)
-    if since:
-        query = query.gte("timestamp", since.isoformat())
-
-    query = query.order("timestamp", desc=True).limit(limit)
+    pages = iter_timeseries_pages(
+        "prices_iron_ore",
+        since=since,
+        desc=True,
+        limit=limit,
+        filters={"source": source} if source else None,
+    )
 
     try:
-        result = query.execute()
-        return result.data or []
+        return [record for page in pages for record in page]
     except Exception as e:
         logger.error(f"Erro ao buscar preços minério: {e}")
         return []
 
 
+def read_iron_ore_bars(
+    timeframe: str = "1d",
+    since: datetime | None = None,
+    after: datetime | None = None,
+    variable_key: str | None = None,
+    source: str = "sgx",
+    client: Client | None = None,
+) -> pd.DataFrame:
+    """
+    Lê barras OHLC de minério já agregadas (tabela prices_iron_ore_bars).
+
+    Sem `variable_key`, monta a série contínua do front month: em cada
+    barra fica o contrato de vencimento mais próximo (menor variable_key).
+
+    Args:
+        timeframe: '5m', '1h' ou '1d'
+        since: Barras com início >= since (opcional)
+        after: Barras com início > after (opcional, tem prioridade)
+        variable_key: Contrato (ex: "DERIV_IO_SWAP_2026_01"). Padrão: front month
+        source: Fonte dos dados
+        client: Cliente a usar (default: `get_supabase()`)
+
+    Returns:
+        DataFrame indexado pelo início da barra (UTC), com variable_key,
+        symbol, open, high, low, close e ticks. Vazio se não houver barras.
+    """
+    filters = {"timeframe": timeframe, "source": source}
+    if variable_key is not None:
+        filters["variable_key"] = variable_key
+
+    bars = read_timeseries(
+        "prices_iron_ore_bars",
+        "timestamp, variable_key, symbol, open, high, low, close, ticks",
+        since=since, after=after, filters=filters, client=client,
+    )
+    if bars.empty or variable_key is not None:
+        return bars
+
+    # Front month: menor vencimento de contrato (DERIV_IO_SWAP_YYYY_MM) por barra
+    swaps = bars[bars["variable_key"].str.startswith("DERIV_IO_SWAP_")]
+    if not swaps.empty:
+        bars = swaps
+    front = bars.reset_index().sort_values(["timestamp", "variable_key"], kind="stable")
+    return front.drop_duplicates("timestamp").set_index("timestamp")
+
+
 # -------------------------------------------
 # Operações de Preços - VALE3
 # -------------------------------------------
@@ -204,19 +256,12 @@ def get_vale_prices(
         since: Buscar desde esta data (opcional)
 
     Returns:
-        Lista de registros de preços.
+        Lista de registros de preços (mais recentes primeiro).
     """
-    client = get_supabase()
-    query = client.table("prices_vale3").select("*")
-
-    if since:
-        query = query.gte("timestamp", since.isoformat())
-
-    query = query.order("timestamp", desc=True).limit(limit)
+    pages = iter_timeseries_pages("prices_vale3", since=since, desc=True, limit=limit)
 
     try:
-        result = query.execute()
-        return result.data or []
+        return [record for page in pages for record in page]
     except Exception as e:
         logger.error(f"Erro ao buscar preços VALE3: {e}")
         return []
@@ -286,6 +331,333 @@ def save_signal(
         return None
 
 
+# -------------------------------------------
+# Leitura Concorrente
+# -------------------------------------------
+def build_timeseries_query(
+    table: str,
+    columns: str = "*",
+    since: datetime | None = None,
+    after: datetime | None = None,
+    latest: bool = False,
+    client: Client | None = None,
+    limit: int = 1,
+) -> Any:
+    """
+    Monta (sem executar) uma consulta de série temporal.
+
+    Args:
+        table: Nome da tabela
+        columns: Colunas do select
+        since: Registros com timestamp >= since (opcional)
+        after: Registros com timestamp > after (opcional, tem prioridade)
+        latest: Se True, retorna apenas os `limit` registros mais recentes
+                (do mais novo para o mais antigo)
+        client: Cliente a usar (default: `get_supabase()`)
+        limit: Registros retornados com latest=True (default: 1)
+
+    Returns:
+        Query builder do PostgREST pronto para `execute()`.
+    """
+    query = (client or get_supabase()).table(table).select(columns)
+
+    if after is not None:
+        query = query.gt("timestamp", after.isoformat())
+    elif since is not None:
+        query = query.gte("timestamp", since.isoformat())
+
+    if latest:
+        return query.order("timestamp", desc=True).limit(limit)
+    return query.order("timestamp", desc=False)
+
+
+async def fetch_concurrently_async(queries: dict[str, Any]) -> dict[str, Any]:
+    """
+    Executa consultas em paralelo (versão para quem já está num event loop).
+
+    Cada consulta roda em uma thread própria; o tempo total fica limitado
+    pela consulta mais lenta, não pela soma delas.
+
+    Args:
+        queries: Dict nome -> query builder (ver `build_timeseries_query`)
+                 ou função sem argumentos (ex: `read_timeseries` com
+                 `functools.partial`)
+
+    Returns:
+        Dict nome -> registros do query builder ou retorno da função.
+        Consultas com erro retornam lista vazia; funções com erro, None.
+    """
+    names = list(queries)
+    results = await asyncio.gather(
+        *(asyncio.to_thread(_as_call(queries[name])) for name in names),
+        return_exceptions=True,
+    )
+
+    data: dict[str, Any] = {}
+    for name, result in zip(names, results):
+        if isinstance(result, Exception):
+            logger.error(f"Erro ao buscar {name}: {result}")
+            data[name] = None if callable(queries[name]) else []
+        else:
+            data[name] = result
+    return data
+
+
+def _as_call(query: Any) -> Callable[[], Any]:
+    """Normaliza query builder ou função em uma chamada sem argumentos."""
+    if callable(query):
+        return query
+    return lambda: query.execute().data or []
+
+
+def fetch_concurrently(queries: dict[str, Any]) -> dict[str, Any]:
+    """
+    Executa consultas em paralelo, em uma única rodada de rede.
+
+    Args:
+        queries: Dict nome -> query builder ou função sem argumentos
+                 (ver `fetch_concurrently_async`)
+
+    Returns:
+        Dict nome -> resultado. Consultas com erro retornam lista vazia;
+        funções com erro, None.
+    """
+    if not queries:
+        return {}
+    return asyncio.run(fetch_concurrently_async(queries))
+
+
+# -------------------------------------------
+# Fechamentos Diários (servidor)
+# -------------------------------------------
+def get_daily_closes(
+    instruments: list[str],
+    since: date,
+    until: date | None = None,
+    client: Client | None = None,
+) -> pd.DataFrame:
+    """
+    Lê fechamentos diários calculados no banco (RPC get_daily_closes).
+
+    Retorna uma linha por dia em vez de todos os ticks; a consulta é
+    dividida em janelas de datas para não passar do max-rows do PostgREST.
+
+    Args:
+        instruments: Instrumentos da tabela daily_close (ex: "VALE3",
+                     "IRON_ORE_FRONT" ou um variable_key)
+        since: Primeiro dia (inclusive)
+        until: Último dia (exclusive). Padrão: sem limite
+        client: Cliente a usar (default: `get_supabase()`)
+
+    Returns:
+        DataFrame indexado por dia (UTC), uma coluna por instrumento
+        (NaN onde não há fechamento). Vazio se não houver dados.
+    """
+    client = client or get_supabase()
+    end = until or datetime.now(timezone.utc).date() + timedelta(days=1)
+    step = timedelta(days=max(SUPABASE_MAX_ROWS // max(len(instruments), 1), 1))
+
+    rows: list[dict[str, Any]] = []
+    start = since
+    while start < end:
+        stop = min(start + step, end)
+        params = {
+            "p_instruments": instruments,
+            "p_since": start.isoformat(),
+            "p_until": stop.isoformat(),
+        }
+        rows.extend(client.rpc("get_daily_closes", params).execute().data or [])
+        start = stop
+
+    if not rows:
+        return pd.DataFrame(columns=instruments)
+
+    df = pd.DataFrame(rows)
+    closes = df.pivot(index="day", columns="instrument", values="close").astype(float)
+    closes.index = pd.DatetimeIndex(pd.to_datetime(closes.index), name="day").tz_localize("UTC")
+    closes.columns.name = None
+    return closes.reindex(columns=instruments)
+
+
+# -------------------------------------------
+# Leitura Paginada
+# -------------------------------------------
+def iter_timeseries_pages(
+    table: str,
+    columns: str = "*",
+    since: datetime | None = None,
+    after: datetime | None = None,
+    until: datetime | None = None,
+    desc: bool = False,
+    limit: int | None = None,
+    filters: dict[str, Any] | None = None,
+    page_size: int = SUPABASE_MAX_ROWS,
+    client: Client | None = None,
+) -> Iterator[list[dict[str, Any]]]:
+    """
+    Lê uma série temporal em páginas, sem o corte silencioso do Supabase.
+
+    Paginação por chave (keyset) em (timestamp, id): cada página continua
+    após o último registro da anterior, então o custo por página é constante
+    (sem OFFSET) e linhas com o mesmo timestamp (ex: 12 contratos da curva)
+    não são perdidas na fronteira entre páginas.
+
+    Args:
+        table: Nome da tabela
+        columns: Colunas do select ('id' é incluída para a paginação)
+        since: Registros com timestamp >= since (opcional)
+        after: Registros com timestamp > after (opcional, tem prioridade)
+        until: Registros com timestamp < until (opcional)
+        desc: Se True, do mais recente para o mais antigo
+        limit: Número máximo de registros no total (opcional)
+        filters: Filtros de igualdade coluna -> valor (opcional)
+        page_size: Registros por requisição; não deve passar do max-rows
+                   do projeto (default: SUPABASE_MAX_ROWS)
+        client: Cliente a usar (default: `get_supabase()`)
+
+    Yields:
+        Listas de registros, uma por requisição.
+    """
+    client = client or get_supabase()
+    fields = [c.strip() for c in columns.split(",")]
+    if "*" not in fields and "id" not in fields:
+        columns = f"{columns}, id"
+    op = "lt" if desc else "gt"
+
+    cursor: tuple[str, Any] | None = None
+    remaining = limit
+    while remaining is None or remaining > 0:
+        size = page_size if remaining is None else min(page_size, remaining)
+        query = client.table(table).select(columns)
+
+        for column, value in (filters or {}).items():
+            query = query.eq(column, value)
+        if after is not None:
+            query = query.gt("timestamp", after.isoformat())
+        elif since is not None:
+            query = query.gte("timestamp", since.isoformat())
+        if until is not None:
+            query = query.lt("timestamp", until.isoformat())
+        if cursor is not None:
+            ts, row_id = cursor
+            query = query.or_(
+                f'timestamp.{op}."{ts}",and(timestamp.eq."{ts}",id.{op}.{row_id})'
+            )
+
+        page = (
+            query.order("timestamp", desc=desc)
+            .order("id", desc=desc)
+            .limit(size)
+            .execute()
+        ).data or []
+        if not page:
+            return
+
+        yield page
+
+        if len(page) < size:
+            return
+        if remaining is not None:
+            remaining -= len(page)
+        cursor = (page[-1]["timestamp"], page[-1]["id"])
+
+
+def read_timeseries(
+    table: str,
+    columns: str = "*",
+    since: datetime | None = None,
+    after: datetime | None = None,
+    until: datetime | None = None,
+    filters: dict[str, Any] | None = None,
+    page_size: int = SUPABASE_MAX_ROWS,
+    client: Client | None = None,
+) -> pd.DataFrame:
+    """
+    Lê uma série temporal completa para um DataFrame indexado por timestamp.
+
+    As páginas de `iter_timeseries_pages` são copiadas direto para arrays
+    NumPy pré-alocados (capacidade dobrada quando enchem), de modo que só
+    uma página de JSON fica em memória por vez, mesmo em consultas de anos.
+
+    Args:
+        table: Nome da tabela
+        columns: Colunas do select (deve incluir 'timestamp')
+        since: Registros com timestamp >= since (opcional)
+        after: Registros com timestamp > after (opcional, tem prioridade)
+        until: Registros com timestamp < until (opcional)
+        filters: Filtros de igualdade coluna -> valor (opcional)
+        page_size: Registros por requisição (default: SUPABASE_MAX_ROWS)
+        client: Cliente a usar (default: `get_supabase()`)
+
+    Returns:
+        DataFrame em ordem crescente de timestamp (UTC). Colunas numéricas
+        viram float64 (None -> NaN); as demais ficam como object.
+        Vazio se não houver registros.
+    """
+    fields = [c.strip() for c in columns.split(",")]
+    keep_id = "*" in fields or "id" in fields
+
+    buffers: dict[str, np.ndarray] = {}
+    size = 0
+
+    pages = iter_timeseries_pages(
+        table, columns, since=since, after=after, until=until,
+        filters=filters, page_size=page_size, client=client,
+    )
+    for page in pages:
+        n = len(page)
+        if not buffers:
+            buffers = {
+                name: np.empty(max(2 * page_size, n), dtype=_column_dtype(name, page))
+                for name in page[0]
+            }
+        elif size + n > len(buffers["timestamp"]):
+            capacity = max(2 * len(buffers["timestamp"]), size + n)
+            for name, buffer in buffers.items():
+                grown = np.empty(capacity, dtype=buffer.dtype)
+                grown[:size] = buffer[:size]
+                buffers[name] = grown
+
+        for name, buffer in buffers.items():
+            values = [record.get(name) for record in page]
+            if name == "timestamp":
+                buffer[size : size + n] = (
+                    pd.to_datetime(values, utc=True, format="ISO8601").tz_localize(None).to_numpy()
+                )
+                continue
+            try:
+                buffer[size : size + n] = values
+            except (TypeError, ValueError):
+                # Coluna que parecia numérica recebeu texto: passa a object
+                buffers[name] = buffer.astype(object)
+                buffers[name][size : size + n] = values
+        size += n
+
+    if not buffers:
+        return pd.DataFrame()
+
+    index = pd.DatetimeIndex(buffers.pop("timestamp")[:size], name="timestamp").tz_localize("UTC")
+    if not keep_id:
+        buffers.pop("id", None)
+    return pd.DataFrame({name: buffer[:size] for name, buffer in buffers.items()}, index=index)
+
+
+def _column_dtype(name: str, page: list[dict[str, Any]]) -> Any:
+    """Escolhe o dtype do buffer de uma coluna pelo primeiro valor não nulo."""
+    if name == "timestamp":
+        return "datetime64[ns]"
+    if name == "id":
+        return np.int64
+    for record in page:
+        value = record.get(name)
+        if value is None:
+            continue
+        if isinstance(value, int | float) and not isinstance(value, bool):
+            return np.float64
+        return object
+    return np.float64
+
+
 # -------------------------------------------
 # Teste de Conexão
 # -------------------------------------------
@@ -0,0 +1,257 @@
+"""
+Espelho local em Parquet das tabelas de preços do Supabase.
+
+Cada tabela vira um diretório com um arquivo por mês:
+
+    data/parquet/prices_iron_ore/2024-01.parquet
+    data/parquet/prices_vale3/2024-01.parquet
+    data/parquet/auxiliary_data/2024-01.parquet
+
+A sincronização é incremental: busca (com paginação) apenas os registros a
+partir do maior `timestamp` já em cache e reescreve só os meses afetados.
+A leitura usa Arrow com memory map, sem rede, de modo que backtests e
+notebooks carregam anos de histórico em milissegundos.
+
+Uso:
+    from src.db.parquet_cache import load_table, sync_all
+
+    sync_all()  # Requer Supabase configurado
+    iron_df = load_table("prices_iron_ore", since=datetime(2020, 1, 1))
+"""
+
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+from loguru import logger
+
+from src.config import PRICE_CACHE_DIR
+from src.db.client import read_timeseries
+
+# Tabelas espelhadas localmente
+CACHED_TABLES = ("prices_iron_ore", "prices_vale3", "auxiliary_data")
+
+_TIMESTAMP = pa.timestamp("ns", tz="UTC")
+_COMMON_FIELDS = [("id", pa.int64()), ("timestamp", _TIMESTAMP), ("created_at", pa.string())]
+
+# Tipos Arrow de cada tabela, como `read_timeseries` devolve as colunas
+# (numéricas em float64; texto e datas em string). Um mês em que uma coluna
+# é toda nula (ex: expiry_date dos backfills SZZFc2) seria inferido como
+# double e não concatenaria com os meses em string.
+TABLE_SCHEMAS: dict[str, pa.Schema] = {
+    "prices_iron_ore": pa.schema(_COMMON_FIELDS + [
+        ("source", pa.string()),
+        ("symbol", pa.string()),
+        ("price", pa.float64()),
+        ("volume", pa.float64()),
+        ("open", pa.float64()),
+        ("high", pa.float64()),
+        ("low", pa.float64()),
+        ("close", pa.float64()),
+        ("variable_key", pa.string()),
+        ("expiry_date", pa.string()),
+        ("price_type", pa.string()),
+    ]),
+    "prices_vale3": pa.schema(_COMMON_FIELDS + [
+        ("source", pa.string()),
+        ("symbol", pa.string()),
+        ("open", pa.float64()),
+        ("high", pa.float64()),
+        ("low", pa.float64()),
+        ("close", pa.float64()),
+        ("volume", pa.float64()),
+        ("tick_volume", pa.float64()),
+        ("spread", pa.float64()),
+    ]),
+    "auxiliary_data": pa.schema(_COMMON_FIELDS + [
+        ("usd_brl", pa.float64()),
+        ("vix", pa.float64()),
+        ("ibov", pa.float64()),
+    ]),
+}
+
+
+def _utc(ts: datetime) -> pd.Timestamp:
+    """Converte para Timestamp UTC (datas sem fuso são tratadas como UTC)."""
+    ts = pd.Timestamp(ts)
+    return ts.tz_localize("UTC") if ts.tz is None else ts.tz_convert("UTC")
+
+
+def _table_dir(table: str, cache_dir: Path) -> Path:
+    """Diretório da tabela no cache (valida se a tabela é espelhada)."""
+    if table not in CACHED_TABLES:
+        raise ValueError(f"Tabela sem cache local: {table}. Use {CACHED_TABLES}")
+    return cache_dir / table
+
+
+def _conform(data: pa.Table, table: str) -> pa.Table:
+    """
+    Converte as colunas conhecidas para os tipos de TABLE_SCHEMAS.
+
+    Colunas fora do schema (ex: adicionadas depois no banco) mantêm o tipo
+    inferido.
+    """
+    declared = TABLE_SCHEMAS[table]
+    schema = pa.schema([
+        declared.field(name) if name in declared.names else data.schema.field(name)
+        for name in data.column_names
+    ])
+    return data if data.schema.equals(schema) else data.cast(schema)
+
+
+def _month_files(
+    table: str,
+    cache_dir: Path,
+    since: datetime | None = None,
+    until: datetime | None = None,
+) -> list[Path]:
+    """Arquivos mensais da tabela que podem conter [since, until), em ordem."""
+    files = sorted(_table_dir(table, cache_dir).glob("*.parquet"))
+    first = _utc(since).strftime("%Y-%m") if since is not None else None
+    last = _utc(until).strftime("%Y-%m") if until is not None else None
+    return [
+        path for path in files
+        if (first is None or path.stem >= first) and (last is None or path.stem <= last)
+    ]
+
+
+def get_last_cached_timestamp(
+    table: str, cache_dir: Path = PRICE_CACHE_DIR
+) -> pd.Timestamp | None:
+    """
+    Maior `timestamp` em cache para a tabela.
+
+    Lê apenas a coluna de timestamp do último arquivo mensal.
+
+    Returns:
+        Timestamp (UTC) ou None se a tabela ainda não tem cache.
+    """
+    files = _month_files(table, cache_dir)
+    if not files:
+        return None
+
+    column = pq.read_table(files[-1], columns=["timestamp"], memory_map=True)["timestamp"]
+    latest = pc.max(column).as_py()
+    return _utc(latest) if latest is not None else None
+
+
+def sync_table(
+    table: str,
+    since: datetime | None = None,
+    full: bool = False,
+    cache_dir: Path = PRICE_CACHE_DIR,
+) -> int:
+    """
+    Sincroniza o cache local de uma tabela com o Supabase.
+
+    Busca os registros a partir do maior timestamp em cache (inclusive,
+    para pegar linhas com o mesmo timestamp inseridas depois) e mescla
+    por `id` nos arquivos mensais afetados.
+
+    Args:
+        table: Nome da tabela (ver CACHED_TABLES)
+        since: Início da carga quando não há cache (default: todo o histórico)
+        full: Se True, descarta o cache e baixa tudo desde `since`
+              (necessário para refletir upserts em registros antigos)
+        cache_dir: Diretório raiz do cache
+
+    Returns:
+        Número de registros recebidos do banco.
+    """
+    table_dir = _table_dir(table, cache_dir)
+    if full:
+        for path in table_dir.glob("*.parquet"):
+            path.unlink()
+
+    last_ts = get_last_cached_timestamp(table, cache_dir)
+    df = read_timeseries(table, since=last_ts if last_ts is not None else since)
+    if df.empty:
+        logger.info(f"Cache {table}: nenhum registro novo")
+        return 0
+
+    table_dir.mkdir(parents=True, exist_ok=True)
+    df = df.reset_index()
+    months = df["timestamp"].dt.strftime("%Y-%m")
+
+    for month, new in df.groupby(months, sort=True):
+        path = table_dir / f"{month}.parquet"
+        if path.exists():
+            cached = pq.read_table(path).to_pandas()
+            new = pd.concat([cached, new], ignore_index=True)
+        new = (
+            new.drop_duplicates(subset="id", keep="last")
+            .sort_values(["timestamp", "id"], kind="stable")
+            .reset_index(drop=True)
+        )
+        pq.write_table(_conform(pa.Table.from_pandas(new, preserve_index=False), table), path)
+
+    logger.info(f"Cache {table}: {len(df)} registros em {months.nunique()} mês(es)")
+    return len(df)
+
+
+def sync_all(since: datetime | None = None, cache_dir: Path = PRICE_CACHE_DIR) -> dict[str, int]:
+    """
+    Sincroniza todas as tabelas de CACHED_TABLES.
+
+    Returns:
+        Dict tabela -> registros recebidos.
+    """
+    return {table: sync_table(table, since=since, cache_dir=cache_dir) for table in CACHED_TABLES}
+
+
+def load_table(
+    table: str,
+    since: datetime | None = None,
+    until: datetime | None = None,
+    columns: list[str] | None = None,
+    cache_dir: Path = PRICE_CACHE_DIR,
+) -> pd.DataFrame:
+    """
+    Carrega uma tabela do cache local (sem acesso à rede).
+
+    Args:
+        table: Nome da tabela (ver CACHED_TABLES)
+        since: Registros com timestamp >= since (opcional)
+        until: Registros com timestamp < until (opcional)
+        columns: Colunas a carregar (default: todas)
+        cache_dir: Diretório raiz do cache
+
+    Returns:
+        DataFrame indexado por timestamp (UTC), em ordem crescente.
+        Vazio se não houver cache.
+    """
+    files = _month_files(table, cache_dir, since, until)
+    if not files:
+        return pd.DataFrame()
+
+    read_columns = None if columns is None else ["timestamp", *(c for c in columns if c != "timestamp")]
+    # _conform também corrige meses gravados antes de TABLE_SCHEMAS
+    data = pa.concat_tables(
+        [_conform(pq.read_table(path, columns=read_columns, memory_map=True), table) for path in files],
+        promote_options="default",
+    )
+
+    mask = None
+    if since is not None:
+        mask = pc.greater_equal(data["timestamp"], pa.scalar(_utc(since)))
+    if until is not None:
+        before = pc.less(data["timestamp"], pa.scalar(_utc(until)))
+        mask = before if mask is None else pc.and_(mask, before)
+    if mask is not None:
+        data = data.filter(mask)
+
+    return data.to_pandas().set_index("timestamp")
+
+
+def main():
+    """Entry point para execução via CLI."""
+    logger.info("Sincronizando cache local Parquet...")
+    counts = sync_all()
+    logger.info(f"Concluído: {counts}")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,10 +2,14 @@
 Feature Engineering para QuantFund Trading System.
 
 Módulos:
+    - rolling: Média/desvio rolling em várias janelas numa única passada
+    - frame: Bloco pré-alocado para os add_*_features escreverem sem cópia
     - returns: Cálculo de retornos em múltiplas janelas
     - volatility: ATR, desvio padrão rolling
     - zscore: Z-Score para normalização de retornos
     - alignment: Alinhamento temporal entre mercados
+    - graph: Grafo de features por nome, calculado sob demanda e memorizado
+    - online: Estimadores streaming (update tick a tick) de Z-Score e volatilidade
 
 Uso:
     from src.features import (
@@ -16,9 +20,23 @@ Uso:
         calculate_zscore,
         add_zscore_features,
         create_analysis_dataset,
+        FeatureGraph,
     )
+
+    # Só as colunas pedidas; dependências calculadas uma vez
+    graph = FeatureGraph(df, prices={"iron_": "iron_ore_price"})
+    features = graph.build(["iron_return_1d_zscore_20", "iron_volatility_20d"])
+
+    # add_*_features sem copiar o DataFrame a cada etapa
+    df = add_return_features(df, "close", inplace=True)
 """
 
+# Rolling
+from src.features.rolling import RollingStats
+
+# Feature frame
+from src.features.frame import FeatureFrame
+
 # Returns
 from src.features.returns import (
     calculate_returns,
@@ -36,6 +54,7 @@ from src.features.volatility import (
     calculate_atr_percent,
     calculate_rolling_std,
     calculate_annualized_volatility,
+    calculate_ewma_volatility,
     calculate_volatility_ratio,
     add_volatility_features,
     calculate_parkinson_volatility,
@@ -46,6 +65,8 @@ from src.features.zscore import (
     calculate_zscore,
     calculate_static_zscore,
     calculate_zscore_threshold,
+    calculate_zscore_signal,
+    threshold_signal,
     add_zscore_features,
     calculate_normalized_return,
     is_extreme_move,
@@ -60,11 +81,30 @@ from src.features.alignment import (
     filter_trading_days,
     create_analysis_dataset,
     add_lagged_features,
+    calculate_cross_correlation,
     calculate_lead_lag_correlation,
     validate_alignment,
 )
 
+# Feature graph
+from src.features.graph import FeatureGraph, feature
+
+# Online (streaming)
+from src.features.online import (
+    OnlineEstimator,
+    OnlineRollingMean,
+    OnlineRollingStd,
+    OnlineZScore,
+    OnlineEWMAVolatility,
+    OnlineATR,
+    OnlineParkinsonVolatility,
+)
+
 __all__ = [
+    # Rolling
+    "RollingStats",
+    # Feature frame
+    "FeatureFrame",
     # Returns
     "calculate_returns",
     "calculate_cumulative_return",
@@ -78,6 +118,7 @@ __all__ = [
     "calculate_atr_percent",
     "calculate_rolling_std",
     "calculate_annualized_volatility",
+    "calculate_ewma_volatility",
     "calculate_volatility_ratio",
     "add_volatility_features",
     "calculate_parkinson_volatility",
@@ -85,6 +126,8 @@ __all__ = [
     "calculate_zscore",
     "calculate_static_zscore",
     "calculate_zscore_threshold",
+    "calculate_zscore_signal",
+    "threshold_signal",
     "add_zscore_features",
     "calculate_normalized_return",
     "is_extreme_move",
@@ -96,6 +139,18 @@ __all__ = [
     "filter_trading_days",
     "create_analysis_dataset",
     "add_lagged_features",
+    "calculate_cross_correlation",
     "calculate_lead_lag_correlation",
     "validate_alignment",
+    # Feature graph
+    "FeatureGraph",
+    "feature",
+    # Online (streaming)
+    "OnlineEstimator",
+    "OnlineRollingMean",
+    "OnlineRollingStd",
+    "OnlineZScore",
+    "OnlineEWMAVolatility",
+    "OnlineATR",
+    "OnlineParkinsonVolatility",
 ]
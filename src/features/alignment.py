@@ -16,10 +16,17 @@ Uso:
     from src.features.alignment import align_datasets, create_analysis_dataset
 """
 
-import pandas as pd
+from statistics import NormalDist
+from typing import Literal
+
 import numpy as np
+import pandas as pd
 from loguru import logger
-from typing import Literal
+
+from src.features.frame import FeatureTarget, _output_frame
+
+# Erro relativo da FFT abaixo do qual a variância de um lag é tratada como zero
+_FFT_TOLERANCE = 1e-10
 
 
 def align_by_date(
@@ -228,11 +235,12 @@ def create_analysis_dataset(
 
 
 def add_lagged_features(
-    df: pd.DataFrame,
+    df: FeatureTarget,
     source_col: str,
     target_col: str,
     lags: list[int] | None = None,
-) -> pd.DataFrame:
+    inplace: bool = False,
+) -> FeatureTarget:
     """
     Adiciona features defasadas de um ativo para prever outro.
 
@@ -245,6 +253,8 @@ def add_lagged_features(
         source_col: Coluna fonte (ex: 'iron_ore_return_1d')
         target_col: Coluna alvo (ex: 'vale3_return_1d')
         lags: Defasagens a criar (default: [1, 2, 3])
+        inplace: Se True, acrescenta as colunas ao próprio `df` (sem cópia).
+                 Um `FeatureFrame` é sempre alterado no lugar
 
     Returns:
         DataFrame com features defasadas
@@ -257,7 +267,7 @@ def add_lagged_features(
     if lags is None:
         lags = [1, 2, 3]
 
-    df = df.copy()
+    df = _output_frame(df, inplace)
 
     for lag in lags:
         col_name = f"{source_col}_lag_{lag}"
@@ -266,6 +276,84 @@ def add_lagged_features(
     return df
 
 
+def calculate_cross_correlation(
+    series_a: pd.Series,
+    series_b: pd.Series,
+    max_lag: int = 10,
+    alpha: float = 0.05,
+) -> pd.DataFrame:
+    """
+    Correlação cruzada de todos os lags de uma vez, via FFT.
+
+    Para cada lag k calcula a correlação de Pearson entre A(t-k) e B(t),
+    usando só os pares em que ambos os valores existem (como `Series.corr`
+    após `shift`). As somas de todos os lags saem de seis correlações
+    circulares por FFT, O(n log n) independente de `max_lag`, o que viabiliza
+    centenas de lags em barras intraday (os lags são em barras).
+
+    Args:
+        series_a: Primeira série (ex: retornos minério)
+        series_b: Segunda série (ex: retornos VALE3)
+        max_lag: Máximo de lags para testar
+        alpha: Nível da banda de significância (default: 0.05 → 95%)
+
+    Returns:
+        DataFrame com uma linha por lag (-max_lag..max_lag):
+        - lag: > 0 série A lidera série B; < 0 série B lidera série A
+        - correlation: Correlação de Pearson no lag
+        - n_obs: Pares usados no lag
+        - band: Banda de significância ±z/sqrt(n_obs) (ruído branco)
+        - significant: |correlation| > band
+        - leader: 'A', 'B' ou 'simultaneous'
+    """
+    # Séries alinhadas pelo índice antes do deslocamento
+    aligned = pd.concat([series_a, series_b], axis=1)
+    a = aligned.iloc[:, 0].to_numpy(dtype=np.float64, na_value=np.nan)
+    b = aligned.iloc[:, 1].to_numpy(dtype=np.float64, na_value=np.nan)
+    valid_a, valid_b = np.isfinite(a), np.isfinite(b)
+
+    # Centrar reduz o cancelamento em cov = sum(ab) - sum(a)sum(b)/n
+    a = np.where(valid_a, a - a[valid_a].mean() if valid_a.any() else 0.0, 0.0)
+    b = np.where(valid_b, b - b[valid_b].mean() if valid_b.any() else 0.0, 0.0)
+
+    # Zero-padding até n + max_lag: sem sobreposição circular nos lags pedidos
+    size = 1 << max(len(a) + max_lag - 1, 1).bit_length()
+    spectra_a = np.fft.rfft(np.stack([valid_a, a, a * a]), size)
+    spectra_b = np.fft.rfft(np.stack([valid_b, b, b * b]), size)
+
+    def xcorr(i: int, j: int) -> np.ndarray:
+        """sum_t x(t-k) y(t) para k = -max_lag..max_lag."""
+        full = np.fft.irfft(np.conj(spectra_a[i]) * spectra_b[j], size)
+        return np.concatenate([full[size - max_lag:], full[:max_lag + 1]])
+
+    count = np.rint(xcorr(0, 0))
+    sum_a, sum_b = xcorr(1, 0), xcorr(0, 1)
+    sum_aa, sum_bb, sum_ab = xcorr(2, 0), xcorr(0, 2), xcorr(1, 1)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cov = sum_ab - sum_a * sum_b / count
+        var_a = sum_aa - sum_a * sum_a / count
+        var_b = sum_bb - sum_b * sum_b / count
+        # Variância no nível do erro da FFT → série constante no lag
+        degenerate = (
+            (count < 2)
+            | (var_a <= _FFT_TOLERANCE * np.sum(a * a))
+            | (var_b <= _FFT_TOLERANCE * np.sum(b * b))
+        )
+        correlation = np.where(degenerate, np.nan, np.clip(cov / np.sqrt(var_a * var_b), -1, 1))
+        band = NormalDist().inv_cdf(1 - alpha / 2) / np.sqrt(count)
+
+    lags = np.arange(-max_lag, max_lag + 1)
+    return pd.DataFrame({
+        "lag": lags,
+        "correlation": correlation,
+        "n_obs": count.astype(int),
+        "band": band,
+        "significant": np.abs(correlation) > band,
+        "leader": np.select([lags > 0, lags < 0], ["A", "B"], "simultaneous"),
+    })
+
+
 def calculate_lead_lag_correlation(
     series_a: pd.Series,
     series_b: pd.Series,
@@ -274,7 +362,8 @@ def calculate_lead_lag_correlation(
     """
     Calcula correlação lead-lag entre duas séries.
 
-    Identifica se série A lidera ou segue série B.
+    Identifica se série A lidera ou segue série B. Todos os lags saem de uma
+    única `calculate_cross_correlation` (FFT).
 
     Args:
         series_a: Primeira série (ex: retornos minério)
@@ -286,25 +375,8 @@ def calculate_lead_lag_correlation(
         - lag > 0: série A lidera série B
         - lag < 0: série B lidera série A
     """
-    results = []
-
-    for lag in range(-max_lag, max_lag + 1):
-        if lag == 0:
-            corr = series_a.corr(series_b)
-        elif lag > 0:
-            # A lidera B por `lag` dias
-            corr = series_a.shift(lag).corr(series_b)
-        else:
-            # B lidera A por `abs(lag)` dias
-            corr = series_a.corr(series_b.shift(abs(lag)))
-
-        results.append({
-            "lag": lag,
-            "correlation": corr,
-            "leader": "A" if lag > 0 else ("B" if lag < 0 else "simultaneous"),
-        })
-
-    return pd.DataFrame(results)
+    cross = calculate_cross_correlation(series_a, series_b, max_lag)
+    return cross[["lag", "correlation", "leader"]]
 
 
 def validate_alignment(df: pd.DataFrame) -> dict:
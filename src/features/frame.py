@@ -0,0 +1,121 @@
+"""
+Bloco pré-alocado de colunas de features.
+
+Por padrão cada `add_*_features` copia o DataFrame de entrada antes de
+acrescentar colunas; encadear quatro delas sobre anos de barras de 5 minutos
+aloca quatro cópias completas. Há dois modos sem cópia:
+
+- `inplace=True`: as colunas são acrescentadas ao próprio DataFrame, que é
+  devolvido (nenhuma cópia das colunas existentes).
+- `FeatureFrame`: as colunas novas são escritas num bloco float64
+  pré-alocado; leituras caem no DataFrame base quando a coluna não é uma
+  feature. `to_frame()` devolve as features como views do bloco.
+
+Uso:
+    from src.features import FeatureFrame, add_return_features, add_zscore_features
+
+    frame = FeatureFrame(df)
+    add_return_features(frame, "close", periods=[1, 5])
+    add_zscore_features(frame, "return_1d", windows=[20])
+    features = frame.to_frame()   # só as colunas novas, sem cópia
+
+O bloco é float64: sinais inteiros (ex: zscore_signal) saem como 1.0/-1.0/0.0.
+"""
+
+from collections.abc import Iterator
+
+import numpy as np
+import pandas as pd
+
+# Colunas pré-alocadas quando a capacidade não é informada
+DEFAULT_CAPACITY = 32
+
+
+class FeatureFrame:
+    """Colunas de features num bloco float64 pré-alocado sobre um DataFrame base."""
+
+    def __init__(self, data: pd.DataFrame, capacity: int = DEFAULT_CAPACITY) -> None:
+        """
+        Args:
+            data: DataFrame base (não é copiado nem alterado)
+            capacity: Colunas pré-alocadas; o bloco dobra de tamanho se faltar espaço
+        """
+        self.data = data
+        self.index = data.index
+        self._block = np.empty((len(data), max(capacity, 1)), order="F")
+        self._positions: dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._positions or name in self.data.columns
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.columns)
+
+    @property
+    def columns(self) -> pd.Index:
+        """Colunas base seguidas das features escritas no bloco."""
+        return self.data.columns.append(pd.Index(list(self._positions)))
+
+    @property
+    def features(self) -> list[str]:
+        """Features escritas no bloco, na ordem de escrita."""
+        return list(self._positions)
+
+    def __getitem__(self, name: str) -> pd.Series:
+        """Feature (view do bloco) ou coluna do DataFrame base."""
+        position = self._positions.get(name)
+        if position is None:
+            return self.data[name]
+        return pd.Series(self._block[:, position], index=self.index, name=name, copy=False)
+
+    def __setitem__(self, name: str, values: pd.Series | np.ndarray) -> None:
+        """Escreve uma feature no bloco (sobrescreve se já existir)."""
+        if name in self.data.columns:
+            raise KeyError(f"'{name}' já é coluna do DataFrame base")
+
+        if isinstance(values, pd.Series):
+            if not values.index.equals(self.index):
+                values = values.reindex(self.index)
+            values = values.to_numpy(dtype=np.float64, na_value=np.nan)
+
+        position = self._positions.get(name)
+        if position is None:
+            position = len(self._positions)
+            if position == self._block.shape[1]:
+                self._grow()
+            self._positions[name] = position
+        self._block[:, position] = values
+
+    def _grow(self) -> None:
+        """Dobra a capacidade do bloco (views já devolvidas mantêm os valores escritos)."""
+        block = np.empty((self._block.shape[0], 2 * self._block.shape[1]), order="F")
+        block[:, :self._block.shape[1]] = self._block
+        self._block = block
+
+    def to_frame(self) -> pd.DataFrame:
+        """
+        Features escritas até aqui, como views do bloco (sem cópia).
+
+        Returns:
+            DataFrame só com as features, no índice de `data`.
+        """
+        return pd.DataFrame(
+            self._block[:, :len(self._positions)],
+            index=self.index,
+            columns=list(self._positions),
+            copy=False,
+        )
+
+
+# DataFrame ou FeatureFrame aceitos pelos add_*_features
+FeatureTarget = pd.DataFrame | FeatureFrame
+
+
+def _output_frame(df: FeatureTarget, inplace: bool) -> FeatureTarget:
+    """Destino das colunas novas de um `add_*_features`."""
+    if inplace or isinstance(df, FeatureFrame):
+        return df
+    return df.copy()
@@ -0,0 +1,252 @@
+"""
+Grafo de features avaliado sob demanda.
+
+Cada feature é declarada por um padrão de nome e calculada a partir de
+outras features (suas dependências), pedidas pelo próprio nome. Um
+`FeatureGraph` resolve os nomes recursivamente, memoriza cada coluna
+intermediária e monta apenas as colunas pedidas, sem copiar o DataFrame de
+entrada. Pedir `iron_return_1d_zscore_20` calcula `iron_return_1d` uma vez;
+volatilidade, Z-Score e lags do mesmo retorno reaproveitam a coluna e as
+mesmas somas de `RollingStats`.
+
+Os nomes seguem os de `add_return_features`, `add_volatility_features`,
+`add_zscore_features` e `add_lagged_features`:
+
+    {prefix}return_{n}d               retorno simples de n dias (%)
+    {prefix}cumulative_return_{n}d    retorno acumulado em n dias (%)
+    {prefix}momentum_{s}_{l}          retorno s dias - retorno l dias
+    {prefix}volatility_{w}d           desvio padrão rolling de return_1d
+    {prefix}vol_ratio_{s}_{l}         volatilidade s / volatilidade l
+    {prefix}atr_{n}, atr_pct_{n}      ATR (requer high/low em `ranges`)
+    {coluna}_zscore_{w}               Z-Score rolling de qualquer coluna
+    {coluna}_zscore_signal_{w}        sinal 1/-1/0 do Z-Score
+    {coluna}_lag_{n}                  coluna defasada em n barras
+
+Uso:
+    from src.features import FeatureGraph
+
+    graph = FeatureGraph(dataset, prices={"iron_": "iron_ore_price", "vale_": "vale3_close"})
+    features = graph.build(["iron_return_1d_zscore_20", "iron_volatility_20d", "vale_return_1d"])
+
+Novas features são declaradas com o decorator `feature`:
+
+    @feature(r"(?P<source>.+)_squared")
+    def squared(graph: FeatureGraph, source: str) -> pd.Series:
+        return graph[source] ** 2
+"""
+
+import re
+from collections.abc import Callable, Iterable
+
+import pandas as pd
+from loguru import logger
+
+from src.features.rolling import RollingStats
+from src.features.volatility import calculate_true_range
+from src.features.zscore import threshold_signal
+
+# Regras registradas: (padrão de nome, função). Se mais de uma casar, vence a
+# mais específica (ver `FeatureGraph._match`), independente da ordem.
+_RULES: list[tuple[re.Pattern, Callable[..., pd.Series]]] = []
+
+
+def feature(pattern: str) -> Callable[[Callable[..., pd.Series]], Callable[..., pd.Series]]:
+    """
+    Declara uma família de features pelo padrão do nome.
+
+    A função recebe o grafo e os grupos nomeados do padrão (como strings) e
+    pede suas dependências por nome (`graph["..."]`).
+
+    Args:
+        pattern: Regex que deve casar com o nome inteiro
+    """
+    def decorator(func: Callable[..., pd.Series]) -> Callable[..., pd.Series]:
+        _RULES.append((re.compile(pattern), func))
+        return func
+
+    return decorator
+
+
+class FeatureGraph:
+    """Features calculadas sob demanda e memorizadas durante um build."""
+
+    def __init__(
+        self,
+        data: pd.DataFrame,
+        prices: dict[str, str] | None = None,
+        ranges: dict[str, tuple[str, str]] | None = None,
+        threshold: float = 1.5,
+    ) -> None:
+        """
+        Args:
+            data: DataFrame base (não é copiado nem alterado)
+            prices: Prefixo -> coluna de preço (default: {"": "close"})
+            ranges: Prefixo -> (coluna de máxima, coluna de mínima), para ATR
+            threshold: Limite dos sinais de Z-Score (default: 1.5)
+        """
+        self.data = data
+        self.prices = prices if prices is not None else {"": "close"}
+        self.ranges = ranges or {}
+        self.threshold = threshold
+
+        self._columns: dict[str, pd.Series] = {}
+        self._stats: dict[str, RollingStats] = {}
+        self._stack: list[str] = []
+        # Dependências diretas de cada feature calculada
+        self.dependencies: dict[str, list[str]] = {}
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._columns or name in self.data.columns or self._match(name) is not None
+
+    def __getitem__(self, name: str) -> pd.Series:
+        """Coluna base ou feature (calculada na primeira vez e memorizada)."""
+        if self._stack and name not in self.dependencies[self._stack[-1]]:
+            self.dependencies[self._stack[-1]].append(name)
+
+        if name in self._columns:
+            return self._columns[name]
+        if name in self.data.columns:
+            return self.data[name]
+        if name in self._stack:
+            raise ValueError(f"Dependência circular: {' -> '.join([*self._stack, name])}")
+
+        match = self._match(name)
+        if match is None:
+            raise KeyError(f"Feature desconhecida: {name}")
+        pattern, func = match
+
+        self.dependencies[name] = []
+        self._stack.append(name)
+        try:
+            series = func(self, **pattern.groupdict())
+        finally:
+            self._stack.pop()
+
+        self._columns[name] = series.rename(name, copy=False)
+        return self._columns[name]
+
+    @staticmethod
+    def _match(name: str) -> tuple[re.Match, Callable[..., pd.Series]] | None:
+        """
+        Regra mais específica para o nome: a que captura menos caracteres
+        nos grupos (mais texto literal). Ex: "iron_cumulative_return_20d"
+        casa com cumulative_return (prefixo "iron_") e com return (prefixo
+        "iron_cumulative_"); vence cumulative_return.
+        """
+        matches = []
+        for regex, func in _RULES:
+            pattern = regex.fullmatch(name)
+            if pattern is not None:
+                captured = sum(len(group) for group in pattern.groups() if group)
+                matches.append((captured, pattern, func))
+        if not matches:
+            return None
+
+        matches.sort(key=lambda match: match[0])
+        if len(matches) > 1 and matches[0][0] == matches[1][0]:
+            raise ValueError(f"Feature ambígua: {name} casa com mais de uma regra")
+        return matches[0][1], matches[0][2]
+
+    @property
+    def computed(self) -> list[str]:
+        """Features já calculadas neste grafo (inclui intermediárias)."""
+        return list(self._columns)
+
+    def price(self, prefix: str) -> pd.Series:
+        """Coluna de preço associada ao prefixo."""
+        if prefix not in self.prices:
+            raise KeyError(f"Prefixo sem coluna de preço: '{prefix}'")
+        return self[self.prices[prefix]]
+
+    def rolling(self, name: str) -> RollingStats:
+        """`RollingStats` compartilhado de uma coluna (uma passada por coluna)."""
+        stats = self._stats.get(name)
+        if stats is None:
+            stats = self._stats[name] = RollingStats(self[name])
+        return stats
+
+    def build(self, names: Iterable[str]) -> pd.DataFrame:
+        """
+        Calcula as features pedidas.
+
+        Args:
+            names: Nomes das features (ou colunas base)
+
+        Returns:
+            DataFrame só com as colunas pedidas, no índice de `data`.
+        """
+        names = list(names)
+        columns = {name: self[name] for name in names}
+        logger.debug(
+            f"FeatureGraph: {len(names)} features pedidas, {len(self._columns)} calculadas"
+        )
+        return pd.DataFrame(columns, index=self.data.index)
+
+
+# -------------------------------------------
+# Retornos
+# -------------------------------------------
+@feature(r"(?P<prefix>\w*?)cumulative_return_(?P<window>\d+)d")
+def _cumulative_return(graph: FeatureGraph, prefix: str, window: str) -> pd.Series:
+    prices = graph.price(prefix)
+    return ((prices / prices.shift(int(window))) - 1) * 100
+
+
+@feature(r"(?P<prefix>\w*?)return_(?P<period>\d+)d")
+def _return(graph: FeatureGraph, prefix: str, period: str) -> pd.Series:
+    return graph.price(prefix).pct_change(periods=int(period)) * 100
+
+
+@feature(r"(?P<prefix>\w*?)momentum_(?P<short>\d+)_(?P<long>\d+)")
+def _momentum(graph: FeatureGraph, prefix: str, short: str, long: str) -> pd.Series:
+    return graph[f"{prefix}return_{short}d"] - graph[f"{prefix}return_{long}d"]
+
+
+# -------------------------------------------
+# Volatilidade
+# -------------------------------------------
+@feature(r"(?P<prefix>\w*?)volatility_(?P<window>\d+)d")
+def _volatility(graph: FeatureGraph, prefix: str, window: str) -> pd.Series:
+    return graph.rolling(f"{prefix}return_1d").std(int(window))
+
+
+@feature(r"(?P<prefix>\w*?)vol_ratio_(?P<short>\d+)_(?P<long>\d+)")
+def _volatility_ratio(graph: FeatureGraph, prefix: str, short: str, long: str) -> pd.Series:
+    return graph[f"{prefix}volatility_{short}d"] / graph[f"{prefix}volatility_{long}d"]
+
+
+@feature(r"(?P<prefix>\w*?)true_range")
+def _true_range(graph: FeatureGraph, prefix: str) -> pd.Series:
+    if prefix not in graph.ranges:
+        raise KeyError(f"Prefixo sem colunas de máxima/mínima: '{prefix}'")
+    high_col, low_col = graph.ranges[prefix]
+    return calculate_true_range(graph[high_col], graph[low_col], graph.price(prefix))
+
+
+@feature(r"(?P<prefix>\w*?)atr_(?P<period>\d+)")
+def _atr(graph: FeatureGraph, prefix: str, period: str) -> pd.Series:
+    return graph.rolling(f"{prefix}true_range").mean(int(period))
+
+
+@feature(r"(?P<prefix>\w*?)atr_pct_(?P<period>\d+)")
+def _atr_percent(graph: FeatureGraph, prefix: str, period: str) -> pd.Series:
+    return (graph[f"{prefix}atr_{period}"] / graph.price(prefix)) * 100
+
+
+# -------------------------------------------
+# Z-Score e lags (sobre qualquer coluna)
+# -------------------------------------------
+@feature(r"(?P<source>.+)_zscore_signal_(?P<window>\d+)")
+def _zscore_signal(graph: FeatureGraph, source: str, window: str) -> pd.Series:
+    return threshold_signal(graph[f"{source}_zscore_{window}"], graph.threshold)
+
+
+@feature(r"(?P<source>.+)_zscore_(?P<window>\d+)")
+def _zscore(graph: FeatureGraph, source: str, window: str) -> pd.Series:
+    window = int(window)
+    return graph.rolling(source).zscore(window, min_periods=max(window // 2, 2))
+
+
+@feature(r"(?P<source>.+)_lag_(?P<lag>\d+)")
+def _lag(graph: FeatureGraph, source: str, lag: str) -> pd.Series:
+    return graph[source].shift(int(lag))
@@ -0,0 +1,293 @@
+"""
+Estimadores online (streaming) de volatilidade e Z-Score.
+
+Contrapartes tick a tick das funções de `zscore` e `volatility`: cada
+estimador recebe um valor por vez em `update(...)` e expõe o resultado em
+`value`, com custo constante por atualização. As janelas rolling usam um
+buffer circular de tamanho fixo e as fórmulas de Welford para entrar e sair
+da janela.
+
+Os resultados batem com as funções batch ao reprocessar o histórico
+(`replay`), inclusive no tratamento de NaN/inf (ignorados, como em
+`RollingStats`), em min_periods e em janelas constantes (desvio zero). Para
+que o erro de arredondamento das atualizações não se acumule, média e
+variância são recalculadas a partir do buffer a cada volta completa (custo
+O(janela) a cada `janela` atualizações).
+
+Uso:
+    from src.features.online import OnlineZScore, OnlineATR
+
+    zscore = OnlineZScore(window=20)
+    zscore.replay(history)            # aquece com o histórico
+    signal_value = zscore.update(ret)  # a cada novo retorno
+
+    atr = OnlineATR(period=14)
+    atr.update(high, low, close)
+"""
+
+import math
+from abc import ABC, abstractmethod
+from collections.abc import Iterable
+
+import numpy as np
+
+
+class OnlineEstimator(ABC):
+    """Base dos estimadores: `update` devolve o novo `value`."""
+
+    @abstractmethod
+    def update(self, *args: float) -> float:
+        """Incorpora uma observação e devolve `value`."""
+
+    @property
+    @abstractmethod
+    def value(self) -> float:
+        """Estimativa atual (NaN até haver dados suficientes)."""
+
+    def replay(self, *columns: Iterable[float]) -> np.ndarray:
+        """
+        Aplica `update` sobre um histórico (uma coluna por argumento de `update`).
+
+        Returns:
+            Array com `value` após cada atualização (comparável à função batch)
+        """
+        return np.array([self.update(*row) for row in zip(*columns)], dtype=np.float64)
+
+
+class _RollingWindow:
+    """Buffer circular com contagem, média e M2 (Welford) dos valores válidos."""
+
+    def __init__(self, window: int) -> None:
+        if window < 1:
+            raise ValueError(f"Janela inválida: {window}")
+        self.window = window
+        self._buffer = [math.nan] * window
+        self._head = 0
+        self._updates = 0
+
+        self.count = 0
+        self._mean = 0.0
+        self._m2 = 0.0
+
+        # Janela constante: último valor válido, sua posição e a posição do
+        # último valor válido diferente dele (fora da janela → constante)
+        self._last = math.nan
+        self._last_index: float = -math.inf
+        self._last_change: float = -math.inf
+
+    def push(self, x: float) -> None:
+        old = self._buffer[self._head]
+        self._buffer[self._head] = x
+        self._head = (self._head + 1) % self.window
+        self._updates += 1
+
+        if math.isfinite(old):
+            self._remove(old)
+        if math.isfinite(x):
+            self._add(x)
+            if x != self._last:
+                self._last_change = self._last_index
+                self._last = x
+            self._last_index = self._updates - 1
+
+        # Volta completa: recalcula do buffer para não acumular erro
+        if self._head == 0:
+            self._recompute()
+
+    def _add(self, x: float) -> None:
+        self.count += 1
+        delta = x - self._mean
+        self._mean += delta / self.count
+        self._m2 += delta * (x - self._mean)
+
+    def _remove(self, x: float) -> None:
+        self.count -= 1
+        if self.count == 0:
+            self._mean = self._m2 = 0.0
+            return
+        delta = x - self._mean
+        self._mean -= delta / self.count
+        self._m2 -= delta * (x - self._mean)
+
+    def _recompute(self) -> None:
+        valid = [x for x in self._buffer if math.isfinite(x)]
+        self.count = len(valid)
+        if not valid:
+            self._mean = self._m2 = 0.0
+            return
+        self._mean = math.fsum(valid) / self.count
+        self._m2 = math.fsum((x - self._mean) ** 2 for x in valid)
+
+    @property
+    def constant(self) -> bool:
+        """Todos os valores válidos da janela são iguais."""
+        return self.count > 0 and self._last_change < self._updates - self.window
+
+    @property
+    def mean(self) -> float:
+        if self.count == 0:
+            return math.nan
+        return self._last if self.constant else self._mean
+
+    def std(self, ddof: int = 1) -> float:
+        if self.count <= ddof:
+            return math.nan
+        if self.constant:
+            return 0.0
+        return math.sqrt(max(self._m2, 0.0) / (self.count - ddof))
+
+
+class OnlineRollingMean(OnlineEstimator):
+    """Média rolling (equivale a `RollingStats.mean`)."""
+
+    def __init__(self, window: int, min_periods: int | None = None) -> None:
+        """
+        Args:
+            window: Tamanho da janela
+            min_periods: Valores mínimos na janela (default: window)
+        """
+        self._window = _RollingWindow(window)
+        self.min_periods = window if min_periods is None else min_periods
+
+    @property
+    def value(self) -> float:
+        return self._window.mean if self._window.count >= self.min_periods else math.nan
+
+    def update(self, x: float) -> float:
+        self._window.push(x)
+        return self.value
+
+
+class OnlineRollingStd(OnlineEstimator):
+    """Desvio padrão rolling (equivale a `calculate_rolling_std`)."""
+
+    def __init__(self, window: int, min_periods: int | None = None, ddof: int = 1) -> None:
+        """
+        Args:
+            window: Tamanho da janela
+            min_periods: Valores mínimos na janela (default: window)
+            ddof: Graus de liberdade (default: 1, como pandas)
+        """
+        self._window = _RollingWindow(window)
+        self.min_periods = window if min_periods is None else min_periods
+        self.ddof = ddof
+
+    @property
+    def mean(self) -> float:
+        """Média da janela atual (sem min_periods)."""
+        return self._window.mean
+
+    @property
+    def value(self) -> float:
+        return self._window.std(self.ddof) if self._window.count >= self.min_periods else math.nan
+
+    def update(self, x: float) -> float:
+        self._window.push(x)
+        return self.value
+
+
+class OnlineZScore(OnlineEstimator):
+    """Z-Score rolling (equivale a `calculate_zscore`)."""
+
+    def __init__(self, window: int = 20, min_periods: int | None = None) -> None:
+        """
+        Args:
+            window: Janela para média e desvio (default: 20)
+            min_periods: Períodos mínimos (default: window // 2, mínimo 2)
+        """
+        self._window = _RollingWindow(window)
+        self.min_periods = max(window // 2, 2) if min_periods is None else min_periods
+        self._last = math.nan
+
+    @property
+    def value(self) -> float:
+        std = self._window.std()
+        if self._window.count >= self.min_periods and std > 0:
+            return (self._last - self._window.mean) / std
+        return math.nan
+
+    def update(self, x: float) -> float:
+        self._window.push(x)
+        self._last = x
+        return self.value
+
+    def signal(self, threshold: float = 1.5) -> int:
+        """Sinal 1/-1/0 do Z-Score atual (como `calculate_zscore_threshold`)."""
+        return int(self.value > threshold) - int(self.value < -threshold)
+
+
+class OnlineEWMAVolatility(OnlineEstimator):
+    """Volatilidade EWMA (equivale a `calculate_ewma_volatility`)."""
+
+    def __init__(self, span: int = 20) -> None:
+        """
+        Args:
+            span: Span da média exponencial (default: 20)
+        """
+        self.alpha = 2 / (span + 1)
+        self._variance = math.nan
+
+    def update(self, x: float) -> float:
+        # NaN mantém a estimativa anterior (ewm com ignore_na=True)
+        if not math.isnan(x):
+            if math.isnan(self._variance):
+                self._variance = x * x
+            else:
+                self._variance = (1 - self.alpha) * self._variance + self.alpha * x * x
+        return self.value
+
+    @property
+    def value(self) -> float:
+        return math.sqrt(self._variance)
+
+
+class OnlineATR(OnlineEstimator):
+    """Average True Range (equivale a `calculate_atr`)."""
+
+    def __init__(self, period: int = 14) -> None:
+        """
+        Args:
+            period: Período da média (default: 14)
+        """
+        self._mean = OnlineRollingMean(period)
+        self._prev_close = math.nan
+        self.true_range = math.nan
+
+    def update(self, high: float, low: float, close: float) -> float:
+        # Máximo dos componentes disponíveis (como max(axis=1) no pandas)
+        ranges = [
+            r for r in (high - low, abs(high - self._prev_close), abs(low - self._prev_close))
+            if not math.isnan(r)
+        ]
+        self.true_range = max(ranges) if ranges else math.nan
+        self._prev_close = close
+        return self._mean.update(self.true_range)
+
+    @property
+    def value(self) -> float:
+        return self._mean.value
+
+
+class OnlineParkinsonVolatility(OnlineEstimator):
+    """Volatilidade de Parkinson (equivale a `calculate_parkinson_volatility`)."""
+
+    _FACTOR = 1 / (4 * math.log(2))
+
+    def __init__(self, window: int = 20, trading_days: int = 252) -> None:
+        """
+        Args:
+            window: Janela para cálculo (default: 20)
+            trading_days: Dias de trading por ano (default: 252)
+        """
+        self._mean = OnlineRollingMean(window)
+        self._scale = 100 * math.sqrt(trading_days)
+
+    def update(self, high: float, low: float) -> float:
+        with np.errstate(divide="ignore", invalid="ignore"):
+            log_hl = float(np.log(np.float64(high) / low))
+        self._mean.update(self._FACTOR * log_hl ** 2)
+        return self.value
+
+    @property
+    def value(self) -> float:
+        return math.sqrt(self._mean.value) * self._scale
@@ -18,6 +18,8 @@ import numpy as np
 import pandas as pd
 from loguru import logger
 
+from src.features.frame import FeatureTarget, _output_frame
+
 
 def calculate_returns(
     prices: pd.Series,
@@ -99,13 +101,14 @@ def calculate_momentum(
 
 
 def add_return_features(
-    df: pd.DataFrame,
+    df: FeatureTarget,
     price_col: str,
     periods: list[int] | None = None,
     prefix: str = "",
     include_momentum: bool = True,
     include_cumulative: bool = True,
-) -> pd.DataFrame:
+    inplace: bool = False,
+) -> FeatureTarget:
     """
     Adiciona features de retorno a um DataFrame.
 
@@ -116,6 +119,8 @@ def add_return_features(
         prefix: Prefixo para nomes das colunas (ex: 'iron_' → 'iron_return_1d')
         include_momentum: Se True, inclui momentum (5d vs 20d)
         include_cumulative: Se True, inclui retorno acumulado 20d
+        inplace: Se True, acrescenta as colunas ao próprio `df` (sem cópia).
+                 Um `FeatureFrame` é sempre alterado no lugar
 
     Returns:
         DataFrame com novas colunas de retorno
@@ -129,7 +134,7 @@ def add_return_features(
     if periods is None:
         periods = [1, 5, 10, 20]
 
-    df = df.copy()
+    df = _output_frame(df, inplace)
     prices = df[price_col]
 
     # Retornos básicos
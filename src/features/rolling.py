@@ -0,0 +1,236 @@
+"""
+Estatísticas rolling (média, desvio padrão, contagem) em várias janelas.
+
+Volatilidade, Z-Score, ATR e retorno normalizado usam as mesmas médias e
+desvios rolling. `RollingStats` calcula as somas cumulativas da série uma
+única vez e obtém cada janela por diferença dessas somas (O(n) por janela,
+sem reprocessar a série), memorizando o resultado. Um mesmo objeto pode ser
+passado para as funções de `volatility` e `zscore` para que um build de
+features completo não recalcule janelas idênticas.
+
+Estabilidade numérica: as somas cumulativas reiniciam a cada bloco (potência
+de 2 >= janela) e são centradas na média do bloco, então o erro não cresce
+com o tamanho da série nem com o nível dos valores (evita o cancelamento de
+sum(x²) - sum(x)²/n). Uma janela cobre no máximo dois blocos, combinados
+pela fórmula de Chan et al.; resíduos abaixo do erro de arredondamento viram
+variância zero (janela constante), como no pandas.
+
+Valores NaN/inf são ignorados, como em `Series.rolling` com min_periods.
+
+Uso:
+    from src.features.rolling import RollingStats
+
+    stats = RollingStats(returns, windows=[5, 10, 20])
+    vol_20 = stats.std(20)
+    zscore_20 = stats.zscore(20, min_periods=10)
+"""
+
+from collections.abc import Iterable
+
+import numpy as np
+import pandas as pd
+
+# Margem (em épsilons de máquina) do erro de arredondamento das somas
+_ROUNDING_TOLERANCE = 16 * np.finfo(np.float64).eps
+
+# Menor bloco das somas cumulativas (potência de 2)
+_MIN_BLOCK = 64
+
+
+class _BlockSums:
+    """
+    Somas cumulativas reiniciadas a cada bloco, centradas na média do bloco.
+
+    Arrays com shape (blocos, tamanho + 1); a coluna 0 é zero, então a soma
+    das posições [i, j] de um bloco é prefix[:, j + 1] - prefix[:, i].
+    """
+
+    def __init__(self, raw: np.ndarray, valid: np.ndarray, block: int) -> None:
+        n = len(raw)
+        blocks = max(-(-n // block), 1)
+        pad = blocks * block - n
+
+        x = np.pad(np.where(valid, raw, 0.0), (0, pad)).reshape(blocks, block)
+        ok = np.pad(valid, (0, pad)).reshape(blocks, block)
+        counts = ok.sum(axis=1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            self.shift = np.where(counts > 0, x.sum(axis=1) / counts, 0.0)
+        centered = np.where(ok, x - self.shift[:, None], 0.0)
+
+        def prefix(values: np.ndarray) -> np.ndarray:
+            out = np.zeros((blocks, block + 1))
+            np.cumsum(values, axis=1, out=out[:, 1:])
+            return out
+
+        self.n = n
+        self.block = block
+        self.count = prefix(ok)
+        self.sum = prefix(centered)
+        self.sum_sq = prefix(centered * centered)
+
+
+class RollingStats:
+    """Média, desvio padrão e contagem rolling de uma série para várias janelas."""
+
+    def __init__(self, values: pd.Series, windows: Iterable[int] = (), ddof: int = 1) -> None:
+        """
+        Calcula as somas cumulativas e as janelas pedidas.
+
+        Args:
+            values: Série de valores (ex: retornos)
+            windows: Janelas a pré-calcular; outras são calculadas sob demanda
+            ddof: Graus de liberdade do desvio padrão (default: 1, como pandas)
+        """
+        windows = list(windows)
+        self.values = values
+        self.ddof = ddof
+
+        self._raw = values.to_numpy(dtype=np.float64, na_value=np.nan)
+        self._valid = np.isfinite(self._raw)
+        self._blocks: dict[int, _BlockSums] = {}
+        self._windows: dict[int, tuple[np.ndarray, np.ndarray, np.ndarray]] = {}
+
+        # Um único conjunto de somas atende todas as janelas pré-calculadas
+        if windows:
+            self._block_sums(max(windows))
+        for window in windows:
+            self._window(window)
+
+    def __len__(self) -> int:
+        return len(self._raw)
+
+    def _block_sums(self, window: int) -> _BlockSums:
+        """Somas por bloco com tamanho >= window (reaproveita as já calculadas)."""
+        fitting = [size for size in self._blocks if size >= window]
+        if fitting:
+            return self._blocks[min(fitting)]
+
+        # Blocos ~4x a janela: só 1/4 das posições cruza a fronteira de bloco
+        series_block = 1 << max(len(self._raw) - 1, 0).bit_length()
+        block = max(
+            _MIN_BLOCK,
+            min(1 << (4 * window - 1).bit_length(), series_block),
+            1 << (window - 1).bit_length(),
+        )
+        self._blocks[block] = _BlockSums(self._raw, self._valid, block)
+        return self._blocks[block]
+
+    def _window(self, window: int) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """(contagem, média, desvio padrão) de uma janela, sem min_periods."""
+        cached = self._windows.get(window)
+        if cached is not None:
+            return cached
+        if window < 1:
+            raise ValueError(f"Janela inválida: {window}")
+
+        sums = self._block_sums(window)
+        block, w = sums.block, window
+        C, S, Q = sums.count, sums.sum, sums.sum_sq
+        shift = sums.shift[:, None]
+
+        count = np.empty((len(C), block))
+        mean = np.empty((len(C), block))
+        m2 = np.empty((len(C), block))
+        tolerance = np.empty((len(C), block))
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            # Janelas inteiras dentro do bloco (colunas w-1 .. block-1)
+            hi, lo = np.s_[:, w:], np.s_[:, :block + 1 - w]
+            n = np.subtract(C[hi], C[lo], out=count[:, w - 1:])
+            total = S[hi] - S[lo]
+            local = total / n
+            np.add(local, shift, out=mean[:, w - 1:])
+            np.subtract(Q[hi] - Q[lo], total * local, out=m2[:, w - 1:])
+            np.add(Q[hi], Q[lo], out=tolerance[:, w - 1:])
+
+            if w > 1:
+                # Colunas 0 .. w-2: prefixo do bloco (b) + sufixo do bloco
+                # anterior (a), combinados pela fórmula de Chan et al.
+                def suffix(prefix: np.ndarray) -> np.ndarray:
+                    out = np.zeros((len(prefix), w - 1))
+                    out[1:] = prefix[:-1, block:] - prefix[:-1, block + 1 - w:block]
+                    return out
+
+                n_b, total_b = C[:, 1:w], S[:, 1:w]
+                n_a, total_a = suffix(C), suffix(S)
+                mean_b = np.where(n_b > 0, total_b / n_b, 0.0)
+                mean_a = np.where(n_a > 0, total_a / n_a, 0.0)
+                shift_gap = np.zeros((len(C), 1))
+                shift_gap[1:, 0] = sums.shift[1:] - sums.shift[:-1]
+
+                n = np.add(n_a, n_b, out=count[:, :w - 1])
+                # Diferença das médias: deslocamentos (exata) + médias centradas
+                delta = shift_gap + (mean_b - mean_a)
+                mean[:, :w - 1] = shift + mean_b - delta * n_a / n
+                m2[:, :w - 1] = (
+                    (Q[:, 1:w] - total_b * mean_b) + (suffix(Q) - total_a * mean_a)
+                    + delta * delta * n_a * n_b / n
+                )
+                scale = np.abs(shift_gap) + np.abs(mean_a) + np.abs(mean_b)
+                previous_total = np.pad(Q[:-1, block:], ((1, 0), (0, 0)))
+                tolerance[:, :w - 1] = Q[:, 1:w] + 2 * previous_total + n * _ROUNDING_TOLERANCE * scale * scale
+
+            count = count.ravel()[:sums.n]
+            mean = mean.ravel()[:sums.n]
+            m2 = m2.ravel()[:sums.n]
+            # Resíduo de arredondamento → janela constante (variância zero),
+            # com média igual ao próprio valor (ex: janela só de zeros → 0)
+            constant = (m2 <= _ROUNDING_TOLERANCE * tolerance.ravel()[:sums.n]) & (count > 0)
+            m2[constant] = 0.0
+            if constant.any():
+                last_valid = np.maximum.accumulate(np.where(self._valid, np.arange(sums.n), 0))
+                mean[constant] = self._raw[last_valid[constant]]
+            std = np.sqrt(m2 / (count - self.ddof))
+            std[count <= self.ddof] = np.nan
+
+        self._windows[window] = (count, mean, std)
+        return count, mean, std
+
+    def _series(self, data: np.ndarray) -> pd.Series:
+        return pd.Series(data, index=self.values.index, name=self.values.name)
+
+    def count(self, window: int) -> pd.Series:
+        """Valores válidos em cada janela."""
+        return self._series(self._window(window)[0].astype(np.float64))
+
+    def mean(self, window: int, min_periods: int | None = None) -> pd.Series:
+        """
+        Média rolling (equivale a `values.rolling(window, min_periods).mean()`).
+
+        Args:
+            window: Tamanho da janela
+            min_periods: Valores mínimos na janela (default: window)
+        """
+        count, mean, _ = self._window(window)
+        required = window if min_periods is None else min_periods
+        return self._series(np.where(count >= required, mean, np.nan))
+
+    def std(self, window: int, min_periods: int | None = None) -> pd.Series:
+        """
+        Desvio padrão rolling (equivale a `values.rolling(window, min_periods).std()`).
+
+        Args:
+            window: Tamanho da janela
+            min_periods: Valores mínimos na janela (default: window)
+        """
+        count, _, std = self._window(window)
+        required = window if min_periods is None else min_periods
+        return self._series(np.where(count >= required, std, np.nan))
+
+    def zscore(self, window: int, min_periods: int | None = None) -> pd.Series:
+        """
+        Z-Score rolling: (valor - média) / desvio padrão.
+
+        Janelas com desvio zero resultam em NaN.
+
+        Args:
+            window: Tamanho da janela
+            min_periods: Valores mínimos na janela (default: window)
+        """
+        count, mean, std = self._window(window)
+        required = window if min_periods is None else min_periods
+        with np.errstate(divide="ignore", invalid="ignore"):
+            zscore = np.where(
+                (count >= required) & (std > 0), (self._raw - mean) / std, np.nan
+            )
+        return self._series(zscore)
@@ -18,6 +18,9 @@ import numpy as np
 import pandas as pd
 from loguru import logger
 
+from src.features.frame import FeatureTarget, _output_frame
+from src.features.rolling import RollingStats
+
 
 def calculate_true_range(
     high: pd.Series,
@@ -81,7 +84,7 @@ def calculate_atr(
         >>> stop_loss = 2 * atr  # Stop de 2x ATR
     """
     true_range = calculate_true_range(df[high_col], df[low_col], df[close_col])
-    atr = true_range.rolling(window=period).mean()
+    atr = RollingStats(true_range, [period]).mean(period)
 
     logger.debug(f"Calculado ATR({period})")
     return atr
@@ -113,13 +116,17 @@ def calculate_atr_percent(
 def calculate_rolling_std(
     returns: pd.Series,
     windows: list[int] | None = None,
+    stats: RollingStats | None = None,
 ) -> pd.DataFrame:
     """
     Calcula desvio padrão rolling de retornos em múltiplas janelas.
 
+    Todas as janelas saem das mesmas somas cumulativas (`RollingStats`).
+
     Args:
         returns: Série de retornos (%)
         windows: Lista de janelas em dias (default: [5, 10, 20])
+        stats: Estatísticas rolling já calculadas sobre `returns` (opcional)
 
     Returns:
         DataFrame com colunas de volatilidade para cada janela
@@ -133,10 +140,11 @@ def calculate_rolling_std(
     if windows is None:
         windows = [5, 10, 20]
 
+    stats = stats or RollingStats(returns, windows)
     result = pd.DataFrame(index=returns.index)
 
     for window in windows:
-        result[f"volatility_{window}d"] = returns.rolling(window=window).std()
+        result[f"volatility_{window}d"] = stats.std(window)
 
     logger.debug(f"Calculada volatilidade rolling para janelas: {windows}")
     return result
@@ -146,6 +154,7 @@ def calculate_annualized_volatility(
     returns: pd.Series,
     window: int = 20,
     trading_days: int = 252,
+    stats: RollingStats | None = None,
 ) -> pd.Series:
     """
     Calcula volatilidade anualizada.
@@ -154,18 +163,41 @@ def calculate_annualized_volatility(
         returns: Série de retornos diários (%)
         window: Janela para cálculo (default: 20 dias)
         trading_days: Dias de trading por ano (default: 252)
+        stats: Estatísticas rolling já calculadas sobre `returns` (opcional)
 
     Returns:
         Série com volatilidade anualizada (%)
     """
-    daily_std = returns.rolling(window=window).std()
+    daily_std = (stats or RollingStats(returns, [window])).std(window)
     return daily_std * np.sqrt(trading_days)
 
 
+def calculate_ewma_volatility(
+    returns: pd.Series,
+    span: int = 20,
+) -> pd.Series:
+    """
+    Calcula volatilidade EWMA (estilo RiskMetrics, média zero).
+
+    sigma²_t = (1 - alpha) * sigma²_{t-1} + alpha * r²_t, com alpha = 2 / (span + 1).
+    Valores NaN mantêm a estimativa anterior.
+
+    Args:
+        returns: Série de retornos (%)
+        span: Span da média exponencial (default: 20)
+
+    Returns:
+        Série com volatilidade EWMA (mesma unidade dos retornos)
+    """
+    variance = (returns ** 2).ewm(span=span, adjust=False, ignore_na=True).mean()
+    return np.sqrt(variance)
+
+
 def calculate_volatility_ratio(
     returns: pd.Series,
     short_window: int = 5,
     long_window: int = 20,
+    stats: RollingStats | None = None,
 ) -> pd.Series:
     """
     Calcula razão de volatilidade curto/longo prazo.
@@ -178,17 +210,19 @@ def calculate_volatility_ratio(
         returns: Série de retornos
         short_window: Janela curta (default: 5 dias)
         long_window: Janela longa (default: 20 dias)
+        stats: Estatísticas rolling já calculadas sobre `returns` (opcional)
 
     Returns:
         Série com razão de volatilidade
     """
-    short_vol = returns.rolling(window=short_window).std()
-    long_vol = returns.rolling(window=long_window).std()
+    stats = stats or RollingStats(returns, [short_window, long_window])
+    short_vol = stats.std(short_window)
+    long_vol = stats.std(long_window)
     return short_vol / long_vol
 
 
 def add_volatility_features(
-    df: pd.DataFrame,
+    df: FeatureTarget,
     close_col: str = "close",
     high_col: str | None = None,
     low_col: str | None = None,
@@ -196,10 +230,15 @@ def add_volatility_features(
     windows: list[int] | None = None,
     include_atr: bool = True,
     include_ratio: bool = True,
-) -> pd.DataFrame:
+    stats: RollingStats | None = None,
+    inplace: bool = False,
+) -> FeatureTarget:
     """
     Adiciona features de volatilidade a um DataFrame.
 
+    Volatilidades e ratio compartilham uma única passada de `RollingStats`
+    sobre os retornos; o mesmo vale para as duas janelas de ATR.
+
     Args:
         df: DataFrame com dados de preços
         close_col: Nome da coluna de fechamento
@@ -209,6 +248,10 @@ def add_volatility_features(
         windows: Janelas para volatilidade rolling (default: [5, 10, 20])
         include_atr: Se True e high/low disponíveis, inclui ATR
         include_ratio: Se True, inclui volatility ratio (5d/20d)
+        stats: Estatísticas rolling dos retornos de `close_col` (pct_change * 100)
+               já calculadas, ex: compartilhadas com `add_zscore_features`
+        inplace: Se True, acrescenta as colunas ao próprio `df` (sem cópia).
+                 Um `FeatureFrame` é sempre alterado no lugar
 
     Returns:
         DataFrame com novas colunas de volatilidade
@@ -216,13 +259,16 @@ def add_volatility_features(
     if windows is None:
         windows = [5, 10, 20]
 
-    df = df.copy()
+    df = _output_frame(df, inplace)
 
     # Calcula retornos para volatilidade
-    returns = df[close_col].pct_change() * 100
+    if stats is None:
+        returns = df[close_col].pct_change() * 100
+        stats = RollingStats(returns, [*windows, 5, 20] if include_ratio else windows)
+    returns = stats.values
 
     # Volatilidade rolling
-    vol = calculate_rolling_std(returns, windows=windows)
+    vol = calculate_rolling_std(returns, windows=windows, stats=stats)
     for col in vol.columns:
         new_col = f"{prefix}{col}" if prefix else col
         df[new_col] = vol[col]
@@ -230,12 +276,11 @@ def add_volatility_features(
     # ATR (se high/low disponíveis)
     if include_atr and high_col and low_col:
         if high_col in df.columns and low_col in df.columns:
+            true_range = calculate_true_range(df[high_col], df[low_col], df[close_col])
+            atr_stats = RollingStats(true_range, [14, 20])
             for period in [14, 20]:
                 atr_col = f"{prefix}atr_{period}" if prefix else f"atr_{period}"
-                df[atr_col] = calculate_atr(
-                    df, period=period,
-                    high_col=high_col, low_col=low_col, close_col=close_col
-                )
+                df[atr_col] = atr_stats.mean(period)
                 # ATR percentual
                 atr_pct_col = f"{prefix}atr_pct_{period}" if prefix else f"atr_pct_{period}"
                 df[atr_pct_col] = (df[atr_col] / df[close_col]) * 100
@@ -243,7 +288,9 @@ def add_volatility_features(
     # Volatility ratio
     if include_ratio and 5 in windows and 20 in windows:
         ratio_col = f"{prefix}vol_ratio_5_20" if prefix else "vol_ratio_5_20"
-        df[ratio_col] = calculate_volatility_ratio(returns, short_window=5, long_window=20)
+        df[ratio_col] = calculate_volatility_ratio(
+            returns, short_window=5, long_window=20, stats=stats
+        )
 
     logger.debug(f"Adicionadas features de volatilidade para '{close_col}'")
     return df
@@ -270,4 +317,4 @@ def calculate_parkinson_volatility(
     log_hl = np.log(high / low)
     factor = 1 / (4 * np.log(2))
     variance = factor * (log_hl ** 2)
-    return np.sqrt(variance.rolling(window=window).mean()) * 100 * np.sqrt(252)
+    return np.sqrt(RollingStats(variance, [window]).mean(window)) * 100 * np.sqrt(252)
@@ -18,11 +18,15 @@ import numpy as np
 import pandas as pd
 from loguru import logger
 
+from src.features.frame import FeatureTarget, _output_frame
+from src.features.rolling import RollingStats
+
 
 def calculate_zscore(
     values: pd.Series,
     window: int = 20,
     min_periods: int | None = None,
+    stats: RollingStats | None = None,
 ) -> pd.Series:
     """
     Calcula Z-Score rolling de uma série.
@@ -33,6 +37,7 @@ def calculate_zscore(
         values: Série de valores (ex: retornos)
         window: Janela para cálculo de média e std (default: 20)
         min_periods: Períodos mínimos para cálculo (default: window // 2)
+        stats: Estatísticas rolling já calculadas sobre `values` (opcional)
 
     Returns:
         Série com Z-Score
@@ -45,13 +50,8 @@ def calculate_zscore(
     if min_periods is None:
         min_periods = max(window // 2, 2)
 
-    rolling_mean = values.rolling(window=window, min_periods=min_periods).mean()
-    rolling_std = values.rolling(window=window, min_periods=min_periods).std()
-
-    # Evita divisão por zero
-    rolling_std = rolling_std.replace(0, np.nan)
-
-    zscore = (values - rolling_mean) / rolling_std
+    # Desvio zero vira NaN (evita divisão por zero)
+    zscore = (stats or RollingStats(values, [window])).zscore(window, min_periods)
 
     logger.debug(f"Calculado Z-Score rolling com janela={window}")
     return zscore
@@ -74,21 +74,16 @@ def calculate_static_zscore(
     Returns:
         Série com Z-Score
     """
-    if lookback:
-        mean = values.rolling(window=lookback, min_periods=1).mean()
-        std = values.rolling(window=lookback, min_periods=1).std()
-    else:
-        mean = values.expanding().mean()
-        std = values.expanding().std()
-
-    std = std.replace(0, np.nan)
-    return (values - mean) / std
+    # Sem lookback a janela cobre todo o histórico (expanding)
+    window = lookback or max(len(values), 1)
+    return RollingStats(values, [window]).zscore(window, min_periods=1)
 
 
 def calculate_zscore_threshold(
     values: pd.Series,
     window: int = 20,
     threshold: float = 1.5,
+    stats: RollingStats | None = None,
 ) -> pd.Series:
     """
     Retorna sinal baseado em Z-Score e threshold.
@@ -97,6 +92,7 @@ def calculate_zscore_threshold(
         values: Série de valores
         window: Janela para Z-Score
         threshold: Limite para gerar sinal (default: 1.5)
+        stats: Estatísticas rolling já calculadas sobre `values` (opcional)
 
     Returns:
         Série com sinais:
@@ -110,26 +106,95 @@ def calculate_zscore_threshold(
         >>> # signal == 1 → considerar LONG
         >>> # signal == -1 → considerar SHORT
     """
-    zscore = calculate_zscore(values, window=window)
+    zscore = calculate_zscore(values, window=window, stats=stats)
+    return threshold_signal(zscore, threshold)
+
+
+def calculate_zscore_signal(
+    values: pd.Series,
+    window: int = 20,
+    threshold: float = 1.5,
+    min_periods: int | None = None,
+    stats: RollingStats | None = None,
+) -> tuple[pd.Series, pd.Series]:
+    """
+    Calcula Z-Score e sinal juntos, numa única passada rolling.
+
+    Caminho compacto para gerar features em massa (ex: varreduras de
+    parâmetros): o sinal sai do mesmo Z-Score, sem recalcular nem alocar
+    máscaras intermediárias.
+
+    Args:
+        values: Série de valores (ex: retornos)
+        window: Janela para Z-Score (default: 20)
+        threshold: Limite para gerar sinal (default: 1.5)
+        min_periods: Períodos mínimos para cálculo (default: window // 2)
+        stats: Estatísticas rolling já calculadas sobre `values` (opcional)
 
-    signal = pd.Series(0, index=values.index)
-    signal[zscore > threshold] = 1
-    signal[zscore < -threshold] = -1
+    Returns:
+        Tupla (Z-Score em float32, sinal 1/-1/0 em int8). O sinal é
+        calculado sobre o Z-Score em float64, como em `calculate_zscore_threshold`.
+        Com `values` nomeada (ex: 'return_1d'), as séries se chamam
+        'return_1d_zscore_20' e 'return_1d_zscore_signal_20'; sem nome, ficam sem nome.
+    """
+    if min_periods is None:
+        min_periods = max(window // 2, 2)
 
+    zscore = (stats or RollingStats(values, [window])).zscore(window, min_periods).to_numpy()
+    signal = _signal_array(zscore, threshold)
+
+    name = values.name
+    return (
+        pd.Series(
+            zscore.astype(np.float32), index=values.index, copy=False,
+            name=None if name is None else f"{name}_zscore_{window}",
+        ),
+        pd.Series(
+            signal, index=values.index, copy=False,
+            name=None if name is None else f"{name}_zscore_signal_{window}",
+        ),
+    )
+
+
+def _signal_array(zscore: np.ndarray, threshold: float) -> np.ndarray:
+    """Sinal int8 (z > threshold) - (z < -threshold); NaN resulta em 0."""
+    signal = (zscore > threshold).view(np.int8)
+    signal -= zscore < -threshold
     return signal
 
 
+def threshold_signal(zscore: pd.Series, threshold: float = 1.5) -> pd.Series:
+    """
+    Sinal 1/-1/0 a partir de um Z-Score já calculado.
+
+    Args:
+        zscore: Série de Z-Score (NaN resulta em 0)
+        threshold: Limite para gerar sinal (default: 1.5)
+
+    Returns:
+        Série int64 com 1 (Z-Score > threshold), -1 (< -threshold) ou 0
+    """
+    signal = _signal_array(zscore.to_numpy(dtype=np.float64, na_value=np.nan), threshold)
+    return pd.Series(signal.astype(np.int64), index=zscore.index)
+
+
 def add_zscore_features(
-    df: pd.DataFrame,
+    df: FeatureTarget,
     value_col: str,
     windows: list[int] | None = None,
     prefix: str = "",
     include_signal: bool = True,
     threshold: float = 1.5,
-) -> pd.DataFrame:
+    stats: RollingStats | None = None,
+    inplace: bool = False,
+    compact: bool = False,
+) -> FeatureTarget:
     """
     Adiciona features de Z-Score a um DataFrame.
 
+    Todas as janelas saem de uma única passada de `RollingStats`, e o sinal
+    reaproveita o Z-Score da mesma janela.
+
     Args:
         df: DataFrame com coluna de valores
         value_col: Nome da coluna para calcular Z-Score (ex: 'return_1d')
@@ -137,6 +202,12 @@ def add_zscore_features(
         prefix: Prefixo para nomes das colunas
         include_signal: Se True, inclui sinal baseado em threshold
         threshold: Limite para sinal (default: 1.5)
+        stats: Estatísticas rolling de `value_col` já calculadas, ex:
+               compartilhadas com `add_volatility_features`
+        inplace: Se True, acrescenta as colunas ao próprio `df` (sem cópia).
+                 Um `FeatureFrame` é sempre alterado no lugar
+        compact: Se True, grava Z-Score em float32 e sinal em int8
+                 (via `calculate_zscore_signal`)
 
     Returns:
         DataFrame com novas colunas de Z-Score
@@ -149,18 +220,22 @@ def add_zscore_features(
     if windows is None:
         windows = [10, 20]
 
-    df = df.copy()
+    df = _output_frame(df, inplace)
     values = df[value_col]
+    stats = stats or RollingStats(values, windows)
 
     for window in windows:
-        zscore = calculate_zscore(values, window=window)
+        if compact:
+            zscore, signal = calculate_zscore_signal(values, window, threshold, stats=stats)
+        else:
+            zscore = calculate_zscore(values, window=window, stats=stats)
 
         zscore_col = f"{prefix}{value_col}_zscore_{window}" if prefix else f"{value_col}_zscore_{window}"
         df[zscore_col] = zscore
 
         if include_signal:
             signal_col = f"{prefix}{value_col}_zscore_signal_{window}" if prefix else f"{value_col}_zscore_signal_{window}"
-            df[signal_col] = calculate_zscore_threshold(values, window=window, threshold=threshold)
+            df[signal_col] = signal if compact else threshold_signal(zscore, threshold)
 
     logger.debug(f"Adicionadas features de Z-Score para '{value_col}'")
     return df
@@ -169,6 +244,7 @@ def add_zscore_features(
 def calculate_normalized_return(
     returns: pd.Series,
     window: int = 20,
+    stats: RollingStats | None = None,
 ) -> pd.Series:
     """
     Calcula retorno normalizado pela volatilidade (tipo Sharpe instantâneo).
@@ -176,11 +252,12 @@ def calculate_normalized_return(
     Args:
         returns: Série de retornos (%)
         window: Janela para volatilidade (default: 20)
+        stats: Estatísticas rolling já calculadas sobre `returns` (opcional)
 
     Returns:
         Série com retornos normalizados
     """
-    rolling_std = returns.rolling(window=window).std()
+    rolling_std = (stats or RollingStats(returns, [window])).std(window)
     rolling_std = rolling_std.replace(0, np.nan)
     return returns / rolling_std
 
@@ -189,6 +266,7 @@ def is_extreme_move(
     values: pd.Series,
     window: int = 20,
     threshold: float = 2.0,
+    stats: RollingStats | None = None,
 ) -> pd.Series:
     """
     Identifica movimentos extremos (Z-Score > threshold).
@@ -202,11 +280,12 @@ def is_extreme_move(
         values: Série de valores
         window: Janela para Z-Score
         threshold: Limite para considerar extremo
+        stats: Estatísticas rolling já calculadas sobre `values` (opcional)
 
     Returns:
         Série booleana (True = movimento extremo)
     """
-    zscore = calculate_zscore(values, window=window)
+    zscore = calculate_zscore(values, window=window, stats=stats)
     return abs(zscore) > threshold
 
 
@@ -4,6 +4,7 @@ Módulo de estratégia de trading.
 Contém geradores de sinais e lógica de trading.
 """
 
+from src.strategy.rules import RULES_VERSION, apply_signal_rules, calculate_usd_brl_change
 from src.strategy.signal_generator import SignalGenerator
 
-__all__ = ["SignalGenerator"]
\ No newline at end of file
+__all__ = ["RULES_VERSION", "SignalGenerator", "apply_signal_rules", "calculate_usd_brl_change"]
\ No newline at end of file
@@ -0,0 +1,482 @@
+"""
+Estado rolling incremental do gerador de sinais.
+
+Mantém fechamentos diários, retornos e momentos (somas, somas de quadrados
+e produtos cruzados) em janelas circulares de tamanho fixo, atualizados
+apenas com as barras novas. O custo de cada atualização e de cada consulta
+é O(1), independente do tamanho do histórico.
+
+O estado é salvo em JSON local entre execuções, de modo que cada chamada
+de `SignalGenerator.generate_signal` só precisa buscar os ticks posteriores
+ao último timestamp processado.
+
+O estado só avança: ticks com timestamp anterior ao último processado
+(chegados fora de ordem ou inseridos depois no banco) não podem ser
+incorporados sem reprocessar o histórico, então são descartados com um
+aviso no log. Para incluí-los, descarte o checkpoint e reconstrua o estado
+(`SignalGenerator.refresh_state` faz isso quando ele fica defasado).
+
+Uso:
+    from src.strategy.rolling_state import RollingSignalState
+
+    state = RollingSignalState.load(path, window=20)
+    state.update_iron_ore(iron_ore_df)
+    state.update_vale3(vale3_df)
+    current_return, std_20d, zscore = state.iron_ore_metrics()
+    correlation = state.correlation()
+    state.save(path)
+"""
+
+import json
+import math
+from collections import deque
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import pandas as pd
+from loguru import logger
+
+
+class RollingMoments:
+    """Janela circular com soma e soma de quadrados de uma série."""
+
+    def __init__(self, size: int) -> None:
+        """
+        Args:
+            size: Tamanho da janela.
+        """
+        self.size = size
+        self.buffer = np.zeros(size)
+        self.count = 0
+        self.pos = 0
+        self.total = 0.0
+        self.total_sq = 0.0
+
+    def push(self, x: float) -> None:
+        """Adiciona um valor, descartando o mais antigo se a janela estiver cheia."""
+        if self.count == self.size:
+            old = self.buffer[self.pos]
+            self.total -= old
+            self.total_sq -= old * old
+        else:
+            self.count += 1
+
+        self.buffer[self.pos] = x
+        self.total += x
+        self.total_sq += x * x
+        self.pos = (self.pos + 1) % self.size
+
+        # Recalcula as somas a cada volta completa para evitar deriva numérica
+        if self.pos == 0:
+            self.total = float(self.buffer.sum())
+            self.total_sq = float((self.buffer * self.buffer).sum())
+
+    def std(self) -> float:
+        """Desvio padrão amostral (ddof=1) da janela."""
+        n = self.count
+        if n < 2:
+            return float("nan")
+        var = (self.total_sq - self.total * self.total / n) / (n - 1)
+        return math.sqrt(var) if var > 0 else 0.0
+
+    def values(self) -> list[float]:
+        """Valores da janela em ordem cronológica."""
+        if self.count < self.size:
+            return self.buffer[: self.count].tolist()
+        return np.roll(self.buffer, -self.pos).tolist()
+
+    @classmethod
+    def from_values(cls, size: int, values: list[float]) -> "RollingMoments":
+        """Reconstrói a janela a partir de valores em ordem cronológica."""
+        window = cls(size)
+        for x in values[-size:]:
+            window.push(x)
+        return window
+
+
+class RollingCorrelation:
+    """Janela circular de pares (x, y) com momentos para correlação de Pearson."""
+
+    def __init__(self, size: int) -> None:
+        """
+        Args:
+            size: Tamanho da janela.
+        """
+        self.size = size
+        self.buffer = np.zeros((size, 2))
+        self.count = 0
+        self.pos = 0
+        self.sums = np.zeros(5)  # sx, sy, sxx, syy, sxy
+
+    @staticmethod
+    def _moments(x: float, y: float) -> np.ndarray:
+        return np.array([x, y, x * x, y * y, x * y])
+
+    def push(self, x: float, y: float) -> None:
+        """Adiciona um par, descartando o mais antigo se a janela estiver cheia."""
+        if self.count == self.size:
+            self.sums -= self._moments(*self.buffer[self.pos])
+        else:
+            self.count += 1
+
+        self.buffer[self.pos] = (x, y)
+        self.sums += self._moments(x, y)
+        self.pos = (self.pos + 1) % self.size
+
+        if self.pos == 0:
+            x_all, y_all = self.buffer[:, 0], self.buffer[:, 1]
+            self.sums = np.array([
+                x_all.sum(), y_all.sum(),
+                (x_all * x_all).sum(), (y_all * y_all).sum(), (x_all * y_all).sum(),
+            ])
+
+    def corr(self, extra: tuple[float, float] | None = None) -> tuple[float, int]:
+        """
+        Correlação de Pearson da janela.
+
+        Args:
+            extra: Par provisório (ainda não consolidado) a incluir como
+                   observação mais recente, descartando a mais antiga se
+                   a janela estiver cheia.
+
+        Returns:
+            Tuple (correlação, número de observações).
+        """
+        sums = self.sums.copy()
+        n = self.count
+        if extra is not None:
+            if n == self.size:
+                sums -= self._moments(*self.buffer[self.pos])
+            else:
+                n += 1
+            sums += self._moments(*extra)
+
+        if n < 2:
+            return float("nan"), n
+
+        sx, sy, sxx, syy, sxy = sums
+        cov = sxy - sx * sy / n
+        var_x = sxx - sx * sx / n
+        var_y = syy - sy * sy / n
+        if var_x <= 0 or var_y <= 0:
+            return float("nan"), n
+        return float(cov / math.sqrt(var_x * var_y)), n
+
+    def values(self) -> list[list[float]]:
+        """Pares da janela em ordem cronológica."""
+        if self.count < self.size:
+            return self.buffer[: self.count].tolist()
+        return np.roll(self.buffer, -self.pos, axis=0).tolist()
+
+    @classmethod
+    def from_values(cls, size: int, values: list[list[float]]) -> "RollingCorrelation":
+        """Reconstrói a janela a partir de pares em ordem cronológica."""
+        window = cls(size)
+        for x, y in values[-size:]:
+            window.push(x, y)
+        return window
+
+
+class RollingSignalState:
+    """
+    Estado rolling dos dados usados pelo gerador de sinais.
+
+    Semântica (equivalente ao cálculo com `groupby(index.date).last()`):
+    - O fechamento diário é o último preço de cada data (UTC).
+    - O retorno atual do minério é o fechamento corrente do dia sobre o
+      último fechamento consolidado; o desvio padrão usa os `window`
+      retornos diários consolidados anteriores.
+    - A correlação usa os últimos `window` retornos diários pareados
+      (datas com minério e VALE3), incluindo o par da data mais recente
+      ainda aberta em ambas as séries.
+    """
+
+    def __init__(self, window: int = 20, tick_horizon_hours: int = 3) -> None:
+        """
+        Args:
+            window: Janela rolling em dias.
+            tick_horizon_hours: Horas de ticks brutos mantidos para o filtro
+                                de direção consistente.
+        """
+        self.window = window
+        self.tick_horizon = timedelta(hours=tick_horizon_hours)
+
+        # Minério: dia corrente e último fechamento consolidado
+        self.iron_ore_day: date | None = None
+        self.iron_ore_close: float | None = None
+        self.iron_ore_prev_close: float | None = None
+        self.iron_ore_returns = RollingMoments(window)
+        self.last_iron_ore_ts: pd.Timestamp | None = None
+
+        # VALE3: apenas o dia corrente (fechamentos ficam em `pending`)
+        self.vale3_day: date | None = None
+        self.last_vale3_ts: pd.Timestamp | None = None
+
+        # Fechamentos ainda não pareados: {data: [minério, vale3]}
+        self.pending: dict[date, list[float | None]] = {}
+        self.last_pair: tuple[float, float] | None = None
+        self.pair_returns = RollingCorrelation(window)
+
+        # Ticks recentes do minério (timestamp, preço)
+        self.recent_ticks: deque[tuple[pd.Timestamp, float]] = deque()
+
+    # ------------------------------------------------------------------
+    # Atualização
+    # ------------------------------------------------------------------
+    def update_iron_ore(self, df: pd.DataFrame, price_col: str = "price") -> int:
+        """
+        Processa novos ticks ou barras de minério (index = timestamp, ordenado).
+
+        Ticks com timestamp anterior ao último processado são descartados
+        (ver docstring do módulo) e contados num aviso do log. Um tick com o
+        mesmo timestamp do último substitui o preço dele (barra aberta
+        relida com o close atualizado).
+
+        Returns:
+            Número de ticks aplicados.
+        """
+        if df.empty:
+            return 0
+
+        applied = late = 0
+        for ts, price in zip(df.index, df[price_col].to_numpy(dtype=float)):
+            ts = pd.Timestamp(ts)
+            if self.last_iron_ore_ts is not None and ts < self.last_iron_ore_ts:
+                late += 1
+                continue
+            if np.isnan(price):
+                continue
+            self._push_iron_ore(ts, float(price))
+            applied += 1
+
+        if late:
+            logger.warning(
+                f"{late} tick(s) de minério anteriores ao último processado "
+                f"({self.last_iron_ore_ts}) descartados"
+            )
+        self._flush_pairs()
+        self._trim_ticks()
+        return applied
+
+    def update_vale3(self, df: pd.DataFrame, price_col: str = "close") -> int:
+        """
+        Processa novos preços de VALE3 (index = timestamp, ordenado).
+
+        Registros anteriores ao último processado são descartados, como em
+        `update_iron_ore`.
+
+        Returns:
+            Número de registros aplicados.
+        """
+        if df.empty:
+            return 0
+
+        applied = late = 0
+        for ts, price in zip(df.index, df[price_col].to_numpy(dtype=float)):
+            ts = pd.Timestamp(ts)
+            if self.last_vale3_ts is not None and ts < self.last_vale3_ts:
+                late += 1
+                continue
+            if np.isnan(price):
+                continue
+            day = ts.date()
+            self.pending.setdefault(day, [None, None])[1] = float(price)
+            self.vale3_day = day
+            self.last_vale3_ts = ts
+            applied += 1
+
+        if late:
+            logger.warning(
+                f"{late} preço(s) de VALE3 anteriores ao último processado "
+                f"({self.last_vale3_ts}) descartados"
+            )
+        self._flush_pairs()
+        return applied
+
+    def _push_iron_ore(self, ts: pd.Timestamp, price: float) -> None:
+        day = ts.date()
+        if self.iron_ore_day is not None and day > self.iron_ore_day:
+            # Consolida o fechamento do dia anterior
+            if self.iron_ore_prev_close:
+                self.iron_ore_returns.push(self.iron_ore_close / self.iron_ore_prev_close - 1)
+            self.iron_ore_prev_close = self.iron_ore_close
+
+        self.iron_ore_day = day
+        self.iron_ore_close = price
+        self.pending.setdefault(day, [None, None])[0] = price
+        self.last_iron_ore_ts = ts
+        if self.recent_ticks and self.recent_ticks[-1][0] == ts:
+            # Mesma barra relida (barra aberta atualizada): substitui o close
+            self.recent_ticks[-1] = (ts, price)
+        else:
+            self.recent_ticks.append((ts, price))
+
+    def _flush_pairs(self) -> None:
+        """Consolida pares de datas já encerradas em ambas as séries."""
+        if self.iron_ore_day is None or self.vale3_day is None:
+            return
+
+        open_day = min(self.iron_ore_day, self.vale3_day)
+        for day in sorted(d for d in self.pending if d < open_day):
+            io_close, vale_close = self.pending.pop(day)
+            if io_close is None or vale_close is None:
+                continue
+            if self.last_pair is not None:
+                self.pair_returns.push(
+                    io_close / self.last_pair[0] - 1,
+                    vale_close / self.last_pair[1] - 1,
+                )
+            self.last_pair = (io_close, vale_close)
+
+    def _trim_ticks(self) -> None:
+        if not self.recent_ticks:
+            return
+        cutoff = self.recent_ticks[-1][0] - self.tick_horizon
+        while self.recent_ticks and self.recent_ticks[0][0] < cutoff:
+            self.recent_ticks.popleft()
+
+    # ------------------------------------------------------------------
+    # Consultas O(1)
+    # ------------------------------------------------------------------
+    @property
+    def empty(self) -> bool:
+        """True se nenhum tick de minério foi processado."""
+        return self.last_iron_ore_ts is None
+
+    def iron_ore_metrics(self) -> tuple[float, float, float]:
+        """
+        Retorna métricas do minério a partir do estado.
+
+        Returns:
+            Tuple (retorno_atual, std_20d, zscore).
+        """
+        if not self.iron_ore_prev_close or self.iron_ore_returns.count < self.window:
+            return 0.0, 0.0, 0.0
+
+        current_return = self.iron_ore_close / self.iron_ore_prev_close - 1
+        historical_std = self.iron_ore_returns.std()
+
+        if historical_std == 0 or np.isnan(historical_std):
+            return current_return, 0.0, 0.0
+
+        return current_return, historical_std, current_return / historical_std
+
+    def correlation(self) -> float:
+        """Correlação dos retornos diários pareados minério x VALE3."""
+        if self.iron_ore_day is None or self.vale3_day is None:
+            return 0.0
+
+        extra = None
+        closes = self.pending.get(min(self.iron_ore_day, self.vale3_day))
+        if (
+            self.last_pair is not None
+            and closes is not None
+            and closes[0] is not None
+            and closes[1] is not None
+        ):
+            extra = (closes[0] / self.last_pair[0] - 1, closes[1] / self.last_pair[1] - 1)
+
+        correlation, n = self.pair_returns.corr(extra)
+        if n < self.window or np.isnan(correlation):
+            return 0.0
+        return correlation
+
+    def recent_ticks_frame(self) -> pd.DataFrame:
+        """Ticks recentes do minério como DataFrame (index = timestamp)."""
+        if not self.recent_ticks:
+            return pd.DataFrame()
+        timestamps, prices = zip(*self.recent_ticks)
+        return pd.DataFrame({"price": prices}, index=pd.DatetimeIndex(timestamps, name="timestamp"))
+
+    def is_stale(self, max_age: timedelta, now: datetime) -> bool:
+        """True se o último tick processado for mais antigo que `max_age`."""
+        return self.last_iron_ore_ts is None or now - self.last_iron_ore_ts > max_age
+
+    # ------------------------------------------------------------------
+    # Checkpoint
+    # ------------------------------------------------------------------
+    def to_dict(self) -> dict[str, Any]:
+        """Serializa o estado para JSON."""
+
+        def _ts(value: pd.Timestamp | None) -> str | None:
+            return value.isoformat() if value is not None else None
+
+        def _day(value: date | None) -> str | None:
+            return value.isoformat() if value is not None else None
+
+        return {
+            "window": self.window,
+            "tick_horizon_hours": self.tick_horizon.total_seconds() / 3600,
+            "iron_ore_day": _day(self.iron_ore_day),
+            "iron_ore_close": self.iron_ore_close,
+            "iron_ore_prev_close": self.iron_ore_prev_close,
+            "iron_ore_returns": self.iron_ore_returns.values(),
+            "last_iron_ore_ts": _ts(self.last_iron_ore_ts),
+            "vale3_day": _day(self.vale3_day),
+            "last_vale3_ts": _ts(self.last_vale3_ts),
+            "pending": {d.isoformat(): closes for d, closes in self.pending.items()},
+            "last_pair": list(self.last_pair) if self.last_pair else None,
+            "pair_returns": self.pair_returns.values(),
+            "recent_ticks": [[ts.isoformat(), price] for ts, price in self.recent_ticks],
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "RollingSignalState":
+        """Reconstrói o estado a partir de `to_dict`."""
+
+        def _ts(value: str | None) -> pd.Timestamp | None:
+            return pd.Timestamp(value) if value else None
+
+        def _day(value: str | None) -> date | None:
+            return date.fromisoformat(value) if value else None
+
+        window = int(data["window"])
+        state = cls(window=window, tick_horizon_hours=data.get("tick_horizon_hours", 3))
+        state.iron_ore_day = _day(data.get("iron_ore_day"))
+        state.iron_ore_close = data.get("iron_ore_close")
+        state.iron_ore_prev_close = data.get("iron_ore_prev_close")
+        state.iron_ore_returns = RollingMoments.from_values(window, data.get("iron_ore_returns", []))
+        state.last_iron_ore_ts = _ts(data.get("last_iron_ore_ts"))
+        state.vale3_day = _day(data.get("vale3_day"))
+        state.last_vale3_ts = _ts(data.get("last_vale3_ts"))
+        state.pending = {
+            date.fromisoformat(d): list(closes) for d, closes in data.get("pending", {}).items()
+        }
+        last_pair = data.get("last_pair")
+        state.last_pair = tuple(last_pair) if last_pair else None
+        state.pair_returns = RollingCorrelation.from_values(window, data.get("pair_returns", []))
+        state.recent_ticks = deque(
+            (pd.Timestamp(ts), float(price)) for ts, price in data.get("recent_ticks", [])
+        )
+        return state
+
+    def save(self, path: Path) -> None:
+        """Salva o checkpoint de forma atômica."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(path.suffix + ".tmp")
+        tmp_path.write_text(json.dumps(self.to_dict()))
+        tmp_path.replace(path)
+
+    @classmethod
+    def load(cls, path: Path, window: int = 20) -> "RollingSignalState":
+        """
+        Carrega checkpoint local ou cria estado vazio.
+
+        Um checkpoint com janela diferente da configurada é descartado.
+        """
+        if not path.exists():
+            return cls(window=window)
+
+        try:
+            state = cls.from_dict(json.loads(path.read_text()))
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.warning(f"Checkpoint de estado inválido ({path.name}): {e}")
+            return cls(window=window)
+
+        if state.window != window:
+            logger.info(f"Janela do checkpoint ({state.window}) difere de {window}, recriando estado")
+            return cls(window=window)
+
+        return state
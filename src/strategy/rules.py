@@ -0,0 +1,97 @@
+"""
+Regras de sinal da estratégia Minério → VALE3.
+
+Fonte única das regras LONG/SHORT/NO-TRADE usadas pelo replay de sinais
+(`SignalGenerator.generate_signals_batch`), pelo backtest
+(`generate_backtest_signals`) e pelo walk-forward, para que os três não
+divirjam. Os limites vêm de src/config.py.
+
+- LONG: retorno do minério > threshold x escala (std dos retornos anteriores)
+- SHORT: retorno do minério < -threshold x escala
+- NO-TRADE: escala indisponível ou zero, correlação < correlation_threshold,
+  VIX > vix_threshold, |variação USD/BRL| >= usd_brl_threshold ou direção
+  intradiária inconsistente
+
+Valores ausentes de VIX e USD/BRL não bloqueiam o sinal.
+
+Qualquer mudança de comportamento aqui deve incrementar `RULES_VERSION`,
+que invalida resultados em cache calculados com as regras antigas (ex:
+folds do walk-forward).
+"""
+
+import numpy as np
+import pandas as pd
+
+from src.config import (
+    CORRELATION_THRESHOLD,
+    SIGNAL_THRESHOLD_STD,
+    USD_BRL_CHANGE_THRESHOLD,
+    VIX_THRESHOLD,
+)
+
+# Versão das regras (incrementar ao mudar o comportamento de apply_signal_rules)
+RULES_VERSION = "1"
+
+
+def calculate_usd_brl_change(usd_brl: pd.Series) -> pd.Series:
+    """
+    Variação de USD/BRL entre registros consecutivos (fração, não %).
+
+    Cotações ausentes repetem a anterior (variação zero), como o
+    `pct_change()` padrão do pandas.
+
+    Args:
+        usd_brl: Cotações em ordem cronológica
+
+    Returns:
+        Série com a variação relativa (NaN no primeiro registro)
+    """
+    return pd.to_numeric(usd_brl, errors="coerce").ffill().pct_change(fill_method=None)
+
+
+def apply_signal_rules(
+    returns: np.ndarray,
+    scale: np.ndarray,
+    correlation: np.ndarray,
+    vix: np.ndarray | None = None,
+    usd_brl_change: np.ndarray | None = None,
+    direction_consistent: np.ndarray | None = None,
+    threshold: float = SIGNAL_THRESHOLD_STD,
+    correlation_threshold: float = CORRELATION_THRESHOLD,
+    vix_threshold: float = VIX_THRESHOLD,
+    usd_brl_threshold: float = USD_BRL_CHANGE_THRESHOLD,
+) -> np.ndarray:
+    """
+    Aplica as regras da estratégia elemento a elemento.
+
+    Args:
+        returns: Retorno do minério em cada ponto
+        scale: Desvio padrão dos retornos anteriores (NaN/0 → NO-TRADE)
+        correlation: Correlação minério x VALE3 conhecida no ponto
+        vix: VIX (opcional)
+        usd_brl_change: Variação de USD/BRL (opcional, ver `calculate_usd_brl_change`)
+        direction_consistent: Filtro de direção intradiária (opcional)
+        threshold: Múltiplo de desvio padrão para sinal
+        correlation_threshold: Correlação mínima para operar
+        vix_threshold: VIX máximo para operar
+        usd_brl_threshold: Variação absoluta máxima de USD/BRL para operar
+
+    Returns:
+        Array int8 com 1 (LONG), -1 (SHORT) ou 0
+    """
+    returns = np.asarray(returns, dtype=float)
+    scale = np.asarray(scale, dtype=float)
+
+    tradeable = (scale > 0) & (np.asarray(correlation, dtype=float) >= correlation_threshold)
+    if vix is not None:
+        tradeable &= ~(np.asarray(vix, dtype=float) > vix_threshold)
+    if usd_brl_change is not None:
+        tradeable &= ~(np.abs(np.asarray(usd_brl_change, dtype=float)) >= usd_brl_threshold)
+    if direction_consistent is not None:
+        tradeable &= np.asarray(direction_consistent, dtype=bool)
+
+    limit = threshold * scale
+    signals = np.zeros(len(returns), dtype=np.int8)
+    signals[tradeable & (returns > limit)] = 1
+    signals[tradeable & (returns < -limit)] = -1
+    return signals
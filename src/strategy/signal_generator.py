@@ -10,96 +10,230 @@ Filtros NO-TRADE:
 - Gap abertura B3 > 2%
 - Correlação rolling 20d < 0.2
 - Feriado em BR, SG ou CN
+
+Os fechamentos diários, a volatilidade e a correlação são mantidos em um
+estado rolling incremental (`RollingSignalState`) salvo localmente, de modo
+que cada execução busca apenas os dados posteriores ao último processado.
+O minério vem das barras pré-agregadas na ingestão (prices_iron_ore_bars,
+front month): barras de 1d reconstroem o histórico e barras de 5m alimentam
+o dia corrente e o filtro de direção. As três séries (minério, VALE3,
+auxiliares) são buscadas em paralelo.
+
+`generate_signals_batch` reavalia as mesmas regras sobre todo o histórico
+em arrays NumPy, para replay e backtest sem consultas ao banco.
 """
 
 import asyncio
 from datetime import datetime, timedelta, timezone
+from functools import partial
+from pathlib import Path
 from typing import Any
 
 import numpy as np
 import pandas as pd
 from loguru import logger
+from supabase import Client
 
 from src.config import (
     CORRELATION_THRESHOLD,
+    DAILY_CLOSE_IRON_ORE,
+    DAILY_CLOSE_VALE3,
     ROLLING_WINDOW,
+    SIGNAL_STATE_PATH,
     SIGNAL_THRESHOLD_STD,
     TELEGRAM_BOT_TOKEN,
+    USD_BRL_CHANGE_THRESHOLD,
+    VIX_THRESHOLD,
 )
-from src.db.client import get_supabase, save_signal
+from src.db.client import (
+    build_timeseries_query,
+    fetch_concurrently,
+    get_daily_closes,
+    get_supabase,
+    read_iron_ore_bars,
+    read_timeseries,
+    save_signal,
+)
+from src.strategy.rolling_state import RollingSignalState
+from src.strategy.rules import apply_signal_rules, calculate_usd_brl_change
 
 
 class SignalGenerator:
     """Gerador de sinais de trading."""
 
-    def __init__(self) -> None:
-        """Inicializa o gerador."""
-        self.client = get_supabase()
+    def __init__(self, state_path: Path | None = None) -> None:
+        """
+        Inicializa o gerador.
+
+        Args:
+            state_path: Caminho do checkpoint do estado rolling
+                        (default: SIGNAL_STATE_PATH).
+        """
+        self._client: Client | None = None
         self.rolling_window = ROLLING_WINDOW
         self.signal_threshold = SIGNAL_THRESHOLD_STD
         self.correlation_threshold = CORRELATION_THRESHOLD
+        self.vix_threshold = VIX_THRESHOLD
+        self.usd_brl_threshold = USD_BRL_CHANGE_THRESHOLD
+        self.state_path = state_path or SIGNAL_STATE_PATH
+        self.state = RollingSignalState.load(self.state_path, window=self.rolling_window)
+
+    @property
+    def client(self) -> Client:
+        """Cliente Supabase, criado apenas quando há acesso ao banco."""
+        if self._client is None:
+            self._client = get_supabase()
+        return self._client
+
+    @property
+    def bootstrap_days(self) -> int:
+        """Dias corridos buscados para reconstruir o estado do zero."""
+        # Margem para fins de semana e feriados: `rolling_window` pregões
+        return 2 * self.rolling_window + 5
+
+    def _read_iron_ore(self, days: int = 30, after: datetime | None = None) -> pd.DataFrame:
+        """Leitura paginada dos ticks de minério (ver `get_recent_iron_ore_prices`)."""
+        since = None if after is not None else datetime.now(timezone.utc) - timedelta(days=days)
+        return read_timeseries(
+            "prices_iron_ore", "timestamp, price, symbol",
+            since=since, after=after, client=self.client,
+        )
+
+    def _read_iron_ore_bars(
+        self, timeframe: str, since: datetime, variable_key: str | None = None
+    ) -> pd.DataFrame:
+        """Leitura paginada das barras de minério (ver `get_iron_ore_bars`)."""
+        return read_iron_ore_bars(
+            timeframe, since=since, variable_key=variable_key, client=self.client
+        )
 
-    def get_recent_iron_ore_prices(self, days: int = 30) -> pd.DataFrame:
+    def _read_vale3(
+        self, days: int = 30, after: datetime | None = None, since: datetime | None = None
+    ) -> pd.DataFrame:
+        """Leitura paginada dos preços de VALE3 (ver `get_recent_vale3_prices`)."""
+        if after is None and since is None:
+            since = datetime.now(timezone.utc) - timedelta(days=days)
+        return read_timeseries(
+            "prices_vale3", "timestamp, close", since=since, after=after, client=self.client
+        )
+
+    def _auxiliary_query(self) -> Any:
+        """Consulta dos dois registros auxiliares mais recentes (ver `_latest_auxiliary`)."""
+        return build_timeseries_query("auxiliary_data", latest=True, limit=2, client=self.client)
+
+    @staticmethod
+    def _latest_auxiliary(rows: list[dict[str, Any]] | None) -> dict[str, Any]:
+        """
+        Registro auxiliar mais recente com `usd_brl_change`.
+
+        A variação de USD/BRL é calculada contra o registro anterior com
+        `calculate_usd_brl_change`, a mesma definição do replay e do backtest.
+
+        Args:
+            rows: Registros do mais novo para o mais antigo (`_auxiliary_query`)
+
+        Returns:
+            Dict com usd_brl, vix, ibov e usd_brl_change (vazio sem dados).
+        """
+        if not rows:
+            return {}
+        latest = dict(rows[0])
+        if latest.get("usd_brl_change") is None:
+            usd_brl = pd.Series([row.get("usd_brl") for row in reversed(rows)], dtype=object)
+            change = calculate_usd_brl_change(usd_brl).iloc[-1]
+            latest["usd_brl_change"] = None if pd.isna(change) else float(change)
+        return latest
+
+    def get_recent_iron_ore_prices(
+        self, days: int = 30, after: datetime | None = None
+    ) -> pd.DataFrame:
         """
         Busca preços recentes de minério de ferro.
 
         Args:
             days: Número de dias para buscar.
+            after: Se informado, busca apenas registros posteriores a este
+                   timestamp (ignora `days`).
 
         Returns:
             DataFrame com preços.
         """
-        since = datetime.now(timezone.utc) - timedelta(days=days)
-
         try:
-            result = (
-                self.client.table("prices_iron_ore")
-                .select("timestamp, price, symbol")
-                .gte("timestamp", since.isoformat())
-                .order("timestamp", desc=False)
-                .execute()
-            )
-
-            if not result.data:
-                return pd.DataFrame()
-
-            df = pd.DataFrame(result.data)
-            df["timestamp"] = pd.to_datetime(df["timestamp"])
-            df = df.set_index("timestamp")
-            return df
+            return self._read_iron_ore(days, after)
 
         except Exception as e:
             logger.error(f"Erro ao buscar preços minério: {e}")
             return pd.DataFrame()
 
-    def get_recent_vale3_prices(self, days: int = 30) -> pd.DataFrame:
+    def get_iron_ore_bars(
+        self, timeframe: str = "1d", days: int = 30, variable_key: str | None = None
+    ) -> pd.DataFrame:
         """
-        Busca preços recentes de VALE3.
+        Busca barras OHLC de minério pré-agregadas na ingestão.
 
         Args:
+            timeframe: '5m', '1h' ou '1d'.
             days: Número de dias para buscar.
+            variable_key: Contrato (default: série contínua do front month).
 
         Returns:
-            DataFrame com preços.
+            DataFrame de barras (coluna 'close'), aceito por
+            `calculate_iron_ore_return` e `check_direction_consistency`.
         """
-        since = datetime.now(timezone.utc) - timedelta(days=days)
+        try:
+            since = datetime.now(timezone.utc) - timedelta(days=days)
+            return self._read_iron_ore_bars(timeframe, since, variable_key)
+
+        except Exception as e:
+            logger.error(f"Erro ao buscar barras minério: {e}")
+            return pd.DataFrame()
+
+    def get_daily_closes(self, days: int = 60) -> tuple[pd.DataFrame, pd.DataFrame]:
+        """
+        Busca fechamentos diários de minério (front month) e VALE3 do banco.
+
+        Transfere uma linha por dia (tabela daily_close) em vez de todos os
+        ticks.
 
+        Args:
+            days: Número de dias para buscar.
+
+        Returns:
+            Tuple (minério, vale3) de DataFrames diários com coluna 'close'
+            (index = dia UTC), usados na reconstrução do estado
+            (`refresh_state`) e aceitos por `calculate_iron_ore_return` e
+            `calculate_correlation`.
+        """
         try:
-            result = (
-                self.client.table("prices_vale3")
-                .select("timestamp, close")
-                .gte("timestamp", since.isoformat())
-                .order("timestamp", desc=False)
-                .execute()
+            since = (datetime.now(timezone.utc) - timedelta(days=days)).date()
+            closes = get_daily_closes(
+                [DAILY_CLOSE_IRON_ORE, DAILY_CLOSE_VALE3], since, client=self.client
             )
+        except Exception as e:
+            logger.error(f"Erro ao buscar fechamentos diários: {e}")
+            return pd.DataFrame(), pd.DataFrame()
 
-            if not result.data:
-                return pd.DataFrame()
+        return (
+            closes[[DAILY_CLOSE_IRON_ORE]].dropna().set_axis(["close"], axis=1),
+            closes[[DAILY_CLOSE_VALE3]].dropna().set_axis(["close"], axis=1),
+        )
 
-            df = pd.DataFrame(result.data)
-            df["timestamp"] = pd.to_datetime(df["timestamp"])
-            df = df.set_index("timestamp")
-            return df
+    def get_recent_vale3_prices(
+        self, days: int = 30, after: datetime | None = None
+    ) -> pd.DataFrame:
+        """
+        Busca preços recentes de VALE3.
+
+        Args:
+            days: Número de dias para buscar.
+            after: Se informado, busca apenas registros posteriores a este
+                   timestamp (ignora `days`).
+
+        Returns:
+            DataFrame com preços.
+        """
+        try:
+            return self._read_vale3(days, after)
 
         except Exception as e:
             logger.error(f"Erro ao buscar preços VALE3: {e}")
@@ -110,20 +244,11 @@ class SignalGenerator:
         Busca dados auxiliares mais recentes.
 
         Returns:
-            Dict com usd_brl, vix, ibov.
+            Dict com usd_brl, vix, ibov e usd_brl_change.
         """
         try:
-            result = (
-                self.client.table("auxiliary_data")
-                .select("*")
-                .order("timestamp", desc=True)
-                .limit(1)
-                .execute()
-            )
-
-            if result.data:
-                return result.data[0]
-            return {}
+            result = self._auxiliary_query().execute()
+            return self._latest_auxiliary(result.data)
 
         except Exception as e:
             logger.error(f"Erro ao buscar dados auxiliares: {e}")
@@ -134,7 +259,8 @@ class SignalGenerator:
         Calcula retorno e z-score do minério de ferro.
 
         Args:
-            df: DataFrame com preços.
+            df: Fechamentos diários (coluna 'close'), de `get_daily_closes`
+                ou barras de 1d de `get_iron_ore_bars`.
 
         Returns:
             Tuple (retorno_atual, std_20d, zscore).
@@ -142,11 +268,7 @@ class SignalGenerator:
         if df.empty or len(df) < self.rolling_window + 1:
             return 0.0, 0.0, 0.0
 
-        # Pega preços de fechamento diário (agrupa por dia)
-        daily = df.groupby(df.index.date)["price"].last()
-
-        if len(daily) < self.rolling_window + 1:
-            return 0.0, 0.0, 0.0
+        daily = df["close"]
 
         # Calcula retornos
         returns = daily.pct_change().dropna()
@@ -165,13 +287,17 @@ class SignalGenerator:
 
         return current_return, historical_std, zscore
 
-    def check_direction_consistency(self, df: pd.DataFrame, hours: int = 2) -> bool:
+    def check_direction_consistency(
+        self, df: pd.DataFrame, hours: int = 2, now: datetime | None = None
+    ) -> bool:
         """
         Verifica se a direção do preço foi consistente nas últimas N horas.
 
         Args:
-            df: DataFrame com preços.
+            df: Barras intraday (coluna 'close', ex: 5m de `get_iron_ore_bars`)
+                ou ticks brutos (coluna 'price').
             hours: Número de horas para verificar.
+            now: Momento de referência (default: agora, UTC).
 
         Returns:
             True se direção consistente.
@@ -180,14 +306,16 @@ class SignalGenerator:
             return False
 
         # Filtra últimas N horas
-        cutoff = datetime.now(timezone.utc) - timedelta(hours=hours)
+        now = now or datetime.now(timezone.utc)
+        cutoff = now - timedelta(hours=hours)
         recent = df[df.index >= cutoff]
 
         if len(recent) < 2:
             return True  # Sem dados suficientes, assume consistente
 
         # Verifica se todos os retornos têm o mesmo sinal
-        returns = recent["price"].pct_change().dropna()
+        prices = recent["price"] if "price" in recent.columns else recent["close"]
+        returns = prices.pct_change().dropna()
 
         if len(returns) == 0:
             return True
@@ -205,8 +333,9 @@ class SignalGenerator:
         Calcula correlação rolling entre minério e VALE3.
 
         Args:
-            iron_ore: DataFrame de preços do minério.
-            vale3: DataFrame de preços VALE3.
+            iron_ore: Fechamentos diários do minério (coluna 'close', ver
+                      `get_daily_closes`).
+            vale3: Fechamentos diários de VALE3 (coluna 'close').
 
         Returns:
             Correlação rolling.
@@ -214,12 +343,8 @@ class SignalGenerator:
         if iron_ore.empty or vale3.empty:
             return 0.0
 
-        # Agrupa por dia
-        io_daily = iron_ore.groupby(iron_ore.index.date)["price"].last()
-        vale_daily = vale3.groupby(vale3.index.date)["close"].last()
-
         # Alinha datas
-        combined = pd.DataFrame({"iron_ore": io_daily, "vale3": vale_daily}).dropna()
+        combined = pd.DataFrame({"iron_ore": iron_ore["close"], "vale3": vale3["close"]}).dropna()
 
         if len(combined) < self.rolling_window:
             return 0.0
@@ -246,8 +371,8 @@ class SignalGenerator:
         """
         # VIX > 25
         vix = auxiliary.get("vix", 0)
-        if vix and vix > 25:
-            return False, f"VIX muito alto ({vix:.1f} > 25)"
+        if vix and vix > self.vix_threshold:
+            return False, f"VIX muito alto ({vix:.1f} > {self.vix_threshold:.0f})"
 
         # TODO: Adicionar verificação de feriados
         # TODO: Adicionar verificação de gap de abertura
@@ -255,6 +380,107 @@ class SignalGenerator:
 
         return True, ""
 
+    def refresh_state(self) -> dict[str, Any]:
+        """
+        Atualiza o estado rolling com os dados novos e salva o checkpoint.
+
+        O minério é lido das barras front month de prices_iron_ore_bars:
+
+        - Estado vazio ou defasado: barras de 1d dos últimos `bootstrap_days`
+          dias (um fechamento por dia encerrado) e barras de 5m do dia
+          corrente (UTC).
+        - Incremental: barras de 5m a partir da última processada,
+          inclusive, para pegar a atualização da barra ainda aberta.
+
+        Na reconstrução, os dias encerrados de VALE3 vêm da tabela
+        daily_close (`get_daily_closes`, uma linha por dia), que também
+        completa dias sem barra diária de minério; só o dia corrente de
+        VALE3 é lido da tabela de preços.
+
+        Minério, VALE3 e dados auxiliares são buscados em paralelo, em uma
+        única rodada de rede.
+
+        Returns:
+            Dados auxiliares mais recentes (dict vazio se indisponíveis).
+        """
+        now = datetime.now(timezone.utc)
+        today = pd.Timestamp(now).floor("D")
+        queries: dict[str, Any] = {}
+        if self.state.is_stale(timedelta(days=self.bootstrap_days), now):
+            self.state = RollingSignalState(window=self.rolling_window)
+            queries["barras 1d minério"] = partial(
+                self._read_iron_ore_bars, "1d", now - timedelta(days=self.bootstrap_days)
+            )
+            queries["barras 5m minério"] = partial(self._read_iron_ore_bars, "5m", today)
+            queries["fechamentos diários"] = partial(self.get_daily_closes, days=self.bootstrap_days)
+            read_vale3 = partial(self._read_vale3, since=today)
+        else:
+            queries["barras 5m minério"] = partial(
+                self._read_iron_ore_bars, "5m", self.state.last_iron_ore_ts
+            )
+            if self.state.last_vale3_ts is not None:
+                read_vale3 = partial(self._read_vale3, after=self.state.last_vale3_ts)
+            else:
+                read_vale3 = partial(self._read_vale3, days=self.bootstrap_days)
+
+        data = fetch_concurrently({
+            **queries,
+            "preços VALE3": read_vale3,
+            "dados auxiliares": self._auxiliary_query(),
+        })
+
+        # Dias encerrados pelas barras diárias (daily_close completa dias sem
+        # barra); o dia corrente pelas barras de 5m / preços do dia
+        iron_closes, vale3_closes = data.get("fechamentos diários") or (pd.DataFrame(), pd.DataFrame())
+        iron_ore_df = self._closed_days_then_today(
+            data.get("barras 1d minério"), iron_closes, data["barras 5m minério"], today
+        )
+        vale3_df = self._closed_days_then_today(None, vale3_closes, data["preços VALE3"], today)
+        io_count = self.state.update_iron_ore(iron_ore_df, price_col="close")
+        vale_count = self.state.update_vale3(vale3_df)
+        logger.debug(f"Estado rolling atualizado: {io_count} barras minério, {vale_count} VALE3")
+
+        try:
+            self.state.save(self.state_path)
+        except OSError as e:
+            logger.warning(f"Erro ao salvar checkpoint do estado: {e}")
+
+        return self._latest_auxiliary(data["dados auxiliares"])
+
+    @staticmethod
+    def _closed_days_then_today(
+        daily: pd.DataFrame | None,
+        closes: pd.DataFrame | None,
+        current: pd.DataFrame | None,
+        today: pd.Timestamp,
+    ) -> pd.DataFrame:
+        """
+        Fechamentos dos dias encerrados seguidos dos registros do dia corrente.
+
+        Args:
+            daily: Barras diárias (coluna 'close'), com prioridade
+            closes: Fechamentos de `get_daily_closes` (completam dias sem barra)
+            current: Barras intraday ou preços a partir de `today`
+            today: Início do dia corrente (UTC)
+
+        Returns:
+            DataFrame com coluna 'close' em ordem cronológica.
+        """
+        closed = [
+            frame.loc[frame.index < today, ["close"]]
+            for frame in (daily, closes)
+            if frame is not None and not frame.empty
+        ]
+        frames = []
+        if closed:
+            merged = closed[0]
+            for frame in closed[1:]:
+                merged = merged.combine_first(frame)
+            frames.append(merged)
+        if current is not None and not current.empty:
+            frames.append(current[["close"]])
+        return pd.concat(frames).sort_index(kind="stable") if frames else pd.DataFrame()
+
     def generate_signal(self) -> dict[str, Any] | None:
         """
         Gera sinal de trading baseado nas condições atuais.
@@ -264,12 +490,27 @@ class SignalGenerator:
         """
         logger.info("Iniciando geração de sinal...")
 
-        # Buscar dados
-        iron_ore_df = self.get_recent_iron_ore_prices(days=self.rolling_window + 5)
-        vale3_df = self.get_recent_vale3_prices(days=self.rolling_window + 5)
-        auxiliary = self.get_latest_auxiliary_data()
+        # Atualizar estado rolling apenas com os dados novos (junto com os
+        # dados auxiliares, em paralelo)
+        auxiliary = self.refresh_state()
+
+        return self.evaluate_signal(auxiliary)
 
-        if iron_ore_df.empty:
+    def evaluate_signal(
+        self, auxiliary: dict[str, Any], now: datetime | None = None
+    ) -> dict[str, Any] | None:
+        """
+        Aplica as regras da estratégia sobre o estado rolling atual.
+
+        Args:
+            auxiliary: Dados auxiliares mais recentes (vix, usd_brl, ...).
+            now: Momento da avaliação (default: agora, UTC). Usado como
+                 referência do filtro de direção e timestamp do sinal.
+
+        Returns:
+            Dict com detalhes do sinal ou None se sem sinal.
+        """
+        if self.state.empty:
             logger.warning("Sem dados de minério de ferro disponíveis")
             return None
 
@@ -280,14 +521,14 @@ class SignalGenerator:
             return None
 
         # Calcular métricas do minério
-        current_return, std_20d, zscore = self.calculate_iron_ore_return(iron_ore_df)
+        current_return, std_20d, zscore = self.state.iron_ore_metrics()
 
         if std_20d == 0:
             logger.warning("Volatilidade zero - sem dados suficientes")
             return None
 
         # Verificar correlação
-        correlation = self.calculate_correlation(iron_ore_df, vale3_df)
+        correlation = self.state.correlation()
         if correlation < self.correlation_threshold:
             logger.info(
                 f"NO-TRADE: Correlação baixa ({correlation:.2f} < {self.correlation_threshold})"
@@ -295,7 +536,9 @@ class SignalGenerator:
             return None
 
         # Verificar direção consistente
-        direction_consistent = self.check_direction_consistency(iron_ore_df, hours=2)
+        direction_consistent = self.check_direction_consistency(
+            self.state.recent_ticks_frame(), hours=2, now=now
+        )
 
         # Verificar variação USD/BRL
         usd_brl_variation = abs(auxiliary.get("usd_brl_change", 0) or 0)
@@ -307,12 +550,12 @@ class SignalGenerator:
         threshold = self.signal_threshold * std_20d
 
         if current_return > threshold:
-            if direction_consistent and usd_brl_variation < 0.005:  # < 0.5%
+            if direction_consistent and usd_brl_variation < self.usd_brl_threshold:
                 signal_type = "LONG"
                 confidence = min(abs(zscore) / 3.0, 1.0)  # Normaliza confiança
 
         elif current_return < -threshold:
-            if direction_consistent and usd_brl_variation < 0.005:
+            if direction_consistent and usd_brl_variation < self.usd_brl_threshold:
                 signal_type = "SHORT"
                 confidence = min(abs(zscore) / 3.0, 1.0)
 
@@ -324,7 +567,7 @@ class SignalGenerator:
 
         # Construir sinal
         signal = {
-            "timestamp": datetime.now(timezone.utc),
+            "timestamp": now or datetime.now(timezone.utc),
             "signal_type": signal_type,
             "confidence": confidence,
             "iron_ore_return": current_return,
@@ -341,6 +584,161 @@ class SignalGenerator:
 
         return signal
 
+    def generate_signals_batch(
+        self,
+        iron_ore_df: pd.DataFrame,
+        vale3_df: pd.DataFrame,
+        aux_df: pd.DataFrame | None = None,
+        direction_hours: int = 2,
+    ) -> pd.DataFrame:
+        """
+        Reavalia a estratégia para cada dia do histórico em uma única passada.
+
+        Equivale a chamar `evaluate_signal` ao fim de cada dia com minério,
+        com o estado rolling alimentado por todos os dados até aquele dia,
+        os dados auxiliares mais recentes até o fim do dia e o filtro de
+        direção referenciado ao último tick do dia. Todos os filtros são
+        avaliados como operações vetorizadas em NumPy.
+
+        Args:
+            iron_ore_df: Ticks de minério (index = timestamp, coluna 'price').
+            vale3_df: Preços de VALE3 (index = timestamp, coluna 'close').
+            aux_df: Dados auxiliares (index = timestamp, colunas 'vix',
+                    'usd_brl' e opcionalmente 'usd_brl_change'; sem ela, a
+                    variação é calculada de 'usd_brl' entre registros).
+            direction_hours: Horas do filtro de direção consistente.
+
+        Returns:
+            DataFrame indexado por dia com as métricas, `signal_type`
+            ('LONG', 'SHORT' ou None), `signal` (1, -1, 0) e `confidence`.
+        """
+        window = self.rolling_window
+
+        io = iron_ore_df["price"].dropna().sort_index(kind="stable")
+        if io.empty:
+            return pd.DataFrame()
+
+        tick_ts = io.index
+        tick_price = io.to_numpy(dtype=float)
+        tick_day = tick_ts.normalize()
+
+        # Fechamento diário = último tick de cada data
+        day_end = np.flatnonzero(np.append(tick_day[1:] != tick_day[:-1], True))
+        days = tick_day[day_end]
+        closes = tick_price[day_end]
+        n_days = len(days)
+
+        # Retorno atual vs. std dos `window` retornos diários anteriores
+        current_return = np.full(n_days, np.nan)
+        current_return[1:] = closes[1:] / closes[:-1] - 1
+        std_window = np.full(n_days, np.nan)
+        if n_days > window + 1:
+            windows = np.lib.stride_tricks.sliding_window_view(current_return[1:-1], window)
+            std_window[window + 1 :] = windows.std(axis=1, ddof=1)
+
+        has_std = ~np.isnan(std_window)
+        returns = np.where(has_std, current_return, 0.0)
+        std_20d = np.where(has_std & (std_window > 0), std_window, 0.0)
+        zscore = np.divide(returns, std_20d, out=np.zeros(n_days), where=std_20d > 0)
+
+        # Correlação dos retornos diários pareados até cada dia
+        correlation = np.zeros(n_days)
+        vale = vale3_df["close"].dropna().sort_index(kind="stable")
+        if not vale.empty:
+            vale_day = vale.index.normalize()
+            vale_end = np.flatnonzero(np.append(vale_day[1:] != vale_day[:-1], True))
+            vale_closes = pd.Series(vale.to_numpy(dtype=float)[vale_end], index=vale_day[vale_end])
+            io_closes = pd.Series(closes, index=days)
+
+            pair_days = io_closes.index.intersection(vale_closes.index).sort_values()
+            pairs = np.column_stack([io_closes[pair_days], vale_closes[pair_days]])
+
+            if len(pairs) > window:
+                pair_returns = pairs[1:] / pairs[:-1] - 1
+                x = np.lib.stride_tricks.sliding_window_view(pair_returns[:, 0], window)
+                y = np.lib.stride_tricks.sliding_window_view(pair_returns[:, 1], window)
+                x = x - x.mean(axis=1, keepdims=True)
+                y = y - y.mean(axis=1, keepdims=True)
+                denom = np.sqrt((x * x).sum(axis=1) * (y * y).sum(axis=1))
+                rolling_corr = np.divide(
+                    (x * y).sum(axis=1), denom, out=np.zeros(len(denom)), where=denom > 0
+                )
+
+                # Último par com data <= dia avaliado; a primeira janela
+                # completa termina no par de índice `window`
+                last_pair = pair_days.searchsorted(days, side="right") - 1
+                valid = last_pair >= window
+                correlation[valid] = rolling_corr[last_pair[valid] - window]
+
+        # Direção consistente nas últimas N horas até o último tick do dia
+        tick_returns = np.zeros(len(tick_price))
+        tick_returns[1:] = tick_price[1:] / tick_price[:-1] - 1
+        neg_count = np.cumsum(tick_returns < 0)
+        pos_count = np.cumsum(tick_returns > 0)
+        window_start = tick_ts.searchsorted(
+            tick_ts[day_end] - pd.Timedelta(hours=direction_hours), side="left"
+        )
+        negatives = neg_count[day_end] - neg_count[window_start]
+        positives = pos_count[day_end] - pos_count[window_start]
+        direction_consistent = (negatives == 0) | (positives == 0)
+
+        # Dados auxiliares mais recentes até o fim de cada dia
+        vix = np.full(n_days, np.nan)
+        usd_brl = np.full(n_days, np.nan)
+        usd_brl_change = np.zeros(n_days)
+        if aux_df is not None and not aux_df.empty:
+            aux = aux_df.sort_index(kind="stable")
+            if "usd_brl_change" not in aux.columns and "usd_brl" in aux.columns:
+                aux = aux.assign(usd_brl_change=calculate_usd_brl_change(aux["usd_brl"]))
+            aux_pos = aux.index.normalize().searchsorted(days, side="right") - 1
+            has_aux = aux_pos >= 0
+            for col, target in (("vix", vix), ("usd_brl", usd_brl), ("usd_brl_change", usd_brl_change)):
+                if col in aux.columns:
+                    values = pd.to_numeric(aux[col], errors="coerce").to_numpy(dtype=float)
+                    target[has_aux] = values[aux_pos[has_aux]]
+            usd_brl_change = np.nan_to_num(usd_brl_change, nan=0.0)
+
+        # Regras compartilhadas com o backtest (src/strategy/rules.py)
+        signal = apply_signal_rules(
+            returns,
+            std_20d,
+            correlation,
+            vix=vix,
+            usd_brl_change=usd_brl_change,
+            direction_consistent=direction_consistent,
+            threshold=self.signal_threshold,
+            correlation_threshold=self.correlation_threshold,
+            vix_threshold=self.vix_threshold,
+            usd_brl_threshold=self.usd_brl_threshold,
+        )
+        confidence = np.where(signal != 0, np.minimum(np.abs(zscore) / 3.0, 1.0), 0.0)
+        signal_type = np.full(n_days, None, dtype=object)
+        signal_type[signal == 1] = "LONG"
+        signal_type[signal == -1] = "SHORT"
+
+        result = pd.DataFrame(
+            {
+                "timestamp": tick_ts[day_end],
+                "iron_ore_return": returns,
+                "iron_ore_std_20d": std_20d,
+                "iron_ore_zscore": zscore,
+                "correlation": correlation,
+                "direction_consistent": direction_consistent,
+                "vix": vix,
+                "usd_brl": usd_brl,
+                "signal": signal,
+                "signal_type": signal_type,
+                "confidence": confidence,
+            },
+            index=pd.DatetimeIndex(days, name="date"),
+        )
+
+        logger.info(
+            f"Replay de sinais: {n_days} dias, "
+            f"{int((signal == 1).sum())} LONG, {int((signal == -1).sum())} SHORT"
+        )
+        return result
+
     def process_and_save_signal(self) -> dict[str, Any] | None:
         """
         Gera sinal, salva no banco e notifica.
@@ -0,0 +1,152 @@
+"""
+Testes de `run_backtest` em barras OHLC montadas à mão.
+
+Barras neutras: abertura/fechamento 100, máxima 101, mínima 99 (True Range
+2). Com atr_period=2 e stop_multiplier=1 o risco é 2; com capital 100.000
+e 1% de risco por operação, a posição é de 500 ações (stop em 98/102,
+alvo 2R em 104/96).
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.backtest import run_backtest
+
+FLAT = (100.0, 101.0, 99.0, 100.0)
+PARAMS = {
+    "atr_period": 2,
+    "stop_multiplier": 1.0,
+    "take_profit_rr": 2.0,
+    "max_holding": 3,
+    "cost_bps": 0.0,
+    "capital": 100_000.0,
+    "risk_per_trade": 0.01,
+    "max_position_pct": 1.0,
+}
+
+
+def bars(n: int = 10, **overrides: tuple[float, float, float, float]) -> pd.DataFrame:
+    """n barras neutras; `b4=(o, h, l, c)` substitui a barra 4."""
+    rows = [FLAT] * n
+    for name, row in overrides.items():
+        rows[int(name[1:])] = row
+    return pd.DataFrame(
+        rows,
+        columns=["vale3_open", "vale3_high", "vale3_low", "vale3_close"],
+        index=pd.bdate_range("2024-01-01", periods=n),
+    )
+
+
+def signals_at(n: int, **positions: int) -> np.ndarray:
+    """Array de sinais com `s3=1` na barra 3."""
+    signals = np.zeros(n, dtype=np.int8)
+    for name, side in positions.items():
+        signals[int(name[1:])] = side
+    return signals
+
+
+def single_trade(df: pd.DataFrame, side: int = 1, **params) -> pd.Series:
+    result = run_backtest(df, signals=signals_at(len(df), s3=side), **{**PARAMS, **params})
+    assert len(result["trades"]) == 1
+    return result["trades"].iloc[0]
+
+
+@pytest.mark.parametrize(
+    "bar, side, reason, exit_price",
+    [
+        ((100.0, 104.5, 99.5, 104.0), 1, "TAKE_PROFIT", 104.0),
+        # Stop e alvo na mesma barra: stop primeiro
+        ((100.0, 105.0, 97.0, 100.0), 1, "STOP_LOSS", 98.0),
+        # Gap através do stop / alvo: executa na abertura
+        ((95.0, 96.0, 94.0, 95.5), 1, "STOP_LOSS", 95.0),
+        ((106.0, 107.0, 105.0, 106.5), 1, "TAKE_PROFIT", 106.0),
+        ((100.0, 100.5, 95.5, 96.0), -1, "TAKE_PROFIT", 96.0),
+        ((95.0, 95.5, 94.0, 94.5), -1, "TAKE_PROFIT", 95.0),
+        ((103.0, 104.0, 102.5, 103.5), -1, "STOP_LOSS", 103.0),
+    ],
+)
+def test_exits(bar, side, reason, exit_price):
+    trade = single_trade(bars(b4=bar), side)
+
+    assert trade["exit_reason"] == reason
+    assert trade["entry_price"] == 100.0
+    assert trade["exit_price"] == exit_price
+    assert trade["quantity"] == 500
+    assert trade["pnl"] == pytest.approx(500 * side * (exit_price - 100.0))
+    assert trade["exit_time"] == bars().index[4]
+    assert trade["bars_held"] == 2
+
+
+def test_stop_on_entry_bar():
+    trade = single_trade(bars(b3=(100.0, 100.5, 97.5, 98.0)))
+
+    assert (trade["exit_reason"], trade["exit_price"], trade["bars_held"]) == ("STOP_LOSS", 98.0, 1)
+
+
+def test_time_stop_and_end_of_data():
+    result = run_backtest(bars(8), signals=signals_at(8, s3=1, s6=-1), **PARAMS)
+    trades = result["trades"]
+
+    # 3 barras (3, 4, 5): sai no fechamento da última
+    assert trades["exit_reason"].tolist() == ["TIME_STOP", "END_OF_DATA"]
+    assert trades["bars_held"].tolist() == [3, 2]
+    assert trades["exit_time"].tolist() == [bars(8).index[5], bars(8).index[7]]
+    assert trades["pnl"].tolist() == [0.0, 0.0]
+
+
+def test_entry_lag_enters_on_later_open():
+    df = bars(b3=(100.0, 101.0, 99.0, 100.0), b4=(102.0, 103.0, 101.0, 102.0))
+    result = run_backtest(df, signals=signals_at(10, s3=1), entry_lag=1, **PARAMS)
+    trade = result["trades"].iloc[0]
+
+    assert trade["entry_time"] == df.index[4]
+    assert trade["entry_price"] == 102.0
+    assert trade["stop_loss"] == 100.0
+    assert result["position"].iloc[3] == 0 and result["position"].iloc[4] == 1
+
+
+def test_signal_without_atr_history_is_skipped():
+    result = run_backtest(bars(), signals=signals_at(10, s1=1), **PARAMS)
+
+    assert result["trades"].empty
+
+
+def test_position_capped_by_max_position_pct():
+    trade = single_trade(bars(b4=(100.0, 104.5, 99.5, 104.0)), max_position_pct=0.2)
+
+    # Risco pediria 500 ações; 20% de 100.000 a 100 limita em 200
+    assert trade["quantity"] == 200
+    assert trade["pnl"] == pytest.approx(200 * 4.0)
+
+
+def test_costs_and_equity():
+    df = bars(b4=(100.0, 104.5, 99.5, 104.0))
+    result = run_backtest(df, signals=signals_at(10, s3=1), **{**PARAMS, "cost_bps": 25.0})
+
+    pnl = 500 * 4.0 - 0.0025 * 500 * 100.0
+    assert result["trades"]["pnl"].iloc[0] == pytest.approx(pnl)
+    # Marcação a mercado na barra de entrada, realizado a partir da saída
+    np.testing.assert_allclose(result["equity"].iloc[2:6], [100_000.0, 100_000.0, 100_000 + pnl, 100_000 + pnl])
+    assert result["metrics"]["total_return_pct"] == pytest.approx(pnl / 1_000)
+
+
+def test_overlapping_signals_are_blocked_until_exit():
+    # Sinais em 3 e 4 (posição aberta) e 5 (barra de saída) são ignorados
+    signals = signals_at(10, s3=1, s4=1, s5=-1, s6=-1)
+    result = run_backtest(bars(), signals=signals, **PARAMS)
+    trades = result["trades"]
+
+    assert trades["entry_time"].tolist() == [bars().index[3], bars().index[6]]
+    assert trades["side"].tolist() == ["LONG", "SHORT"]
+    assert result["position"].tolist() == [0, 0, 0, 1, 1, 1, -1, -1, -1, 0]
+    assert result["metrics"]["signals"] == 4
+
+
+def test_sizing_uses_equity_after_previous_trade():
+    df = bars(b4=(100.0, 104.5, 99.5, 104.0), b5=(100.0, 101.0, 99.0, 100.0))
+    result = run_backtest(df, signals=signals_at(10, s3=1, s6=1), **PARAMS)
+
+    # Após +2.000, arrisca 1% de 102.000; ATR das barras 4-5 = 5
+    # (TR 104,5 - 99,5 e |99 - fechamento anterior 104|)
+    assert result["trades"]["quantity"].tolist() == pytest.approx([500, 1_020 / 5.0])
@@ -0,0 +1,93 @@
+"""Testes do walk-forward: fatiamento sem look-ahead e cache de folds."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.backtest import build_walk_forward_features, run_walk_forward
+
+GRID = {"window": [10], "threshold": [1.0, 1.5]}
+FOLDS = {"train_months": 6, "test_months": 3, "step_months": 3}
+
+
+@pytest.fixture
+def dataset():
+    """Minério e VALE3 correlacionados em dias úteis, com uma série alternativa de minério."""
+    rng = np.random.default_rng(3)
+    index = pd.bdate_range("2020-01-01", "2022-09-30")
+    iron_returns = rng.normal(0, 0.015, len(index))
+    vale_returns = 0.7 * iron_returns + rng.normal(0, 0.008, len(index))
+    return pd.DataFrame(
+        {
+            "iron_ore_price": 100 * np.exp(np.cumsum(iron_returns)),
+            "iron_alt": 100 * np.exp(np.cumsum(rng.normal(0, 0.015, len(index)))),
+            "vale3_close": 60 * np.exp(np.cumsum(vale_returns)),
+            "vix": rng.uniform(12, 30, len(index)),
+        },
+        index=index,
+    )
+
+
+def run(dataset, **kwargs):
+    return run_walk_forward(dataset, grid=GRID, max_workers=1, **FOLDS, **kwargs)
+
+
+def test_features_use_only_past_data(dataset):
+    cut = dataset.index[300]
+    future = dataset.index > cut
+    # Futuro alterado não pode mudar nenhuma feature até o corte
+    changed = dataset.copy()
+    changed.loc[future, ["iron_ore_price", "vale3_close"]] *= 1.5
+
+    full = build_walk_forward_features(dataset, GRID["window"])
+    altered = build_walk_forward_features(changed, GRID["window"])
+
+    pd.testing.assert_frame_equal(full.loc[:cut], altered.loc[:cut])
+
+
+def test_fold_result_ignores_later_data(dataset):
+    full = run(dataset, cache_dir=None)
+    fold = full.iloc[1]
+    truncated = run(dataset[dataset.index < fold["test_end"]], cache_dir=None)
+
+    row = truncated.set_index("test_start").loc[fold["test_start"]]
+    for column in ("threshold", "train_sharpe_ratio", "test_sharpe_ratio", "test_trades"):
+        assert row[column] == pytest.approx(fold[column], rel=1e-9), column
+
+
+def test_shifted_window_reuses_cached_folds(dataset, tmp_path):
+    first = run(dataset[dataset.index < "2022-07-01"], cache_dir=tmp_path)
+    assert not first["cached"].any() and len(first) >= 4
+    assert (first["test_trades"] > 0).all()
+
+    # Começa 3 semanas antes do 3º fold: os folds seguintes não mudam
+    shifted_data = dataset[(dataset.index >= "2020-06-10") & (dataset.index < "2022-07-01")]
+    shifted = run(shifted_data, cache_dir=tmp_path)
+    fresh = run(shifted_data, cache_dir=None)
+
+    common = shifted["test_start"].isin(first["test_start"])
+    assert common.all() and shifted["cached"].all()
+    pd.testing.assert_frame_equal(
+        shifted.drop(columns=["fold", "cached"]),
+        fresh.drop(columns=["fold", "cached"]),
+        rtol=1e-9,
+    )
+
+    # Extensão do histórico: só o fold novo é calculado
+    result = run(dataset, cache_dir=tmp_path)
+    assert result["cached"].tolist() == [True] * len(first) + [False]
+
+
+def test_cache_key_covers_columns_and_rule_version(dataset, tmp_path, monkeypatch):
+    run(dataset, cache_dir=tmp_path)
+
+    alternative = run(dataset, cache_dir=tmp_path, iron_col="iron_alt")
+    assert not alternative["cached"].any()
+    fresh = run(dataset, cache_dir=None, iron_col="iron_alt")
+    np.testing.assert_allclose(alternative["test_sharpe_ratio"], fresh["test_sharpe_ratio"])
+
+    # Coluna não usada não invalida o cache
+    assert run(dataset.assign(unused=1.0), cache_dir=tmp_path)["cached"].all()
+
+    monkeypatch.setattr("src.backtest.walk_forward.RULES_VERSION", "test")
+    assert not run(dataset, cache_dir=tmp_path)["cached"].any()
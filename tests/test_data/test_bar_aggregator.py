@@ -0,0 +1,132 @@
+"""
+Testes do BarAggregator com vários processos gravando na mesma barra.
+
+O banco é simulado por `SqlBarTable`, transcrição direta do ON CONFLICT do
+RPC merge_iron_ore_bars (sql/004_iron_ore_bars.sql), independente de
+`merge_bar`; os resultados esperados são números literais.
+"""
+
+import pandas as pd
+import pytest
+
+from jobs.ingestion.bar_aggregator import BarAggregator, merge_bar
+
+TIMEFRAMES = {"5m": "5min", "1h": "1h"}
+BAR_5M = ("5m", "sgx", "DERIV_IO_SWAP_2024_04", pd.Timestamp("2024-03-01T01:00:00+00:00"))
+
+
+def snapshot(minute: int, price: float, symbol: str = "SZZFJ4") -> dict:
+    return {
+        "timestamp": f"2024-03-01T01:{minute:02d}:00+00:00",
+        "source": "sgx",
+        "symbol": symbol,
+        "variable_key": "DERIV_IO_SWAP_2024_04",
+        "price": price,
+        "price_type": "intraday",
+    }
+
+
+def sql_merge(cur: dict, new: dict) -> dict:
+    """SET do ON CONFLICT de merge_iron_ore_bars, coluna a coluna."""
+    return {
+        **cur,
+        "open": new["open"] if new["first_tick"] < cur["first_tick"] else cur["open"],
+        "high": max(cur["high"], new["high"]),
+        "low": min(cur["low"], new["low"]),
+        "close": new["close"] if new["last_tick"] >= cur["last_tick"] else cur["close"],
+        "ticks": (
+            cur["ticks"] + new["ticks"]
+            if new["first_tick"] > cur["last_tick"]
+            else max(cur["ticks"], new["ticks"])
+        ),
+        "first_tick": min(cur["first_tick"], new["first_tick"]),
+        "last_tick": max(cur["last_tick"], new["last_tick"]),
+        "symbol": (new["symbol"] or cur["symbol"]) if new["last_tick"] >= cur["last_tick"] else cur["symbol"],
+    }
+
+
+class SqlBarTable:
+    """prices_iron_ore_bars com a regra do RPC merge_iron_ore_bars."""
+
+    def __init__(self) -> None:
+        self.rows: dict[tuple, dict] = {}
+
+    def merge(self, bars: list[dict]) -> None:
+        for bar in bars:
+            bar = {**bar, **{c: pd.Timestamp(bar[c]) for c in ("timestamp", "first_tick", "last_tick")}}
+            key = (bar["timeframe"], bar["source"], bar["variable_key"], bar["timestamp"])
+            current = self.rows.get(key)
+            self.rows[key] = bar if current is None else sql_merge(current, bar)
+
+    def ohlc(self, key: tuple = BAR_5M) -> tuple:
+        row = self.rows[key]
+        return row["open"], row["high"], row["low"], row["close"], row["ticks"]
+
+
+def test_long_lived_and_cron_processes_count_every_tick():
+    table = SqlBarTable()
+    long_lived = BarAggregator(TIMEFRAMES)
+
+    table.merge(long_lived.update([snapshot(1, 100.0)]))
+    # Processo novo (cron) grava o tick seguinte na mesma barra
+    table.merge(BarAggregator(TIMEFRAMES).update([snapshot(2, 101.0)]))
+    table.merge(long_lived.update([snapshot(3, 99.5)]))
+
+    assert table.ohlc() == (100.0, 101.0, 99.5, 99.5, 3)
+    assert table.ohlc(("1h", *BAR_5M[1:])) == (100.0, 101.0, 99.5, 99.5, 3)
+
+
+def test_update_sends_deltas_and_resend_is_idempotent():
+    table = SqlBarTable()
+    aggregator = BarAggregator(TIMEFRAMES)
+
+    first = aggregator.update([snapshot(1, 100.0), snapshot(2, 101.0)])
+    second = aggregator.update([snapshot(3, 102.0), snapshot(4, 98.0)])
+
+    # Delta: só os dois ticks novos
+    delta = next(bar for bar in second if bar["timeframe"] == "5m")
+    assert (delta["open"], delta["high"], delta["low"], delta["close"], delta["ticks"]) == (102.0, 102.0, 98.0, 98.0, 2)
+    assert (delta["first_tick"], delta["last_tick"]) == ("2024-03-01T01:03:00+00:00", "2024-03-01T01:04:00+00:00")
+
+    table.merge(first)
+    assert table.ohlc() == (100.0, 101.0, 100.0, 101.0, 2)
+    table.merge(second)
+    assert table.ohlc() == (100.0, 102.0, 98.0, 98.0, 4)
+    # Reenvio após falha do RPC (delta e barra anterior): nada muda
+    table.merge(second)
+    table.merge(first)
+    assert table.ohlc() == (100.0, 102.0, 98.0, 98.0, 4)
+
+    # A barra em memória continua acumulada
+    current = aggregator.bars[("5m", "sgx", "DERIV_IO_SWAP_2024_04")]
+    assert (current["open"], current["high"], current["low"], current["close"], current["ticks"]) == (100.0, 102.0, 98.0, 98.0, 4)
+
+
+def test_older_partial_keeps_close_and_symbol():
+    table = SqlBarTable()
+    table.merge(BarAggregator(TIMEFRAMES).update([snapshot(3, 101.0, "SZZFJ4b"), snapshot(4, 100.5, "SZZFJ4b")]))
+    # Parcial anterior (processo atrasado): só open/high/low mudam; ticks não somam
+    table.merge(BarAggregator(TIMEFRAMES).update([snapshot(1, 99.0), snapshot(2, 103.0)]))
+
+    assert table.ohlc() == (99.0, 103.0, 99.0, 100.5, 2)
+    assert table.rows[BAR_5M]["symbol"] == "SZZFJ4b"
+    assert table.rows[BAR_5M]["first_tick"] == pd.Timestamp("2024-03-01T01:01:00+00:00")
+
+
+@pytest.mark.parametrize(
+    "partial",
+    [
+        # Delta posterior, reenvio idêntico, parcial anterior, sobreposta e sem símbolo
+        {"open": 99.0, "high": 104.0, "low": 98.0, "close": 103.0, "ticks": 3, "first_tick": 5, "last_tick": 8, "symbol": "B"},
+        {"open": 100.0, "high": 102.0, "low": 99.0, "close": 101.0, "ticks": 4, "first_tick": 1, "last_tick": 4, "symbol": "A"},
+        {"open": 97.0, "high": 98.0, "low": 96.0, "close": 98.0, "ticks": 2, "first_tick": 0, "last_tick": 0, "symbol": "C"},
+        {"open": 101.5, "high": 105.0, "low": 101.0, "close": 104.0, "ticks": 5, "first_tick": 3, "last_tick": 9, "symbol": None},
+    ],
+)
+def test_merge_bar_matches_sql(partial):
+    stamp = pd.Timestamp("2024-03-01T01:00:00+00:00")
+    current = {"open": 100.0, "high": 102.0, "low": 99.0, "close": 101.0, "ticks": 4,
+               "first_tick": stamp + pd.Timedelta(minutes=1), "last_tick": stamp + pd.Timedelta(minutes=4), "symbol": "A"}
+    partial = {**partial, **{c: stamp + pd.Timedelta(minutes=partial[c]) for c in ("first_tick", "last_tick")}}
+
+    assert merge_bar(current, partial) == sql_merge(current, partial)
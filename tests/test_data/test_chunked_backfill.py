@@ -0,0 +1,68 @@
+"""Testes do checkpoint do backfill em blocos entre execuções em dias diferentes."""
+
+import json
+from datetime import date
+
+from jobs.ingestion.chunked_backfill import (
+    BackfillCheckpoint,
+    backfill_period,
+    date_chunks,
+    run_chunked_backfill,
+)
+
+
+def run(start_date, end_date, state_dir, fail=()):
+    fetched = []
+
+    def fetch_chunk(start, end):
+        if start in fail:
+            raise RuntimeError("falha simulada")
+        fetched.append((start, end))
+        return [{"day": start}]
+
+    run_chunked_backfill(
+        "test", start_date, end_date, fetch_chunk, persist=len,
+        chunk_months=6, max_workers=2, state_dir=state_dir,
+    )
+    return sorted(fetched)
+
+
+def test_backfill_period_is_stable_within_month():
+    assert backfill_period(5, today=date(2026, 10, 17)) == ("2021-10-01", "2026-10-17")
+    assert backfill_period(5, today=date(2026, 10, 30))[0] == "2021-10-01"
+
+
+def test_resume_on_later_day_fetches_only_new_days(tmp_path):
+    start, end = backfill_period(2, today=date(2026, 10, 17))
+    first = run(start, end, tmp_path)
+    assert first == date_chunks(start, end, 6)
+    assert first[0] == ("2024-10-01", "2025-01-01") and first[-1] == ("2026-07-01", "2026-10-17")
+
+    # Dias depois, no mesmo mês: só o final do último bloco
+    start, end = backfill_period(2, today=date(2026, 10, 24))
+    assert run(start, end, tmp_path) == [("2026-10-17", "2026-10-24")]
+
+    # Mês seguinte: o primeiro bloco recortado já está coberto
+    start, end = backfill_period(2, today=date(2026, 11, 3))
+    assert start == "2024-11-01"
+    assert run(start, end, tmp_path) == [("2026-10-24", "2026-11-03")]
+
+    entries = json.loads((tmp_path / "backfill_test.json").read_text())["completed"]
+    assert entries["2026-07-01"] == {"start": "2026-07-01", "end": "2026-11-03", "records": 3}
+
+
+def test_failed_chunk_is_retried(tmp_path):
+    assert len(run("2025-01-01", "2026-01-01", tmp_path, fail={"2025-07-01"})) == 1
+    assert run("2025-01-01", "2026-01-01", tmp_path) == [("2025-07-01", "2026-01-01")]
+    assert run("2025-01-01", "2026-01-01", tmp_path) == []
+
+
+def test_old_checkpoint_format_is_read(tmp_path):
+    path = tmp_path / "backfill_test.json"
+    path.write_text(json.dumps({"completed": {"2025-03-14:2025-07-01": 80, "2025-07-01:2025-10-02": 60}}))
+
+    checkpoint = BackfillCheckpoint(path, chunk_months=6)
+
+    assert checkpoint.is_done(("2025-04-01", "2025-07-01"))
+    assert checkpoint.pending(("2025-07-01", "2025-10-17")) == ("2025-10-02", "2025-10-17")
+    assert checkpoint.pending(("2025-01-01", "2025-07-01")) == ("2025-01-01", "2025-07-01")
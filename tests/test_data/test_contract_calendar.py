@@ -0,0 +1,60 @@
+"""Testes do calendário de contratos SGX de minério (RIC ↔ vencimento)."""
+
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+from jobs.clients.forward_curve import ForwardCurve
+from jobs.config.contracts import IronOreContractCalendar
+
+
+def make_calendar(today: date = date(2026, 10, 17)) -> IronOreContractCalendar:
+    return IronOreContractCalendar(today=lambda: today)
+
+
+def test_expiry_falls_back_to_month_end():
+    contracts = make_calendar()
+
+    assert contracts.expiry("SZZFG7") == date(2027, 2, 28)
+    assert contracts.expiry("SZZFG7", fallback=False) is None
+    assert contracts.expiry("XYZ") is None
+
+
+def test_recorded_expiry_replaces_month_end():
+    contracts = make_calendar()
+    contracts.record_expiries(pd.Series(["2026-11-27", None, "invalid"]))
+
+    assert contracts.expiry("SZZFX6") == date(2026, 11, 27)
+    assert contracts.expiry("SZZFX6", fallback=False) == date(2026, 11, 27)
+    assert contracts.map_expiries(pd.Series(["SZZFX6", "SZZFZ6", "bad"])).tolist() == [
+        "2026-11-27",
+        "2026-12-31",
+        None,
+    ]
+    assert contracts.map_expiries(pd.Series(["SZZFX6", "SZZFZ6"]), fallback=False).tolist() == [
+        "2026-11-27",
+        None,
+    ]
+
+
+def test_recorded_expiry_survives_month_rollover():
+    today = [date(2026, 10, 17)]
+    contracts = IronOreContractCalendar(today=lambda: today[0])
+    contracts.record_expiries(pd.Series(["2026-12-30"]))
+
+    today[0] = date(2026, 11, 2)
+
+    assert contracts.expiry("SZZFZ6") == date(2026, 12, 30)
+    np.testing.assert_array_equal(
+        contracts.maturities(np.array(["DERIV_IO_SWAP_2026_12", "DERIV_IO_SWAP_2001_01"], dtype=object)),
+        np.array(["2026-12-30", "NaT"], dtype="datetime64[D]"),
+    )
+
+
+def test_forward_curve_uses_month_end_outside_calendar():
+    curve = ForwardCurve.from_rows([
+        {"timestamp": "2026-10-17T00:00:00+00:00", "variable_key": "DERIV_IO_SWAP_2001_01", "price": 1.0},
+    ])
+
+    assert curve.maturities.tolist() == [date(2001, 1, 31)]
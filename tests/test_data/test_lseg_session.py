@@ -0,0 +1,175 @@
+"""Testes do LsegSessionManager contra um stub local de `lseg.data`."""
+
+import time
+from enum import Enum
+from types import SimpleNamespace
+
+import pytest
+
+from jobs.clients import lseg_session
+from jobs.clients.lseg_session import LsegSessionManager
+
+
+class OpenState(Enum):
+    Opened = "Opened"
+    Closed = "Closed"
+
+
+class StubLsegData:
+    """Imita open_session/close_session/session.get_default() do lseg.data."""
+
+    def __init__(self, failures: int = 0) -> None:
+        self.failures = failures
+        self.open_calls = 0
+        self.close_calls = 0
+        self.state = OpenState.Closed
+        self.session = SimpleNamespace(get_default=lambda: SimpleNamespace(open_state=self.state))
+
+    def open_session(self, config_name: str) -> None:
+        self.open_calls += 1
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("handshake recusado")
+        self.state = OpenState.Opened
+
+    def close_session(self) -> None:
+        self.close_calls += 1
+        self.state = OpenState.Closed
+
+
+@pytest.fixture
+def config_path(tmp_path):
+    path = tmp_path / "lseg-data.config.json"
+    path.write_text("{}")
+    return path
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """Registra os backoffs de `_open` sem esperar."""
+    calls = []
+    monkeypatch.setattr(lseg_session.time, "sleep", calls.append)
+    return calls
+
+
+def make_manager(stub, config_path, **kwargs) -> LsegSessionManager:
+    options = {"idle_timeout": 0, "health_check_interval": 0, "open_retries": 0}
+    return LsegSessionManager(ld_module=stub, config_path=config_path, **{**options, **kwargs})
+
+
+def test_single_handshake_across_leases(config_path):
+    stub = StubLsegData()
+    manager = make_manager(stub, config_path)
+
+    for _ in range(5):
+        with manager.lease() as acquired:
+            assert acquired
+            with manager.lease() as nested:
+                assert nested
+
+    assert stub.open_calls == 1
+    assert manager.opened_count == 1
+    assert manager.is_open
+
+    manager.close()
+    assert stub.close_calls == 1
+    assert not manager.is_open
+
+
+def test_reconnects_when_session_not_opened(config_path):
+    stub = StubLsegData()
+    manager = make_manager(stub, config_path)
+
+    with manager.lease():
+        pass
+    stub.state = OpenState.Closed  # sessão caiu entre coletas
+
+    with manager.lease() as acquired:
+        assert acquired
+
+    assert stub.open_calls == 2
+    assert stub.close_calls == 1
+    assert manager.opened_count == 2
+
+
+def test_health_check_respects_interval(config_path):
+    stub = StubLsegData()
+    manager = make_manager(stub, config_path, health_check_interval=3600)
+
+    with manager.lease():
+        pass
+    stub.state = OpenState.Closed
+
+    with manager.lease():
+        pass
+
+    # Dentro do intervalo o estado não é consultado
+    assert stub.open_calls == 1
+
+
+def test_idle_session_expires(config_path):
+    stub = StubLsegData()
+    manager = make_manager(stub, config_path, idle_timeout=0.05)
+
+    with manager.lease():
+        pass
+    assert manager.is_open
+
+    deadline = time.monotonic() + 2
+    while manager.is_open and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    assert not manager.is_open
+    assert stub.close_calls == 1
+
+    # Próximo acquire reabre
+    with manager.lease() as acquired:
+        assert acquired
+    assert stub.open_calls == 2
+    manager.close()
+
+
+def test_active_lease_is_not_expired(config_path):
+    stub = StubLsegData()
+    manager = make_manager(stub, config_path, idle_timeout=0.05)
+
+    with manager.lease():
+        with manager.lease():
+            pass
+        time.sleep(0.15)
+        assert manager.is_open
+
+    manager.close()
+
+
+def test_open_retries_with_backoff(config_path, sleeps):
+    stub = StubLsegData(failures=2)
+    manager = make_manager(stub, config_path, open_retries=2)
+
+    with manager.lease() as acquired:
+        assert acquired
+
+    assert stub.open_calls == 3
+    assert sleeps == [1, 2]
+    assert manager.opened_count == 1
+
+
+def test_open_gives_up_after_retries(config_path, sleeps):
+    stub = StubLsegData(failures=5)
+    manager = make_manager(stub, config_path, open_retries=1)
+
+    with manager.lease() as acquired:
+        assert not acquired
+
+    assert stub.open_calls == 2
+    assert sleeps == [1]
+    assert not manager.is_open
+    assert manager._users == 0
+
+
+def test_missing_config_does_not_open(tmp_path):
+    stub = StubLsegData()
+    manager = make_manager(stub, tmp_path / "missing.json")
+
+    assert not manager.acquire()
+    assert stub.open_calls == 0
@@ -0,0 +1,66 @@
+"""Testes do cache Parquet com meses de schemas inferidos diferentes."""
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+from src.db import parquet_cache
+
+
+def iron_ore_rows(start: str, ids: list[int], variable_key, expiry_date) -> pd.DataFrame:
+    """Linhas de prices_iron_ore como `read_timeseries` devolve (índice UTC)."""
+    index = pd.date_range(start, periods=len(ids), freq="h", tz="UTC", name="timestamp")
+    return pd.DataFrame(
+        {
+            "id": np.array(ids, dtype=np.int64),
+            "symbol": "SZZFc2",
+            "price": np.linspace(100.0, 101.0, len(ids)),
+            "variable_key": variable_key,
+            "expiry_date": expiry_date,
+        },
+        index=index,
+    )
+
+
+@pytest.fixture
+def months(monkeypatch):
+    """Mês 1 com variable_key/expiry_date só nulos (float64), mês 2 com strings."""
+    january = iron_ore_rows("2024-01-30", [1, 2], np.nan, np.nan)
+    february = iron_ore_rows("2024-02-01", [3, 4], "SGX_2024-03", "2024-03-28")
+    frame = pd.concat([january, february])
+    assert frame.loc[frame["id"] <= 2, "expiry_date"].isna().all()
+    monkeypatch.setattr(parquet_cache, "read_timeseries", lambda table, since=None: frame)
+    return frame
+
+
+def test_mixed_months_load_as_strings(months, tmp_path):
+    assert parquet_cache.sync_table("prices_iron_ore", cache_dir=tmp_path) == 4
+
+    january = pq.read_schema(tmp_path / "prices_iron_ore" / "2024-01.parquet")
+    assert january.field("expiry_date").type == pa.string()
+    assert january.field("variable_key").type == pa.string()
+
+    df = parquet_cache.load_table("prices_iron_ore", cache_dir=tmp_path)
+
+    assert df["id"].tolist() == [1, 2, 3, 4]
+    assert df["expiry_date"].iloc[:2].isna().all()
+    assert df["expiry_date"].iloc[2:].tolist() == ["2024-03-28", "2024-03-28"]
+    assert df["variable_key"].iloc[2:].tolist() == ["SGX_2024-03", "SGX_2024-03"]
+
+
+def test_legacy_double_month_is_cast_on_load(months, tmp_path):
+    parquet_cache.sync_table("prices_iron_ore", cache_dir=tmp_path)
+
+    # Mês gravado antes do schema fixo: colunas nulas inferidas como double
+    legacy = months[months["id"] <= 2].reset_index()
+    pq.write_table(
+        pa.Table.from_pandas(legacy, preserve_index=False),
+        tmp_path / "prices_iron_ore" / "2024-01.parquet",
+    )
+
+    df = parquet_cache.load_table("prices_iron_ore", cache_dir=tmp_path, columns=["id", "expiry_date"])
+
+    assert df["id"].tolist() == [1, 2, 3, 4]
+    assert df["expiry_date"].iloc[2:].tolist() == ["2024-03-28", "2024-03-28"]
@@ -0,0 +1,73 @@
+"""Testes do `SupabaseClient` compartilhado entre threads (sem rede)."""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+import pytest
+
+import jobs.clients.supabase_client as supabase_client
+
+
+class StubTable:
+    """Tabela que devolve os registros enviados (com atraso para intercalar threads)."""
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+
+    def upsert(self, chunk, on_conflict):
+        return SimpleNamespace(execute=lambda: self._execute(chunk))
+
+    def _execute(self, chunk):
+        time.sleep(0.01)
+        return SimpleNamespace(data=list(chunk))
+
+
+@pytest.fixture
+def stub_client(monkeypatch):
+    created = []
+
+    def create_client(url, key):
+        time.sleep(0.02)  # Janela para inicializações concorrentes
+        created.append(url)
+        return SimpleNamespace(table=StubTable)
+
+    monkeypatch.setattr(supabase_client, "SUPABASE_URL", "http://stub")
+    monkeypatch.setattr(supabase_client, "SUPABASE_KEY", "key")
+    monkeypatch.setattr(supabase_client, "create_client", create_client)
+    monkeypatch.setattr(supabase_client, "_client", None)
+    return created
+
+
+def test_singleton_is_created_once_across_threads(stub_client):
+    barrier = threading.Barrier(8)
+
+    def get():
+        barrier.wait()
+        return supabase_client.get_supabase_client()
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        clients = list(executor.map(lambda _: get(), range(8)))
+
+    assert len(stub_client) == 1
+    assert all(client is clients[0] for client in clients)
+
+
+def test_concurrent_upserts_keep_one_report_per_table(stub_client):
+    client = supabase_client.get_supabase_client()
+    client.batch_size = 2
+    sizes = {"prices_iron_ore": 7, "prices_vale3": 4, "auxiliary_data": 1}
+
+    def upsert(table):
+        records = [{"id": i} for i in range(sizes[table])]
+        return client._upsert_batched(table, records, "id")
+
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        counts = dict(zip(sizes, executor.map(upsert, sizes)))
+
+    assert counts == sizes
+    for table, size in sizes.items():
+        report = client.upsert_reports[table]
+        assert [r["chunk"] for r in report] == list(range(-(-size // 2)))
+        assert sum(r["rows"] for r in report) == size
@@ -0,0 +1,186 @@
+"""Testes da paginação keyset de `iter_timeseries_pages` / `read_timeseries`."""
+
+import re
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.db.client import iter_timeseries_pages, read_timeseries
+
+CURSOR = re.compile(
+    r'^timestamp\.(gt|lt)\."([^"]+)",and\(timestamp\.eq\."([^"]+)",id\.(gt|lt)\.(-?\d+)\)$'
+)
+
+
+class FakeQuery:
+    """Builder PostgREST mínimo sobre uma lista de registros em memória."""
+
+    def __init__(self, table: "FakeTable", columns: str) -> None:
+        self.table = table
+        self.columns = [c.strip() for c in columns.split(",")]
+        self.filters = []
+        self.orders = []
+        self.size = None
+
+    def eq(self, column, value):
+        self.filters.append(lambda r: r[column] == value)
+        return self
+
+    def gt(self, column, value):
+        self.filters.append(lambda r: r[column] > value)
+        return self
+
+    def gte(self, column, value):
+        self.filters.append(lambda r: r[column] >= value)
+        return self
+
+    def lt(self, column, value):
+        self.filters.append(lambda r: r[column] < value)
+        return self
+
+    def or_(self, expression):
+        self.table.cursors.append(expression)
+        op, ts, ts_eq, id_op, row_id = CURSOR.match(expression).groups()
+        assert ts == ts_eq and op == id_op
+        key = (ts, int(row_id))
+        if op == "gt":
+            self.filters.append(lambda r: (r["timestamp"], r["id"]) > key)
+        else:
+            self.filters.append(lambda r: (r["timestamp"], r["id"]) < key)
+        return self
+
+    def order(self, column, desc=False):
+        self.orders.append((column, desc))
+        return self
+
+    def limit(self, size):
+        self.size = size
+        return self
+
+    def execute(self):
+        assert self.orders in ([("timestamp", False), ("id", False)], [("timestamp", True), ("id", True)])
+        rows = [r for r in self.table.rows if all(f(r) for f in self.filters)]
+        rows.sort(key=lambda r: (r["timestamp"], r["id"]), reverse=self.orders[0][1])
+        rows = rows[: self.size]
+        if "*" not in self.columns:
+            rows = [{c: r.get(c) for c in self.columns} for r in rows]
+        self.table.requests += 1
+        return SimpleNamespace(data=[dict(r) for r in rows])
+
+
+class FakeTable:
+    def __init__(self, rows):
+        self.rows = rows
+        self.cursors = []
+        self.requests = 0
+
+
+class FakeClient:
+    def __init__(self, rows):
+        self.tables = {"prices": FakeTable(rows)}
+
+    def table(self, name):
+        table = self.tables[name]
+        return SimpleNamespace(select=lambda columns: FakeQuery(table, columns))
+
+
+def iso(ts: pd.Timestamp) -> str:
+    return ts.strftime("%Y-%m-%dT%H:%M:%S+00:00")
+
+
+def curve_rows(n_timestamps: int, per_timestamp: int = 12) -> list[dict]:
+    """Curva forward: vários contratos com o mesmo timestamp (ids fora de ordem)."""
+    base = pd.Timestamp("2024-01-01", tz="UTC")
+    rows = []
+    row_id = 1000
+    for i in range(n_timestamps):
+        ts = iso(base + pd.Timedelta(minutes=5 * i))
+        for j in range(per_timestamp):
+            rows.append({"id": row_id, "timestamp": ts, "price": 100.0 + i + j / 100, "symbol": f"SZZF{j}"})
+            row_id += 7 if j % 2 else -3
+    return rows
+
+
+@pytest.mark.parametrize("desc", [False, True])
+def test_duplicate_timestamps_across_page_boundaries(desc):
+    rows = curve_rows(10)
+    client = FakeClient(rows)
+
+    pages = list(iter_timeseries_pages("prices", page_size=5, desc=desc, client=client))
+    read = [(r["timestamp"], r["id"]) for page in pages for r in page]
+
+    expected = sorted(((r["timestamp"], r["id"]) for r in rows), reverse=desc)
+    assert read == expected
+    assert all(len(page) == 5 for page in pages[:-1])
+
+
+def test_keyset_cursor_continues_after_last_row():
+    rows = curve_rows(3, per_timestamp=4)
+    client = FakeClient(rows)
+
+    pages = list(iter_timeseries_pages("prices", "timestamp, price", page_size=5, client=client))
+
+    cursors = client.tables["prices"].cursors
+    assert len(cursors) == len(pages) - 1 + (len(pages[-1]) == 5)
+    for page, cursor in zip(pages, cursors):
+        last = page[-1]
+        assert cursor == (
+            f'timestamp.gt."{last["timestamp"]}",and(timestamp.eq."{last["timestamp"]}",id.gt.{last["id"]})'
+        )
+    # 'id' é acrescentada ao select para o cursor
+    assert set(pages[0][0]) == {"timestamp", "price", "id"}
+
+
+def test_limit_and_filters():
+    rows = curve_rows(6, per_timestamp=3)
+    client = FakeClient(rows)
+    pages = list(iter_timeseries_pages(
+        "prices", page_size=4, limit=7, filters={"symbol": "SZZF1"},
+        since=datetime(2024, 1, 1, 0, 5, tzinfo=timezone.utc), client=client,
+    ))
+    read = [r for page in pages for r in page]
+
+    assert [len(p) for p in pages] == [4, 1]
+    assert all(r["symbol"] == "SZZF1" for r in read)
+    assert read[0]["timestamp"] == "2024-01-01T00:05:00+00:00"
+
+
+def test_read_timeseries_grows_buffers():
+    rows = curve_rows(40, per_timestamp=2)
+    client = FakeClient(rows)
+
+    df = read_timeseries("prices", "timestamp, price", page_size=3, client=client)
+
+    assert client.tables["prices"].requests == -(-len(rows) // 3) + (len(rows) % 3 == 0)
+    assert len(df) == len(rows)
+    assert list(df.columns) == ["price"]
+    assert df.index.tz is not None and df.index.is_monotonic_increasing
+    expected = sorted(rows, key=lambda r: (r["timestamp"], r["id"]))
+    np.testing.assert_array_equal(df["price"].to_numpy(), [r["price"] for r in expected])
+    assert df["price"].dtype == np.float64
+
+
+def test_read_timeseries_falls_back_to_object_when_dtype_changes():
+    rows = sorted(curve_rows(4, per_timestamp=2), key=lambda r: (r["timestamp"], r["id"]))
+    for i, row in enumerate(rows):
+        # Numérica na primeira página, texto na segunda
+        row["price_type"] = 1.0 if i < 3 else "settlement"
+        # Só nulos na primeira página (buffer float64), texto depois
+        row["expiry_date"] = None if i < 3 else "2024-03-28"
+    client = FakeClient(rows)
+
+    df = read_timeseries("prices", page_size=3, client=client)
+
+    assert df["price_type"].dtype == object
+    assert df["price_type"].tolist() == [1.0] * 3 + ["settlement"] * 5
+    assert df["expiry_date"].dtype == object
+    assert df["expiry_date"].iloc[3:].tolist() == ["2024-03-28"] * 5
+    assert df["expiry_date"].iloc[:3].isna().all()
+    assert df["id"].dtype == np.int64
+
+
+def test_read_timeseries_empty():
+    assert read_timeseries("prices", client=FakeClient([])).empty
@@ -0,0 +1,109 @@
+"""Testes de `calculate_cross_correlation` (FFT) contra o loop `shift().corr()` por lag."""
+
+import warnings
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.features import calculate_cross_correlation
+from src.features.alignment import calculate_lead_lag_correlation
+
+
+def reference(series_a: pd.Series, series_b: pd.Series, max_lag: int, alpha: float = 0.05) -> pd.DataFrame:
+    """Implementação anterior: um `shift().corr()` por lag sobre as séries alinhadas."""
+    aligned = pd.concat([series_a, series_b], axis=1)
+    a, b = aligned.iloc[:, 0], aligned.iloc[:, 1]
+    z = NormalDist().inv_cdf(1 - alpha / 2)
+    rows = []
+    for lag in range(-max_lag, max_lag + 1):
+        shifted = a.shift(lag)
+        n_obs = int((shifted.notna() & b.notna()).sum())
+        with warnings.catch_warnings():
+            # Variância zero (série constante) → NaN
+            warnings.simplefilter("ignore", RuntimeWarning)
+            correlation = shifted.corr(b)
+        rows.append({"lag": lag, "correlation": correlation, "n_obs": n_obs, "band": z / np.sqrt(n_obs)})
+    return pd.DataFrame(rows)
+
+
+def assert_matches(result: pd.DataFrame, expected: pd.DataFrame) -> None:
+    np.testing.assert_array_equal(result["lag"], expected["lag"])
+    np.testing.assert_array_equal(result["n_obs"], expected["n_obs"])
+    np.testing.assert_allclose(result["correlation"], expected["correlation"], rtol=1e-9, atol=1e-12)
+    np.testing.assert_allclose(result["band"], expected["band"], rtol=1e-12)
+
+
+@pytest.fixture
+def returns():
+    rng = np.random.default_rng(21)
+    index = pd.bdate_range("2023-01-02", periods=300)
+    iron = pd.Series(rng.normal(0, 0.015, len(index)), index=index)
+    # VALE3 segue o minério com 2 pregões de atraso
+    vale = 0.6 * iron.shift(2).fillna(0) + pd.Series(rng.normal(0, 0.01, len(index)), index=index)
+    return iron, vale
+
+
+def test_matches_shift_corr_loop(returns):
+    iron, vale = returns
+    result = calculate_cross_correlation(iron, vale, max_lag=8)
+
+    assert_matches(result, reference(iron, vale, 8))
+    best = result.loc[result["correlation"].abs().idxmax()]
+    assert best["lag"] == 2 and best["leader"] == "A" and best["significant"]
+    assert result.set_index("lag").loc[-3, "leader"] == "B"
+    assert result.set_index("lag").loc[0, "leader"] == "simultaneous"
+
+
+def test_nans_and_misaligned_indexes(returns):
+    iron, vale = returns
+    iron = iron.copy()
+    iron.iloc[[5, 6, 40, 41, 42, 200]] = np.nan
+    # Índices diferentes: as séries são alinhadas antes do deslocamento
+    vale = vale.iloc[10:].drop(vale.index[[50, 51, 120]])
+
+    result = calculate_cross_correlation(iron, vale, max_lag=5)
+
+    assert_matches(result, reference(iron, vale, 5))
+    assert (result["n_obs"] < len(iron)).all()
+
+
+def test_high_level_series(returns):
+    iron, vale = returns
+    # Níveis altos (preços) testam o cancelamento das somas da FFT
+    result = calculate_cross_correlation(1e4 + iron.cumsum(), 50 + vale.cumsum(), max_lag=3)
+
+    assert_matches(result, reference(1e4 + iron.cumsum(), 50 + vale.cumsum(), 3))
+
+
+def test_constant_series_and_short_overlap_are_nan(returns):
+    iron, vale = returns
+    constant = pd.Series(1.0, index=iron.index)
+
+    result = calculate_cross_correlation(constant, vale, max_lag=4)
+
+    assert result["correlation"].isna().all()
+    assert not result["significant"].any()
+    np.testing.assert_array_equal(result["n_obs"], reference(constant, vale, 4)["n_obs"])
+
+    # Menos de 2 pares no lag → NaN
+    short = calculate_cross_correlation(iron.iloc[:3], vale.iloc[:3], max_lag=2)
+    assert short["n_obs"].tolist() == [1, 2, 3, 2, 1]
+    assert short.loc[short["n_obs"] < 2, "correlation"].isna().all()
+
+
+def test_band_alpha(returns):
+    iron, vale = returns
+    result = calculate_cross_correlation(iron, vale, max_lag=2, alpha=0.01)
+
+    assert_matches(result, reference(iron, vale, 2, alpha=0.01))
+    np.testing.assert_array_equal(result["significant"], result["correlation"].abs() > result["band"])
+
+
+def test_lead_lag_correlation_wrapper(returns):
+    iron, vale = returns
+    result = calculate_lead_lag_correlation(iron, vale, max_lag=3)
+
+    assert list(result.columns) == ["lag", "correlation", "leader"]
+    np.testing.assert_allclose(result["correlation"], reference(iron, vale, 3)["correlation"], rtol=1e-9)
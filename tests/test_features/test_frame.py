@@ -0,0 +1,86 @@
+"""Testes dos modos sem cópia dos `add_*_features`: `inplace=True` e `FeatureFrame`."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.features import (
+    FeatureFrame,
+    add_lagged_features,
+    add_return_features,
+    add_volatility_features,
+    add_zscore_features,
+)
+
+
+@pytest.fixture
+def prices():
+    rng = np.random.default_rng(13)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.015, 200)))
+    spread = np.abs(rng.normal(0, 0.8, 200))
+    return pd.DataFrame(
+        {"close": close, "high": close + spread, "low": close - spread},
+        index=pd.bdate_range("2023-01-02", periods=200),
+    )
+
+
+def chain(df, **kwargs):
+    """Encadeia os quatro add_*_features e devolve o resultado do último."""
+    out = add_return_features(df, "close", **kwargs)
+    out = add_volatility_features(out, "close", "high", "low", **kwargs)
+    out = add_zscore_features(out, "return_1d", windows=[10, 20], **kwargs)
+    return add_lagged_features(out, "return_1d", "close", lags=[1, 2], **kwargs)
+
+
+def test_modes_give_same_values(prices):
+    copied = chain(prices)
+    features = [col for col in copied.columns if col not in prices.columns]
+
+    target = prices.copy()
+    inplace = chain(target, inplace=True)
+
+    frame = FeatureFrame(prices, capacity=4)  # força o bloco a crescer
+    assert chain(frame) is frame
+
+    pd.testing.assert_frame_equal(inplace, copied)
+    # O bloco é float64: sinais int64 voltam como 1.0/-1.0/0.0
+    pd.testing.assert_frame_equal(frame.to_frame(), copied[features].astype(np.float64))
+    assert frame.features == features
+    assert list(frame.columns) == list(copied.columns)
+
+
+def test_copy_mode_leaves_input_untouched(prices):
+    original = prices.copy()
+    out = add_return_features(prices, "close", periods=[1])
+
+    assert out is not prices
+    pd.testing.assert_frame_equal(prices, original)
+
+
+def test_inplace_returns_same_object(prices):
+    close = prices["close"].to_numpy()
+    out = add_return_features(prices, "close", periods=[1], inplace=True)
+
+    assert out is prices
+    assert "return_1d" in prices.columns
+    # Colunas existentes não são copiadas
+    assert np.shares_memory(prices["close"].to_numpy(), close)
+
+
+def test_feature_frame_shares_block(prices):
+    frame = FeatureFrame(prices)
+    add_return_features(frame, "close", periods=[1, 5])
+    features = frame.to_frame()
+
+    for column in features.columns:
+        assert np.shares_memory(features[column].to_numpy(), frame._block)
+        assert np.shares_memory(frame[column].to_numpy(), frame._block)
+    # Base não é copiada nem alterada
+    assert np.shares_memory(frame["close"].to_numpy(), prices["close"].to_numpy())
+    assert list(prices.columns) == ["close", "high", "low"]
+
+    # Reescrever uma feature altera a view já devolvida (mesma memória)
+    frame["return_1d"] = np.zeros(len(prices))
+    assert (features["return_1d"] == 0).all()
+    with pytest.raises(KeyError):
+        frame["close"] = np.zeros(len(prices))
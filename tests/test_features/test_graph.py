@@ -0,0 +1,139 @@
+"""Testes do `FeatureGraph` contra os `add_*_features` e da resolução de dependências."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import src.features.graph as graph_module
+from src.features import (
+    FeatureGraph,
+    add_lagged_features,
+    add_return_features,
+    add_volatility_features,
+    add_zscore_features,
+    feature,
+)
+
+
+@pytest.fixture
+def prices():
+    rng = np.random.default_rng(8)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.015, 250)))
+    spread = np.abs(rng.normal(0, 0.8, 250))
+    return pd.DataFrame(
+        {"close": close, "high": close + spread, "low": close - spread},
+        index=pd.bdate_range("2023-01-02", periods=250),
+    )
+
+
+@pytest.fixture
+def rules(monkeypatch):
+    """Cópia do registro de regras, descartada ao fim do teste."""
+    monkeypatch.setattr(graph_module, "_RULES", list(graph_module._RULES))
+    return graph_module._RULES
+
+
+def test_build_matches_add_features(prices):
+    expected = add_return_features(prices, "close")
+    expected = add_volatility_features(expected, "close", "high", "low")
+    expected = add_zscore_features(expected, "return_1d", windows=[10, 20])
+    expected = add_lagged_features(expected, "return_1d", "close", lags=[1, 2])
+    names = [col for col in expected.columns if col not in prices.columns]
+
+    graph = FeatureGraph(prices, ranges={"": ("high", "low")})
+    result = graph.build(names)
+
+    assert list(result.columns) == names
+    pd.testing.assert_frame_equal(result, expected[names], rtol=1e-12)
+
+
+def test_prefixed_columns(prices):
+    data = prices.rename(columns={"close": "iron_ore_price"})
+    expected = add_return_features(data, "iron_ore_price", prefix="iron_")
+    names = ["iron_return_1d", "iron_return_20d", "iron_momentum_5_20", "iron_cumulative_return_20d"]
+
+    result = FeatureGraph(data, prices={"iron_": "iron_ore_price"}).build(names)
+
+    pd.testing.assert_frame_equal(result, expected[names])
+
+
+def test_intermediates_computed_once(prices, rules):
+    calls: dict[str, int] = {}
+
+    def counting(func):
+        def wrapper(graph, **groups):
+            calls[func.__name__] = calls.get(func.__name__, 0) + 1
+            return func(graph, **groups)
+        return wrapper
+
+    rules[:] = [(regex, counting(func)) for regex, func in rules]
+    graph = FeatureGraph(prices)
+    graph.build([
+        "return_1d_zscore_20",
+        "return_1d_zscore_signal_20",
+        "volatility_5d",
+        "volatility_20d",
+        "vol_ratio_5_20",
+        "return_1d_lag_1",
+    ])
+
+    assert calls["_return"] == 1
+    assert calls["_zscore"] == 1
+    assert calls["_volatility"] == 2
+    assert sorted(graph.computed) == sorted([
+        "return_1d", "return_1d_zscore_20", "return_1d_zscore_signal_20",
+        "volatility_5d", "volatility_20d", "vol_ratio_5_20", "return_1d_lag_1",
+    ])
+    assert graph.dependencies["return_1d"] == ["close"]
+    assert graph.dependencies["return_1d_zscore_signal_20"] == ["return_1d_zscore_20"]
+    assert graph.dependencies["vol_ratio_5_20"] == ["volatility_5d", "volatility_20d"]
+    # Z-Score e volatilidade compartilham as somas rolling do retorno
+    assert list(graph._stats) == ["return_1d"]
+
+
+def test_rule_order_does_not_matter(prices, rules):
+    rules.reverse()
+    result = FeatureGraph(prices).build(["cumulative_return_20d", "return_20d"])
+
+    expected = add_return_features(prices, "close", periods=[20])
+    pd.testing.assert_frame_equal(result, expected[["cumulative_return_20d", "return_20d"]])
+
+
+def test_ambiguous_rules_raise(prices, rules):
+    @feature(r"(?P<source>\w+)_double")
+    def _double(graph, source):
+        return graph[source] * 2
+
+    @feature(r"(?P<source>\w+)_double")
+    def _also_double(graph, source):
+        return graph[source] + graph[source]
+
+    with pytest.raises(ValueError, match="ambígua"):
+        FeatureGraph(prices)["close_double"]
+
+
+def test_circular_dependency_raises(prices, rules):
+    @feature(r"ping_(?P<n>\d+)")
+    def _ping(graph, n):
+        return graph[f"pong_{n}"]
+
+    @feature(r"pong_(?P<n>\d+)")
+    def _pong(graph, n):
+        return graph[f"ping_{n}"]
+
+    graph = FeatureGraph(prices)
+    with pytest.raises(ValueError, match="Dependência circular: ping_1 -> pong_1 -> ping_1"):
+        graph.build(["ping_1"])
+    assert graph.computed == []
+
+
+def test_unknown_names_raise(prices):
+    graph = FeatureGraph(prices)
+
+    with pytest.raises(KeyError, match="Feature desconhecida"):
+        graph.build(["close", "no_such_feature"])
+    with pytest.raises(KeyError, match="Prefixo sem coluna de preço"):
+        graph["vale_return_1d"]
+    with pytest.raises(KeyError, match="Prefixo sem colunas de máxima/mínima"):
+        graph["atr_14"]
+    assert "return_1d" in graph and "no_such_feature" not in graph
@@ -0,0 +1,98 @@
+"""Testes dos estimadores online contra as funções batch."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.features import (
+    OnlineATR,
+    OnlineEstimator,
+    OnlineEWMAVolatility,
+    OnlineParkinsonVolatility,
+    OnlineRollingMean,
+    OnlineRollingStd,
+    OnlineZScore,
+    RollingStats,
+    calculate_atr,
+    calculate_ewma_volatility,
+    calculate_parkinson_volatility,
+    calculate_zscore,
+    calculate_zscore_threshold,
+)
+
+
+@pytest.fixture
+def returns() -> pd.Series:
+    rng = np.random.default_rng(3)
+    series = pd.Series(rng.standard_t(4, 5000))
+    series[[0, 5, 6, 7, 300]] = np.nan
+    series[1000:1100] = 0.25
+    series[2000:2050] = 0.0
+    return series
+
+
+@pytest.fixture
+def bars() -> pd.DataFrame:
+    rng = np.random.default_rng(4)
+    close = pd.Series(100 * np.exp(np.cumsum(rng.normal(0, 0.01, 3000))))
+    df = pd.DataFrame({
+        "high": close * (1 + rng.uniform(0, 0.01, len(close))),
+        "low": close * (1 - rng.uniform(0, 0.01, len(close))),
+        "close": close,
+    })
+    df.loc[50, "high"] = np.nan
+    df.loc[60, "close"] = np.nan
+    df.loc[1000:1030, "low"] = df.loc[1000:1030, "high"]
+    return df
+
+
+@pytest.mark.parametrize("window", [5, 20, 60])
+def test_rolling_mean_and_std_match_batch(returns, window):
+    stats = RollingStats(returns)
+
+    np.testing.assert_allclose(OnlineRollingMean(window).replay(returns), stats.mean(window), atol=1e-12)
+    np.testing.assert_allclose(OnlineRollingStd(window).replay(returns), stats.std(window), atol=1e-12)
+
+
+@pytest.mark.parametrize("window", [5, 20, 60])
+def test_zscore_and_signal_match_batch(returns, window):
+    estimator = OnlineZScore(window)
+    signals = []
+    values = []
+    for x in returns:
+        values.append(estimator.update(x))
+        signals.append(estimator.signal(1.5))
+
+    np.testing.assert_allclose(values, calculate_zscore(returns, window), rtol=1e-10, atol=1e-12)
+    assert signals == calculate_zscore_threshold(returns, window, 1.5).tolist()
+
+
+@pytest.mark.parametrize("span", [5, 20])
+def test_ewma_volatility_matches_batch(returns, span):
+    np.testing.assert_allclose(
+        OnlineEWMAVolatility(span).replay(returns), calculate_ewma_volatility(returns, span), rtol=1e-12
+    )
+
+
+@pytest.mark.parametrize("window", [14, 20])
+def test_range_estimators_match_batch(bars, window):
+    np.testing.assert_allclose(
+        OnlineATR(window).replay(bars["high"], bars["low"], bars["close"]),
+        calculate_atr(bars, window),
+        rtol=1e-12,
+    )
+    np.testing.assert_allclose(
+        OnlineParkinsonVolatility(window).replay(bars["high"], bars["low"]),
+        calculate_parkinson_volatility(bars["high"], bars["low"], window),
+        rtol=1e-10,
+        atol=1e-12,
+    )
+
+
+def test_estimator_without_value_cannot_be_instantiated():
+    class Incomplete(OnlineEstimator):
+        def update(self, x: float) -> float:
+            return x
+
+    with pytest.raises(TypeError):
+        Incomplete()
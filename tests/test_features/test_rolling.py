@@ -0,0 +1,109 @@
+"""
+Testes de RollingStats contra pandas rolling().
+
+pandas usa somas correntes e perde precisão em janelas curtas sobre séries
+de nível alto (erro relativo ~1e-5 no desvio de janela 2 aqui), então os
+valores são comparados com uma referência exata por janela (duas passadas)
+e com pandas apenas na posição dos NaN e numa tolerância folgada.
+"""
+
+import warnings
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.features import RollingStats, calculate_parkinson_volatility
+
+WINDOWS = [1, 2, 5, 20, 63, 250]
+
+
+def exact_rolling(values: pd.Series, window: int, min_periods: int | None = None):
+    """Média e desvio (ddof=1) de cada janela por duas passadas, ignorando NaN."""
+    required = window if min_periods is None else min_periods
+    padded = np.concatenate([np.full(window - 1, np.nan), values.to_numpy()])
+    windows = np.lib.stride_tricks.sliding_window_view(padded, window)
+    count = np.isfinite(windows).sum(axis=1)
+    with warnings.catch_warnings():
+        # Janelas sem valores válidos (nanmean de fatia vazia)
+        warnings.simplefilter("ignore", RuntimeWarning)
+        mean = np.nanmean(windows, axis=1)
+        std = np.sqrt(np.nansum((windows - mean[:, None]) ** 2, axis=1) / (count - 1))
+    mean[count < required] = np.nan
+    std[(count < required) | (count < 2)] = np.nan
+    return mean, std
+
+
+@pytest.fixture
+def values() -> pd.Series:
+    """Passeio aleatório com NaN isolados, um buraco longo e trechos constantes."""
+    rng = np.random.default_rng(7)
+    series = pd.Series(100 + np.cumsum(rng.standard_t(4, 3000)))
+    series[[0, 17, 18, 500]] = np.nan
+    series[900:1300] = np.nan
+    series[1500:1600] = 42.0
+    series[2000:2100] = 0.0
+    return series
+
+
+@pytest.mark.parametrize("window", WINDOWS)
+def test_mean_matches_pandas(values, window):
+    result = RollingStats(values).mean(window)
+
+    pd.testing.assert_series_equal(result, values.rolling(window).mean(), rtol=1e-6, atol=1e-6)
+    np.testing.assert_allclose(result, exact_rolling(values, window)[0], rtol=1e-12, atol=1e-10)
+
+
+@pytest.mark.parametrize("window", WINDOWS)
+def test_std_matches_pandas(values, window):
+    result = RollingStats(values).std(window)
+
+    pd.testing.assert_series_equal(result, values.rolling(window).std(), rtol=1e-4, atol=1e-6)
+    np.testing.assert_allclose(result, exact_rolling(values, window)[1], rtol=1e-9, atol=1e-9)
+
+
+@pytest.mark.parametrize("window", [5, 20, 63])
+def test_min_periods_matches_pandas(values, window):
+    min_periods = max(window // 2, 2)
+    stats = RollingStats(values, [window])
+
+    mean, std = stats.mean(window, min_periods), stats.std(window, min_periods)
+    exact_mean, exact_std = exact_rolling(values, window, min_periods)
+
+    pd.testing.assert_series_equal(
+        mean, values.rolling(window, min_periods=min_periods).mean(), rtol=1e-6, atol=1e-6
+    )
+    pd.testing.assert_series_equal(
+        std, values.rolling(window, min_periods=min_periods).std(), rtol=1e-4, atol=1e-6
+    )
+    np.testing.assert_allclose(mean, exact_mean, rtol=1e-12, atol=1e-10)
+    np.testing.assert_allclose(std, exact_std, rtol=1e-9, atol=1e-9)
+
+
+@pytest.mark.parametrize("window", [5, 20, 63])
+def test_constant_windows_are_exact(values, window):
+    stats = RollingStats(values)
+    mean, std = stats.mean(window), stats.std(window)
+
+    constant = slice(1500 + window - 1, 1600)
+    zeros = slice(2000 + window - 1, 2100)
+    assert (mean[constant] == 42.0).all()
+    assert (std[constant] == 0.0).all()
+    assert (mean[zeros] == 0.0).all()
+    assert (std[zeros] == 0.0).all()
+
+
+def test_zscore_is_nan_on_constant_windows(values):
+    zscore = RollingStats(values).zscore(20, min_periods=10)
+
+    assert zscore[1520:1600].isna().all()
+    assert zscore[2020:2100].isna().all()
+
+
+def test_parkinson_zero_range_is_zero():
+    high = pd.Series([10.0, 10.2, 10.1] + [10.0] * 30)
+    low = pd.Series([9.8, 9.9, 9.7] + [10.0] * 30)
+
+    result = calculate_parkinson_volatility(high, low, window=20)
+
+    assert (result.iloc[-10:] == 0.0).all()
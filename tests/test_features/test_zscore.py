@@ -0,0 +1,53 @@
+"""Testes do caminho compacto de Z-Score (float32/int8) contra o caminho padrão."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.features import (
+    add_zscore_features,
+    calculate_zscore,
+    calculate_zscore_signal,
+    calculate_zscore_threshold,
+)
+
+
+@pytest.fixture
+def returns():
+    rng = np.random.default_rng(17)
+    values = rng.normal(0, 1.2, 400)
+    values[[30, 31, 150]] = np.nan
+    return pd.Series(values, index=pd.bdate_range("2023-01-02", periods=400), name="return_1d")
+
+
+@pytest.mark.parametrize("window", [5, 20])
+def test_compact_signal_matches_threshold(returns, window):
+    zscore, signal = calculate_zscore_signal(returns, window, threshold=1.5)
+
+    assert zscore.dtype == np.float32 and signal.dtype == np.int8
+    assert (zscore.name, signal.name) == (f"return_1d_zscore_{window}", f"return_1d_zscore_signal_{window}")
+    np.testing.assert_allclose(zscore, calculate_zscore(returns, window).astype(np.float32))
+    # Sinal a partir do Z-Score float64: igual ao caminho padrão
+    np.testing.assert_array_equal(signal, calculate_zscore_threshold(returns, window, threshold=1.5))
+    assert set(np.unique(signal)) <= {-1, 0, 1}
+    assert (signal[zscore.isna()] == 0).all()
+
+
+def test_unnamed_values_give_unnamed_series(returns):
+    zscore, signal = calculate_zscore_signal(returns.rename(None), 20)
+
+    assert zscore.name is None and signal.name is None
+
+
+def test_add_zscore_features_compact(returns):
+    df = returns.to_frame()
+    default = add_zscore_features(df, "return_1d", windows=[10, 20])
+    compact = add_zscore_features(df, "return_1d", windows=[10, 20], compact=True)
+
+    assert list(compact.columns) == list(default.columns)
+    for window in (10, 20):
+        zscore_col, signal_col = f"return_1d_zscore_{window}", f"return_1d_zscore_signal_{window}"
+        assert compact[zscore_col].dtype == np.float32
+        assert compact[signal_col].dtype == np.int8
+        np.testing.assert_allclose(compact[zscore_col], default[zscore_col].astype(np.float32))
+        np.testing.assert_array_equal(compact[signal_col], default[signal_col])
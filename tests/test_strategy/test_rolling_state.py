@@ -0,0 +1,187 @@
+"""Testes do estado rolling incremental contra o replay vetorizado."""
+
+import numpy as np
+import pandas as pd
+import pytest
+from loguru import logger
+
+from src.strategy import SignalGenerator
+from src.strategy.rolling_state import RollingSignalState
+
+N_DAYS = 90
+
+
+@pytest.fixture
+def market():
+    """Ticks horários de minério, um fechamento diário de VALE3 e auxiliares."""
+    rng = np.random.default_rng(11)
+    days = pd.bdate_range("2024-01-01", periods=N_DAYS, tz="UTC")
+
+    iron, vale, aux = [], [], []
+    iron_close, vale_close = 100.0, 60.0
+    for day in days:
+        daily = rng.normal(0, 0.01) * (4 if rng.random() < 0.15 else 1)
+        steps = rng.normal(daily / 12, 0.001, 12)
+        if rng.random() < 0.5:
+            # Direção consistente no fim do dia
+            steps[-4:] = np.abs(steps[-4:]) * np.sign(daily)
+        prices = iron_close * np.exp(np.cumsum(steps))
+        iron.append(pd.Series(prices, index=day + pd.to_timedelta(np.arange(12), unit="h")))
+        vale_close *= np.exp(0.8 * (prices[-1] / iron_close - 1) + rng.normal(0, 0.004))
+        vale.append(pd.Series([vale_close], index=[day + pd.Timedelta(hours=20)]))
+        aux.append({
+            "timestamp": day + pd.Timedelta(hours=11, minutes=30),
+            "vix": rng.uniform(12, 30),
+            "usd_brl": 5.0,
+            "usd_brl_change": rng.normal(0, 0.003),
+        })
+        iron_close = prices[-1]
+
+    return (
+        pd.concat(iron).rename("price").to_frame(),
+        pd.concat(vale).rename("close").to_frame(),
+        pd.DataFrame(aux).set_index("timestamp"),
+    )
+
+
+def test_incremental_state_matches_batch(market, tmp_path):
+    iron_df, vale_df, aux_df = market
+    generator = SignalGenerator(state_path=tmp_path / "state.json")
+    batch = generator.generate_signals_batch(iron_df, vale_df, aux_df)
+    assert (batch["signal"] == 1).any() and (batch["signal"] == -1).any()
+
+    for day, row in batch.iterrows():
+        generator.state.update_iron_ore(iron_df[iron_df.index.normalize() == day])
+        generator.state.update_vale3(vale_df[vale_df.index.normalize() == day])
+
+        current_return, std_20d, zscore = generator.state.iron_ore_metrics()
+        assert current_return == pytest.approx(row["iron_ore_return"], rel=1e-9, abs=1e-12)
+        assert std_20d == pytest.approx(row["iron_ore_std_20d"], rel=1e-9, abs=1e-12)
+        assert zscore == pytest.approx(row["iron_ore_zscore"], rel=1e-9, abs=1e-9)
+        assert generator.state.correlation() == pytest.approx(row["correlation"], rel=1e-9, abs=1e-9)
+
+        auxiliary = aux_df.loc[aux_df.index.normalize() == day].iloc[-1].to_dict()
+        signal = generator.evaluate_signal(auxiliary, now=row["timestamp"].to_pydatetime())
+        assert (signal["signal_type"] if signal else None) == row["signal_type"], day
+
+
+def test_checkpoint_round_trip(market, tmp_path):
+    iron_df, vale_df, _ = market
+    split = iron_df.index[len(iron_df) // 2]
+    path = tmp_path / "state.json"
+
+    uninterrupted = RollingSignalState(window=20)
+    uninterrupted.update_iron_ore(iron_df)
+    uninterrupted.update_vale3(vale_df)
+
+    first = RollingSignalState(window=20)
+    first.update_iron_ore(iron_df[iron_df.index < split])
+    first.update_vale3(vale_df[vale_df.index < split])
+    first.save(path)
+
+    resumed = RollingSignalState.load(path, window=20)
+    assert resumed.to_dict() == first.to_dict()
+    resumed.update_iron_ore(iron_df[iron_df.index >= split])
+    resumed.update_vale3(vale_df[vale_df.index >= split])
+
+    assert resumed.iron_ore_metrics() == pytest.approx(uninterrupted.iron_ore_metrics(), rel=1e-12)
+    assert resumed.correlation() == pytest.approx(uninterrupted.correlation(), rel=1e-12)
+    pd.testing.assert_frame_equal(resumed.recent_ticks_frame(), uninterrupted.recent_ticks_frame())
+
+
+def test_checkpoint_with_other_window_is_discarded(market, tmp_path):
+    iron_df, _, _ = market
+    path = tmp_path / "state.json"
+    state = RollingSignalState(window=20)
+    state.update_iron_ore(iron_df)
+    state.save(path)
+
+    assert RollingSignalState.load(path, window=10).empty
+    path.write_text("{invalid")
+    assert RollingSignalState.load(path, window=20).empty
+
+
+def test_late_ticks_are_dropped_and_logged(market):
+    iron_df, vale_df, _ = market
+    messages = []
+    sink = logger.add(messages.append, level="WARNING", format="{message}")
+    try:
+        state = RollingSignalState(window=20)
+        state.update_iron_ore(iron_df.iloc[:100])
+        before = state.to_dict()
+
+        assert state.update_iron_ore(iron_df.iloc[50:60]) == 0
+        assert state.to_dict() == before
+
+        # Mesmo timestamp do último tick ainda é aplicado
+        assert state.update_iron_ore(iron_df.iloc[99:101]) == 2
+
+        state.update_vale3(vale_df.iloc[:10])
+        assert state.update_vale3(vale_df.iloc[:3]) == 0
+    finally:
+        logger.remove(sink)
+
+    assert any("10 tick(s) de minério" in m for m in messages)
+    assert any("3 preço(s) de VALE3" in m for m in messages)
+
+
+def test_refresh_state_reads_daily_and_intraday_bars(tmp_path, monkeypatch):
+    today = pd.Timestamp.now(tz="UTC").floor("D")
+    days = pd.bdate_range(end=today - pd.Timedelta(days=1), periods=30)
+    rng = np.random.default_rng(5)
+    steps = rng.normal(0, 0.01, (len(days), 2)).cumsum(axis=0)
+    iron_closes = pd.DataFrame({"close": 100 * np.exp(steps[:, 0])}, index=days)
+    vale_closes = pd.DataFrame({"close": 60 * np.exp(steps[:, 1])}, index=days)
+    # Um dia sem barra diária: completado pelo daily_close
+    daily = iron_closes.drop(days[10])
+    intraday = pd.DataFrame(
+        {"close": [110.0, 110.5, 111.0]},
+        index=today + pd.to_timedelta([0, 5, 10], unit="min"),
+    )
+    vale_today = pd.DataFrame({"close": [66.0]}, index=[today + pd.Timedelta(hours=13)])
+    calls = []
+    vale_reads = []
+
+    def read_vale3(days=30, after=None, since=None):
+        vale_reads.append(since)
+        return vale_today
+
+    def read_bars(timeframe, since, variable_key=None):
+        calls.append((timeframe, pd.Timestamp(since)))
+        bars = daily if timeframe == "1d" else intraday
+        return bars[bars.index >= since]
+
+    generator = SignalGenerator(state_path=tmp_path / "state.json")
+    monkeypatch.setattr(generator, "_read_iron_ore_bars", read_bars)
+    monkeypatch.setattr(generator, "_read_vale3", read_vale3)
+    monkeypatch.setattr(generator, "get_daily_closes", lambda days=60: (iron_closes, vale_closes))
+    monkeypatch.setattr(generator, "_auxiliary_query", lambda: lambda: [{"vix": 15.0}])
+
+    assert generator.refresh_state()["vix"] == 15.0
+    assert {timeframe for timeframe, _ in calls} == {"1d", "5m"}
+    # Só o dia corrente de VALE3 vem da tabela de preços
+    assert vale_reads == [today]
+    assert generator.state.iron_ore_close == 111.0
+    assert generator.state.iron_ore_prev_close == daily["close"].iloc[-1]
+    assert generator.state.iron_ore_returns.count == 20
+
+    # Mesmo resultado do cálculo em lote sobre os fechamentos diários
+    iron_all = pd.concat([iron_closes, intraday.iloc[[-1]]])
+    vale_all = pd.concat([vale_closes, vale_today])
+    vale_all.index = vale_all.index.floor("D")
+    iron_all.index = iron_all.index.floor("D")
+    assert generator.state.iron_ore_metrics() == pytest.approx(
+        generator.calculate_iron_ore_return(iron_all), rel=1e-9
+    )
+    assert generator.state.correlation() == pytest.approx(
+        generator.calculate_correlation(iron_all.iloc[-21:], vale_all.iloc[-21:]), rel=1e-9
+    )
+
+    # Barra aberta relida com close novo: substitui, não duplica
+    calls.clear()
+    intraday.loc[intraday.index[-1], "close"] = 109.0
+    generator.refresh_state()
+
+    assert calls == [("5m", intraday.index[-1])]
+    assert generator.state.iron_ore_close == 109.0
+    assert generator.state.recent_ticks_frame()["price"].tolist()[-3:] == [110.0, 110.5, 109.0]
@@ -0,0 +1,55 @@
+"""Testes das regras de sinal compartilhadas entre replay, backtest e execução."""
+
+import numpy as np
+import pandas as pd
+
+from src.backtest import generate_backtest_signals
+from src.config import USD_BRL_CHANGE_THRESHOLD, VIX_THRESHOLD
+from src.strategy import SignalGenerator, apply_signal_rules, calculate_usd_brl_change
+
+
+def test_apply_signal_rules_filters():
+    returns = np.array([0.03, -0.03, 0.03, 0.03, 0.03, 0.03, 0.001])
+    scale = np.array([0.01, 0.01, np.nan, 0.01, 0.01, 0.01, 0.01])
+    correlation = np.array([0.5, 0.5, 0.5, 0.1, 0.5, 0.5, 0.5])
+    vix = np.array([np.nan, 20.0, 20.0, 20.0, VIX_THRESHOLD + 1, 20.0, 20.0])
+    usd_change = np.array([0.0, -0.001, 0.0, 0.0, 0.0, -USD_BRL_CHANGE_THRESHOLD, np.nan])
+
+    signals = apply_signal_rules(returns, scale, correlation, vix=vix, usd_brl_change=usd_change)
+
+    assert signals.tolist() == [1, -1, 0, 0, 0, 0, 0]
+
+
+def test_usd_brl_change_repeats_missing_quotes():
+    change = calculate_usd_brl_change(pd.Series([5.0, 5.05, np.nan, 5.05]))
+
+    np.testing.assert_allclose(change, [np.nan, 0.01, 0.0, 0.0])
+
+
+def test_latest_auxiliary_computes_usd_brl_change():
+    rows = [{"usd_brl": 5.05, "vix": 18.0}, {"usd_brl": 5.0, "vix": 17.0}]
+
+    latest = SignalGenerator._latest_auxiliary(rows)
+
+    assert latest["vix"] == 18.0
+    assert np.isclose(latest["usd_brl_change"], 0.01)
+    assert SignalGenerator._latest_auxiliary(rows[:1])["usd_brl_change"] is None
+    assert SignalGenerator._latest_auxiliary([]) == {}
+
+
+def test_backtest_usd_brl_filter_uses_shared_change():
+    rng = np.random.default_rng(5)
+    n = 120
+    iron = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+    vale = 60 * np.exp(np.cumsum(0.8 * np.diff(np.log(iron), prepend=np.log(iron[0])) + rng.normal(0, 0.002, n)))
+    iron[100] *= 1.08
+    vale[100] *= 1.05
+    usd_brl = np.full(n, 5.0)
+    usd_brl[100] = 5.0 * (1 + 2 * USD_BRL_CHANGE_THRESHOLD)
+    index = pd.date_range("2024-01-01", periods=n, freq="B")
+    df = pd.DataFrame({"iron_ore_price": iron, "vale3_close": vale}, index=index)
+
+    assert generate_backtest_signals(df)[100] == 1
+    assert generate_backtest_signals(df.assign(usd_brl=usd_brl))[100] == 0
+    usd_brl[99] = np.nan
+    assert generate_backtest_signals(df.assign(usd_brl=usd_brl))[100] == 0